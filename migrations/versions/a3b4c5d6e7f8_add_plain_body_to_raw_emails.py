@@ -0,0 +1,34 @@
+"""Add encrypted_plain_body + plain_body_version to raw_emails
+
+HTML→Plain-Text wird einmal pro Email berechnet und verschlüsselt
+gespeichert. Bestandsmails bleiben NULL und werden lazy beim nächsten
+Lesen nachgezogen (services/plain_text.py).
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-02-08
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3b4c5d6e7f8'
+down_revision: Union[str, Sequence[str], None] = 'f2a3b4c5d6e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('raw_emails', sa.Column('encrypted_plain_body', sa.Text(), nullable=True))
+    op.add_column('raw_emails', sa.Column('plain_body_version', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('raw_emails', 'plain_body_version')
+    op.drop_column('raw_emails', 'encrypted_plain_body')
@@ -0,0 +1,48 @@
+"""Add email_search_tokens (Blind-Index) and raw_emails.search_indexed_at
+
+HMAC-Tokens für die Suche über verschlüsselte Betreff/Absender-Felder.
+Bestehende Emails bleiben search_indexed_at = NULL und werden vom
+Celery-Task backfill_search_index nachindexiert (beim Login gestartet).
+
+Revision ID: a7b8c9d0e1f2
+Revises: f1a2b3c4d5e6
+Create Date: 2026-02-02
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, Sequence[str], None] = 'f1a2b3c4d5e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('raw_emails', sa.Column('search_indexed_at', sa.DateTime(), nullable=True))
+
+    op.create_table('email_search_tokens',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('raw_email_id', sa.Integer(), nullable=False),
+    sa.Column('token', sa.String(length=32), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['raw_email_id'], ['raw_emails.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('raw_email_id', 'token', name='uq_email_search_tokens_email_token')
+    )
+    op.create_index('ix_email_search_tokens_raw_email_id', 'email_search_tokens', ['raw_email_id'], unique=False)
+    op.create_index('ix_email_search_tokens_user_token', 'email_search_tokens', ['user_id', 'token'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_email_search_tokens_user_token', table_name='email_search_tokens')
+    op.drop_index('ix_email_search_tokens_raw_email_id', table_name='email_search_tokens')
+    op.drop_table('email_search_tokens')
+    op.drop_column('raw_emails', 'search_indexed_at')
@@ -0,0 +1,32 @@
+"""Add index translation_cache(user_id, created_at)
+
+Für das Pruning pro User (älteste Einträge über TRANSLATION_CACHE_MAX_ENTRIES,
+abgelaufene nach TRANSLATION_CACHE_TTL_DAYS).
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-02-09
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4c5d6e7f8a9'
+down_revision: Union[str, Sequence[str], None] = 'a3b4c5d6e7f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_translation_cache_user_created', 'translation_cache', ['user_id', 'created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_translation_cache_user_created', table_name='translation_cache')
@@ -0,0 +1,53 @@
+"""Add thread_summary (materialisierte Thread-Übersicht)
+
+Wird per Session-Events nachgeführt; bestehende Threads werden beim ersten
+Abruf pro User lazy aufgebaut (ThreadSummaryService.ensure_built) oder
+vorab mit scripts/rebuild_thread_summary.py.
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-02-03
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, Sequence[str], None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('thread_summary',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('mail_account_id', sa.Integer(), nullable=False),
+    sa.Column('thread_id', sa.String(length=36), nullable=False),
+    sa.Column('email_count', sa.Integer(), nullable=False),
+    sa.Column('unread_count', sa.Integer(), nullable=False),
+    sa.Column('latest_date', sa.DateTime(), nullable=True),
+    sa.Column('oldest_date', sa.DateTime(), nullable=True),
+    sa.Column('latest_uid', sa.Integer(), nullable=True),
+    sa.Column('latest_sender', sa.Text(), nullable=True),
+    sa.Column('root_subject', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['mail_account_id'], ['mail_accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'thread_id', name='uq_thread_summary_user_thread')
+    )
+    op.create_index('ix_thread_summary_user_latest', 'thread_summary', ['user_id', 'latest_date'], unique=False)
+    op.create_index('ix_thread_summary_account_latest', 'thread_summary', ['mail_account_id', 'latest_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_thread_summary_account_latest', table_name='thread_summary')
+    op.drop_index('ix_thread_summary_user_latest', table_name='thread_summary')
+    op.drop_table('thread_summary')
@@ -0,0 +1,48 @@
+"""Add folder_audit_cache (Folder-Audit-Ergebnisse pro UID)
+
+Verschlüsselte Features + Ergebnis von analyze_email pro
+(Account, Ordner, UIDVALIDITY, UID) mit Config-Fingerprint. Erneute Audits
+holen nur neue UIDs vom Server.
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-02-05
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd0e1f2a3b4c5'
+down_revision: Union[str, Sequence[str], None] = 'c9d0e1f2a3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('folder_audit_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('mail_account_id', sa.Integer(), nullable=False),
+    sa.Column('folder', sa.Text(), nullable=False),
+    sa.Column('uidvalidity', sa.BigInteger(), nullable=False),
+    sa.Column('uid', sa.Integer(), nullable=False),
+    sa.Column('config_fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('encrypted_data', sa.Text(), nullable=False),
+    sa.Column('analyzed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['mail_account_id'], ['mail_accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('mail_account_id', 'folder', 'uidvalidity', 'uid', name='uq_folder_audit_cache_uid')
+    )
+    op.create_index('ix_folder_audit_cache_folder', 'folder_audit_cache', ['user_id', 'mail_account_id', 'folder'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_folder_audit_cache_folder', table_name='folder_audit_cache')
+    op.drop_table('folder_audit_cache')
@@ -0,0 +1,44 @@
+"""Add message_thread_index (persistenter Message-ID → Thread-Index)
+
+Ein Knoten pro (HMAC der) Message-ID mit zugeordneter thread_id, damit
+Antworten aus späteren Syncs oder anderen Ordnern dem richtigen Thread
+zugeordnet werden. Wird beim ersten Sync lazy aufgebaut
+(bzw. scripts/rebuild_thread_index.py).
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-02-07
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a3b4c5d6e7'
+down_revision: Union[str, Sequence[str], None] = 'e1f2a3b4c5d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('message_thread_index',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('message_key', sa.String(length=64), nullable=False),
+    sa.Column('thread_id', sa.String(length=36), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'message_key', name='uq_message_thread_index_key')
+    )
+    op.create_index('ix_message_thread_index_user_thread', 'message_thread_index', ['user_id', 'thread_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_message_thread_index_user_thread', table_name='message_thread_index')
+    op.drop_table('message_thread_index')
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Recall-Benchmark: persistierter IVF-Index vs. Brute-Force Semantic Search
+
+Misst recall@k und Latenz des ANN-Index (services/ann_index.py) gegen den
+exakten In-Memory-Index über die gleichen Embeddings.
+
+Usage:
+    # Echte Embeddings eines Users (DATABASE_URL aus .env)
+    python3 scripts/benchmark_embedding_index.py --user-id 1 --model all-minilm:22m
+
+    # Synthetische Daten (ohne DB)
+    python3 scripts/benchmark_embedding_index.py --synthetic 50000 --dim 384
+
+    # Mehrere nprobe-Werte vergleichen
+    python3 scripts/benchmark_embedding_index.py --user-id 1 --model bge-m3 --nprobe 4 8 16 32
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.embedding_index import EmbeddingIndex, EmbeddingIndexCache
+from src.services.ann_index import IVFIndex, benchmark_recall
+
+
+def _load_user_index(user_id: int, model: str) -> EmbeddingIndex:
+    from dotenv import load_dotenv
+    from src.helpers.database import get_session
+
+    load_dotenv()
+    session = get_session()
+    try:
+        index = EmbeddingIndex(user_id, model)
+        index.upsert(
+            EmbeddingIndexCache._base_query(
+                session, user_id, model, *EmbeddingIndexCache._row_columns()
+            ).yield_per(EmbeddingIndexCache.BUILD_BATCH_SIZE)
+        )
+    finally:
+        session.close()
+    return index
+
+
+def _synthetic_index(n: int, dim: int, clusters: int = 200) -> EmbeddingIndex:
+    rng = np.random.default_rng(42)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(0, clusters, size=n)] + 0.4 * rng.normal(size=(n, dim))
+    index = EmbeddingIndex(0, "synthetic")
+    index.upsert(
+        (i + 1, v.astype(np.float32).tobytes()) for i, v in enumerate(vectors)
+    )
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ANN Recall-Benchmark")
+    parser.add_argument("--user-id", type=int, help="User-ID (echte Embeddings)")
+    parser.add_argument("--model", default="all-minilm:22m", help="Embedding-Model")
+    parser.add_argument("--synthetic", type=int, help="Anzahl synthetischer Embeddings")
+    parser.add_argument("--dim", type=int, default=384, help="Dimension (synthetisch)")
+    parser.add_argument("--queries", type=int, default=200, help="Anzahl Queries")
+    parser.add_argument("-k", type=int, default=10, help="Top-K")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[IVFIndex.DEFAULT_NPROBE])
+    args = parser.parse_args()
+
+    if args.synthetic:
+        exact = _synthetic_index(args.synthetic, args.dim)
+    elif args.user_id:
+        exact = _load_user_index(args.user_id, args.model)
+    else:
+        parser.error("--user-id oder --synthetic angeben")
+
+    if exact.size == 0:
+        print("❌ Keine Embeddings gefunden")
+        return 1
+
+    print(f"📊 {exact.size} Embeddings, dim={exact.dim}")
+    ann = IVFIndex.from_embedding_index(exact)
+    print(f"🧮 IVF: {ann.centroids.shape[0]} Listen")
+
+    rng = np.random.default_rng(7)
+    rows = rng.choice(exact.size, size=min(args.queries, exact.size), replace=False)
+    # Queries leicht verrauscht (sonst trifft jede Query sich selbst)
+    queries = exact.matrix[rows] + 0.05 * rng.normal(size=(len(rows), exact.dim)).astype(np.float32)
+
+    for nprobe in args.nprobe:
+        ann.nprobe = nprobe
+        result = benchmark_recall(ann, exact, queries, k=args.k)
+        print(
+            f"  nprobe={nprobe:>4}: recall@{args.k}={result['recall_at_k']:.3f}  "
+            f"ANN {result['ann_ms_avg']:.2f} ms  vs. exakt {result['exact_ms_avg']:.2f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
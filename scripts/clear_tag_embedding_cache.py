@@ -19,8 +19,7 @@ def main():
     print("🗑️  Invalidiere Tag-Embedding Cache...")
     
     # Cache komplett leeren
-    TagEmbeddingCache._cache = {}
-    TagEmbeddingCache._ai_client_cache = {}
+    TagEmbeddingCache.clear_all()
     
     print("✅ Cache geleert!")
     print("📝 Beim nächsten Server-Start werden alle Tag-Embeddings neu generiert")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Baut den persistenten Message-ID → Thread-Index (message_thread_index) neu auf
+
+Ein Streaming-Durchlauf über alle Emails des Users: In-Reply-To/References
+werden entschlüsselt, per Union-Find zu Konversationen zusammengefasst und
+die thread_ids in raw_emails + thread_summary neu zugeordnet - ohne IMAP-Refetch.
+
+Im Normalbetrieb pflegt _persist_raw_emails den Index inkrementell und der
+erste Sync eines Users baut ihn lazy auf. Dieses Script ist für ein
+Re-Threading des Bestands (z.B. nach manuellen DB-Eingriffen).
+
+Da In-Reply-To/References verschlüsselt sind, wird der Master-Key des Users
+benötigt. Er wird nie als Argument übergeben (sonst in `ps` und Shell-History
+sichtbar), sondern aus der Umgebungsvariable MASTER_KEY gelesen oder
+interaktiv abgefragt.
+
+Usage:
+    python3 scripts/rebuild_thread_index.py --user-id 1
+"""
+
+import argparse
+import getpass
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="message_thread_index neu aufbauen")
+    parser.add_argument("--user-id", type=int, required=True, help="User-ID")
+    args = parser.parse_args()
+
+    master_key = os.environ.get("MASTER_KEY") or getpass.getpass("Master-Key des Users (Base64): ")
+    if not master_key:
+        print("❌ Kein Master-Key angegeben")
+        return 1
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    from src.helpers.database import get_session
+    from src.services.thread_index import ThreadIndexService
+
+    session = get_session()
+    try:
+        count = ThreadIndexService.rebuild_user(session, args.user_id, master_key)
+        session.commit()
+        print(f"✅ User {args.user_id}: {count} Threads")
+    except Exception as e:
+        session.rollback()
+        print(f"❌ Fehler: {e}")
+        return 1
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
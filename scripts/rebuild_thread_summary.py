@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Baut die materialisierte Thread-Übersicht (thread_summary) neu auf
+
+Im Normalbetrieb pflegen Session-Events die Tabelle inkrementell und
+ThreadSummaryService.ensure_built() baut beim ersten Abruf lazy auf. Dieses
+Script ist für den Bestand nach der Migration oder nach manuellen
+DB-Eingriffen (SQL an der ORM vorbei).
+
+Usage:
+    # Alle User
+    python3 scripts/rebuild_thread_summary.py
+
+    # Ein User
+    python3 scripts/rebuild_thread_summary.py --user-id 1
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="thread_summary neu aufbauen")
+    parser.add_argument("--user-id", type=int, help="Nur diesen User (Default: alle)")
+    args = parser.parse_args()
+
+    import importlib
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    from src.helpers.database import get_session
+    from src.services.thread_summary import ThreadSummaryService
+
+    models = importlib.import_module("src.02_models")
+
+    session = get_session()
+    try:
+        if args.user_id:
+            user_ids = [args.user_id]
+        else:
+            user_ids = [user_id for (user_id,) in session.query(models.User.id).order_by(models.User.id)]
+
+        total = 0
+        for user_id in user_ids:
+            count = ThreadSummaryService.rebuild_user(session, user_id)
+            session.commit()
+            print(f"User {user_id}: {count} Threads")
+            total += count
+        print(f"✅ {total} Threads für {len(user_ids)} User aufgebaut")
+    except Exception as e:
+        session.rollback()
+        print(f"❌ Fehler: {e}")
+        return 1
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
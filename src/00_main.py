@@ -29,6 +29,7 @@ encryption = importlib.import_module(".08_encryption", "src")
 auth = importlib.import_module(".07_auth", "src")
 google_oauth = importlib.import_module(".10_google_oauth", "src")
 processing = importlib.import_module(".12_processing", "src")
+search_index = importlib.import_module(".services.search_index", "src")
 
 # Web-App Factory
 web_app_instance = create_app()
@@ -224,6 +225,8 @@ def fetch_and_process(
                         logger.info(
                             f"📥 {len(raw_emails)} neue Mails in {mail_account.name}"
                         )
+                        # Blind-Index für die Suche direkt beim Speichern (kein Backfill nötig)
+                        search_key = search_index.derive_search_key(user_master_key)
                         for raw_email_data in raw_emails:
                             # Phase 14f: RFC-konformer Lookup (folder, uidvalidity, imap_uid)
                             imap_folder = raw_email_data.get("imap_folder")
@@ -338,6 +341,14 @@ def fetch_and_process(
                                 encrypted_calendar_data=encrypted_calendar_data,
                             )
                             session.add(raw_email)
+                            session.flush()  # ID für die Such-Tokens
+                            search_index.SearchIndexService.index_email(
+                                session,
+                                raw_email,
+                                raw_email_data.get("subject"),
+                                raw_email_data.get("sender"),
+                                search_key=search_key,
+                            )
                             saved_count += 1
 
                         if saved_count:
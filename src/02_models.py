@@ -12,6 +12,7 @@ from sqlalchemy import (
     create_engine,
     Column,
     Integer,
+    BigInteger,
     String,
     Text,
     Boolean,
@@ -26,7 +27,7 @@ from sqlalchemy import (
     event,
 )
 from sqlalchemy.dialects import postgresql
-from sqlalchemy.orm import declarative_base, sessionmaker, relationship
+from sqlalchemy.orm import declarative_base, sessionmaker, relationship, Session as OrmSession
 from sqlalchemy.pool import StaticPool
 from werkzeug.security import generate_password_hash, check_password_hash
 import secrets
@@ -1011,6 +1012,102 @@ class MailServerState(Base):
         return f"<MailServerState({self.folder}/{self.uid} {fetched})>"
 
 
+class MailFolderSyncState(Base):
+    """Sync-Marker pro Ordner für den inkrementellen State-Sync (mail_sync_v2)
+
+    Hält die Werte vom letzten erfolgreichen Abgleich von mail_server_state:
+    - uidvalidity: Wechsel → voller Neu-Scan des Ordners
+    - uidnext: unverändert + gleiche EXISTS-Anzahl → keine neuen/gelöschten Mails
+    - highestmodseq: CONDSTORE (RFC 7162) → nur geänderte Flags holen
+      (NULL = Server ohne CONDSTORE, Flags werden komplett verglichen)
+    """
+    __tablename__ = "mail_folder_sync_state"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    mail_account_id = Column(
+        Integer, ForeignKey("mail_accounts.id", ondelete="CASCADE"), nullable=False
+    )
+    folder = Column(Text, nullable=False)
+
+    uidvalidity = Column(BigInteger, nullable=False)
+    uidnext = Column(BigInteger, nullable=True)
+    highestmodseq = Column(BigInteger, nullable=True)
+    message_count = Column(Integer, default=0)
+
+    last_full_sync_at = Column(DateTime, nullable=True)
+    updated_at = Column(
+        DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC)
+    )
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "mail_account_id", "folder", name="uq_folder_sync_state"),
+    )
+
+    def __repr__(self):
+        return f"<MailFolderSyncState({self.folder} uidnext={self.uidnext} modseq={self.highestmodseq})>"
+
+
+class FolderAuditCacheEntry(Base):
+    """Gespeichertes Folder-Audit-Ergebnis pro UID (services/folder_audit_cache.py)
+
+    encrypted_data: {"features": geparste Header, "result": Kategorie/Reasons}
+    als JSON, verschlüsselt mit dem Master-Key (Zero-Knowledge).
+    config_fingerprint: Hash der Audit-Config + Trusted Senders bei der Analyse
+    """
+    __tablename__ = "folder_audit_cache"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    mail_account_id = Column(
+        Integer, ForeignKey("mail_accounts.id", ondelete="CASCADE"), nullable=False
+    )
+    folder = Column(Text, nullable=False)
+    uidvalidity = Column(BigInteger, nullable=False)
+    uid = Column(Integer, nullable=False)
+
+    config_fingerprint = Column(String(64), nullable=False)
+    encrypted_data = Column(Text, nullable=False)
+    analyzed_at = Column(DateTime, default=lambda: datetime.now(UTC))
+
+    __table_args__ = (
+        UniqueConstraint(
+            "mail_account_id", "folder", "uidvalidity", "uid", name="uq_folder_audit_cache_uid"
+        ),
+        Index("ix_folder_audit_cache_folder", "user_id", "mail_account_id", "folder"),
+    )
+
+    def __repr__(self):
+        return f"<FolderAuditCacheEntry({self.folder} uid={self.uid})>"
+
+
+class TranslationCacheEntry(Base):
+    """Übersetztes Segment (Absatz) pro User (services/translation_cache.py)
+
+    cache_key: HMAC-SHA256 über (Modell, Quellsprache, normalisiertes Segment)
+    mit einem aus dem Master-Key abgeleiteten Key - ohne ihn nicht berechenbar.
+    encrypted_translation: Übersetzung, verschlüsselt mit dem Master-Key.
+    created_at: Pruning nach Alter/Anzahl pro User (TRANSLATION_CACHE_*).
+    """
+    __tablename__ = "translation_cache"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    cache_key = Column(String(64), nullable=False)
+    model_name = Column(String(100), nullable=False)
+    encrypted_translation = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "cache_key", name="uq_translation_cache_key"),
+        # Pruning: WHERE user_id = ? ORDER BY created_at
+        Index("ix_translation_cache_user_created", "user_id", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<TranslationCacheEntry({self.model_name} {self.cache_key[:8]})>"
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # PHASE 27: Processing Status Codes (State Machine)
 # ═══════════════════════════════════════════════════════════════════════
@@ -1189,6 +1286,12 @@ class RawEmail(Base):
     # Timestamp: Wann wurde Translation erfolgreich abgeschlossen?
     translation_completed_at = Column(DateTime, nullable=True)
 
+    # ===== ABGELEITETER PLAIN TEXT (HTML→Text einmal pro Email) =====
+    # Konvertierter Body (verschlüsselt), siehe services/plain_text.py
+    encrypted_plain_body = Column(Text, nullable=True)
+    # Version des Konverters (PLAIN_TEXT_VERSION) - ältere werden lazy neu erzeugt
+    plain_body_version = Column(Integer, nullable=True)
+
     # ===== PHASE 27: PROCESSING STATE MACHINE (Resume-fähig) =====
     # Timestamp: Wann wurde AI-Classification erfolgreich abgeschlossen?
     ai_classification_completed_at = Column(DateTime, nullable=True)
@@ -1209,6 +1312,11 @@ class RawEmail(Base):
     # Zeitstempel letzter Verarbeitungsversuch
     processing_last_attempt_at = Column(DateTime, nullable=True)
 
+    # ===== SUCHINDEX (Blind-Index) =====
+    # Timestamp: Wann wurden die HMAC-Tokens (email_search_tokens) geschrieben?
+    # NULL = noch nicht indexiert → Lazy-Backfill bei der nächsten Suche
+    search_indexed_at = Column(DateTime, nullable=True)
+
     # Relationships
     user = relationship("User", back_populates="raw_emails")
     mail_account = relationship("MailAccount", back_populates="raw_emails")
@@ -1218,6 +1326,10 @@ class RawEmail(Base):
     attachments = relationship(
         "EmailAttachment", back_populates="raw_email", cascade="all, delete-orphan"
     )
+    search_tokens = relationship(
+        "EmailSearchToken", back_populates="raw_email",
+        cascade="all, delete-orphan", passive_deletes=True
+    )
 
     __table_args__ = (
         # Phase 14a: RFC-konformer Unique Key (RFC 3501 / RFC 9051)
@@ -1301,6 +1413,183 @@ class EmailAttachment(Base):
         return f"<EmailAttachment(id={self.id}, filename={self.filename}, size={self.size_human})>"
 
 
+class EmailSearchToken(Base):
+    """Blind-Index für die Suche über Betreff/Absender (Zero-Knowledge)
+
+    Enthält nur HMAC-Tokens der normalisierten Wörter/Präfixe - der HMAC-Key
+    wird aus dem Master-Key des Users abgeleitet, ohne ihn sind die Tokens
+    nicht auf Klartext rückführbar. Siehe src/services/search_index.py.
+    """
+
+    __tablename__ = "email_search_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    raw_email_id = Column(
+        Integer, ForeignKey("raw_emails.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    token = Column(String(32), nullable=False)  # HMAC-SHA256[:32 hex]
+
+    raw_email = relationship("RawEmail", back_populates="search_tokens")
+
+    __table_args__ = (
+        UniqueConstraint("raw_email_id", "token", name="uq_email_search_tokens_email_token"),
+        # Lookup: WHERE user_id = ? AND token IN (...)
+        Index("ix_email_search_tokens_user_token", "user_id", "token"),
+    )
+
+
+class ThreadSummary(Base):
+    """Materialisierte Thread-Übersicht (eine Zeile pro Thread)
+
+    Wird bei Insert/Flag-Änderung/Move/Delete von RawEmails automatisch
+    nachgeführt (Session-Events unten → services/thread_summary.py), damit
+    /api/threads mit einer indizierten Abfrage paginieren kann.
+    Soft-gelöschte Emails (deleted_at) zählen nicht mit.
+    """
+
+    __tablename__ = "thread_summary"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    mail_account_id = Column(
+        Integer, ForeignKey("mail_accounts.id", ondelete="CASCADE"), nullable=False
+    )
+    thread_id = Column(String(36), nullable=False)
+
+    email_count = Column(Integer, nullable=False, default=0)
+    unread_count = Column(Integer, nullable=False, default=0)
+    latest_date = Column(DateTime, nullable=True)
+    oldest_date = Column(DateTime, nullable=True)
+    latest_uid = Column(Integer, nullable=True)
+
+    # Zero-Knowledge: verschlüsselte Blobs 1:1 aus raw_emails übernommen
+    latest_sender = Column(Text, nullable=True)
+    root_subject = Column(Text, nullable=True)
+
+    updated_at = Column(
+        DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC)
+    )
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "thread_id", name="uq_thread_summary_user_thread"),
+        # Pagination: WHERE user_id = ? ORDER BY latest_date DESC
+        Index("ix_thread_summary_user_latest", "user_id", "latest_date"),
+        Index("ix_thread_summary_account_latest", "mail_account_id", "latest_date"),
+    )
+
+
+
+class MessageThreadNode(Base):
+    """Persistenter Message-ID → Thread-Index (services/thread_index.py)
+
+    Ein Knoten pro Message-ID, die in Message-ID, In-Reply-To oder References
+    einer Email des Users vorkommt - auch für (noch) fehlende Eltern. Alle
+    Knoten einer Konversation tragen dieselbe thread_id; taucht ein fehlendes
+    Glied später auf, werden die Threads zusammengelegt.
+
+    message_key: HMAC-SHA256 über die Message-ID mit einem aus dem Master-Key
+    abgeleiteten Key (In-Reply-To/References sind in raw_emails verschlüsselt).
+    """
+
+    __tablename__ = "message_thread_index"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    message_key = Column(String(64), nullable=False)
+    thread_id = Column(String(36), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "message_key", name="uq_message_thread_index_key"),
+        # Merge: UPDATE ... WHERE user_id = ? AND thread_id IN (...)
+        Index("ix_message_thread_index_user_thread", "user_id", "thread_id"),
+    )
+
+    def __repr__(self):
+        return f"<MessageThreadNode({self.message_key[:8]} → {self.thread_id})>"
+
+# ===== THREAD SUMMARY: Dirty-Tracking über Session-Events =====
+# Alle Schreibpfade (Sync, Aktionen, Auto-Rules, Purge) laufen über die ORM-Session.
+# before_flush merkt sich betroffene (user_id, thread_id), before_commit rechnet
+# genau diese Threads in derselben Transaktion neu.
+THREAD_SUMMARY_DIRTY_KEY = "thread_summary_dirty"
+_THREAD_SUMMARY_FIELDS = (
+    "thread_id", "deleted_at", "imap_is_seen", "received_at",
+    "imap_uid", "encrypted_sender", "encrypted_subject", "mail_account_id",
+)
+
+
+def _collect_dirty_threads(session, flush_context, instances):
+    """before_flush: (user_id, thread_id) geänderter RawEmails merken"""
+    from sqlalchemy import inspect as sa_inspect
+
+    dirty = set()
+    for obj in session.new:
+        if isinstance(obj, RawEmail) and obj.thread_id:
+            dirty.add((obj.user_id, obj.thread_id))
+    for obj in session.deleted:
+        if isinstance(obj, RawEmail) and obj.thread_id:
+            dirty.add((obj.user_id, obj.thread_id))
+    for obj in session.dirty:
+        if not isinstance(obj, RawEmail):
+            continue
+        state = sa_inspect(obj)
+        if not any(state.attrs[f].history.has_changes() for f in _THREAD_SUMMARY_FIELDS):
+            continue
+        # Thread-Wechsel: alter und neuer Thread sind betroffen
+        for thread_id in (obj.thread_id, *state.attrs.thread_id.history.deleted):
+            if thread_id:
+                dirty.add((obj.user_id, thread_id))
+
+    if dirty:
+        session.info.setdefault(THREAD_SUMMARY_DIRTY_KEY, set()).update(dirty)
+
+
+def _refresh_dirty_threads(session):
+    """before_commit: gemerkte Threads in thread_summary neu berechnen"""
+    import importlib
+    import logging
+
+    session.flush()  # ausstehende Änderungen einsammeln (löst before_flush aus)
+    dirty = session.info.pop(THREAD_SUMMARY_DIRTY_KEY, None)
+    if not dirty:
+        return
+
+    logger = logging.getLogger(__name__)
+    thread_summary = importlib.import_module(".services.thread_summary", "src")
+    try:
+        with session.begin_nested():
+            thread_summary.ThreadSummaryService.refresh_threads(session, dirty)
+        return
+    except Exception as e:
+        # Summary ist ableitbar (rebuild) - darf den eigentlichen Commit nie blockieren
+        logger.warning(f"⚠️ thread_summary nicht aktualisiert: {e}")
+
+    # Veraltete Summary nicht stehen lassen: Zeilen der User verwerfen,
+    # ensure_built() baut beim nächsten Lesen neu auf
+    try:
+        with session.begin_nested():
+            thread_summary.ThreadSummaryService.invalidate_users(
+                session, {user_id for user_id, _ in dirty}
+            )
+    except Exception as e:
+        # Letzter Ausweg: beim nächsten Commit dieser Session erneut versuchen
+        session.info.setdefault(THREAD_SUMMARY_DIRTY_KEY, set()).update(dirty)
+        logger.warning(f"⚠️ thread_summary nicht invalidiert, erneuter Versuch beim nächsten Commit: {e}")
+
+
+def _discard_dirty_threads(session, previous_transaction):
+    """after_soft_rollback: verworfene Änderungen nicht mehr nachführen (nur äußere Transaktion)"""
+    if not previous_transaction.nested:
+        session.info.pop(THREAD_SUMMARY_DIRTY_KEY, None)
+
+
+event.listen(OrmSession, "before_flush", _collect_dirty_threads)
+event.listen(OrmSession, "before_commit", _refresh_dirty_threads)
+event.listen(OrmSession, "after_soft_rollback", _discard_dirty_threads)
+
+
 class ProcessedEmail(Base):
     """Von der KI verarbeitete E-Mails mit Scoring"""
 
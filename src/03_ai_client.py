@@ -5,6 +5,7 @@ Unterstützt: Ollama (lokal), OpenAI (Cloud), Anthropic (Cloud)
 
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
+import importlib
 import json
 import os
 import requests
@@ -664,6 +665,43 @@ class LocalOllamaClient(AIClient):
         logger.debug(f"📊 Chunked Embedding: {len(chunks)} Chunks → {len(mean_embedding)}D Vektor")
         return mean_embedding.tolist()
 
+    def _get_embeddings_batch(self, texts: list[str]) -> list[list[float] | None]:
+        """🚀 PERFORMANCE: Embeddings für mehrere Texte via /api/embed (Multi-Input).
+
+        Gleiches Chunking + Mean-Pooling wie _get_embedding, aber die Chunks
+        ALLER Texte gehen gesammelt in wenigen Requests (EMBEDDING_BATCH_SIZE).
+        Ohne /api/embed (ältere Ollama-Versionen) fällt der Batch-Client auf
+        Einzel-Requests zurück.
+        """
+        import numpy as np
+
+        if getattr(self, "_embedding_batch_client", None) is None:
+            embedding_api = importlib.import_module(".05_embedding_api", "src")
+            self._embedding_batch_client = embedding_api.OllamaEmbeddingClient(
+                model=self.model, base_url=self.base_url
+            )
+
+        chunked = [
+            self._chunk_text(text.strip(), chunk_size=512, overlap=50) if text and text.strip() else []
+            for text in texts
+        ]
+        flat = [chunk for chunks in chunked for chunk in chunks]
+        vectors = self._embedding_batch_client.get_embeddings_batch(flat)
+
+        results: list[list[float] | None] = []
+        position = 0
+        for chunks in chunked:
+            chunk_vectors = [v for v in vectors[position:position + len(chunks)] if v]
+            position += len(chunks)
+            if not chunk_vectors:
+                results.append(None)
+            elif len(chunks) == 1:
+                results.append(chunk_vectors[0])
+            else:
+                # Mean-Pooling: Durchschnitt aller Chunk-Embeddings
+                results.append(np.mean(np.array(chunk_vectors), axis=0).tolist())
+        return results
+
     def _analyze_with_embeddings(
         self, subject: str, body: str, sender: str = ""
     ) -> Dict[str, Any]:
@@ -1569,6 +1607,19 @@ class OpenAIClient(AIClient):
             logger.error(f"OpenAI Embeddings Error: {exc}")
             return None
 
+    def _get_embeddings_batch(self, texts: list[str]) -> list[list[float] | None]:
+        """Batch-Embeddings (input-Array) via OpenAIEmbeddingClient.
+
+        Der Client wird einmal pro Instanz erzeugt - seine requests.Session hält die
+        Verbindung der Batch-Requests offen (Keep-Alive), batch_stats summieren sich.
+        """
+        if getattr(self, "_embedding_batch_client", None) is None:
+            embedding_api = importlib.import_module(".05_embedding_api", "src")
+            self._embedding_batch_client = embedding_api.OpenAIEmbeddingClient(
+                api_key=self.api_key, model=self.model
+            )
+        return self._embedding_batch_client.get_embeddings_batch(texts)
+
 
 class AnthropicClient(AIClient):
     """Anthropic Claude Messages API mit Rate Limiting."""
@@ -1969,6 +2020,19 @@ class MistralClient(AIClient):
         except Exception as exc:
             logger.error(f"Mistral Embeddings Error: {exc}")
             return None
+    
+    def _get_embeddings_batch(self, texts: list[str]) -> list[list[float] | None]:
+        """Batch-Embeddings (input-Array) via MistralEmbeddingClient (mistral-embed).
+
+        Der Client wird einmal pro Instanz erzeugt - seine requests.Session hält die
+        Verbindung der Batch-Requests offen (Keep-Alive), batch_stats summieren sich.
+        """
+        if getattr(self, "_embedding_batch_client", None) is None:
+            embedding_api = importlib.import_module(".05_embedding_api", "src")
+            self._embedding_batch_client = embedding_api.MistralEmbeddingClient(
+                api_key=self.api_key, model="mistral-embed"
+            )
+        return self._embedding_batch_client.get_embeddings_batch(texts)
 
 
 def resolve_model(
@@ -5,13 +5,51 @@ Anthropic hat KEINE eigene Embedding-API!
 """
 
 import os
+import time
 import requests
 import logging
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterator, List, Optional, Sequence
 
 logger = logging.getLogger(__name__)
 
+# 🚀 PERFORMANCE: Texte pro Embedding-Request bei Batch-Endpoints
+# (Ollama /api/embed, OpenAI/Mistral input-Array) - auch Collector-Größe in 12_processing
+EMBEDDING_BATCH_SIZE = max(1, int(os.getenv("EMBEDDING_BATCH_SIZE", "32")))
+
+
+def iter_batches(items: Sequence, batch_size: Optional[int] = None) -> Iterator[Sequence]:
+    """Teilt items in Blöcke von höchstens batch_size (Default: EMBEDDING_BATCH_SIZE)"""
+    batch_size = max(1, batch_size or EMBEDDING_BATCH_SIZE)
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+class EmbeddingBatchStats:
+    """Latenz-Metriken pro Batch-Request (für Monitoring/Logging)"""
+
+    def __init__(self):
+        self.batches = 0
+        self.texts = 0
+        self.seconds = 0.0
+        self.last_batch_ms = None
+
+    def record(self, size: int, seconds: float) -> None:
+        self.batches += 1
+        self.texts += size
+        self.seconds += seconds
+        self.last_batch_ms = round(seconds * 1000, 1)
+        logger.debug(f"⚡ Embedding-Batch: {size} Texte in {self.last_batch_ms} ms")
+
+    def as_dict(self) -> dict:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_ms": round(self.seconds * 1000 / self.batches, 1) if self.batches else None,
+            "avg_text_ms": round(self.seconds * 1000 / self.texts, 2) if self.texts else None,
+            "last_batch_ms": self.last_batch_ms,
+        }
+
 
 class EmbeddingClient(ABC):
     """Abstraktes Interface für Embedding-Backends"""
@@ -31,6 +69,20 @@ class EmbeddingClient(ABC):
     def dimension(self) -> int:
         """Gibt die Dimension der Embeddings zurück."""
         raise NotImplementedError
+    
+    @property
+    def batch_stats(self) -> EmbeddingBatchStats:
+        """Latenz-Metriken der Batch-Requests dieses Clients."""
+        if not hasattr(self, "_batch_stats"):
+            self._batch_stats = EmbeddingBatchStats()
+        return self._batch_stats
+    
+    @property
+    def http(self) -> requests.Session:
+        """HTTP-Session dieses Clients (Keep-Alive über alle Requests)."""
+        if not hasattr(self, "_http"):
+            self._http = requests.Session()
+        return self._http
 
 
 # =============================================================================
@@ -64,6 +116,11 @@ class OllamaEmbeddingClient(EmbeddingClient):
     def embeddings_url(self) -> str:
         return f"{self.base_url}/api/embeddings"
     
+    @property
+    def embed_url(self) -> str:
+        """Multi-Input-Endpoint (Ollama >= 0.3)"""
+        return f"{self.base_url}/api/embed"
+    
     @property
     def dimension(self) -> int:
         if self._dimension is None:
@@ -83,7 +140,7 @@ class OllamaEmbeddingClient(EmbeddingClient):
             return None
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 self.embeddings_url,
                 json={
                     "model": self.model,
@@ -109,8 +166,49 @@ class OllamaEmbeddingClient(EmbeddingClient):
             return None
     
     def get_embeddings_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
-        # Ollama hat keinen Batch-Endpoint, also sequentiell
-        return [self.get_embedding(text) for text in texts]
+        """Batch via /api/embed (input-Array), EMBEDDING_BATCH_SIZE Texte pro Request."""
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        valid = [(i, text.strip()) for i, text in enumerate(texts) if text and text.strip()]
+        
+        for batch in iter_batches(valid):
+            inputs = [text for _, text in batch]
+            embeddings = self._embed_request(inputs)
+            if embeddings is None:
+                # Ältere Ollama-Versionen kennen /api/embed nicht → Einzel-Requests
+                embeddings = [self.get_embedding(text) for text in inputs]
+            for (i, _), embedding in zip(batch, embeddings):
+                results[i] = embedding
+        
+        return results
+    
+    def _embed_request(self, inputs: List[str]) -> Optional[List[List[float]]]:
+        """Ein Request an /api/embed - None wenn Endpoint fehlt/fehlschlägt."""
+        started = time.perf_counter()
+        try:
+            response = self.http.post(
+                self.embed_url,
+                json={
+                    "model": self.model,
+                    "input": inputs,
+                    "keep_alive": "30m"
+                },
+                timeout=60
+            )
+        except requests.RequestException as e:
+            logger.warning(f"Ollama Batch Embedding Request failed: {e}")
+            return None
+        
+        if response.status_code != 200:
+            logger.warning(f"Ollama Batch Embedding Error: {response.status_code}")
+            return None
+        
+        embeddings = response.json().get("embeddings")
+        if not isinstance(embeddings, list) or len(embeddings) != len(inputs):
+            logger.warning("Ollama Batch Embedding: unerwartete Antwort")
+            return None
+        
+        self.batch_stats.record(len(inputs), time.perf_counter() - started)
+        return embeddings
 
 
 # =============================================================================
@@ -148,7 +246,7 @@ class OpenAIEmbeddingClient(EmbeddingClient):
             return None
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 self.API_URL,
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -181,51 +279,47 @@ class OpenAIEmbeddingClient(EmbeddingClient):
         if not texts:
             return []
         
-        # Leere Texte filtern, Position merken
-        valid_texts = []
-        valid_indices = []
-        for i, text in enumerate(texts):
-            if text and text.strip():
-                valid_texts.append(text.strip())
-                valid_indices.append(i)
-        
-        if not valid_texts:
+        valid = [(i, t.strip()) for i, t in enumerate(texts) if t and t.strip()]
+        if not valid:
             return [None] * len(texts)
         
-        try:
-            response = requests.post(
-                self.API_URL,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model,
-                    "input": valid_texts
-                },
-                timeout=60
-            )
-            
-            if response.status_code != 200:
-                logger.warning(f"OpenAI Batch Embedding Error: {response.status_code}")
-                return [None] * len(texts)
-            
-            data = response.json()
-            embeddings_data = data.get("data", [])
-            
-            # Ergebnisse zusammenbauen
-            results: List[Optional[List[float]]] = [None] * len(texts)
-            for emb_data in embeddings_data:
-                idx_in_batch = emb_data.get("index", 0)
-                if idx_in_batch < len(valid_indices):
-                    original_idx = valid_indices[idx_in_batch]
-                    results[original_idx] = emb_data.get("embedding")
-            
-            return results
-            
-        except requests.RequestException as e:
-            logger.warning(f"OpenAI Batch Embedding failed: {e}")
-            return [None] * len(texts)
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        
+        for batch in iter_batches(valid):
+            started = time.perf_counter()
+            try:
+                response = self.http.post(
+                    self.API_URL,
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "model": self.model,
+                        "input": [text for _, text in batch]
+                    },
+                    timeout=60
+                )
+                
+                if response.status_code != 200:
+                    logger.warning(f"OpenAI Batch Embedding Error: {response.status_code}")
+                    continue
+                
+                data = response.json()
+                embeddings_data = data.get("data", [])
+                
+                # Ergebnisse zusammenbauen (index ist relativ zum Request)
+                for emb_data in embeddings_data:
+                    idx_in_batch = emb_data.get("index", 0)
+                    if 0 <= idx_in_batch < len(batch):
+                        results[batch[idx_in_batch][0]] = emb_data.get("embedding")
+                
+                self.batch_stats.record(len(batch), time.perf_counter() - started)
+                
+            except requests.RequestException as e:
+                logger.warning(f"OpenAI Batch Embedding failed: {e}")
+        
+        return results
 
 
 # =============================================================================
@@ -260,7 +354,7 @@ class MistralEmbeddingClient(EmbeddingClient):
             return None
         
         try:
-            response = requests.post(
+            response = self.http.post(
                 self.API_URL,
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
@@ -293,50 +387,45 @@ class MistralEmbeddingClient(EmbeddingClient):
         if not texts:
             return []
         
-        valid_texts = [t.strip() for t in texts if t and t.strip()]
-        if not valid_texts:
+        valid = [(i, t.strip()) for i, t in enumerate(texts) if t and t.strip()]
+        if not valid:
             return [None] * len(texts)
         
-        try:
-            response = requests.post(
-                self.API_URL,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model,
-                    "input": valid_texts
-                },
-                timeout=60
-            )
-            
-            if response.status_code != 200:
-                logger.warning(f"Mistral Batch Embedding Error: {response.status_code}")
-                return [None] * len(texts)
-            
-            data = response.json()
-            embeddings_data = data.get("data", [])
-            
-            # Mistral gibt Embeddings in Reihenfolge zurück
-            results: List[Optional[List[float]]] = []
-            emb_iter = iter(embeddings_data)
-            
-            for text in texts:
-                if text and text.strip():
-                    try:
-                        emb_data = next(emb_iter)
-                        results.append(emb_data.get("embedding"))
-                    except StopIteration:
-                        results.append(None)
-                else:
-                    results.append(None)
-            
-            return results
-            
-        except requests.RequestException as e:
-            logger.warning(f"Mistral Batch Embedding failed: {e}")
-            return [None] * len(texts)
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        
+        for batch in iter_batches(valid):
+            started = time.perf_counter()
+            try:
+                response = self.http.post(
+                    self.API_URL,
+                    headers={
+                        "Authorization": f"Bearer {self.api_key}",
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "model": self.model,
+                        "input": [text for _, text in batch]
+                    },
+                    timeout=60
+                )
+                
+                if response.status_code != 200:
+                    logger.warning(f"Mistral Batch Embedding Error: {response.status_code}")
+                    continue
+                
+                data = response.json()
+                embeddings_data = data.get("data", [])
+                
+                # Mistral gibt Embeddings in Reihenfolge zurück
+                for (i, _), emb_data in zip(batch, embeddings_data):
+                    results[i] = emb_data.get("embedding")
+                
+                self.batch_stats.record(len(batch), time.perf_counter() - started)
+                
+            except requests.RequestException as e:
+                logger.warning(f"Mistral Batch Embedding failed: {e}")
+        
+        return results
 
 
 # =============================================================================
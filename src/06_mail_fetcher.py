@@ -14,6 +14,7 @@ import importlib
 import re
 import logging
 import json
+import time
 import uuid
 
 logger = logging.getLogger(__name__)
@@ -240,6 +241,16 @@ class ThreadCalculator:
 class MailFetcher:
     """IMAP-Client zum Abholen von E-Mails"""
 
+    # FETCH-Items für Metadaten (RFC822 wird separat bzw. im Batch mitgeholt)
+    META_FETCH_ITEMS = ['FLAGS', 'RFC822.SIZE', 'ENVELOPE', 'BODYSTRUCTURE', 'INTERNALDATE']
+
+    # Pipelined FETCH: UIDs pro FETCH-Kommando (0/1 = Einzel-FETCH wie früher)
+    FETCH_BATCH_SIZE = int(os.getenv("IMAP_FETCH_BATCH_SIZE", "100"))
+    # Byte-Budget pro FETCH-Chunk (Summe RFC822.SIZE), größere Mails einzeln (0 = nur Anzahl)
+    FETCH_BATCH_BYTES = int(os.getenv("IMAP_FETCH_BATCH_BYTES", str(20 * 1024 * 1024)))
+    # UIDs pro FETCH RFC822.SIZE beim Planen der Chunks (kurze Kommandozeilen)
+    SIZE_FETCH_BATCH = 500
+
     def __init__(self, server: str, username: str, password: str, port: int = 993):
         """
         Initialisiert IMAP-Verbindung
@@ -264,6 +275,8 @@ class MailFetcher:
         self.password = password
         self.port = port
         self.connection: Optional[IMAPClient] = None
+        # Per-Chunk Timing des letzten Batch-FETCH (für Logging/Diagnose)
+        self.last_fetch_stats: List[Dict] = []
 
     def connect(self, retry_count: int = 1, timeout: float = 15.0):
         """Stellt Verbindung zum IMAP-Server her (IMAPClient)
@@ -374,19 +387,28 @@ class MailFetcher:
         import importlib; models = importlib.import_module(".02_models", "src")
         from datetime import datetime, UTC
         
-        # Soft-Delete aller Emails dieses Folders
-        deleted_count = (
+        folder_query = (
             session.query(models.RawEmail)
             .filter_by(
                 mail_account_id=account_id,
                 imap_folder=folder,
             )
             .filter(models.RawEmail.deleted_at.is_(None))
-            .update({
-                'deleted_at': datetime.now(UTC)
-            })
         )
         
+        # Bulk-UPDATE umgeht die ORM-Events → betroffene Threads explizit vormerken
+        thread_summary = importlib.import_module(".services.thread_summary", "src")
+        affected = folder_query.with_entities(
+            models.RawEmail.user_id, models.RawEmail.thread_id
+        ).filter(models.RawEmail.thread_id.isnot(None)).distinct().all()
+        for user_id, thread_id in affected:
+            thread_summary.ThreadSummaryService.mark_dirty(session, user_id, [thread_id])
+        
+        # Soft-Delete aller Emails dieses Folders
+        deleted_count = folder_query.update({
+            'deleted_at': datetime.now(UTC)
+        })
+        
         session.commit()
         logger.warning(
             f"🗑️  UIDVALIDITY CHANGE: {deleted_count} Emails in {folder} invalidiert"
@@ -460,6 +482,8 @@ class MailFetcher:
         session = None,
         # NEU: Spezifische UIDs laden (für Filter-basiertes Delta)
         specific_uids: Optional[List[int]] = None,
+        # Pipelined FETCH: UIDs pro FETCH (None = FETCH_BATCH_SIZE)
+        batch_size: Optional[int] = None,
     ) -> List[Dict]:
         """
         Holt E-Mails mit Threading-Informationen (Phase 12)
@@ -467,6 +491,7 @@ class MailFetcher:
         + Delta-Sync (Phase 13C Part 4)
         + UIDVALIDITY-Check (Phase 14b)
         + Filter-basiertes Delta (specific_uids)
+        + Pipelined Batch-FETCH (batch_size)
 
         Args:
             folder: IMAP-Ordner (Standard: "INBOX")
@@ -479,6 +504,7 @@ class MailFetcher:
             account_id: MailAccount-ID für UIDVALIDITY-Check (Phase 14b)
             session: SQLAlchemy Session für UIDVALIDITY-Lookup (Phase 14b)
             specific_uids: Liste spezifischer UIDs die geladen werden sollen (Filter-Delta)
+            batch_size: UIDs pro FETCH-Kommando (None = IMAP_FETCH_BATCH_SIZE, 1 = Einzel-FETCH)
 
         Returns:
             Liste von E-Mail-Dicts mit erweiterten Metadaten
@@ -587,11 +613,17 @@ class MailFetcher:
                     print(f"🔍 Filter: {' '.join(str(c) for c in search_criteria)}")
                 print(f"📧 {len(mail_ids)} Mails gefunden")
 
-            emails = []
-            for mail_id in mail_ids:
-                email_data = self._fetch_email_by_id(mail_id, folder)
-                if email_data:
-                    emails.append(email_data)
+            if batch_size is None:
+                batch_size = self.FETCH_BATCH_SIZE
+
+            if batch_size and batch_size > 1:
+                emails = self._fetch_emails_batched(mail_ids, folder, batch_size)
+            else:
+                emails = []
+                for mail_id in mail_ids:
+                    email_data = self._fetch_email_by_id(mail_id, folder)
+                    if email_data:
+                        emails.append(email_data)
 
             if emails:
                 self._calculate_thread_ids(emails)
@@ -608,7 +640,9 @@ class MailFetcher:
     def _calculate_thread_ids(self, emails: List[Dict]) -> None:
         """Berechnet Thread-IDs für alle geholten E-Mails
 
-        Modifiziert die emails List in-place um thread_id & parent_uid zu setzen
+        Modifiziert die emails List in-place um thread_id & parent_uid zu setzen.
+        Sieht nur diesen Batch - die endgültige thread_id vergibt beim
+        Persistieren der Message-ID-Index (services/thread_index.py).
         """
         email_dict = {email['uid']: email for email in emails}
 
@@ -621,6 +655,161 @@ class MailFetcher:
             email_item['thread_id'] = thread_ids.get(uid)
             email_item['parent_uid'] = parent_uids.get(uid)
 
+    def _fetch_emails_batched(
+        self, mail_ids: List[int], folder: str = "INBOX", batch_size: int = 100
+    ) -> List[Dict]:
+        """Holt E-Mails chunkweise per UID-Set statt einzeln (Pipelined FETCH)
+
+        Pro Chunk genau EIN FETCH mit Metadaten + RFC822 statt 2×N Round-Trips.
+        Bei langsamen Providern (GMX) skaliert der Initial-Sync damit mit der
+        Bandbreite statt mit der Latenz.
+
+        Chunks sind durch batch_size UIDs und FETCH_BATCH_BYTES begrenzt
+        (RFC822.SIZE vorab), Mails über dem Budget werden einzeln geholt.
+
+        Schlägt ein Chunk fehl, wird er per _fetch_email_by_id() einzeln
+        nachgeladen (gleiches Verhalten wie vorher). Ist die Verbindung dabei
+        abgebrochen, wird vorher neu verbunden und der Ordner neu selektiert;
+        scheitert das (oder hat sich UIDVALIDITY geändert), endet der Ordner
+        dort - die bis dahin geholten Chunks werden zurückgegeben.
+
+        Args:
+            mail_ids: UIDs in gewünschter Reihenfolge (neueste zuerst)
+            folder: IMAP-Ordner (bereits selektiert)
+            batch_size: Anzahl UIDs pro FETCH
+
+        Returns:
+            Liste von E-Mail-Dicts (gleiches Format wie _fetch_email_by_id)
+        """
+        conn = self.connection
+        if conn is None:
+            return []
+
+        self.last_fetch_stats = []
+        emails = []
+        chunks = self._plan_fetch_chunks(conn, mail_ids, batch_size)
+        total_chunks = len(chunks)
+
+        for chunk_idx, chunk in enumerate(chunks):
+            started = time.perf_counter()
+
+            try:
+                response = self.connection.fetch(chunk, self.META_FETCH_ITEMS + ['RFC822'])
+            except Exception as e:
+                logger.warning(
+                    f"⚠️ Batch-FETCH Chunk {chunk_idx + 1}/{total_chunks} fehlgeschlagen "
+                    f"({len(chunk)} UIDs): {e} → Fallback auf Einzel-FETCH"
+                )
+                response = None
+                try:
+                    self._ensure_folder_connection(folder)
+                except ConnectionError as conn_err:
+                    logger.error(
+                        f"❌ {folder}: {conn_err} → Abbruch nach {len(emails)} Mails "
+                        f"({chunk_idx}/{total_chunks} Chunks)"
+                    )
+                    break
+
+            fetch_seconds = time.perf_counter() - started
+            chunk_bytes = 0
+            chunk_emails = 0
+
+            for mail_id in chunk:
+                if response is None:
+                    email_data = self._fetch_email_by_id(mail_id, folder)
+                elif mail_id in response:
+                    msg_data = response[mail_id]
+                    msg_bytes = msg_data.get(b'RFC822')
+                    chunk_bytes += len(msg_bytes) if msg_bytes else 0
+                    email_data = self._build_email_data(mail_id, msg_data, msg_bytes, folder)
+                else:
+                    logger.debug(f"UID {mail_id} fehlt in Batch-Response (gelöscht?)")
+                    email_data = None
+
+                if email_data:
+                    emails.append(email_data)
+                    chunk_emails += 1
+
+            total_seconds = time.perf_counter() - started
+            stats = {
+                "chunk": chunk_idx + 1,
+                "uids": len(chunk),
+                "emails": chunk_emails,
+                "bytes": chunk_bytes,
+                "fetch_seconds": round(fetch_seconds, 3),
+                "total_seconds": round(total_seconds, 3),
+            }
+            self.last_fetch_stats.append(stats)
+            logger.info(
+                f"📦 FETCH Chunk {chunk_idx + 1}/{total_chunks}: {chunk_emails}/{len(chunk)} Mails, "
+                f"{chunk_bytes / 1024:.0f} KB in {fetch_seconds:.2f}s "
+                f"(+{total_seconds - fetch_seconds:.2f}s Parsing)"
+            )
+
+        return emails
+
+    def _plan_fetch_chunks(self, conn, mail_ids: List[int], batch_size: int) -> List[List[int]]:
+        """Teilt UIDs in FETCH-Chunks (max. batch_size UIDs und FETCH_BATCH_BYTES)
+
+        Die Größen kommen aus FETCH RFC822.SIZE (ein Kommando pro
+        SIZE_FETCH_BATCH UIDs). Ohne Größen wird nur nach Anzahl geteilt.
+        """
+        budget = self.FETCH_BATCH_BYTES
+        sizes: Dict[int, int] = {}
+        if budget > 0:
+            try:
+                for i in range(0, len(mail_ids), self.SIZE_FETCH_BATCH):
+                    response = conn.fetch(mail_ids[i:i + self.SIZE_FETCH_BATCH], ['RFC822.SIZE'])
+                    for uid, data in response.items():
+                        sizes[uid] = int(data.get(b'RFC822.SIZE') or 0)
+            except Exception as e:
+                logger.debug(f"RFC822.SIZE für Chunk-Planung nicht verfügbar: {e}")
+                sizes = {}
+
+        chunks: List[List[int]] = []
+        chunk: List[int] = []
+        chunk_bytes = 0
+        for mail_id in mail_ids:
+            size = sizes.get(mail_id, 0)
+            if chunk and (len(chunk) >= batch_size or (budget > 0 and chunk_bytes + size > budget)):
+                chunks.append(chunk)
+                chunk, chunk_bytes = [], 0
+            chunk.append(mail_id)
+            chunk_bytes += size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _ensure_folder_connection(self, folder: str) -> None:
+        """Nach einem fehlgeschlagenen FETCH: Verbindung prüfen, ggf. neu verbinden
+
+        Raises:
+            ConnectionError: Reconnect/SELECT fehlgeschlagen oder UIDVALIDITY
+                geändert - die UIDs des Ordners sind dann nicht mehr gültig
+        """
+        try:
+            self.connection.noop()
+            return
+        except Exception as e:
+            logger.warning(f"⚠️ IMAP-Verbindung nach FETCH-Fehler tot ({e}) → Reconnect für {folder}")
+
+        self.disconnect()
+        self.connection = None
+        try:
+            self.connect()
+            folder_info = self.connection.select_folder(folder, readonly=True)
+        except Exception as e:
+            raise ConnectionError(f"Reconnect für {folder} fehlgeschlagen: {e}") from e
+
+        uidvalidity = (folder_info or {}).get(b'UIDVALIDITY')
+        if isinstance(uidvalidity, list):
+            uidvalidity = uidvalidity[0]
+        expected = getattr(self, '_current_folder_uidvalidity', None)
+        if expected and uidvalidity is not None and int(uidvalidity) != expected:
+            raise ConnectionError(
+                f"UIDVALIDITY von {folder} nach Reconnect geändert ({expected} → {uidvalidity})"
+            )
+
     def _fetch_email_by_id(
         self, mail_id: int, folder: str = "INBOX"
     ) -> Optional[Dict]:
@@ -639,13 +828,44 @@ class MailFetcher:
             
             # IMAPClient: fetch() gibt Dict zurück: {uid: {b'FLAGS': [...], b'RFC822': ...}}
             # PHASE 1: Metadaten + Header
-            meta_data = conn.fetch([mail_id], ['FLAGS', 'RFC822.SIZE', 'ENVELOPE', 'BODYSTRUCTURE', 'INTERNALDATE'])
+            meta_data = conn.fetch([mail_id], self.META_FETCH_ITEMS)
             
             if not meta_data or mail_id not in meta_data:
                 return None
             
             msg_data = meta_data[mail_id]
             
+            # PHASE 2: RFC822 für Body + Complete Envelope Parsing
+            body_data = conn.fetch([mail_id], ['RFC822'])
+            msg_bytes = None
+            
+            if body_data and mail_id in body_data:
+                msg_bytes = body_data[mail_id].get(b'RFC822')
+            else:
+                logger.warning(f"⚠️ FETCH FEHLGESCHLAGEN für UID {mail_id}: body_data={body_data}")
+            
+            return self._build_email_data(mail_id, msg_data, msg_bytes, folder)
+
+        except Exception as e:
+            logger.debug(f"Fetch mail error for ID {mail_id}: {e}")
+            print(f"⚠️  Fehler bei Mail-ID {mail_id}: Abruf fehlgeschlagen")
+            return None
+
+    def _build_email_data(
+        self, mail_id: int, msg_data: Dict, msg_bytes: Optional[bytes], folder: str = "INBOX"
+    ) -> Optional[Dict]:
+        """Baut das E-Mail-Dict aus bereits gefetchten FETCH-Daten
+
+        Gemeinsamer Parser für Einzel-FETCH (_fetch_email_by_id) und
+        Batch-FETCH (_fetch_emails_batched).
+
+        Args:
+            mail_id: IMAP-UID
+            msg_data: FETCH-Response-Dict (FLAGS, ENVELOPE, BODYSTRUCTURE, ...)
+            msg_bytes: RFC822-Rohdaten (oder None wenn nicht verfügbar)
+            folder: IMAP-Ordner (UTF-7)
+        """
+        try:
             # FLAGS extrahieren (bereits als Liste!)
             imap_flags_list = msg_data.get(b'FLAGS', [])
             imap_flags = ' '.join(str(f.decode() if isinstance(f, bytes) else f) for f in imap_flags_list)
@@ -761,23 +981,18 @@ class MailFetcher:
                     received_at = datetime.now()
                     logger.warning(f"⚠️ No date found, using now(): {received_at}")
             
-            # PHASE 2: RFC822 für Body + Complete Envelope Parsing
-            body_data = conn.fetch([mail_id], ['RFC822'])
+            # PHASE 2: Body + Complete Envelope Parsing aus RFC822
             body = 'N/A'
             msg = None
             
-            if body_data and mail_id in body_data:
-                msg_bytes = body_data[mail_id].get(b'RFC822')
-                if msg_bytes:
-                    msg = email.message_from_bytes(msg_bytes)
-                    body = self._extract_body(msg)
-                    # DEBUG: Log body extraction result
-                    if not body or body == 'N/A':
-                        logger.warning(f"⚠️ BODY LEER für UID {mail_id}: msg_bytes={len(msg_bytes) if msg_bytes else 0}, content_type={msg.get_content_type() if msg else 'N/A'}, is_multipart={msg.is_multipart() if msg else 'N/A'}")
-                else:
-                    logger.warning(f"⚠️ RFC822 LEER für UID {mail_id}")
+            if msg_bytes:
+                msg = email.message_from_bytes(msg_bytes)
+                body = self._extract_body(msg)
+                # DEBUG: Log body extraction result
+                if not body or body == 'N/A':
+                    logger.warning(f"⚠️ BODY LEER für UID {mail_id}: msg_bytes={len(msg_bytes) if msg_bytes else 0}, content_type={msg.get_content_type() if msg else 'N/A'}, is_multipart={msg.is_multipart() if msg else 'N/A'}")
             else:
-                logger.warning(f"⚠️ FETCH FEHLGESCHLAGEN für UID {mail_id}: body_data={body_data}")
+                logger.warning(f"⚠️ RFC822 LEER für UID {mail_id}")
             
             # Phase E Bug-Fix: Parse complete envelope (in_reply_to, references, etc.)
             # _parse_envelope() extrahiert ALLE Header auf einmal (effizienter!)
@@ -844,8 +1059,8 @@ class MailFetcher:
             return base_data
 
         except Exception as e:
-            logger.debug(f"Fetch mail error for ID {mail_id}: {e}")
-            print(f"⚠️  Fehler bei Mail-ID {mail_id}: Abruf fehlgeschlagen")
+            logger.debug(f"Parse mail error for ID {mail_id}: {e}")
+            print(f"⚠️  Fehler bei Mail-ID {mail_id}: Parsing fehlgeschlagen")
             return None
 
     def _decode_header(self, header: str) -> str:
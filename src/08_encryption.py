@@ -4,7 +4,9 @@ Phase 3: AES-256-GCM encryption for sensitive data
 """
 
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.backends import default_backend
+from typing import Iterable, List
 import os
 import base64
 import logging
@@ -279,6 +281,63 @@ class EncryptionManager:
             raise
 
 
+class BatchDecryptor:
+    """Entschlüsselt viele Blobs mit EINEM Key-Objekt (AES-256-GCM)
+
+    decrypt_data dekodiert den Master-Key und baut pro Feld ein neues
+    Cipher-Objekt. Für Batch-Verarbeitung (z.B. Auto-Rules über viele Emails)
+    wird der Key einmal dekodiert und ein AESGCM-Objekt wiederverwendet.
+    Blob-Format identisch zu encrypt_data (IV + Ciphertext + Tag).
+    """
+
+    def __init__(self, master_key: str):
+        self._aesgcm = AESGCM(base64.b64decode(master_key))
+
+    def decrypt(self, encrypted_blob: str) -> str:
+        """Entschlüsselt ein Blob ("" bleibt "", Fehler werden geloggt und geworfen)"""
+        if not encrypted_blob:
+            return ""
+
+        try:
+            encrypted_bytes = base64.b64decode(encrypted_blob)
+            return self._aesgcm.decrypt(encrypted_bytes[:12], encrypted_bytes[12:], None).decode()
+        except Exception as e:
+            logger.error(f"Decryption error: {e}")
+            raise
+
+    def decrypt_many(self, encrypted_blobs: Iterable[str]) -> List[str]:
+        """Entschlüsselt mehrere Blobs (wirft beim ersten Fehler)"""
+        return [self.decrypt(blob) for blob in encrypted_blobs]
+
+
+class BatchEncryptor:
+    """Verschlüsselt viele Felder mit EINEM Key-Objekt (AES-256-GCM)
+
+    Gegenstück zu BatchDecryptor für Bulk-Inserts (z.B. _persist_raw_emails).
+    Blob-Format identisch zu encrypt_data (IV + Ciphertext + Tag), leere
+    Werte ergeben "" wie bei encrypt_data.
+    """
+
+    def __init__(self, master_key: str):
+        self._aesgcm = AESGCM(base64.b64decode(master_key))
+
+    def encrypt(self, plaintext: str) -> str:
+        """Verschlüsselt einen String (frischer 12-Byte-IV pro Aufruf)"""
+        if not plaintext:
+            return ""
+
+        try:
+            iv = os.urandom(12)
+            return base64.b64encode(iv + self._aesgcm.encrypt(iv, plaintext.encode(), None)).decode()
+        except Exception as e:
+            logger.error(f"Encryption error: {e}")
+            raise
+
+    def encrypt_optional(self, plaintext):
+        """Wie encrypt(), aber None für leere Werte (optionale Spalten)"""
+        return self.encrypt(plaintext) if plaintext else None
+
+
 class CredentialManager:
     """Verwaltet Verschlüsslung von Zugangsdaten (IMAP-Passwörter, E-Mail-Adressen)"""
 
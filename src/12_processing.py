@@ -4,7 +4,13 @@ from __future__ import annotations
 
 import logging
 import importlib
-from typing import Callable, Optional, List, Dict
+import os
+import time
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional, List, Dict, Iterator, Sequence
 from datetime import datetime, UTC
 
 from sqlalchemy.exc import IntegrityError
@@ -15,9 +21,22 @@ sanitizer_mod = importlib.import_module(".04_sanitizer", "src")
 ai_client_mod = importlib.import_module(".03_ai_client", "src")
 scoring = importlib.import_module(".05_scoring", "src")
 imap_flags_mod = importlib.import_module(".16_imap_flags", "src")
+plain_text_mod = importlib.import_module(".services.plain_text", "src")
+spacy_context = importlib.import_module(".services.spacy_context", "src")
 
 logger = logging.getLogger(__name__)
 
+# 🚀 PERFORMANCE: Staged Pipeline für process_pending_raw_emails
+# Worker-Threads für Entschlüsselung, HTML→Text, Spracherkennung und Embedding
+# (laufen den sequentiellen DB-/LLM-Schritten voraus). 0 = rein sequentiell.
+PIPELINE_WORKERS = int(os.getenv("PROCESSING_PIPELINE_WORKERS", "2"))
+# Wie viele Batches pro Worker maximal vorbereitet auf die Klassifizierung warten
+PIPELINE_LOOKAHEAD_PER_WORKER = 2
+# Emails pro Commit in der Schreib-Stufe (jede Email in eigenem Savepoint)
+PROCESSING_COMMIT_BATCH_SIZE = max(1, int(os.getenv("PROCESSING_COMMIT_BATCH_SIZE", "20")))
+
+embedding_api_mod = importlib.import_module(".05_embedding_api", "src")
+
 
 def build_thread_context(
     session,
@@ -341,38 +360,363 @@ def add_processing_warning(
     raw_email.processing_warnings = current_warnings
 
 
-def process_pending_raw_emails(
-    session,
-    user,
-    *,
-    master_key: Optional[str] = None,
-    mail_account: Optional[object] = None,
-    limit: Optional[int] = None,
-    ai=None,
-    sanitize_level: Optional[int] = None,
-    progress_callback: Optional[Callable[[int, int, str], None]] = None,
-) -> int:
-    """Process RawEmails without ProcessedEmail entries for the given user.
+@dataclass
+class PreparedEmail:
+    """Session-unabhängig vorbereitete Inhalte einer RawEmail
 
-    Args:
-        master_key: Master-Key for encryption/decryption. Required for processing emails.
-        progress_callback: Optional callback(current_index: int, total: int, subject: str) for each email.
+    Wird von _prepare_batch erzeugt - im Pipeline-Modus in einem Worker-Thread,
+    daher nur Klartext und Ergebnisse, keine ORM-Objekte.
     """
-    if not user:
-        return 0
+    raw_email_id: int
+    subject: Optional[str] = None
+    body: Optional[str] = None
+    sender: Optional[str] = None
+    plain_body: Optional[str] = None
+    encrypted_plain_body: Optional[str] = None  # frisch konvertiert → im Hauptloop speichern
+    decrypt_error: Optional[Exception] = None
+    plain_text_error: Optional[Exception] = None  # HTML→Text bzw. Verschlüsseln des Plain Text
+    language: Optional[object] = None  # LanguageDetectionResult
+    language_error: Optional[Exception] = None
+    embedding_pending: bool = False  # Embedding soll in der Pipeline erzeugt werden
+    embedding_attempted: bool = False
+    embedding: Optional[tuple] = None  # (bytes, model, timestamp)
+    embedding_error: Optional[Exception] = None
+    timings: Dict[str, float] = field(default_factory=dict)
 
-    if not master_key:
-        logger.warning(
-            "⚠️  Master-Key nicht verfügbar - kann E-Mails nicht verarbeiten"
+
+class PipelineStats:
+    """Zeit und Anzahl pro Pipeline-Stufe (für Durchsatz-Logging)"""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.started = time.perf_counter()
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def merge(self, timings: Dict[str, float]) -> None:
+        for stage, seconds in timings.items():
+            self.add(stage, seconds)
+
+    def summary(self) -> Dict[str, dict]:
+        """{stage: {count, seconds, per_second}} + wall-clock"""
+        result = {
+            stage: {
+                "count": self.counts[stage],
+                "seconds": round(seconds, 3),
+                "per_second": round(self.counts[stage] / seconds, 2) if seconds > 0 else None,
+            }
+            for stage, seconds in self.seconds.items()
+        }
+        result["wall"] = {"seconds": round(time.perf_counter() - self.started, 3)}
+        return result
+
+    def log_summary(self, processed: int, workers: int) -> None:
+        wall = time.perf_counter() - self.started
+        stages = ", ".join(
+            f"{stage} {self.counts[stage]}× {seconds:.1f}s"
+            + (f" ({self.counts[stage] / seconds:.1f}/s)" if seconds > 0 else "")
+            for stage, seconds in self.seconds.items()
+        )
+        logger.info(
+            f"📊 Pipeline ({'sequentiell' if workers <= 0 else f'{workers} Worker'}): "
+            f"{processed} Mails in {wall:.1f}s"
+            + (f" ({processed / wall:.2f}/s)" if wall > 0 else "")
+            + (f" | {stages}" if stages else "")
         )
-        return 0
 
-    level = (
-        sanitize_level
-        if sanitize_level is not None
-        else sanitizer_mod.get_sanitization_level(False)
+
+def _detect_language(subject: Optional[str], plain_body: Optional[str]):
+    translator_mod = importlib.import_module(".services.translator_service", "src")
+    translator = translator_mod.get_translator()
+    # PLAIN TEXT für bessere Detection (HTML würde Confidence zerstören!)
+    return translator.detect_language(f"{subject or ''}\n{(plain_body or '')[:1500]}")
+
+
+def _html_to_plain(decrypted_body: Optional[str]) -> Optional[str]:
+    """SCHRITT 0: HTML→PLAIN-TEXT (muss VOR Language Detection laufen, sonst HTML-Schrott!)"""
+    try:
+        return plain_text_mod.to_plain_text(decrypted_body)
+    except Exception as html_err:
+        logger.warning(f"⚠️  HTML-Konvertierung fehlgeschlagen: {html_err}, nutze Original")
+        return decrypted_body
+
+
+def _generate_embedding(
+    prepared: PreparedEmail, ai_client, ai_model: Optional[str], master_key: Optional[str] = None
+) -> None:
+    """Embedding für eine vorbereitete Email erzeugen (Fehler werden im Objekt gespeichert)"""
+    started = time.perf_counter()
+    prepared.embedding_attempted = True
+    try:
+        semantic_search_mod = importlib.import_module(".semantic_search", "src")
+        prepared.embedding = semantic_search_mod.generate_embedding_for_email(
+            subject=prepared.subject or "",
+            body=prepared.plain_body or "",  # ← PLAIN TEXT statt HTML!
+            ai_client=ai_client,
+            model_name=ai_model,
+            master_key=master_key
+        )
+    except Exception as emb_err:
+        prepared.embedding_error = emb_err
+    prepared.timings["embedding"] = time.perf_counter() - started
+
+
+def _embed_batch(
+    prepared_emails: List[PreparedEmail], ai_client, ai_model: Optional[str], master_key: Optional[str] = None
+) -> None:
+    """🚀 PERFORMANCE: Embedding-Collector - alle offenen Embeddings eines Batches in
+    EINEM Request (generate_embeddings_for_emails) statt einem HTTP-Call pro Mail
+    """
+    todo = [
+        p for p in prepared_emails
+        if p.embedding_pending and not p.decrypt_error and not p.plain_text_error
+    ]
+    if not todo:
+        return
+    if len(todo) == 1:
+        _generate_embedding(todo[0], ai_client, ai_model, master_key)
+        return
+
+    started = time.perf_counter()
+    try:
+        semantic_search_mod = importlib.import_module(".semantic_search", "src")
+        results = semantic_search_mod.generate_embeddings_for_emails(
+            [(p.subject or "", p.plain_body or "") for p in todo],  # ← PLAIN TEXT statt HTML!
+            ai_client=ai_client,
+            model_name=ai_model,
+            master_key=master_key
+        )
+        for prepared, result in zip(todo, results):
+            prepared.embedding = result
+    except Exception as emb_err:
+        for prepared in todo:
+            prepared.embedding_error = emb_err
+    elapsed = time.perf_counter() - started
+
+    for prepared in todo:
+        prepared.embedding_attempted = True
+        prepared.timings["embedding"] = elapsed / len(todo)
+    todo[0].timings["embedding_batch"] = elapsed
+    logger.info(
+        f"⚡ Embedding-Batch: {len(todo)} Mails in {elapsed * 1000:.0f} ms "
+        f"({elapsed * 1000 / len(todo):.0f} ms/Mail)"
+    )
+
+
+def _email_payload(raw_email) -> tuple:
+    """Liest die für _prepare_email nötigen Felder (im Thread der Session!)
+
+    Bei bereits abgeschlossenen Emails wird nichts vorausberechnet - der Hauptloop
+    überspringt sie in der Regel, sonst holt er Sprache/Embedding inline nach.
+    """
+    complete = raw_email.processing_status == models.EmailProcessingStatus.COMPLETE
+    plain_current = raw_email.plain_body_version == plain_text_mod.PLAIN_TEXT_VERSION
+    return (
+        raw_email.id,
+        raw_email.encrypted_subject,
+        raw_email.encrypted_body,
+        raw_email.encrypted_sender,
+        raw_email.encrypted_plain_body if plain_current else None,
+        not raw_email.detected_language and not complete,
+        not raw_email.embedding_generated_at and not complete,
     )
 
+
+def _prepare_email(payload: tuple, master_key: str) -> PreparedEmail:
+    """Stufe 1 (CPU, ohne DB): Entschlüsseln, HTML→Text, Spracherkennung
+
+    HTML→Text nur, wenn kein gespeicherter Plain Text (aktuelle Version)
+    vorliegt - das Ergebnis wird verschlüsselt mitgegeben und im Hauptloop
+    an der RawEmail gespeichert (lazy Backfill).
+    Wirft nie - Fehler landen in PreparedEmail und werden im Hauptloop genauso
+    behandelt wie bei der bisherigen Inline-Verarbeitung. Das Embedding wird
+    danach gesammelt pro Batch erzeugt (_embed_batch).
+    """
+    raw_email_id, enc_subject, enc_body, enc_sender, enc_plain, needs_language, needs_embedding = payload
+    prepared = PreparedEmail(raw_email_id=raw_email_id, embedding_pending=needs_embedding)
+
+    # Zero-Knowledge: Entschlüssele E-Mail-Inhalte mit master_key (wird für alle Schritte benötigt)
+    started = time.perf_counter()
+    try:
+        encryption_mod = importlib.import_module(".08_encryption", "src")
+        prepared.subject = encryption_mod.EmailDataManager.decrypt_email_subject(enc_subject or "", master_key)
+        prepared.body = encryption_mod.EmailDataManager.decrypt_email_body(enc_body or "", master_key)
+        prepared.sender = encryption_mod.EmailDataManager.decrypt_email_sender(enc_sender or "", master_key)
+    except Exception as e:
+        prepared.decrypt_error = e
+        return prepared
+    prepared.timings["decrypt"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if enc_plain is not None:
+        try:
+            prepared.plain_body = encryption_mod.EmailDataManager.decrypt_email_body(enc_plain, master_key)
+        except Exception as e:
+            logger.warning(f"⚠️ Gespeicherter Plain Text von RawEmail {raw_email_id} nicht lesbar: {e}")
+    if prepared.plain_body is None:
+        try:
+            prepared.plain_body = _html_to_plain(prepared.body)
+            prepared.encrypted_plain_body = encryption_mod.EmailDataManager.encrypt_email_body(
+                prepared.plain_body or "", master_key
+            )
+        except Exception as e:
+            prepared.plain_text_error = e
+            return prepared
+    prepared.timings["html"] = time.perf_counter() - started
+
+    if needs_language:
+        started = time.perf_counter()
+        try:
+            prepared.language = _detect_language(prepared.subject, prepared.plain_body)
+        except Exception as e:
+            prepared.language_error = e
+        prepared.timings["language"] = time.perf_counter() - started
+
+    return prepared
+
+
+def _prepare_batch(
+    payloads: List[tuple], master_key: str, ai_client, ai_model: Optional[str]
+) -> List[PreparedEmail]:
+    """Stufe 1 + Embedding-Stufe für einen Batch (läuft im Pipeline-Modus im Worker)"""
+    prepared_emails = [_prepare_email(payload, master_key) for payload in payloads]
+    _embed_batch(prepared_emails, ai_client, ai_model, master_key)
+    return prepared_emails
+
+
+def _iter_prepared_emails(
+    raw_emails: List,
+    workers: int,
+    master_key: str,
+    ai_client,
+    ai_model: Optional[str],
+    batch_size: int = 1,
+) -> Iterator[PreparedEmail]:
+    """Liefert PreparedEmail in Eingabe-Reihenfolge
+
+    Emails werden in Batches zu batch_size vorbereitet, die Embeddings eines
+    Batches gehen in einem Request raus.
+    workers <= 0: sequentiell im Thread des Aufrufers.
+    workers > 0: bis zu workers × PIPELINE_LOOKAHEAD_PER_WORKER Batches werden
+    parallel vorbereitet, während der Aufrufer die vorherigen klassifiziert.
+    ORM-Felder werden hier (im Thread des Aufrufers) gelesen, die Worker
+    sehen nur Klartext-Tupel.
+    """
+    batch_size = max(1, batch_size)
+    batches = (raw_emails[i:i + batch_size] for i in range(0, len(raw_emails), batch_size))
+
+    if workers <= 0:
+        for batch in batches:
+            yield from _prepare_batch(
+                [_email_payload(raw_email) for raw_email in batch], master_key, ai_client, ai_model
+            )
+        return
+
+    # fastText-Modell einmalig im Hauptthread laden (kein paralleles Lazy-Load)
+    try:
+        translator_mod = importlib.import_module(".services.translator_service", "src")
+        translator_mod.get_translator()._load_model()
+    except Exception as e:
+        logger.debug(f"Language-Model Warmup übersprungen: {e}")
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mail-pipeline")
+    lookahead = workers * PIPELINE_LOOKAHEAD_PER_WORKER
+    in_flight = deque()
+    try:
+        for batch in batches:
+            in_flight.append(executor.submit(
+                _prepare_batch, [_email_payload(raw_email) for raw_email in batch],
+                master_key, ai_client, ai_model
+            ))
+            if len(in_flight) > lookahead:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _with_preparsed_docs(session, pairs, enabled: bool) -> Iterator[tuple]:
+    """Liefert (raw_email, prepared, {Text: Doc}) in Eingabe-Reihenfolge
+
+    Für Emails im Urgency-Booster-Modus, deren Klassifizierung noch fehlt,
+    werden die Detektor-Texte von je SPACY_PIPE_BATCH_SIZE Emails gebündelt
+    per nlp.pipe (SPACY_N_PROCESS Prozesse) geparst - die Email-Scopes der
+    Schleife starten damit vorgefüllt, statt pro Email einzeln zu parsen.
+    """
+    nlp = spacy_context.get_nlp() if enabled else None
+    if nlp is None:
+        for raw_email, prepared in pairs:
+            yield raw_email, prepared, {}
+        return
+
+    hybrid_pipeline_mod = importlib.import_module(".services.hybrid_pipeline", "src")
+    booster_accounts: Dict[int, bool] = {}
+
+    def uses_booster(raw_email) -> bool:
+        account_id = raw_email.mail_account_id
+        if account_id not in booster_accounts:
+            account = session.get(models.MailAccount, account_id) if account_id else None
+            booster_accounts[account_id] = bool(account and account.effective_ai_mode == "spacy_booster")
+        return booster_accounts[account_id]
+
+    pairs = iter(pairs)
+    while True:
+        chunk = list(islice(pairs, spacy_context.SPACY_PIPE_BATCH_SIZE))
+        if not chunk:
+            return
+        texts = {}
+        for raw_email, prepared in chunk:
+            if (
+                prepared.decrypt_error is None
+                and prepared.plain_text_error is None
+                and not raw_email.ai_classification_completed_at
+                and uses_booster(raw_email)
+            ):
+                texts[raw_email.id] = hybrid_pipeline_mod.HybridPipeline.detector_text(
+                    prepared.subject or "", prepared.plain_body
+                )
+        docs = {}
+        if texts:
+            try:
+                docs = dict(zip(texts.values(), spacy_context.parse_many(list(texts.values()), nlp)))
+            except Exception as e:
+                logger.warning(f"⚠️ spaCy-Vorab-Parse fehlgeschlagen, parse pro Email: {e}")
+        for raw_email, prepared in chunk:
+            text = texts.get(raw_email.id)
+            yield raw_email, prepared, ({text: docs[text]} if text in docs else {})
+
+
+def _rollback_email(session, savepoint) -> None:
+    """Verwirft nur die Änderungen der aktuellen Email (Savepoint)
+
+    Hat ein Zwischen-Commit (z.B. TagManager.assign_tag) den Savepoint bereits
+    freigegeben, enthält die laufende Transaktion nur noch Änderungen dieser Email.
+    """
+    if savepoint.is_active:
+        savepoint.rollback()
+    else:
+        session.rollback()
+
+
+def _commit_processing_batch(session, count: int) -> None:
+    """Committed die Savepoints der letzten count Emails gemeinsam
+
+    Schlägt der Commit fehl, gehen nur diese Emails verloren - sie bleiben
+    pending und werden beim nächsten Durchlauf erneut verarbeitet.
+    """
+    try:
+        session.commit()
+    except Exception as commit_err:
+        session.rollback()
+        logger.error(f"❌ Commit für {count} Emails fehlgeschlagen: {commit_err}")
+
+
+def _pending_raw_emails_query(session, user, mail_account=None):
+    """RawEmails des Users, bei denen mindestens ein Verarbeitungsschritt fehlt"""
     # Phase 27.1: Timestamp-basierte Query statt Status-Check
     # Finde Emails bei denen mindestens ein Step fehlt
     query = (
@@ -411,6 +755,69 @@ def process_pending_raw_emails(
 
     # Chronologische Verarbeitung: Älteste zuerst
     query = query.order_by(models.RawEmail.received_at.asc(), models.RawEmail.id.asc())
+    return query
+
+
+def pending_raw_email_ids(session, user, mail_account=None, limit: Optional[int] = None) -> List[int]:
+    """IDs für process_pending_raw_emails (gleiche Auswahl und Reihenfolge)
+
+    Übergabe an die Sync-Pipeline (Queues nlp → llm) in ID-Batches.
+    """
+    query = _pending_raw_emails_query(session, user, mail_account).with_entities(models.RawEmail.id)
+    if limit and limit > 0:
+        query = query.limit(limit)
+    return [raw_id for (raw_id,) in query]
+
+
+def process_pending_raw_emails(
+    session,
+    user,
+    *,
+    master_key: Optional[str] = None,
+    mail_account: Optional[object] = None,
+    limit: Optional[int] = None,
+    ai=None,
+    sanitize_level: Optional[int] = None,
+    progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    pipeline_workers: Optional[int] = None,
+    embedding_batch_size: Optional[int] = None,
+    raw_email_ids: Optional[Sequence[int]] = None,
+    skip_classification: bool = False,
+) -> int:
+    """Process RawEmails without ProcessedEmail entries for the given user.
+
+    Args:
+        master_key: Master-Key for encryption/decryption. Required for processing emails.
+        progress_callback: Optional callback(current_index: int, total: int, subject: str) for each email.
+        pipeline_workers: Worker-Threads für die Vorbereitungs-Stufe (Entschlüsselung,
+            HTML→Text, Sprache, Embedding). None = PROCESSING_PIPELINE_WORKERS, 0 = sequentiell.
+            Klassifizierung, Tags und DB-Writes bleiben im Thread der Session.
+            Geschrieben wird pro Email in einem Savepoint, committed je
+            PROCESSING_COMMIT_BATCH_SIZE Emails.
+        embedding_batch_size: Emails pro Embedding-Request (Collector).
+            None = EMBEDDING_BATCH_SIZE, 1 = ein Request pro Mail.
+        raw_email_ids: Nur diese RawEmails (ID-Batch aus der Sync-Pipeline).
+        skip_classification: Nur Sprache, Embedding und Übersetzung (Queue nlp) -
+            Klassifizierung und Tags übernimmt ein späterer Aufruf (Queue llm).
+    """
+    if not user:
+        return 0
+
+    if not master_key:
+        logger.warning(
+            "⚠️  Master-Key nicht verfügbar - kann E-Mails nicht verarbeiten"
+        )
+        return 0
+
+    level = (
+        sanitize_level
+        if sanitize_level is not None
+        else sanitizer_mod.get_sanitization_level(False)
+    )
+
+    query = _pending_raw_emails_query(session, user, mail_account)
+    if raw_email_ids is not None:
+        query = query.filter(models.RawEmail.id.in_(list(raw_email_ids)))
 
     if limit and limit > 0:
         query = query.limit(limit)
@@ -442,12 +849,13 @@ def process_pending_raw_emails(
     
     # 🚀 PERFORMANCE: Pre-Load alle Tag-Embeddings für User
     # Verhindert 11-13× Ollama-Calls pro Email (6min+ → 10s)
-    try:
-        tag_manager_mod = importlib.import_module(".services.tag_manager", "src")
-        preloaded = tag_manager_mod.TagEmbeddingCache.preload_user_tags(user.id, session)
-        logger.info(f"⚡ {preloaded} Tag-Embeddings vorgeladen")
-    except Exception as e:
-        logger.warning(f"⚠️  Tag-Preload fehlgeschlagen: {e}")
+    if not skip_classification:
+        try:
+            tag_manager_mod = importlib.import_module(".services.tag_manager", "src")
+            preloaded = tag_manager_mod.TagEmbeddingCache.preload_user_tags(user.id, session)
+            logger.info(f"⚡ {preloaded} Tag-Embeddings vorgeladen")
+        except Exception as e:
+            logger.warning(f"⚠️  Tag-Preload fehlgeschlagen: {e}")
 
     processed_count = 0
     total_emails = len(pending_emails)
@@ -457,8 +865,30 @@ def process_pending_raw_emails(
     # oder aus user.encrypted_master_key_for_cron entschlüsselt werden
     # Für manuelle Verarbeitung (Web-Request) sollte master_key aus Session kommen
 
-    for idx, raw_email in enumerate(pending_emails, 1):
+    # 🚀 PERFORMANCE: Staged Pipeline - Stufe 1 (Entschlüsselung, HTML→Text, Sprache,
+    # Embedding gesammelt pro Batch) läuft in Worker-Threads voraus, Stufe 2 (Translation, Klassifizierung,
+    # Tags, DB-Writes) sequentiell hier mit der Session - pro Email ein Savepoint,
+    # Commit gebündelt je PROCESSING_COMMIT_BATCH_SIZE Emails.
+    workers = PIPELINE_WORKERS if pipeline_workers is None else pipeline_workers
+    stats = PipelineStats()
+    batch_size = embedding_batch_size or embedding_api_mod.EMBEDDING_BATCH_SIZE
+    prepared_emails = _iter_prepared_emails(
+        pending_emails, workers, master_key, active_ai, ai_model, batch_size=batch_size
+    )
+
+    # Urgency Booster: Detektor-Texte pro Batch vorab per nlp.pipe parsen
+    emails_with_docs = _with_preparsed_docs(
+        session, zip(pending_emails, prepared_emails), enabled=not skip_classification
+    )
+
+    uncommitted = 0
+    for idx, (raw_email, prepared, preparsed_docs) in enumerate(emails_with_docs, 1):
         current_step = None  # Für Error-Mapping
+        stats.merge(prepared.timings)
+        # spaCy-Docs pro Email teilen (Detektoren, UrgencyBooster, Sanitizer)
+        scope_token = spacy_context.enter_email_scope(preparsed_docs)
+        # Fehler verwerfen nur diese Email, nicht den ganzen Commit-Batch
+        savepoint = session.begin_nested()
         
         try:
             # ═══════════════════════════════════════════════════════════════════════
@@ -487,47 +917,30 @@ def process_pending_raw_emails(
                     f"- behalte ProcessedEmail {already_processed.id}"
                 )
 
-            # Zero-Knowledge: Entschlüssele E-Mail-Inhalte mit master_key (wird für alle Schritte benötigt)
-            try:
-                encryption_mod = importlib.import_module(".08_encryption", "src")
-                decrypted_subject = (
-                    encryption_mod.EmailDataManager.decrypt_email_subject(
-                        raw_email.encrypted_subject or "", master_key
-                    )
-                )
-                decrypted_body = encryption_mod.EmailDataManager.decrypt_email_body(
-                    raw_email.encrypted_body or "", master_key
-                )
-                decrypted_sender = encryption_mod.EmailDataManager.decrypt_email_sender(
-                    raw_email.encrypted_sender or "", master_key
+            # Zero-Knowledge: Entschlüsselung + SCHRITT 0 (HTML→PLAIN-TEXT) sind bereits
+            # in _prepare_email passiert (sequentiell oder im Pipeline-Worker)
+            encryption_mod = importlib.import_module(".08_encryption", "src")
+            if prepared.decrypt_error:
+                logger.error(
+                    f"❌ Entschlüsselung fehlgeschlagen für RawEmail {raw_email.id}: {prepared.decrypt_error}"
                 )
-            except Exception as e:
+                continue
+            if prepared.plain_text_error:
                 logger.error(
-                    f"❌ Entschlüsselung fehlgeschlagen für RawEmail {raw_email.id}: {e}"
+                    f"❌ Plain-Text-Vorbereitung fehlgeschlagen für RawEmail {raw_email.id}: {prepared.plain_text_error}"
                 )
                 continue
+            decrypted_subject = prepared.subject
+            decrypted_body = prepared.body
+            decrypted_sender = prepared.sender
 
             subject_preview = (decrypted_subject or "(ohne Betreff)")[:50]
             
-            # ═══════════════════════════════════════════════════════════════════════
-            # SCHRITT 0: HTML→PLAIN-TEXT KONVERTIERUNG (vor allem anderen!)
-            # ═══════════════════════════════════════════════════════════════════════
-            # WICHTIG: Muss VOR Language Detection laufen, sonst HTML-Schrott!
-            plain_body = decrypted_body
-            if decrypted_body and ('<html' in decrypted_body.lower() or '<body' in decrypted_body.lower()):
-                try:
-                    logger.info("🔍 HTML im Body erkannt, starte Konvertierung...")
-                    logger.info(f"📄 decrypted_body (raw, first 500 chars):\n{repr(decrypted_body[:500])}\n")
-                    import inscriptis
-                    from inscriptis.model.config import ParserConfig
-                    plain_body = inscriptis.get_text(decrypted_body, ParserConfig(display_links=False))
-                    logger.info(
-                        f"✅ HTML→Plain Text (inscriptis): {len(decrypted_body)} chars → {len(plain_body)} chars"
-                    )
-                    logger.info(f"📄 plain_body (after inscriptis, first 500 chars):\n{repr(plain_body[:500])}\n")
-                except Exception as html_err:
-                    logger.warning(f"⚠️  HTML-Konvertierung fehlgeschlagen: {html_err}, nutze Original")
-                    plain_body = decrypted_body
+            plain_body = prepared.plain_body
+            if prepared.encrypted_plain_body is not None:
+                # Einmal konvertiert → für Embedding/Sanitizer/Reprocess wiederverwenden
+                raw_email.encrypted_plain_body = prepared.encrypted_plain_body
+                raw_email.plain_body_version = plain_text_mod.PLAIN_TEXT_VERSION
             
             # Phase 27: analysis_body als Alias für Plain Text (wird für alle folgenden Schritte genutzt)
             analysis_body = plain_body
@@ -540,16 +953,16 @@ def process_pending_raw_emails(
                 current_step = "embedding"
                 logger.info(f"🔄 [{idx}/{total_emails}] Schritt 1/4: Embedding für '{subject_preview}'")
                 
-                # Embedding generieren
+                # Embedding generieren (bzw. Ergebnis aus der Pipeline-Stufe übernehmen)
+                if not prepared.embedding_attempted:
+                    _generate_embedding(prepared, active_ai, ai_model, master_key)
+                    stats.add("embedding", prepared.timings["embedding"])
                 try:
                     semantic_search_mod = importlib.import_module(".semantic_search", "src")
+                    if prepared.embedding_error:
+                        raise prepared.embedding_error
                     embedding_bytes, embedding_model_used, embedding_timestamp = \
-                        semantic_search_mod.generate_embedding_for_email(
-                            subject=decrypted_subject or "",
-                            body=plain_body or "",  # ← PLAIN TEXT statt HTML!
-                            ai_client=active_ai,
-                            model_name=ai_model
-                        )
+                        prepared.embedding or (None, None, None)
                     
                     if embedding_bytes:
                         raw_email.email_embedding = embedding_bytes
@@ -559,6 +972,7 @@ def process_pending_raw_emails(
                         if raw_email.processing_status < models.EmailProcessingStatus.EMBEDDING_DONE:
                             raw_email.processing_status = models.EmailProcessingStatus.EMBEDDING_DONE
                         session.flush()  # 🔥 KRITISCH: Zwischenspeichern!
+                        semantic_search_mod.notify_embedding_written(raw_email)
                         logger.info(f"✅ Embedding generiert ({len(embedding_bytes)} bytes)")
                     else:
                         logger.warning(f"⚠️  Kein Embedding generiert, fahre fort ohne Embedding")
@@ -598,11 +1012,9 @@ def process_pending_raw_emails(
             # Sprache erkennen falls noch nicht gesetzt (z.B. nach Reset oder alten Mails)
             if not raw_email.detected_language:
                 try:
-                    translator_mod = importlib.import_module(".services.translator_service", "src")
-                    translator = translator_mod.get_translator()
-                    
-                    # PLAIN TEXT für bessere Detection (HTML würde Confidence zerstören!)
-                    detection = translator.detect_language(f"{decrypted_subject or ''}\n{plain_body[:1500]}")
+                    if prepared.language_error:
+                        raise prepared.language_error
+                    detection = prepared.language or _detect_language(decrypted_subject, plain_body)
                     raw_email.detected_language = detection.language
                     logger.info(f"🌍 Language detected: {detection.language} ({detection.confidence:.2f})")
                     
@@ -645,9 +1057,11 @@ def process_pending_raw_emails(
                 
                 current_step = "translation"
                 logger.info(f"🔄 [{idx}/{total_emails}] Schritt 2/4: Translation Check")
+                translation_started = time.perf_counter()
                 
                 try:
                     translator_mod = importlib.import_module(".services.translator_service", "src")
+                    translation_cache_mod = importlib.import_module(".services.translation_cache", "src")
                     translator = translator_mod.get_translator()
                     
                     # Performance-Limit für sehr lange Emails (z.B. Newsletter)
@@ -666,7 +1080,10 @@ def process_pending_raw_emails(
                         text=text_to_translate,
                         target_lang='de',
                         source_lang=raw_email.detected_language,
-                        engine='local'  # Opus-MT
+                        engine='local',  # Opus-MT
+                        cache=translation_cache_mod.PersistentTranslationCache(
+                            session, user.id, master_key
+                        )
                     )
                     logger.info(f"✅ Translation Output: {len(result.translated_text)} Zeichen")
                     
@@ -707,6 +1124,14 @@ def process_pending_raw_emails(
                         raw_email.processing_status = models.EmailProcessingStatus.TRANSLATION_DONE
                     session.flush()
                     # ⚡ Verarbeitung wird NICHT abgebrochen - AI-Klassifizierung folgt!
+                stats.add("translation", time.perf_counter() - translation_started)
+            
+            if skip_classification:
+                # Queue nlp: Klassifizierung folgt in einem eigenen Task (Queue llm)
+                if progress_callback:
+                    progress_callback(idx, total_emails, subject_preview)
+                processed_count += 1
+                continue
             
             # ═══════════════════════════════════════════════════════════════════════
             # SCHRITT 3: AI-KLASSIFIZIERUNG (nur wenn noch kein ProcessedEmail)
@@ -720,6 +1145,7 @@ def process_pending_raw_emails(
                 
                 current_step = "ai_classification"
                 logger.info(f"🔄 [{idx}/{total_emails}] Schritt 3/4: AI-Klassifizierung")
+                classification_started = time.perf_counter()
                 
                 # Ab hier beginnt die original AI-Klassifizierungs-Logik
                 clean_body = sanitizer_mod.sanitize_email(decrypted_body, level=level)
@@ -1023,7 +1449,7 @@ def process_pending_raw_emails(
                     
                         sanitization_result = sanitizer.sanitize(
                             subject=decrypted_subject or "",
-                            body=decrypted_body,  # ✅ Original HTML - wie im "Gerendert" Tab!
+                            body=plain_body,  # ✅ Gespeicherter Plain Text (gleicher Konverter wie im Sanitizer)
                             level=3
                         )
                     
@@ -1174,7 +1600,7 @@ def process_pending_raw_emails(
                 )
 
                 # 🐛 BUG-002 FIX: Transaction-Management mit try-except-rollback
-                # Per-Email Commit Pattern: Jede Email wird sofort committed (bessere Concurrency)
+                # Fehler verwerfen nur den Savepoint dieser Email (Commit gebündelt)
                 try:
                     session.add(processed_email)
                 
@@ -1191,25 +1617,23 @@ def process_pending_raw_emails(
                             "unique constraint" in err_str or
                             "already exists" in err_str):
                             logger.info(f"⏭️  RawEmail {raw_email.id} wurde parallel verarbeitet – markiere als erledigt")
-                            # Rollback vorheriger Transaktion und setze RawEmail-Status auf AI_CLASSIFIED
-                            session.rollback()
+                            # Rollback dieser Email und setze RawEmail-Status auf AI_CLASSIFIED
+                            _rollback_email(session, savepoint)
                             try:
-                                raw_email.processing_status = models.EmailProcessingStatus.AI_CLASSIFIED
-                                raw_email.processing_last_attempt_at = datetime.now(UTC)
-                                if hasattr(raw_email, 'processing_retry_count'):
-                                    raw_email.processing_retry_count = 0
-                                if hasattr(raw_email, 'retry_count'):
-                                    raw_email.retry_count = 0
-                                session.commit()
+                                with session.begin_nested():
+                                    raw_email.processing_status = models.EmailProcessingStatus.AI_CLASSIFIED
+                                    raw_email.processing_last_attempt_at = datetime.now(UTC)
+                                    if hasattr(raw_email, 'processing_retry_count'):
+                                        raw_email.processing_retry_count = 0
+                                    if hasattr(raw_email, 'retry_count'):
+                                        raw_email.retry_count = 0
                             except Exception as status_err:
                                 # Wenn sogar das Setzen des Status fehlschlägt, loggen und safe-abbrechen
-                                session.rollback()
                                 logger.error(
                                     f"❌ Konnte RawEmail {raw_email.id} nicht auf AI_CLASSIFIED setzen: {status_err}"
                                 )
                             continue
-                        # Unbekannter Fehler - rollback und re-raise
-                        session.rollback()
+                        # Unbekannter Fehler - re-raise (äußerer Handler verwirft den Savepoint)
                         raise
                 
                     # Phase 10: Auto-assign suggested_tags from AI
@@ -1353,9 +1777,6 @@ def process_pending_raw_emails(
                         except Exception as e:
                             logger.warning(f"⚠️  Phase F.2 Tag-Suggestions fehlgeschlagen: {e}")
                 
-                    # Per-Email Commit für bessere Concurrency (WAL-Mode erlaubt parallele Reads)
-                    session.commit()
-                    
                     # Phase 27.1: Timestamp-Setzung nach erfolgreichem Schritt 3
                     raw_email.ai_classification_completed_at = datetime.now(UTC)
                     # Legacy-Status für Monitoring
@@ -1363,7 +1784,8 @@ def process_pending_raw_emails(
                     raw_email.processing_last_attempt_at = datetime.now(UTC)
                     # Reset retry counter bei Erfolg
                     raw_email.processing_retry_count = 0
-                    session.commit()
+                    session.flush()
+                    stats.add("classification", time.perf_counter() - classification_started)
                     
                     logger.info(
                         "✅ Mail klassifiziert: Score=%s, Farbe=%s",
@@ -1372,8 +1794,7 @@ def process_pending_raw_emails(
                     )
                 
                 except Exception as process_err:
-                    # 🐛 BUG-002 FIX: Rollback bei Fehler während ProcessedEmail-Erstellung
-                    session.rollback()
+                    # 🐛 BUG-002 FIX: Rollback (äußerer Handler) bei Fehler während ProcessedEmail-Erstellung
                     logger.error(f"❌ Fehler bei ProcessedEmail-Erstellung (ID {raw_email.id}): {process_err}")
                     raise  # Re-raise für äußeren Exception-Handler
             
@@ -1384,24 +1805,23 @@ def process_pending_raw_emails(
             processed_count += 1
             
         except IntegrityError as integrity_err:
-            session.rollback()
+            _rollback_email(session, savepoint)
             logger.warning(f"⚠️  Mail {raw_email.id} bereits verarbeitet (IntegrityError)")
             
         except Exception as e:
             # PHASE 27: Pipeline Exception Handling mit Error-Mapping
-            session.rollback()
+            _rollback_email(session, savepoint)
             logger.error(f"❌ Fehler bei Email {raw_email.id} (Schritt: {current_step}): {e}")
             
             try:
-                # Map Exception zu Status-Code basierend auf Schritt
-                error_status = map_exception_to_status(e, current_step)
-                raw_email.processing_status = error_status
-                raw_email.processing_error = str(e)[:1000]  # Max 1000 chars
-                raw_email.processing_last_attempt_at = datetime.now(UTC)
-                # Increment retry counter
-                raw_email.processing_retry_count = (raw_email.processing_retry_count or 0) + 1
-                
-                session.commit()
+                with session.begin_nested():
+                    # Map Exception zu Status-Code basierend auf Schritt
+                    error_status = map_exception_to_status(e, current_step)
+                    raw_email.processing_status = error_status
+                    raw_email.processing_error = str(e)[:1000]  # Max 1000 chars
+                    raw_email.processing_last_attempt_at = datetime.now(UTC)
+                    # Increment retry counter
+                    raw_email.processing_retry_count = (raw_email.processing_retry_count or 0) + 1
                 
                 logger.warning(
                     f"⚠️  Status gesetzt auf {error_status} (Retry {raw_email.processing_retry_count}/3)"
@@ -1409,14 +1829,28 @@ def process_pending_raw_emails(
                 
             except Exception as status_err:
                 # Falls auch Status-Update fehlschlägt
-                session.rollback()
                 logger.error(f"❌ Konnte Status nicht setzen: {status_err}")
             
             # Continue mit nächster Email statt abzubrechen
             continue
 
-    # Alle Emails wurden einzeln committed (Per-Email Commit Pattern)
+        finally:
+            spacy_context.exit_scope(scope_token)
+            if savepoint.is_active:
+                try:
+                    savepoint.commit()
+                except Exception as release_err:
+                    _rollback_email(session, savepoint)
+                    logger.error(f"❌ Savepoint für Email {raw_email.id} fehlgeschlagen: {release_err}")
+            uncommitted += 1
+            if uncommitted >= PROCESSING_COMMIT_BATCH_SIZE:
+                _commit_processing_batch(session, uncommitted)
+                uncommitted = 0
+
+    if uncommitted:
+        _commit_processing_batch(session, uncommitted)
     logger.info(f"✅ Verarbeitung abgeschlossen: {processed_count} Mails erfolgreich verarbeitet")
+    stats.log_summary(processed_count, workers)
 
     return processed_count
 
@@ -795,6 +795,7 @@ class SMTPSender:
         models = importlib.import_module(".02_models", "src")
         encryption = importlib.import_module(".08_encryption", "src")
         db_helper = importlib.import_module(".helpers.database", "src")
+        search_index = importlib.import_module(".services.search_index", "src")
         
         RawEmail = models.RawEmail
         ProcessedEmail = models.ProcessedEmail
@@ -851,6 +852,11 @@ class SMTPSender:
             db.add(raw_email)
             db.flush()  # Um ID zu bekommen
             
+            # Blind-Index für die Suche (sonst erst nach dem nächsten Login-Backfill auffindbar)
+            search_index.SearchIndexService.index_email(
+                db, raw_email, email.subject, self.credentials["from_email"], self.master_key
+            )
+            
             # ProcessedEmail erstellen (minimale KI-Verarbeitung für Suche)
             processed = ProcessedEmail(
                 raw_email_id=raw_email.id,
@@ -10,6 +10,10 @@ Features:
 - Priority-based Execution
 - Statistics Tracking
 - Dry-Run Mode für Testing
+- Vorkompilierte Regeln (RuleMatcher): Regex/Literale einmal pro Engine,
+  Felder einmal pro Email lowercased, Tags pro Batch vorgeladen
+- Batch-Entschlüsselung: RawEmail + ProcessedEmail in einer Query, ein
+  Key-Objekt, Body nur wenn eine Regel Body-Bedingungen hat
 
 Usage:
     from src.auto_rules_engine import AutoRulesEngine
@@ -27,7 +31,7 @@ import re
 import json
 import logging
 import importlib
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Set, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta, UTC
 from sqlalchemy.orm import Session
@@ -45,6 +49,7 @@ ProcessedEmail = models.ProcessedEmail
 EmailTag = models.EmailTag
 EmailTagAssignment = models.EmailTagAssignment
 EmailDataManager = encryption.EmailDataManager
+BatchDecryptor = encryption.BatchDecryptor
 
 logger = logging.getLogger(__name__)
 
@@ -129,6 +134,196 @@ RULE_TEMPLATES = {
 }
 
 
+# ===== Vorkompilierte Regeln =====
+
+_NO_MATCH = object()
+
+# Felder mit Teilstring-Bedingungen (contains/not_contains)
+_LITERAL_FIELDS = ("sender", "subject", "body")
+
+
+@dataclass
+class ScannedEmail:
+    """Einmal pro Email vorbereitete Felder für den RuleMatcher
+
+    sender/subject/body sind lowercased, literal_hits enthält pro Feld alle
+    (lowercased) Literale aller Regeln, die im Feld vorkommen.
+    tag_names=None → wird bei Bedarf per Query nachgeladen.
+    """
+    data: Dict
+    sender: str
+    subject: str
+    body: str
+    sender_domain: str
+    literal_hits: Dict[str, Set[str]]
+    tag_names: Optional[Set[str]] = None
+
+
+class CompiledRule:
+    """Eine AutoRule mit vorab geparsten Bedingungen (JSON einmal, Regex kompiliert)
+
+    Bedingungen werden in der gleichen Reihenfolge geprüft wie bisher in
+    _match_rule. Bei match_mode 'all' bricht die Prüfung nach der ersten
+    verfehlten Bedingung ab (z.B. kein KI-Vorschlag mehr für verfehlte Regeln).
+    """
+
+    def __init__(self, rule: AutoRule):
+        conditions = rule.conditions
+        self.rule = rule
+        self.match_mode = conditions.get('match_mode', 'all')  # 'all' (AND) oder 'any' (OR)
+        self.total_conditions = len([k for k in conditions.keys() if k != 'match_mode'])
+        self.literals: Dict[str, Set[str]] = {name: set() for name in _LITERAL_FIELDS}
+        self.errors: Dict[str, str] = {}
+        self.uses_body = False
+        self.uses_tags = False
+        self.checks: List[Tuple[str, Any]] = []
+
+        for key in (
+            'sender_equals', 'sender_contains', 'sender_not_contains', 'sender_domain',
+            'subject_equals', 'subject_contains', 'subject_not_contains', 'subject_regex',
+            'body_contains', 'body_not_contains', 'body_regex',
+            'has_attachment', 'folder_equals', 'has_tag', 'not_has_tag', 'ai_suggested_tag',
+        ):
+            if key in conditions:
+                check = self._compile_condition(key, conditions[key], conditions)
+                if check is not None:
+                    self.checks.append((key, check))
+
+    def _compile_condition(self, key: str, value: Any, conditions: Dict):
+        """Erzeugt die Prüf-Funktion (scanned, engine) → Detail oder _NO_MATCH"""
+        field_name, _, operator = key.partition('_')
+
+        if operator in ('contains', 'not_contains'):
+            literal = str(value).lower()
+            self.literals[field_name].add(literal)
+            self.uses_body = self.uses_body or field_name == 'body'
+            if operator == 'contains':
+                detail = {
+                    'sender': lambda s: s.data['sender'],
+                    'subject': lambda s: s.data['subject'][:50],
+                    'body': lambda s: True,
+                }[field_name]
+                return lambda s, engine: detail(s) if literal in s.literal_hits[field_name] else _NO_MATCH
+            not_detail = f"Nicht enthalten: {value}"
+            return lambda s, engine: not_detail if literal not in s.literal_hits[field_name] else _NO_MATCH
+
+        if operator == 'equals' and field_name in ('sender', 'subject'):
+            expected = str(value).lower()
+            if field_name == 'sender':
+                return lambda s, engine: s.data['sender'] if s.sender == expected else _NO_MATCH
+            return lambda s, engine: s.data['subject'][:50] if s.subject == expected else _NO_MATCH
+
+        if key == 'sender_domain':
+            expected = str(value).lower()
+            return lambda s, engine: s.sender_domain if s.sender_domain == expected else _NO_MATCH
+
+        if operator == 'regex':
+            self.uses_body = self.uses_body or field_name == 'body'
+            try:
+                pattern = re.compile(value, re.IGNORECASE)
+            except (re.error, TypeError) as e:
+                label = "Body-Regex" if field_name == 'body' else "Regex"
+                logger.warning(f"Ungültiger {label} in Regel {self.rule.id}: {value} - {e}")
+                self.errors[f'{key}_error'] = f"Ungültiger Regex: {str(e)}"
+                return None
+            if field_name == 'body':
+                return lambda s, engine: True if pattern.search(s.data['body']) else _NO_MATCH
+            return lambda s, engine: s.data['subject'][:50] if pattern.search(s.data['subject']) else _NO_MATCH
+
+        if key == 'has_attachment':
+            return lambda s, engine: s.data['has_attachment'] if s.data['has_attachment'] == value else _NO_MATCH
+
+        if key == 'folder_equals':
+            return lambda s, engine: s.data['folder'] if s.data['folder'] == value else _NO_MATCH
+
+        if key == 'has_tag':
+            self.uses_tags = True
+            return lambda s, engine: value if value in engine._scanned_tag_names(s) else _NO_MATCH
+
+        if key == 'not_has_tag':
+            self.uses_tags = True
+            not_detail = f"Hat Tag NICHT: {value}"
+            return lambda s, engine: not_detail if value not in engine._scanned_tag_names(s) else _NO_MATCH
+
+        if key == 'ai_suggested_tag':
+            threshold = conditions.get('ai_confidence_threshold', 85)
+
+            def check_ai_tag(s, engine):
+                # Hole KI-Vorschlag für diese Email
+                suggested = engine._get_ai_suggested_tag(s.data['email_id'], value, threshold)
+                if not suggested:
+                    return _NO_MATCH
+                return f"{value} (Confidence: {suggested['confidence']}%)"
+            return check_ai_tag
+
+        return None
+
+    def match(self, scanned: ScannedEmail, engine) -> RuleMatch:
+        """Wertet die Regel gegen eine vorbereitete Email aus"""
+        matched_conditions = []
+        match_details = dict(self.errors)
+
+        if self.total_conditions and (self.match_mode == 'any' or not self.errors):
+            for name, check in self.checks:
+                detail = check(scanned, engine)
+                if detail is not _NO_MATCH:
+                    matched_conditions.append(name)
+                    match_details[name] = detail
+                elif self.match_mode != 'any':
+                    break  # 'all': eine verfehlte Bedingung reicht
+
+        if self.total_conditions == 0:
+            matched = False  # Keine Bedingungen = Kein Match
+        elif self.match_mode == 'any':
+            matched = len(matched_conditions) > 0
+        else:  # 'all'
+            matched = len(matched_conditions) == self.total_conditions
+
+        return RuleMatch(
+            rule=self.rule,
+            matched=matched,
+            matched_conditions=matched_conditions,
+            match_details=match_details
+        )
+
+
+class RuleMatcher:
+    """Alle Regeln eines Users, einmal kompiliert
+
+    Teilstring-Literale aller Regeln werden pro Feld gesammelt und pro Email
+    genau einmal gegen das (einmal) lowercased Feld geprüft - statt pro
+    Bedingung jeder Regel erneut zu lowercasen und zu suchen.
+    """
+
+    def __init__(self, rules: Iterable[AutoRule]):
+        self.rules = [CompiledRule(rule) for rule in rules]
+        self.literals: Dict[str, Tuple[str, ...]] = {
+            name: tuple(sorted(set().union(*(r.literals[name] for r in self.rules))))
+            for name in _LITERAL_FIELDS
+        }
+        self.needs_body = any(r.uses_body for r in self.rules)
+        self.needs_tags = any(r.uses_tags for r in self.rules)
+
+    def scan(self, email_data: Dict, tag_names: Optional[Set[str]] = None) -> ScannedEmail:
+        """Bereitet die Felder einer entschlüsselten Email einmalig auf"""
+        sender = email_data['sender'].lower()
+        subject = email_data['subject'].lower()
+        body = email_data['body'].lower() if self.literals['body'] else ''
+        lowered = {'sender': sender, 'subject': subject, 'body': body}
+        return ScannedEmail(
+            data=email_data,
+            sender=sender,
+            subject=subject,
+            body=body,
+            sender_domain=sender.split('@')[-1] if '@' in sender else '',
+            literal_hits={
+                name: {literal for literal in self.literals[name] if literal in lowered[name]}
+                for name in _LITERAL_FIELDS
+            },
+            tag_names=tag_names,
+        )
+
+
 class AutoRulesEngine:
     """
     Engine für automatische E-Mail-Aktionen basierend auf Regeln.
@@ -150,6 +345,7 @@ class AutoRulesEngine:
         self.master_key = master_key
         self._db_session = db_session
         self._mail_sync = None
+        self._matchers: Dict[tuple, RuleMatcher] = {}
     
     @property
     def db(self) -> Session:
@@ -171,6 +367,18 @@ class AutoRulesEngine:
             is_active=True
         ).order_by(AutoRule.priority.asc()).all()
     
+    def get_rule_matcher(self, rules: List[AutoRule]) -> RuleMatcher:
+        """Kompilierter Matcher für diese Regeln (gecacht pro Engine)
+        
+        Key enthält conditions_json - geänderte Regeln werden neu kompiliert.
+        """
+        key = tuple((rule.id, rule.conditions_json) for rule in rules)
+        matcher = self._matchers.get(key)
+        if matcher is None:
+            matcher = RuleMatcher(rules)
+            self._matchers[key] = matcher
+        return matcher
+    
     def process_email(
         self, 
         email_id: int,
@@ -214,15 +422,30 @@ class AutoRulesEngine:
             # Alle aktiven Regeln
             rules = self.get_active_rules()
         
-        # Regeln anwenden
-        for rule in rules:
-            match = self._match_rule(rule, email_data)
+        matcher = self.get_rule_matcher(rules)
+        return self._apply_rules(raw_email, matcher.scan(email_data), matcher, dry_run)
+    
+    def _apply_rules(
+        self,
+        raw_email: RawEmail,
+        scanned: ScannedEmail,
+        matcher: RuleMatcher,
+        dry_run: bool = False
+    ) -> List[RuleExecutionResult]:
+        """Wertet alle Regeln des Matchers gegen eine Email aus und führt Treffer aus"""
+        results = []
+        email_id = raw_email.id
+        
+        for compiled in matcher.rules:
+            rule = compiled.rule
+            match = compiled.match(scanned, self)
             
             if match.matched:
                 logger.info(
                     f"✅ Regel '{rule.name}' matched Email {email_id}: "
                     f"{match.matched_conditions}"
                 )
+                actions = rule.actions
                 
                 if dry_run:
                     # Dry-Run: Zeige was passieren würde
@@ -232,16 +455,20 @@ class AutoRulesEngine:
                         email_id=email_id,
                         success=True,
                         actions_executed=[
-                            f"[DRY-RUN] Would execute: {json.dumps(rule.actions)}"
+                            f"[DRY-RUN] Would execute: {json.dumps(actions)}"
                         ]
                     ))
                 else:
                     # Echte Ausführung
-                    result = self._execute_rule(rule, raw_email, email_data)
+                    result = self._execute_rule(rule, raw_email, scanned.data)
                     results.append(result)
+                    
+                    # Regel-Ketten: zugewiesenes Tag für has_tag der folgenden Regeln
+                    if result.success and 'apply_tag' in actions and scanned.tag_names is not None:
+                        scanned.tag_names.add(actions['apply_tag'])
                 
                 # Stop-After-Match?
-                if rule.actions.get('stop_processing', False):
+                if actions.get('stop_processing', False):
                     logger.info(f"🛑 Regel '{rule.name}' hat stop_processing=True - stoppe weitere Regeln")
                     break
         
@@ -268,13 +495,17 @@ class AutoRulesEngine:
         # - AI-Klassifizierung abgeschlossen (ai_classification_completed_at != NULL)
         # - Noch nicht von Auto-Rules verarbeitet (auto_rules_completed_at IS NULL)
         # - Nicht in Fehler-Status (processing_status >= 0)
-        new_emails = self.db.query(RawEmail).filter(
+        # 🚀 PERFORMANCE: ProcessedEmail-ID per Join statt einer Query pro Email
+        rows = self.db.query(RawEmail, ProcessedEmail.id).outerjoin(
+            ProcessedEmail, ProcessedEmail.raw_email_id == RawEmail.id
+        ).filter(
             RawEmail.user_id == self.user_id,
             RawEmail.ai_classification_completed_at.isnot(None),  # AI fertig
             RawEmail.auto_rules_completed_at.is_(None),           # Rules fehlen noch
             RawEmail.processing_status >= 0,  # Keine Fehler-Stati
             RawEmail.deleted_at == None
         ).limit(limit).all()
+        new_emails = [raw_email for raw_email, _ in rows]
         
         stats = {
             "emails_checked": len(new_emails),
@@ -284,9 +515,30 @@ class AutoRulesEngine:
             "processed_email_ids": []
         }
         
+        # 🚀 PERFORMANCE: Regeln einmal laden + kompilieren, Tags aller Emails in einer Query
+        matcher = self.get_rule_matcher(self.get_active_rules()) if new_emails else None
+        email_data_by_id = self._decrypt_emails_for_matching(
+            rows, needs_body=matcher.needs_body if matcher else False
+        )
+        tag_names_by_email: Dict[int, Set[str]] = {}
+        if matcher and matcher.needs_tags:
+            tag_names_by_email = self._load_tag_names(
+                data['email_id'] for data in email_data_by_id.values() if data and data['email_id']
+            )
+        
         for email in new_emails:
             try:
-                results = self.process_email(email.id, dry_run=False)
+                email_data = email_data_by_id[email.id]
+                if not email_data:
+                    logger.error(f"Konnte Email {email.id} nicht entschlüsseln")
+                    results = []
+                else:
+                    scanned = matcher.scan(
+                        email_data,
+                        tag_names=set(tag_names_by_email.get(email_data['email_id'], ()))
+                        if matcher.needs_tags else None
+                    )
+                    results = self._apply_rules(email, scanned, matcher, dry_run=False)
                 
                 has_error = False
                 for result in results:
@@ -344,31 +596,77 @@ class AutoRulesEngine:
                 raw_email_id=raw_email.id
             ).first()
             
-            return {
-                'email_id': processed_email.id if processed_email else None,
-                'sender': EmailDataManager.decrypt_email_sender(
-                    raw_email.encrypted_sender or "", self.master_key
-                ) or '',
-                'subject': EmailDataManager.decrypt_email_subject(
-                    raw_email.encrypted_subject or "", self.master_key
-                ) or '',
-                'body': EmailDataManager.decrypt_email_body(
-                    raw_email.encrypted_body or "", self.master_key
-                ) or '',
-                'has_attachment': raw_email.has_attachments or False,
-                'folder': raw_email.imap_folder or '',
-                'flags': raw_email.imap_flags or '',
-                'is_seen': raw_email.imap_is_seen or False,
-                'is_flagged': raw_email.imap_is_flagged or False
-            }
+            return self._email_data_for_matching(
+                raw_email,
+                processed_email.id if processed_email else None,
+                BatchDecryptor(self.master_key)
+            )
         except Exception as e:
             logger.error(f"Entschlüsselung für Regel-Matching fehlgeschlagen: {e}")
             return None
     
+    def _decrypt_emails_for_matching(
+        self,
+        rows: List[Tuple[RawEmail, Optional[int]]],
+        needs_body: bool = True
+    ) -> Dict[int, Optional[Dict]]:
+        """Batch-Variante von _decrypt_email_for_matching
+        
+        Args:
+            rows: (RawEmail, ProcessedEmail-ID) Paare aus der Join-Query
+            needs_body: False → Body wird nicht entschlüsselt (keine Regel prüft ihn)
+            
+        Returns:
+            Dict RawEmail ID → email_data (None wenn Entschlüsselung fehlschlug)
+        """
+        if not rows:
+            return {}
+        try:
+            decryptor = BatchDecryptor(self.master_key)
+        except Exception as e:
+            logger.error(f"Entschlüsselung für Regel-Matching fehlgeschlagen: {e}")
+            return {raw_email.id: None for raw_email, _ in rows}
+        
+        email_data = {}
+        for raw_email, processed_email_id in rows:
+            try:
+                email_data[raw_email.id] = self._email_data_for_matching(
+                    raw_email, processed_email_id, decryptor, needs_body
+                )
+            except Exception as e:
+                logger.error(f"Entschlüsselung für Regel-Matching fehlgeschlagen: {e}")
+                email_data[raw_email.id] = None
+        return email_data
+    
+    @staticmethod
+    def _email_data_for_matching(
+        raw_email: RawEmail,
+        processed_email_id: Optional[int],
+        decryptor: BatchDecryptor,
+        needs_body: bool = True
+    ) -> Dict:
+        """email_data-Dict für den RuleMatcher (wirft bei Entschlüsselungsfehlern)"""
+        sender, subject = decryptor.decrypt_many(
+            (raw_email.encrypted_sender, raw_email.encrypted_subject)
+        )
+        return {
+            'email_id': processed_email_id,
+            'sender': sender or '',
+            'subject': subject or '',
+            'body': (decryptor.decrypt(raw_email.encrypted_body) or '') if needs_body else '',
+            'has_attachment': raw_email.has_attachments or False,
+            'folder': raw_email.imap_folder or '',
+            'flags': raw_email.imap_flags or '',
+            'is_seen': raw_email.imap_is_seen or False,
+            'is_flagged': raw_email.imap_is_flagged or False
+        }
+    
     def _match_rule(self, rule: AutoRule, email_data: Dict) -> RuleMatch:
         """
         Pr\u00fcft ob eine Regel auf die E-Mail-Daten matched.
         
+        Auswertung über die vorkompilierte Regel (CompiledRule, siehe RuleMatcher).
+        
         Unterst\u00fctzte Bedingungen:
         - match_mode: "all" (AND) oder "any" (OR)
         - sender_equals: Exakte \u00dcbereinstimmung
@@ -389,133 +687,8 @@ class AutoRulesEngine:
         - ai_suggested_tag: KI schl\u00e4gt dieses Tag vor (Phase F.2 Integration)
         - ai_confidence_threshold: Min. Confidence in % (50-100) f\u00fcr ai_suggested_tag
         """
-        conditions = rule.conditions
-        match_mode = conditions.get('match_mode', 'all')  # 'all' (AND) oder 'any' (OR)
-        
-        matched_conditions = []
-        match_details = {}
-        
-        # Sender-Bedingungen
-        if 'sender_equals' in conditions:
-            if email_data['sender'].lower() == conditions['sender_equals'].lower():
-                matched_conditions.append('sender_equals')
-                match_details['sender_equals'] = email_data['sender']
-        
-        if 'sender_contains' in conditions:
-            if conditions['sender_contains'].lower() in email_data['sender'].lower():
-                matched_conditions.append('sender_contains')
-                match_details['sender_contains'] = email_data['sender']
-        
-        if 'sender_not_contains' in conditions:
-            if conditions['sender_not_contains'].lower() not in email_data['sender'].lower():
-                matched_conditions.append('sender_not_contains')
-                match_details['sender_not_contains'] = f"Nicht enthalten: {conditions['sender_not_contains']}"
-        
-        if 'sender_domain' in conditions:
-            sender_domain = email_data['sender'].split('@')[-1].lower() if '@' in email_data['sender'] else ''
-            if sender_domain == conditions['sender_domain'].lower():
-                matched_conditions.append('sender_domain')
-                match_details['sender_domain'] = sender_domain
-        
-        # Subject-Bedingungen
-        if 'subject_equals' in conditions:
-            if email_data['subject'].lower() == conditions['subject_equals'].lower():
-                matched_conditions.append('subject_equals')
-                match_details['subject_equals'] = email_data['subject'][:50]
-        
-        if 'subject_contains' in conditions:
-            if conditions['subject_contains'].lower() in email_data['subject'].lower():
-                matched_conditions.append('subject_contains')
-                match_details['subject_contains'] = email_data['subject'][:50]
-        
-        if 'subject_not_contains' in conditions:
-            if conditions['subject_not_contains'].lower() not in email_data['subject'].lower():
-                matched_conditions.append('subject_not_contains')
-                match_details['subject_not_contains'] = f"Nicht enthalten: {conditions['subject_not_contains']}"
-        
-        if 'subject_regex' in conditions:
-            try:
-                if re.search(conditions['subject_regex'], email_data['subject'], re.IGNORECASE):
-                    matched_conditions.append('subject_regex')
-                    match_details['subject_regex'] = email_data['subject'][:50]
-            except re.error as e:
-                logger.warning(f"Ungültiger Regex in Regel {rule.id}: {conditions['subject_regex']} - {e}")
-                match_details['subject_regex_error'] = f"Ungültiger Regex: {str(e)}"
-        
-        # Body-Bedingungen
-        if 'body_contains' in conditions:
-            if conditions['body_contains'].lower() in email_data['body'].lower():
-                matched_conditions.append('body_contains')
-                match_details['body_contains'] = True
-        
-        if 'body_not_contains' in conditions:
-            if conditions['body_not_contains'].lower() not in email_data['body'].lower():
-                matched_conditions.append('body_not_contains')
-                match_details['body_not_contains'] = f"Nicht enthalten: {conditions['body_not_contains']}"
-        
-        if 'body_regex' in conditions:
-            try:
-                if re.search(conditions['body_regex'], email_data['body'], re.IGNORECASE):
-                    matched_conditions.append('body_regex')
-                    match_details['body_regex'] = True
-            except re.error as e:
-                logger.warning(f"Ungültiger Body-Regex in Regel {rule.id}: {conditions['body_regex']} - {e}")
-                match_details['body_regex_error'] = f"Ungültiger Regex: {str(e)}"
-        
-        # Attachment-Bedingung
-        if 'has_attachment' in conditions:
-            if email_data['has_attachment'] == conditions['has_attachment']:
-                matched_conditions.append('has_attachment')
-                match_details['has_attachment'] = email_data['has_attachment']
-        
-        # Ordner-Bedingung
-        if 'folder_equals' in conditions:
-            if email_data['folder'] == conditions['folder_equals']:
-                matched_conditions.append('folder_equals')
-                match_details['folder_equals'] = email_data['folder']
-        
-        # Tag-Bedingungen (neu - Phase G.2 Enhancement)
-        if 'has_tag' in conditions:
-            # Prüfe ob Email bereits ein bestimmtes Tag hat
-            tag_name = conditions['has_tag']
-            if self._email_has_tag(email_data['email_id'], tag_name):
-                matched_conditions.append('has_tag')
-                match_details['has_tag'] = tag_name
-        
-        if 'not_has_tag' in conditions:
-            # Prüfe ob Email ein Tag NICHT hat
-            tag_name = conditions['not_has_tag']
-            if not self._email_has_tag(email_data['email_id'], tag_name):
-                matched_conditions.append('not_has_tag')
-                match_details['not_has_tag'] = f"Hat Tag NICHT: {tag_name}"
-        
-        # KI-Suggested-Tag (neu - Phase G.2 mit Phase F.2 Integration)
-        if 'ai_suggested_tag' in conditions:
-            target_tag = conditions['ai_suggested_tag']
-            threshold = conditions.get('ai_confidence_threshold', 85)
-            
-            # Hole KI-Vorschlag für diese Email
-            suggested = self._get_ai_suggested_tag(email_data['email_id'], target_tag, threshold)
-            if suggested:
-                matched_conditions.append('ai_suggested_tag')
-                match_details['ai_suggested_tag'] = f"{target_tag} (Confidence: {suggested['confidence']}%)"
-        
-        # Match-Logik auswerten
-        total_conditions = len([k for k in conditions.keys() if k != 'match_mode'])
-        
-        if total_conditions == 0:
-            matched = False  # Keine Bedingungen = Kein Match
-        elif match_mode == 'any':
-            matched = len(matched_conditions) > 0
-        else:  # 'all'
-            matched = len(matched_conditions) == total_conditions
-        
-        return RuleMatch(
-            rule=rule,
-            matched=matched,
-            matched_conditions=matched_conditions,
-            match_details=match_details
-        )
+        matcher = self.get_rule_matcher([rule])
+        return matcher.rules[0].match(matcher.scan(email_data), self)
     
     def _execute_rule(
         self, 
@@ -765,38 +938,40 @@ class AutoRulesEngine:
                 error=error
             )
     
-    def _email_has_tag(self, email_id: int, tag_name: str) -> bool:
-        """
-        Pr\u00fcft ob eine Email ein bestimmtes Tag hat.
+    def _load_tag_names(self, email_ids: Iterable[int]) -> Dict[int, Set[str]]:
+        """Tag-Namen mehrerer Emails in einer Query
         
         Args:
-            email_id: ProcessedEmail ID (nicht RawEmail!)
-            tag_name: Name des Tags
+            email_ids: ProcessedEmail IDs (nicht RawEmail!)
             
         Returns:
-            True wenn Email das Tag hat
+            Dict ProcessedEmail ID → Set der Tag-Namen
         """
-        try:
-            # Finde Tag nach Name
-            tag = self.db.query(EmailTag).filter_by(
-                user_id=self.user_id,
-                name=tag_name
-            ).first()
-            
-            if not tag:
-                return False
-            
-            # Prüfe ob Email-Tag-Assignment existiert
-            assignment = self.db.query(EmailTagAssignment).filter_by(
-                email_id=email_id,
-                tag_id=tag.id
-            ).first()
-            
-            return assignment is not None
-            
-        except Exception as e:
-            logger.error(f"Fehler beim Prüfen von Tag '{tag_name}': {e}")
-            return False
+        email_ids = list(email_ids)
+        tag_names: Dict[int, Set[str]] = {email_id: set() for email_id in email_ids}
+        if not email_ids:
+            return tag_names
+        
+        rows = self.db.query(EmailTagAssignment.email_id, EmailTag.name).join(
+            EmailTag, EmailTag.id == EmailTagAssignment.tag_id
+        ).filter(
+            EmailTag.user_id == self.user_id,
+            EmailTagAssignment.email_id.in_(email_ids)
+        ).all()
+        for email_id, name in rows:
+            tag_names[email_id].add(name)
+        return tag_names
+    
+    def _scanned_tag_names(self, scanned: ScannedEmail) -> Set[str]:
+        """Tag-Namen einer vorbereiteten Email (lädt bei Bedarf nach)"""
+        if scanned.tag_names is None:
+            email_id = scanned.data.get('email_id')
+            try:
+                scanned.tag_names = self._load_tag_names([email_id]).get(email_id, set()) if email_id else set()
+            except Exception as e:
+                logger.error(f"Fehler beim Laden der Tags für Email {email_id}: {e}")
+                scanned.tag_names = set()
+        return scanned.tag_names
     
     def _get_ai_suggested_tag(
         self, 
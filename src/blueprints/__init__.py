@@ -13,7 +13,7 @@ Blueprint Overview:
     api_bp          - API endpoints (64 routes): /api/* with prefix
     rules_bp        - Auto-rules (10 routes): rules management
     training_bp     - ML training (1 route): retrain models
-    admin_bp        - Admin tools (1 route): debug logger status
+    admin_bp        - Admin tools (3 routes): debug logger status, tag/embedding cache stats
 
 Total: 123 routes across 9 blueprints
 """
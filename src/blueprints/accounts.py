@@ -24,7 +24,7 @@ Routes (23 total):
     20. /jobs/<job_id> (GET) - job_status
     21. /tasks/<task_id> (GET) - task_status  ← NEU (Celery)
     22. /account/<id>/mail-count (GET) - get_account_mail_count
-    23. /account/<id>/folders (GET) - get_account_folders
+    23. /account/<id>/folders (GET) - get_account_folders (?refresh=1 = Live-IMAP)
     24. /whitelist-imap-setup (GET) - whitelist_imap_setup_page
 """
 
@@ -50,6 +50,7 @@ _google_oauth = None
 _password_validator = None
 _mail_fetcher_mod = None
 _job_queue = None
+_folder_catalog_mod = None
 
 # Caches für mail-count
 _mail_count_cache = {}
@@ -99,6 +100,13 @@ def _get_mail_fetcher_mod():
     return _mail_fetcher_mod
 
 
+def _get_folder_catalog():
+    global _folder_catalog_mod
+    if _folder_catalog_mod is None:
+        _folder_catalog_mod = importlib.import_module("src.services.folder_catalog")
+    return _folder_catalog_mod
+
+
 def _get_job_queue():
     global _job_queue
     if _job_queue is None:
@@ -1678,6 +1686,25 @@ def task_status(task_id):
                 # Task failed
                 response["error"] = str(result.info)
         
+        # Sync-Task ist nach dem Fetch fertig, die Verarbeitung läuft als
+        # Pipeline weiter (nlp → llm → Auto-Rules) - dieser folgen
+        sync_result = response.get("result")
+        pipeline_id = sync_result.get("pipeline_id") if isinstance(sync_result, dict) else None
+        if pipeline_id:
+            pipeline = celery_app.AsyncResult(pipeline_id)
+            if not pipeline.ready():
+                response["state"] = "PROGRESS"
+                response["status"] = "running"
+                if hasattr(pipeline.info, 'get'):
+                    response.update(pipeline.info)
+            elif pipeline.successful():
+                if isinstance(pipeline.result, dict):
+                    response["result"] = {**sync_result, **pipeline.result}
+            else:
+                response["state"] = "FAILURE"
+                response["status"] = "failed"
+                response["error"] = str(pipeline.info)
+        
         # Add progress info if available (for STARTED/PROGRESS tasks)
         # 🔥 Celery Custom States: self.update_state(state='PROGRESS', meta={...})
         if result.state in ("STARTED", "PROGRESS") and hasattr(result.info, 'get'):
@@ -1879,10 +1906,12 @@ def get_account_mail_count(account_id):
 @accounts_bp.route("/account/<int:account_id>/folders")
 @login_required
 def get_account_folders(account_id):
-    """Listet verfügbare Ordner für einen IMAP-Account auf"""
+    """Listet verfügbare Ordner für einen IMAP-Account auf
+
+    Liest aus dem Ordner-Katalog (email_folders) statt bei jedem Aufruf
+    per IMAP einzuloggen. ?refresh=1 lädt die Liste neu vom Server.
+    """
     models = _get_models()
-    encryption = _get_encryption()
-    mail_fetcher = _get_mail_fetcher_mod()
     
     try:
         with get_db_session() as db:
@@ -1900,61 +1929,22 @@ def get_account_folders(account_id):
             if account.auth_type != "imap":
                 return jsonify({"error": "IMAP-Account erforderlich"}), 400
             
+            # Ordner-Katalog (vom Sync gepflegt); ?refresh=1 erzwingt Live-LIST beim Server
+            refresh = request.args.get("refresh") == "1"
             master_key = session.get("master_key")
-            if not master_key:
+            if refresh and not master_key:
                 return jsonify({"error": "Master-Key erforderlich"}), 401
             
             try:
-                imap_server = encryption.CredentialManager.decrypt_server(
-                    account.encrypted_imap_server, master_key
-                )
-                imap_username = encryption.CredentialManager.decrypt_email_address(
-                    account.encrypted_imap_username, master_key
-                )
-                imap_password = encryption.CredentialManager.decrypt_imap_password(
-                    account.encrypted_imap_password, master_key
+                folder_names = _get_folder_catalog().FolderCatalogService.get_or_refresh(
+                    db, account, master_key, refresh=refresh
                 )
-            except Exception as e:
-                logger.error(f"get_account_folders: Entschlüsselungsfehler: {type(e).__name__}")
-                return jsonify({"error": "Entschlüsselung fehlgeschlagen"}), 500
-            
-            fetcher = mail_fetcher.MailFetcher(
-                server=imap_server,
-                username=imap_username,
-                password=imap_password,
-                port=account.imap_port
-            )
-            
-            try:
-                fetcher.connect()
-                
-                if not fetcher.connection:
-                    logger.error(f"IMAP-Verbindung nicht initialisiert für Account {account_id}")
-                    return jsonify({"error": "IMAP-Verbindung fehlgeschlagen"}), 500
-                
-                # IMAPClient.list_folders() returns (flags, delimiter, folder_name) tuples
-                mailboxes = fetcher.connection.list_folders()
-                
-                folders = []
-                for flags, delimiter, folder_name in mailboxes:
-                    # Skip \Noselect folders
-                    if b'\\Noselect' in flags or '\\Noselect' in [f.decode() if isinstance(f, bytes) else f for f in flags]:
-                        continue
-                    # folder_name is bytes, decode UTF-7
-                    folder_display = mail_fetcher.decode_imap_folder_name(folder_name)
-                    folders.append({"name": folder_display})
-                
-                folders.sort(key=lambda x: x['name'])
-                return jsonify({"success": True, "folders": folders})
-                
             except Exception as e:
                 logger.error(f"get_account_folders: IMAP-Fehler: {type(e).__name__}: {e}")
                 return jsonify({"error": "IMAP-Abfrage fehlgeschlagen"}), 500
-            finally:
-                try:
-                    fetcher.disconnect()
-                except Exception:
-                    pass
+            
+            folders = [{"name": name} for name in folder_names]
+            return jsonify({"success": True, "folders": folders})
                     
     except Exception as e:
         logger.error(f"get_account_folders: Fehler für Account {account_id}: {type(e).__name__}: {e}")
@@ -1,8 +1,10 @@
 ﻿# src/blueprints/admin.py
 """Admin Blueprint - Admin-Funktionen.
 
-Routes (1 total):
+Routes (3 total):
     1. /api/debug-logger-status (GET) - Debug-Logger-Status
+    2. /api/admin/tag-cache-stats (GET) - Tag-Embedding-Cache Statistiken
+    3. /api/admin/embedding-cache-stats (GET) - Email-Embedding-Cache Statistiken
 """
 
 from flask import Blueprint, jsonify
@@ -46,3 +48,41 @@ def api_debug_logger_status():
             "status": "✅ Debug-Logging ist deaktiviert",
             "hint": "Zum Aktivieren: src/debug_logger.py → ENABLED = True"
         }), 200
+
+
+# =============================================================================
+# Route 2: /api/admin/tag-cache-stats
+# =============================================================================
+@admin_bp.route("/api/admin/tag-cache-stats")
+@login_required
+def api_tag_cache_stats():
+    """API: Hit/Miss/Eviction-Zähler und Speicherbelegung des TagEmbeddingCache
+
+    Werte gelten pro Prozess (Web-Worker), nicht für Celery-Worker.
+    """
+    try:
+        tag_mod = importlib.import_module("src.services.tag_manager")
+    except ImportError as e:
+        logger.error(f"TagManager nicht verfügbar: {e}")
+        return jsonify({"error": "TagManager nicht verfügbar"}), 500
+    
+    return jsonify(tag_mod.TagEmbeddingCache.get_stats()), 200
+
+
+# =============================================================================
+# Route 3: /api/admin/embedding-cache-stats
+# =============================================================================
+@admin_bp.route("/api/admin/embedding-cache-stats")
+@login_required
+def api_embedding_cache_stats():
+    """API: Hit-Rate, Evictions und Belegung des Content-Hash EmbeddingCache
+
+    Zähler gelten pro Prozess, Belegung (entries, stored_hits) für die Cache-Datei.
+    """
+    try:
+        cache_mod = importlib.import_module("src.services.embedding_cache")
+    except ImportError as e:
+        logger.error(f"EmbeddingCache nicht verfügbar: {e}")
+        return jsonify({"error": "EmbeddingCache nicht verfügbar"}), 500
+    
+    return jsonify(cache_mod.EmbeddingCache.get_stats()), 200
@@ -15,6 +15,7 @@ import time
 import re
 
 from src.helpers import get_db_session, get_current_user_model
+from src.services.trusted_senders import TrustedSenderManager
 
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 logger = logging.getLogger(__name__)
@@ -3149,6 +3150,7 @@ def api_update_trusted_sender(sender_id):
                     return {"success": False, "error": f"Invalid pattern_type: {new_type}"}, 400
             
             db.commit()
+            TrustedSenderManager.invalidate(user.id)
             return {
                 "success": True,
                 "sender": {
@@ -3199,6 +3201,7 @@ def api_delete_trusted_sender(sender_id):
             
             db.delete(ts)
             db.commit()
+            TrustedSenderManager.invalidate(user.id)
             return {"success": True}, 200
     except Exception as e:
         logger.error(f"api_delete_trusted_sender: Fehler: {type(e).__name__}: {e}")
@@ -3653,13 +3656,6 @@ def api_bulk_add_trusted_senders():
             added = []
             skipped = []
             
-            # Import Service
-            try:
-                from src.services.trusted_senders import TrustedSenderManager
-            except ImportError:
-                logger.error("TrustedSenderManager nicht verfügbar")
-                return jsonify({"error": "TrustedSenderManager not available"}), 500
-            
             # TRANSACTIONAL Bulk-Add
             try:
                 for sender_data in senders:
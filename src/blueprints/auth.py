@@ -65,6 +65,28 @@ def _get_password_validator():
     return _password_validator
 
 
+def _queue_search_index_backfill(db, user_id: int, dek: str) -> None:
+    """Startet den Suchindex-Backfill (Celery), falls noch Emails ohne Tokens existieren
+
+    Fehler werden nur geloggt - der Login darf daran nie scheitern.
+    """
+    try:
+        search_index = importlib.import_module(".services.search_index", "src")
+        if not search_index.SearchIndexService.has_unindexed(db, user_id):
+            return
+
+        from src.tasks.mail_sync_tasks import backfill_search_index
+
+        # Phase 2 Security: Task bekommt nur die token_id, nicht den DEK
+        _, service_token = _get_auth().ServiceTokenManager.create_token(
+            user_id=user_id, master_key=dek, session=db, days=1
+        )
+        backfill_search_index.delay(user_id=user_id, service_token_id=service_token.id)
+        logger.info(f"🔎 Suchindex-Backfill für User {user_id} gestartet")
+    except Exception as e:
+        logger.warning(f"⚠️ Suchindex-Backfill konnte nicht gestartet werden: {type(e).__name__}: {e}")
+
+
 # =============================================================================
 # UserWrapper für Flask-Login Kompatibilität
 # =============================================================================
@@ -210,6 +232,7 @@ def login():
 
                 # Zero-Knowledge: Disable remember-me (verhindert DEK-Loss nach Session-Expire)
                 login_user(UserWrapper(user), remember=False)
+                _queue_search_index_backfill(db, user.id, dek)
                 # Audit Log für erfolgreichen Login
                 logger.info(
                     f"SECURITY[LOGIN_SUCCESS]: user={user.username} ip={request.remote_addr} "
@@ -447,6 +470,8 @@ def verify_2fa():
                         flash("Login fehlgeschlagen. Bitte versuche es erneut.", "danger")
                         return redirect(url_for("auth.login"))
                     
+                    _queue_search_index_backfill(db, user.id, dek)
+                    
                     # Audit Log für erfolgreichen Login mit 2FA
                     logger.info(
                         f"SECURITY[LOGIN_SUCCESS]: user={user.username} ip={request.remote_addr} "
@@ -25,7 +25,6 @@ logger = logging.getLogger(__name__)
 _models = None
 _encryption = None
 _scoring = None
-_mail_fetcher_mod = None
 
 
 def _get_models():
@@ -49,13 +48,6 @@ def _get_scoring():
     return _scoring
 
 
-def _get_mail_fetcher_mod():
-    global _mail_fetcher_mod
-    if _mail_fetcher_mod is None:
-        _mail_fetcher_mod = importlib.import_module(".06_mail_fetcher", "src")
-    return _mail_fetcher_mod
-
-
 _tag_manager_mod = None
 
 
@@ -71,6 +63,35 @@ def _get_tag_manager():
     return _tag_manager_mod
 
 
+_dashboard_stats_mod = None
+_folder_catalog_mod = None
+_search_index_mod = None
+
+
+def _get_dashboard_stats():
+    """Lazy-Import für DashboardStatsService (Matrix-Aggregation)"""
+    global _dashboard_stats_mod
+    if _dashboard_stats_mod is None:
+        _dashboard_stats_mod = importlib.import_module("src.services.dashboard_stats")
+    return _dashboard_stats_mod
+
+
+def _get_folder_catalog():
+    """Lazy-Import für FolderCatalogService (Ordner-Dropdown ohne IMAP-Login)"""
+    global _folder_catalog_mod
+    if _folder_catalog_mod is None:
+        _folder_catalog_mod = importlib.import_module("src.services.folder_catalog")
+    return _folder_catalog_mod
+
+
+def _get_search_index():
+    """Lazy-Import für SearchIndexService (Blind-Index Suche)"""
+    global _search_index_mod
+    if _search_index_mod is None:
+        _search_index_mod = importlib.import_module("src.services.search_index")
+    return _search_index_mod
+
+
 # =============================================================================
 # Route 1: /dashboard (Zeile 978-1098)
 # =============================================================================
@@ -120,81 +141,13 @@ def dashboard():
                         )
                         account.decrypted_imap_username = None
 
-        matrix_data = {}
-        total_mails = 0
-        high_priority_count = 0
-
-        # Filtere nach Account falls gewählt
-        query_filter = [
-            models.RawEmail.user_id == user.id,
-            models.RawEmail.deleted_at == None,
-            models.ProcessedEmail.done == False,
-            models.ProcessedEmail.deleted_at == None,
-        ]
-        if filter_account_id:
-            query_filter.append(models.RawEmail.mail_account_id == filter_account_id)
-
-        # Alle unerledigten Mails des Users (optional gefiltert nach Account)
-        processed_mails = (
-            db.query(models.ProcessedEmail)
-            .join(models.RawEmail)
-            .filter(*query_filter)
-            .all()
-        )
-
-        total_mails = len(processed_mails)
-
-        for mail in processed_mails:
-            key = f"{mail.matrix_x}_{mail.matrix_y}"
-            if key not in matrix_data:
-                matrix_data[key] = {"count": 0, "color": mail.farbe}
-
-            matrix_data[key]["count"] += 1
-
-            if mail.farbe == "rot":
-                high_priority_count += 1
-
-        amp_colors = {
-            "rot": sum(
-                m["count"] for m in matrix_data.values() if m.get("color") == "rot"
-            ),
-            "gelb": sum(
-                m["count"] for m in matrix_data.values() if m.get("color") == "gelb"
-            ),
-            "grün": sum(
-                m["count"] for m in matrix_data.values() if m.get("color") == "grün"
-            ),
-        }
-
-        matrix = {}
-        for x in range(1, 4):
-            for y in range(1, 4):
-                key = f"{x}_{y}"
-                matrix_key = f"{x}{y}"
-                matrix[matrix_key] = matrix_data.get(key, {}).get("count", 0)
-
-        # Erledigte Mails (mit Account-Filter)
-        done_query_filter = [
-            models.RawEmail.user_id == user.id,
-            models.RawEmail.deleted_at == None,
-            models.ProcessedEmail.done == True,
-            models.ProcessedEmail.deleted_at == None,
-        ]
-        if filter_account_id:
-            done_query_filter.append(models.RawEmail.mail_account_id == filter_account_id)
-
-        done_mails = (
-            db.query(models.ProcessedEmail)
-            .join(models.RawEmail)
-            .filter(*done_query_filter)
-            .count()
+        # SQL-Aggregation (GROUP BY) statt alle Mails zu laden und zu zählen
+        matrix_stats = _get_dashboard_stats().DashboardStatsService.get_matrix_stats(
+            db, user.id, filter_account_id
         )
-
-        stats = {
-            "total": total_mails + done_mails,
-            "open": total_mails,
-            "done": done_mails,
-        }
+        matrix = matrix_stats["matrix"]
+        amp_colors = matrix_stats["amp_colors"]
+        stats = matrix_stats["stats"]
 
         # Gewählter Account (für Anzeige)
         selected_account = None
@@ -226,7 +179,6 @@ def list_view():
     """Listen-Ansicht: alle Mails mit erweiterten Filtern"""
     models = _get_models()
     encryption = _get_encryption()
-    mail_fetcher_mod = _get_mail_fetcher_mod()
     
     with get_db_session() as db:
         user = get_current_user_model(db)
@@ -345,6 +297,15 @@ def list_view():
             except (ValueError, TypeError):
                 pass
 
+        # Suche über Blind-Index (SQL) - VOR Count/Pagination, damit Seiten voll
+        # und total_count korrekt sind (statt Post-Filter auf der aktuellen Seite)
+        if search_term and session.get("master_key"):
+            matching_ids = _get_search_index().SearchIndexService.matching_email_ids(
+                db, user.id, search_term, session.get("master_key")
+            )
+            if matching_ids is not None:
+                query = query.filter(models.RawEmail.id.in_(matching_ids))
+
         # Phase 13: Sortierung anwenden
         if sort_by == "date":
             sort_col = models.RawEmail.received_at
@@ -384,7 +345,8 @@ def list_view():
             .all()
         )
 
-        # Phase 13C: Lade Server-Ordner via IMAP (für Dropdown-Autocomplete)
+        # Phase 13C: Server-Ordner für Dropdown-Autocomplete - aus dem Ordner-Katalog
+        # (vom Sync gepflegt), Live-IMAP nur wenn der Katalog noch leer ist
         server_folders = []
         if filter_account_id:
             try:
@@ -392,37 +354,9 @@ def list_view():
                     id=filter_account_id, user_id=user.id
                 ).first()
                 if account and account.auth_type == "imap":
-                    master_key_temp = session.get("master_key")
-                    if master_key_temp:
-                        imap_server = encryption.CredentialManager.decrypt_server(
-                            account.encrypted_imap_server, master_key_temp
-                        )
-                        imap_username = encryption.CredentialManager.decrypt_email_address(
-                            account.encrypted_imap_username, master_key_temp
-                        )
-                        imap_password = encryption.CredentialManager.decrypt_imap_password(
-                            account.encrypted_imap_password, master_key_temp
-                        )
-                        fetcher = mail_fetcher_mod.MailFetcher(
-                            server=imap_server,
-                            username=imap_username,
-                            password=imap_password,
-                            port=account.imap_port,
-                        )
-                        fetcher.connect()
-                        try:
-                            # IMAPClient.list_folders() returns (flags, delimiter, folder_name) tuples
-                            folders = fetcher.connection.list_folders()
-                            for flags, delimiter, folder_name in folders:
-                                # Skip \Noselect folders
-                                if b'\\Noselect' in flags or '\\Noselect' in [f.decode() if isinstance(f, bytes) else f for f in flags]:
-                                    continue
-                                # folder_name is bytes, decode UTF-7 to UTF-8
-                                folder_display = mail_fetcher_mod.decode_imap_folder_name(folder_name)
-                                server_folders.append(folder_display)
-                            server_folders.sort()
-                        finally:
-                            fetcher.disconnect()
+                    server_folders = _get_folder_catalog().FolderCatalogService.get_or_refresh(
+                        db, account, session.get("master_key")
+                    )
             except Exception as e:
                 logger.warning(f"Konnte Server-Ordner nicht laden: {e}")
 
@@ -462,7 +396,7 @@ def list_view():
             except Exception as e:
                 logger.warning(f"Tag eager loading fehlgeschlagen: {e}")
 
-        # Zero-Knowledge: Entschlüsselung für Anzeige und Suche
+        # Zero-Knowledge: Entschlüsselung für Anzeige
         master_key = session.get("master_key")
         decrypted_mails = []
 
@@ -503,14 +437,6 @@ def list_view():
                         mail.encrypted_tags or "", master_key
                     )
 
-                    # Suche anwenden (falls nötig)
-                    if search_term:
-                        if not (
-                            search_term.lower() in decrypted_subject.lower()
-                            or search_term.lower() in decrypted_sender.lower()
-                        ):
-                            continue  # Skip diese Mail bei Suche
-
                     # Mail-Objekt mit entschlüsselten Daten erweitern
                     mail._decrypted_subject = decrypted_subject
                     mail._decrypted_sender = decrypted_sender
@@ -232,6 +232,7 @@ def scan_trash():
                     db_session=db,
                     user_id=user.id,
                     account_id=account.id,
+                    master_key=master_key,
                 )
                 scan_folder = "Alle Ordner"
             else:
@@ -242,10 +243,14 @@ def scan_trash():
                     db_session=db, 
                     user_id=user.id,
                     account_id=account.id,
-                    folder=folder
+                    folder=folder,
+                    master_key=master_key
                 )
                 scan_folder = folder or "Trash"
             
+            # Audit-Cache (folder_audit_cache) schreibt nur per Savepoint
+            db.commit()
+            
             return jsonify({
                 "success": True,
                 "result": result.to_dict(),
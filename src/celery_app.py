@@ -21,8 +21,14 @@ VERWENDUNG:
        - CELERY_BROKER_URL=redis://localhost:6379/1
        - CELERY_RESULT_BACKEND=redis://localhost:6379/2
     
-    2. Worker starten:
-       celery -A src.celery_app worker --loglevel=info
+    2. Worker starten (alle Queues in einem Worker):
+       celery -A src.celery_app worker --loglevel=info -Q celery,imap,nlp,llm
+    
+       Oder getrennt skaliert (siehe task_routes):
+       celery -A src.celery_app worker -Q imap --concurrency=8   # I/O-bound (IMAP)
+       celery -A src.celery_app worker -Q nlp --concurrency=2    # CPU (spaCy, Embeddings)
+       celery -A src.celery_app worker -Q llm --concurrency=1    # LLM-Inferenz
+       celery -A src.celery_app worker -Q celery                 # Rest
     
     3. Tasks definieren in src/tasks/ (siehe Beispiel: mail_sync_tasks.py)
     
@@ -61,6 +67,15 @@ celery_app.conf.update(
     # task_time_limit=15 * 60,      # REMOVED: Mail-Sync kann Stunden dauern!
     # task_soft_time_limit=12 * 60,  # REMOVED: Verursacht SIGKILL bei großen Accounts
     worker_prefetch_multiplier=1,
+    # Sync-Pipeline nach Ressource getrennt: IMAP (I/O), NLP (CPU), LLM (GPU/API)
+    # Nicht gelistete Tasks laufen in der Default-Queue "celery"
+    task_routes={
+        "tasks.sync_user_emails": {"queue": "imap"},
+        "tasks.sync_account_step": {"queue": "imap"},
+        "tasks.finish_sync_pipeline": {"queue": "imap"},
+        "tasks.process_emails_nlp": {"queue": "nlp"},
+        "tasks.classify_emails_llm": {"queue": "llm"},
+    },
 )
 
 celery_app.autodiscover_tasks(["src.tasks"])
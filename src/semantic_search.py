@@ -6,21 +6,31 @@ Vektorbasierte Email-Suche mit Embeddings.
 
 Features:
 - Embedding-Generierung beim Email-Fetch (Klartext verfügbar!)
-- Cosine Similarity für semantische Ähnlichkeit
+- Cosine Similarity für semantische Ähnlichkeit (vektorisiert via EmbeddingIndex)
 - "Budget" findet auch "Kostenplanung", "Finanzübersicht"
 - Zero-Knowledge kompatibel (Embeddings nicht reversibel)
+- Content-Hash Cache: wortgleiche Texte (Newsletter, Duplikate) eines Users
+  werden nur einmal embedded (siehe services/embedding_cache.py)
 
 Usage:
-    from src.semantic_search import SemanticSearchService, generate_embedding_for_email
+    from src.semantic_search import (
+        SemanticSearchService, generate_embedding_for_email, notify_embedding_written
+    )
     
     # Embedding generieren (beim Fetch)
     embedding_bytes, model, timestamp = generate_embedding_for_email(
         subject="Betreff",
         body="Body-Text",
-        ai_client=ollama_client
+        ai_client=ollama_client,
+        master_key=master_key  # optional: Embedding-Cache des Users
     )
     
-    # Suchen
+    # Nach dem Speichern: geladenen Index aktualisieren
+    raw_email.email_embedding = embedding_bytes
+    session.flush()
+    notify_embedding_written(raw_email)
+    
+    # Suchen (Embedding-Index pro User, siehe services/embedding_index.py)
     service = SemanticSearchService(db_session, ai_client)
     results = service.search("Projektbudget", user_id=1, limit=20)
 """
@@ -33,6 +43,8 @@ from sqlalchemy.orm import Session
 import importlib
 
 models = importlib.import_module(".02_models", "src")
+from src.services.embedding_index import EmbeddingIndexCache
+from src.services.embedding_cache import EmbeddingCache, content_hash, derive_cache_key, normalize_text
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +57,9 @@ EMBEDDING_MODEL = "all-minilm:22m"
 DEFAULT_SIMILARITY_THRESHOLD = 0.25
 HIGH_SIMILARITY_THRESHOLD = 0.5
 
+# IDs pro IN(...) beim Filtern der Index-Treffer
+HIT_FILTER_CHUNK = 1000
+
 
 def get_embedding_dim_from_bytes(embedding_bytes: bytes) -> int:
     """Berechnet Dimension aus Bytes (float32 = 4 bytes)"""
@@ -53,12 +68,124 @@ def get_embedding_dim_from_bytes(embedding_bytes: bytes) -> int:
     return len(embedding_bytes) // 4
 
 
+def _validate_embedding_model(ai_client, model_name: Optional[str]) -> bool:
+    """🆕 KRITISCHE VALIDIERUNG: Prüft ob das Model ein Embedding-Model ist
+
+    Verhindert: llama3.2:1b (Chat) statt bge-m3:latest (Embedding)
+    """
+    try:
+        actual_model = model_name or getattr(ai_client, "model", None)
+        if actual_model:
+            # Import model_discovery für Typ-Check (mit importlib wegen 04_* Prefix)
+            try:
+                import importlib
+                model_discovery = importlib.import_module("src.04_model_discovery")
+                model_type = model_discovery._detect_ollama_model_type("http://127.0.0.1:11434", actual_model)
+                
+                if model_type != "embedding":
+                    logger.error(
+                        f"❌ KRITISCHER FEHLER: '{actual_model}' ist ein {model_type.upper()}-Model, "
+                        "kein EMBEDDING-Model! Verwende bge-m3:latest oder all-minilm:22m stattdessen."
+                    )
+                    # BLOCKIERE das Embedding - sonst gibt's Dimensions-Mismatch!
+                    return False
+                    
+                logger.debug(f"✅ Model-Typ validiert: {actual_model} ist ein Embedding-Model")
+                
+            except ImportError:
+                logger.warning("⚠️  model_discovery nicht verfügbar, überspringe Typ-Check")
+            except Exception as type_check_err:
+                logger.warning(f"⚠️  Model-Typ-Check fehlgeschlagen: {type_check_err}")
+    except Exception as e:
+        logger.warning(f"⚠️  Model-Validierung fehlgeschlagen: {e}")
+    return True
+
+
+def _embedding_text(subject: str, body: str, max_body_length: int) -> Optional[str]:
+    """Text für Embedding kombinieren (Subject ist wichtiger, daher zuerst)"""
+    text = f"{subject or ''}\n{(body or '')[:max_body_length]}"
+    text = text.strip()
+    
+    if not text:
+        logger.debug("Leerer Text, kein Embedding generiert")
+        return None
+    
+    # BUGFIX 2026-01-14: Mindestlänge prüfen um sinnlose Embeddings zu vermeiden
+    # Test-Mails mit nur Signatur haben ~500 Zeichen aber keinen Inhalt
+    MIN_MEANINGFUL_LENGTH = 50
+    if len(text) < MIN_MEANINGFUL_LENGTH:
+        logger.debug(f"Text zu kurz ({len(text)} < {MIN_MEANINGFUL_LENGTH} chars), kein Embedding generiert")
+        return None
+    return text
+
+
+def _finalize_embedding(
+    embedding_list, ai_client, model_name: Optional[str]
+) -> Tuple[Optional[bytes], Optional[str], Optional[datetime]]:
+    """Normalisiert ein Roh-Embedding und liefert (bytes, model, timestamp)"""
+    if not embedding_list:
+        logger.warning("❌ AI-Client lieferte kein Embedding")
+        return None, None, None
+    
+    # Zu numpy array konvertieren
+    embedding_array = np.array(embedding_list, dtype=np.float32)
+    
+    # 🆕 WICHTIG: Normalisieren für konsistente Similarity mit Tag-Embeddings!
+    # Tag-Embeddings sind von Ollama normalisiert (Norm = 1.0)
+    # Email-Embeddings waren mean-pooled (Norm < 1.0) → Similarity war zu niedrig!
+    norm = np.linalg.norm(embedding_array)
+    if norm > 0:
+        embedding_array = embedding_array / norm
+        logger.debug(f"📊 Email-Embedding normalisiert: {norm:.4f} → 1.0")
+    else:
+        logger.warning("⚠️  Email-Embedding hat Norm = 0, keine Normalisierung möglich")
+    
+    # Als bytes speichern
+    embedding_array = embedding_array.astype(np.float32)
+    
+    # Validierung: Check gegen erste Email im System (wenn vorhanden)
+    dimension = embedding_array.shape[0]
+    
+    # Log Dimension für Debugging
+    logger.info(f"✅ Embedding generiert: {dimension} Dimensionen, {len(embedding_array.tobytes())} bytes, Norm = 1.0")
+    
+    # WARNING nur beim ersten Mal pro Session (nicht bei jedem Embedding)
+    # Cache: Track ob bereits gewarnt wurde für diese Dimension
+    if not hasattr(generate_embedding_for_email, '_dimension_warned'):
+        generate_embedding_for_email._dimension_warned = set()
+    
+    if dimension != DEFAULT_EMBEDDING_DIM and dimension not in generate_embedding_for_email._dimension_warned:
+        logger.warning(
+            f"⚠️  Embedding-Dimension {dimension} weicht von Default ({DEFAULT_EMBEDDING_DIM}) ab. "
+            f"Stelle sicher, dass ALLE Emails mit dem gleichen Model embedded werden!"
+        )
+        generate_embedding_for_email._dimension_warned.add(dimension)
+    
+    return (
+        embedding_array.tobytes(),
+        _resolve_model_name(ai_client, model_name),
+        datetime.now(UTC)
+    )
+
+
+def _resolve_model_name(ai_client, model_name: Optional[str]) -> str:
+    """Model-Name: Verwende übergebenen Namen oder hole von Client"""
+    if model_name:
+        return model_name
+    if hasattr(ai_client, 'model'):
+        return ai_client.model
+    if hasattr(ai_client, '_model'):
+        return ai_client._model
+    return EMBEDDING_MODEL  # Fallback
+
+
 def generate_embedding_for_email(
     subject: str,
     body: str,
     ai_client,
     max_body_length: int = 1000,  # Erhöht von 500 → 1000 für besseren Context
-    model_name: Optional[str] = None
+    model_name: Optional[str] = None,
+    master_key: Optional[str] = None
 ) -> Tuple[Optional[bytes], Optional[str], Optional[datetime]]:
     """
     Generiert Embedding aus Subject + Body mit Chunking + Normalisierung.
@@ -72,12 +199,17 @@ def generate_embedding_for_email(
     BUGFIX (24.01.2026): Validiert dass das Model ein Embedding-Model ist,
     nicht ein Chat-Model (verhindert llama3.2:1b als Embedding-Model).
     
+    🚀 PERFORMANCE: Wortgleiche Texte kommen aus dem EmbeddingCache
+    (Key: HMAC des Users über Model + normalisierten Text), ohne Backend-Call.
+    Ohne master_key wird der Cache nicht genutzt.
+    
     Args:
         subject: Email-Betreff (Klartext)
         body: Email-Body (Klartext)
         ai_client: AI Client mit _get_embedding() Methode (LocalOllamaClient)
         max_body_length: Maximale Body-Länge für Embedding
         model_name: Optional - Name des verwendeten Models (z.B. "all-minilm:22m")
+        master_key: Optional - Master-Key des Users (Schlüssel für den Embedding-Cache)
         
     Returns:
         Tuple (embedding_bytes, model_name, timestamp)
@@ -89,114 +221,131 @@ def generate_embedding_for_email(
         logger.debug("Kein AI-Client für Embedding-Generierung")
         return None, None, None
     
-    # 🆕 KRITISCHE VALIDIERUNG: Prüfe ob Model ein Embedding-Model ist
-    # Verhindert: llama3.2:1b (Chat) statt bge-m3:latest (Embedding)
-    try:
-        actual_model = model_name or getattr(ai_client, "model", None)
-        if actual_model:
-            # Import model_discovery für Typ-Check (mit importlib wegen 04_* Prefix)
-            try:
-                import importlib
-                model_discovery = importlib.import_module("src.04_model_discovery")
-                model_type = model_discovery._detect_ollama_model_type("http://127.0.0.1:11434", actual_model)
-                
-                if model_type != "embedding":
-                    logger.error(
-                        f"❌ KRITISCHER FEHLER: '{actual_model}' ist ein {model_type.upper()}-Model, "
-                        "kein EMBEDDING-Model! Verwende bge-m3:latest oder all-minilm:22m stattdessen."
-                    )
-                    # BLOCKIERE das Embedding - sonst gibt's Dimensions-Mismatch!
-                    return None, None, None
-                    
-                logger.debug(f"✅ Model-Typ validiert: {actual_model} ist ein Embedding-Model")
-                
-            except ImportError:
-                logger.warning("⚠️  model_discovery nicht verfügbar, überspringe Typ-Check")
-            except Exception as type_check_err:
-                logger.warning(f"⚠️  Model-Typ-Check fehlgeschlagen: {type_check_err}")
-    except Exception as e:
-        logger.warning(f"⚠️  Model-Validierung fehlgeschlagen: {e}")
+    text = _embedding_text(subject, body, max_body_length)
+    if not text:
+        return None, None, None
+    
+    actual_model = _resolve_model_name(ai_client, model_name)
+    cache_key = derive_cache_key(master_key) if master_key else None
+    cached = EmbeddingCache.get(cache_key, actual_model, text) if cache_key else None
+    if cached is not None:
+        logger.debug(f"♻️  Embedding aus Cache ({actual_model})")
+        return cached, actual_model, datetime.now(UTC)
+    
+    if not _validate_embedding_model(ai_client, model_name):
+        return None, None, None
     
     try:
-        # Text für Embedding kombinieren
-        # Subject ist wichtiger, daher zuerst
-        text = f"{subject or ''}\n{(body or '')[:max_body_length]}"
-        text = text.strip()
-        
-        if not text:
-            logger.debug("Leerer Text, kein Embedding generiert")
-            return None, None, None
-        
-        # BUGFIX 2026-01-14: Mindestlänge prüfen um sinnlose Embeddings zu vermeiden
-        # Test-Mails mit nur Signatur haben ~500 Zeichen aber keinen Inhalt
-        MIN_MEANINGFUL_LENGTH = 50
-        if len(text) < MIN_MEANINGFUL_LENGTH:
-            logger.debug(f"Text zu kurz ({len(text)} < {MIN_MEANINGFUL_LENGTH} chars), kein Embedding generiert")
-            return None, None, None
-        
         logger.info(f"📝 Generiere Embedding für Text ({len(text)} Zeichen)...")
         
         # Embedding mit Chunking generieren (für lange Emails wichtig!)
         embedding_list = ai_client._get_embedding(text)
         
-        if not embedding_list:
-            logger.warning("❌ AI-Client lieferte kein Embedding")
-            return None, None, None
+        result = _finalize_embedding(embedding_list, ai_client, model_name)
+        if result[0] and cache_key:
+            EmbeddingCache.put(cache_key, actual_model, text, result[0])
+        return result
         
-        # Zu numpy array konvertieren
-        embedding_array = np.array(embedding_list, dtype=np.float32)
+    except Exception as e:
+        logger.warning(f"Embedding-Generierung fehlgeschlagen: {e}")
+        return None, None, None
+
+
+def generate_embeddings_for_emails(
+    emails: List[Tuple[str, str]],
+    ai_client,
+    max_body_length: int = 1000,
+    model_name: Optional[str] = None,
+    master_key: Optional[str] = None
+) -> List[Tuple[Optional[bytes], Optional[str], Optional[datetime]]]:
+    """
+    🚀 PERFORMANCE: Batch-Variante von generate_embedding_for_email.
+    
+    Alle Texte gehen in EINEM Request (bzw. wenigen, siehe EMBEDDING_BATCH_SIZE)
+    an den Client (_get_embeddings_batch), statt einem HTTP-Call pro Email.
+    Model-Validierung läuft einmal pro Batch. Cache-Treffer und Duplikate
+    innerhalb des Batches gehen nicht ans Backend.
+    
+    Args:
+        emails: Liste von (subject, body) im Klartext
+        ai_client: AI Client mit _get_embeddings_batch() oder _get_embedding()
+        max_body_length: Maximale Body-Länge für Embedding
+        model_name: Optional - Name des verwendeten Models
+        master_key: Optional - Master-Key des Users (Schlüssel für den Embedding-Cache)
         
-        # 🆕 WICHTIG: Normalisieren für konsistente Similarity mit Tag-Embeddings!
-        # Tag-Embeddings sind von Ollama normalisiert (Norm = 1.0)
-        # Email-Embeddings waren mean-pooled (Norm < 1.0) → Similarity war zu niedrig!
-        norm = np.linalg.norm(embedding_array)
-        if norm > 0:
-            embedding_array = embedding_array / norm
-            logger.debug(f"📊 Email-Embedding normalisiert: {norm:.4f} → 1.0")
+    Returns:
+        Pro Email ein Tuple (embedding_bytes, model_name, timestamp) wie
+        generate_embedding_for_email - (None, None, None) bei Fehler/zu kurzem Text
+    """
+    results = [(None, None, None)] * len(emails)
+    if not emails or not ai_client:
+        return results
+    
+    texts = [_embedding_text(subject, body, max_body_length) for subject, body in emails]
+    indices = [i for i, text in enumerate(texts) if text]
+    if not indices:
+        return results
+    
+    actual_model = _resolve_model_name(ai_client, model_name)
+    cache_key = derive_cache_key(master_key) if master_key else None
+    cached = EmbeddingCache.get_many(cache_key, actual_model, (texts[i] for i in indices)) if cache_key else {}
+    
+    # Pro normalisiertem Text nur ein Backend-Text (Duplikate im Batch teilen sich das Ergebnis)
+    positions: Dict[str, List[int]] = {}
+    for i in indices:
+        hit = cached.get(content_hash(cache_key, actual_model, texts[i])) if cached else None
+        if hit is not None:
+            results[i] = (hit, actual_model, datetime.now(UTC))
         else:
-            logger.warning("⚠️  Email-Embedding hat Norm = 0, keine Normalisierung möglich")
-        
-        # Als bytes speichern
-        embedding_array = embedding_array.astype(np.float32)
-        
-        # Validierung: Check gegen erste Email im System (wenn vorhanden)
-        dimension = embedding_array.shape[0]
-        
-        # Log Dimension für Debugging
-        logger.info(f"✅ Embedding generiert: {dimension} Dimensionen, {len(embedding_array.tobytes())} bytes, Norm = 1.0")
-        
-        # WARNING nur beim ersten Mal pro Session (nicht bei jedem Embedding)
-        # Cache: Track ob bereits gewarnt wurde für diese Dimension
-        if not hasattr(generate_embedding_for_email, '_dimension_warned'):
-            generate_embedding_for_email._dimension_warned = set()
-        
-        if dimension != DEFAULT_EMBEDDING_DIM and dimension not in generate_embedding_for_email._dimension_warned:
-            logger.warning(
-                f"⚠️  Embedding-Dimension {dimension} weicht von Default ({DEFAULT_EMBEDDING_DIM}) ab. "
-                f"Stelle sicher, dass ALLE Emails mit dem gleichen Model embedded werden!"
-            )
-            generate_embedding_for_email._dimension_warned.add(dimension)
-        
-        # Model-Name: Verwende übergebenen Namen oder hole von Client
-        actual_model = model_name
-        if not actual_model:
-            # Hole Model-Name vom Client
-            if hasattr(ai_client, 'model'):
-                actual_model = ai_client.model
-            elif hasattr(ai_client, '_model'):
-                actual_model = ai_client._model
-            else:
-                actual_model = EMBEDDING_MODEL  # Fallback
-        
-        return (
-            embedding_array.tobytes(),
-            actual_model,
-            datetime.now(UTC)
+            positions.setdefault(normalize_text(texts[i]), []).append(i)
+    if not positions:
+        logger.debug(f"♻️  {len(indices)} Embeddings aus Cache ({actual_model})")
+        return results
+    
+    if not _validate_embedding_model(ai_client, model_name):
+        return results
+    
+    try:
+        batch_texts = [texts[group[0]] for group in positions.values()]
+        if hasattr(ai_client, "_get_embeddings_batch"):
+            embedding_lists = ai_client._get_embeddings_batch(batch_texts)
+        else:
+            embedding_lists = [ai_client._get_embedding(text) for text in batch_texts]
+    except Exception as e:
+        logger.warning(f"Batch-Embedding-Generierung fehlgeschlagen: {e}")
+        return results
+    
+    new_entries = []
+    for text, group, embedding_list in zip(batch_texts, positions.values(), embedding_lists):
+        try:
+            result = _finalize_embedding(embedding_list, ai_client, model_name)
+        except Exception as e:
+            logger.warning(f"Embedding-Generierung fehlgeschlagen: {e}")
+            continue
+        for i in group:
+            results[i] = result
+        if result[0]:
+            new_entries.append((text, result[0]))
+    if cache_key:
+        EmbeddingCache.put_many(cache_key, actual_model, new_entries)
+    return results
+
+
+def notify_embedding_written(raw_email) -> None:
+    """Hält einen geladenen EmbeddingIndex nach dem Schreiben eines Embeddings aktuell
+    
+    Aufrufen nachdem raw_email.email_embedding gesetzt und geflusht wurde
+    (ID muss vorhanden sein). No-op wenn für den User kein Index geladen ist.
+    """
+    try:
+        EmbeddingIndexCache.notify_embedding(
+            user_id=raw_email.user_id,
+            email_id=raw_email.id,
+            embedding_bytes=raw_email.email_embedding,
+            model=raw_email.embedding_model
         )
-        
     except Exception as e:
-        logger.warning(f"Embedding-Generierung fehlgeschlagen: {e}")
-        return None, None, None
+        logger.debug(f"EmbeddingIndex-Update übersprungen: {e}")
 
 
 class SemanticSearchService:
@@ -245,6 +394,103 @@ class SemanticSearchService:
             logger.error(f"Cosine Similarity Berechnung fehlgeschlagen: {e}")
             return 0.0
     
+    def _filter_query(self, query_obj, user_id: int, folder: Optional[str], account_id: Optional[int]):
+        """deleted_at-, Ordner- und Account-Filter (Quelle der Wahrheit ist die DB)"""
+        query_obj = query_obj.filter(
+            models.RawEmail.user_id == user_id,
+            models.RawEmail.deleted_at.is_(None)
+        )
+        if folder:
+            query_obj = query_obj.filter(models.RawEmail.imap_folder == folder)
+        if account_id:
+            query_obj = query_obj.filter(models.RawEmail.mail_account_id == account_id)
+        return query_obj
+    
+    def _ranked_hits(
+        self,
+        index,
+        vector: np.ndarray,
+        user_id: int,
+        limit: int,
+        threshold: float,
+        folder: Optional[str] = None,
+        account_id: Optional[int] = None,
+        exclude_ids: Optional[List[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """Top-``limit`` Index-Treffer, die in der DB (noch) zu den Filtern passen
+        
+        Der Index kennt weder Ordner noch Account (ein MOVE in einem anderen
+        Prozess würde ihn sonst unbemerkt veralten lassen). Deshalb Over-Fetch
+        ohne Filter, Prüfung per ID-Abfrage in SQL und - solange zu wenige
+        Treffer übrig bleiben - ein größeres k (×4), bis der Index erschöpft ist.
+        Mit Filter durchsucht ein IVF-Index dann alle Listen statt nprobe
+        (sonst fehlen Treffer, die außerhalb der nächsten Listen liegen).
+        
+        Returns:
+            Liste (email_id, similarity), absteigend sortiert
+        """
+        k = limit * 2 + 10
+        filtered = bool(folder or account_id)
+        exhaustive = False
+        checked: Dict[int, bool] = {}
+        while True:
+            hits = index.query(
+                vector, k=k, threshold=threshold, exclude_ids=exclude_ids, exhaustive=exhaustive
+            )
+            unchecked = [email_id for email_id, _ in hits if email_id not in checked]
+            for start in range(0, len(unchecked), HIT_FILTER_CHUNK):
+                chunk = unchecked[start:start + HIT_FILTER_CHUNK]
+                valid = {
+                    email_id for (email_id,) in self._filter_query(
+                        self.db.query(models.RawEmail.id).filter(models.RawEmail.id.in_(chunk)),
+                        user_id, folder, account_id
+                    )
+                }
+                checked.update((email_id, email_id in valid) for email_id in chunk)
+            
+            matching = [(email_id, score) for email_id, score in hits if checked[email_id]]
+            if len(matching) >= limit:
+                return matching[:limit]
+            if len(hits) < k:
+                # Kandidaten erschöpft - bei IVF nur die der nprobe Listen
+                if not filtered or exhaustive:
+                    return matching
+                exhaustive = True
+            else:
+                k *= 4
+    
+    def _load_hits(
+        self,
+        hits: List[Tuple[int, float]],
+        user_id: int,
+        folder: Optional[str],
+        account_id: Optional[int]
+    ) -> List[Tuple[Any, float]]:
+        """Lädt RawEmails zu Index-Treffern und verifiziert sie gegen die DB
+        
+        Der Index kann minimal veraltet sein (Delete/Move in anderem Prozess):
+        deleted_at, Ordner und Account werden hier gegen die DB geprüft.
+        
+        Returns:
+            Liste (RawEmail, similarity) in Reihenfolge der Treffer
+        """
+        if not hits:
+            return []
+        
+        query_obj = self._filter_query(
+            self.db.query(models.RawEmail).filter(
+                models.RawEmail.id.in_([email_id for email_id, _ in hits])
+            ),
+            user_id, folder, account_id
+        )
+        
+        emails_by_id = {email.id: email for email in query_obj.all()}
+        return [
+            (emails_by_id[email_id], similarity)
+            for email_id, similarity in hits
+            if email_id in emails_by_id
+        ]
+    
     def search(
         self,
         query: str,
@@ -310,62 +556,41 @@ class SemanticSearchService:
                 query_vector = query_vector / norm
                 logger.debug(f"📊 Query-Embedding normalisiert: {norm:.4f} → 1.0")
             
-            # 2. Alle Emails mit Embeddings laden
-            query_obj = (
-                self.db.query(models.RawEmail)
-                .filter(
-                    models.RawEmail.user_id == user_id,
-                    models.RawEmail.deleted_at.is_(None),
-                    models.RawEmail.email_embedding.isnot(None)
-                )
-            )
+            # 2. Embedding-Index des Users (Matrix im RAM, Delta-Sync mit DB)
+            index = EmbeddingIndexCache.get_index(self.db, user_id, embedding_model)
             
-            if folder:
-                query_obj = query_obj.filter(models.RawEmail.imap_folder == folder)
-            
-            if account_id:
-                query_obj = query_obj.filter(models.RawEmail.mail_account_id == account_id)
-            
-            emails = query_obj.all()
-            
-            if not emails:
+            if index.size == 0:
                 logger.info("Keine Emails mit Embeddings gefunden")
                 return []
             
-            # 3. Cosine Similarity berechnen für alle Emails
-            results = []
+            # 3. Top-K per Matrix-Vektor-Produkt, Ordner/Account/deleted_at
+            #    per SQL gegen die DB (Over-Fetch, siehe _ranked_hits)
+            hits = self._ranked_hits(
+                index, query_vector, user_id, limit, threshold,
+                folder=folder or None, account_id=account_id or None
+            )
             
-            for email in emails:
-                email_vector = self.embedding_to_vector(email.email_embedding)
-                
-                if email_vector is None:
-                    continue
-                
-                similarity = self.cosine_similarity(query_vector, email_vector)
-                
-                if similarity >= threshold:
-                    results.append({
-                        'id': email.id,
-                        'encrypted_sender': email.encrypted_sender,
-                        'encrypted_subject': email.encrypted_subject,
-                        'received_at': email.received_at,
-                        'imap_folder': email.imap_folder,
-                        'mail_account_id': email.mail_account_id,
-                        'similarity_score': round(similarity, 4),
-                        'has_attachments': email.has_attachments,
-                        'imap_is_seen': email.imap_is_seen,
-                        'imap_is_flagged': email.imap_is_flagged
-                    })
-            
-            # 4. Nach Similarity sortieren (höchste zuerst)
-            results.sort(key=lambda x: x['similarity_score'], reverse=True)
-            
-            # 5. Limit anwenden
-            results = results[:limit]
+            # 4. Nur die Treffer-Zeilen laden (statt aller RawEmails)
+            results = []
+            for email, similarity in self._load_hits(hits, user_id, folder, account_id):
+                results.append({
+                    'id': email.id,
+                    'encrypted_sender': email.encrypted_sender,
+                    'encrypted_subject': email.encrypted_subject,
+                    'received_at': email.received_at,
+                    'imap_folder': email.imap_folder,
+                    'mail_account_id': email.mail_account_id,
+                    'similarity_score': round(similarity, 4),
+                    'has_attachments': email.has_attachments,
+                    'imap_is_seen': email.imap_is_seen,
+                    'imap_is_flagged': email.imap_is_flagged
+                })
+                if len(results) >= limit:
+                    break
             
             logger.info(
                 f"Semantic Search: '{query}' → {len(results)} Ergebnisse "
-                f"(threshold={threshold}, total_emails={len(emails)})"
+                f"(threshold={threshold}, total_emails={index.size})"
             )
             
             return results
@@ -406,53 +631,40 @@ class SemanticSearchService:
             if ref_vector is None:
                 return []
             
-            # 2. Alle anderen Emails des Users mit Embeddings
-            query_obj = (
-                self.db.query(models.RawEmail)
-                .filter(
-                    models.RawEmail.user_id == ref_email.user_id,
-                    models.RawEmail.id != email_id,
-                    models.RawEmail.deleted_at.is_(None),
-                    models.RawEmail.email_embedding.isnot(None)
-                )
-            )
-            
-            # Account-Filter: Default ist gleicher Account wie Referenz-Email
+            # 2. Account-Filter: Default ist gleicher Account wie Referenz-Email
             if account_id is None:
                 # Standard: nur gleicher Account
-                query_obj = query_obj.filter(models.RawEmail.mail_account_id == ref_email.mail_account_id)
+                account_filter = ref_email.mail_account_id
             elif account_id > 0:
                 # Explizit angegebener Account
-                query_obj = query_obj.filter(models.RawEmail.mail_account_id == account_id)
-            # Wenn account_id == -1: alle Accounts (kein Filter)
+                account_filter = account_id
+            else:
+                # Wenn account_id == -1: alle Accounts (kein Filter)
+                account_filter = None
             
-            other_emails = query_obj.all()
+            # 3. Similarity über den Embedding-Index des Users
+            index = EmbeddingIndexCache.get_index(
+                self.db, ref_email.user_id, ref_email.embedding_model or EMBEDDING_MODEL
+            )
+            hits = self._ranked_hits(
+                index, ref_vector, ref_email.user_id, limit, threshold,
+                account_id=account_filter, exclude_ids=[email_id]
+            )
             
-            # 3. Similarity berechnen
+            # 4. Treffer laden (bereits nach Similarity sortiert)
             results = []
-            
-            for email in other_emails:
-                email_vector = self.embedding_to_vector(email.email_embedding)
-                
-                if email_vector is None:
-                    continue
-                
-                similarity = self.cosine_similarity(ref_vector, email_vector)
-                
-                if similarity >= threshold:
-                    results.append({
-                        'id': email.id,
-                        'encrypted_sender': email.encrypted_sender,
-                        'encrypted_subject': email.encrypted_subject,
-                        'received_at': email.received_at,
-                        'imap_folder': email.imap_folder,
-                        'similarity_score': round(similarity, 4),
-                        'thread_id': email.thread_id
-                    })
-            
-            # 4. Sortieren und limitieren
-            results.sort(key=lambda x: x['similarity_score'], reverse=True)
-            results = results[:limit]
+            for email, similarity in self._load_hits(hits, ref_email.user_id, None, account_filter):
+                results.append({
+                    'id': email.id,
+                    'encrypted_sender': email.encrypted_sender,
+                    'encrypted_subject': email.encrypted_subject,
+                    'received_at': email.received_at,
+                    'imap_folder': email.imap_folder,
+                    'similarity_score': round(similarity, 4),
+                    'thread_id': email.thread_id
+                })
+                if len(results) >= limit:
+                    break
             
             logger.info(f"Similar Emails für {email_id}: {len(results)} gefunden")
             
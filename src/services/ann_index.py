@@ -0,0 +1,516 @@
+"""
+ANN Index Service - Persistierter IVF-Index für Semantic Search
+
+Approximate Nearest Neighbour Index (IVF, reines NumPy) pro User +
+Embedding-Model, auf Disk als .npy-Dateien gespeichert und per mmap geöffnet.
+Celery-Worker, die neu starten, öffnen den Index damit zero-copy statt alle
+email_embedding-Blobs aus PostgreSQL zu laden.
+
+Aufbau:
+- Main-Segment (immutable, mmap): Zeilen nach IVF-Liste sortiert
+  centroids.npy, list_offsets.npy, vectors.npy, ids.npy in einem
+  Generations-Verzeichnis gen-*/ (Ordner/Account nicht - Filter laufen in SQL)
+- Delta-Segment (RAM, Brute-Force): neue/geänderte Embeddings
+- Tombstones: gelöschte/überschriebene IDs des Main-Segments
+- state.npz: Delta + Tombstones + Meta, atomar per os.replace geschrieben
+- save() läuft unter einem Datei-Lock (.lock) pro User/Model; alte
+  Generationen werden erst nach GENERATION_GRACE_SECONDS entfernt (Prozesse,
+  die gerade einen älteren state.npz geöffnet haben, finden ihre Dateien noch)
+
+Wird Delta + Tombstones zu groß (REBUILD_RATIO), wird das Main-Segment ohne
+DB-Zugriff neu geclustert (compact()).
+
+Layout:
+    {EMBEDDING_INDEX_DIR}/per_user/{user_id}/{model}/state.npz
+    {EMBEDDING_INDEX_DIR}/per_user/{user_id}/{model}/gen-<ts>-<pid>-<rand>/*.npy
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Tuple, Iterable, Dict, Any, Set
+
+import numpy as np
+
+from src.services.embedding_index import EmbeddingIndex
+
+logger = logging.getLogger(__name__)
+
+# v2: ohne Ordner/Account-Spalten (v1-Indizes werden ignoriert und neu gebaut)
+ANN_INDEX_VERSION = 2
+
+_MAIN_ARRAYS = ("centroids", "list_offsets", "vectors", "ids")
+
+# Nicht mehr referenzierte Generationen erst nach dieser Zeit löschen
+GENERATION_GRACE_SECONDS = 600
+
+try:
+    import fcntl
+except ImportError:  # Windows: kein flock, save() läuft ungeschützt
+    fcntl = None
+
+
+# =============================================================================
+# PATH HELPERS
+# =============================================================================
+
+def get_index_dir() -> Path:
+    """Basisverzeichnis für persistierte Indizes (EMBEDDING_INDEX_DIR)
+
+    Returns:
+        Path: data/embedding_index/ im Projekt-Root (Default, außerhalb von src/)
+    """
+    configured = os.getenv("EMBEDDING_INDEX_DIR")
+    if configured:
+        return Path(configured)
+    return Path(__file__).resolve().parents[2] / "data" / "embedding_index"
+
+
+def get_index_path(user_id: int, model: str) -> Path:
+    """Pfad zum Index eines Users für ein Embedding-Model
+
+    Pattern: per_user/{user_id}/{model}/ (Model-Name dateisystem-sicher)
+    """
+    model_slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model or "default")
+    return get_index_dir() / "per_user" / str(user_id) / model_slug
+
+
+@contextmanager
+def _save_lock(path: Path):
+    """Exklusiver Datei-Lock für save() eines Index-Verzeichnisses (prozessübergreifend)"""
+    if fcntl is None:
+        yield
+        return
+    with open(path / ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _current_generation(path: Path) -> Optional[str]:
+    """Generation, auf die state.npz aktuell zeigt"""
+    try:
+        with np.load(path / "state.npz", allow_pickle=False) as state:
+            return json.loads(str(state["meta"])).get("generation")
+    except Exception:
+        return None
+
+
+def _remove_stale_generations(path: Path, keep: Set[str]) -> int:
+    """Löscht unreferenzierte gen-*-Verzeichnisse, die älter als die Grace-Period sind"""
+    removed = 0
+    cutoff = time.time() - GENERATION_GRACE_SECONDS
+    for old in path.glob("gen-*"):
+        if old.name in keep:
+            continue
+        try:
+            if old.stat().st_mtime > cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        shutil.rmtree(old, ignore_errors=True)
+        removed += 1
+    return removed
+
+
+# =============================================================================
+# CLUSTERING
+# =============================================================================
+
+def _assign_lists(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 8192) -> np.ndarray:
+    """Nächster Centroid (max. Cosine) pro Zeile, chunkweise"""
+    assignments = np.empty(vectors.shape[0], dtype=np.int32)
+    for start in range(0, vectors.shape[0], chunk_size):
+        block = np.asarray(vectors[start:start + chunk_size])
+        assignments[start:start + chunk_size] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def spherical_kmeans(
+    vectors: np.ndarray,
+    nlist: int,
+    iterations: int = 10,
+    sample_size: int = 20000,
+    seed: int = 0,
+) -> np.ndarray:
+    """Spherical k-means (Cosine) auf einer Stichprobe der normalisierten Zeilen
+
+    Returns:
+        Normalisierte Centroids (nlist, dim)
+    """
+    rng = np.random.default_rng(seed)
+    n = vectors.shape[0]
+    sample_rows = np.sort(rng.choice(n, size=min(n, sample_size), replace=False))
+    sample = np.asarray(vectors[sample_rows], dtype=np.float32)
+    nlist = max(1, min(nlist, sample.shape[0]))
+
+    centroids = sample[rng.choice(sample.shape[0], size=nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = _assign_lists(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=nlist)
+
+        empty = counts == 0
+        if empty.any():
+            # Leere Listen mit zufälligen Sample-Zeilen neu besetzen
+            sums[empty] = sample[rng.choice(sample.shape[0], size=int(empty.sum()))]
+
+        centroids = EmbeddingIndex.normalize_rows(sums)
+
+    return centroids
+
+
+# =============================================================================
+# IVF INDEX
+# =============================================================================
+
+class IVFIndex:
+    """Persistierbarer IVF-Index (gleiches Interface wie EmbeddingIndex)"""
+
+    DEFAULT_NPROBE = int(os.getenv("EMBEDDING_ANN_NPROBE", "8"))
+    REBUILD_RATIO = 0.2
+
+    def __init__(self, user_id: int, model: str, dim: int):
+        self.user_id = user_id
+        self.model = model
+        self.dim = dim
+        self.centroids = np.empty((0, dim), dtype=np.float32)
+        self.list_offsets = np.zeros(1, dtype=np.int64)
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self._row_by_id: Dict[int, int] = {}
+        self.tombstones: Set[int] = set()
+        self.delta = EmbeddingIndex(user_id, model, dim)
+        self.nprobe = self.DEFAULT_NPROBE
+        # Sync-Status gegenüber der DB (wie EmbeddingIndex)
+        self.watermark: Optional[datetime] = None
+        self.last_checked: float = 0.0
+        # Persistenz
+        self.generation: Optional[str] = None
+        self.dirty = True
+
+    # ------------------------------------------------------------------
+    # Aufbau
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(
+        cls,
+        user_id: int,
+        model: str,
+        vectors: np.ndarray,
+        ids: np.ndarray,
+        nlist: Optional[int] = None,
+    ) -> "IVFIndex":
+        """Clustert normalisierte Vektoren in IVF-Listen
+
+        Args:
+            vectors: Normalisierte Embeddings (n, dim)
+            ids: Email-IDs (n,)
+            nlist: Anzahl Listen (Default: sqrt(n), max. 1024)
+        """
+        n, dim = vectors.shape
+        index = cls(user_id, model, dim)
+        if n == 0:
+            return index
+
+        nlist = nlist or max(1, min(1024, int(np.sqrt(n))))
+        centroids = spherical_kmeans(vectors, nlist)
+        assignments = _assign_lists(vectors, centroids)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=centroids.shape[0])
+
+        index.centroids = centroids
+        index.list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        index.vectors = np.ascontiguousarray(np.asarray(vectors, dtype=np.float32)[order])
+        index.ids = np.asarray(ids, dtype=np.int64)[order]
+        index._row_by_id = {int(email_id): row for row, email_id in enumerate(index.ids)}
+        return index
+
+    @classmethod
+    def from_embedding_index(cls, flat: EmbeddingIndex) -> "IVFIndex":
+        """Baut einen IVF-Index aus einem (vollständigen) In-Memory-Index"""
+        index = cls.build(flat.user_id, flat.model, flat.matrix, flat.ids)
+        index.watermark = flat.watermark
+        index.last_checked = flat.last_checked
+        return index
+
+    def needs_compaction(self) -> bool:
+        return (self.delta.size + len(self.tombstones)) > self.REBUILD_RATIO * max(1, self.ids.shape[0])
+
+    def compact(self) -> "IVFIndex":
+        """Neu-Clustering aus Main (ohne Tombstones) + Delta, ohne DB-Zugriff"""
+        live = np.ones(self.ids.shape[0], dtype=bool)
+        if self.tombstones:
+            live &= ~np.isin(self.ids, np.fromiter(self.tombstones, dtype=np.int64))
+
+        compacted = self.build(
+            self.user_id,
+            self.model,
+            np.vstack([np.asarray(self.vectors[live]), self.delta.matrix]),
+            np.concatenate([self.ids[live], self.delta.ids]),
+        )
+        compacted.nprobe = self.nprobe
+        compacted.watermark = self.watermark
+        compacted.last_checked = self.last_checked
+        return compacted
+
+    # ------------------------------------------------------------------
+    # Interface wie EmbeddingIndex
+    # ------------------------------------------------------------------
+
+    @property
+    def size(self) -> int:
+        return int(self.ids.shape[0]) - len(self.tombstones) + self.delta.size
+
+    @property
+    def nbytes(self) -> int:
+        # mmap-Arrays liegen im Page-Cache, nicht im Prozess-Heap
+        in_heap = 0 if isinstance(self.vectors, np.memmap) else self.vectors.nbytes
+        return in_heap + self.delta.nbytes
+
+    def _main_row(self, email_id: int) -> Optional[int]:
+        if email_id in self.tombstones:
+            return None
+        return self._row_by_id.get(email_id)
+
+    def contains(self, email_id: int) -> bool:
+        return self.delta.contains(email_id) or self._main_row(email_id) is not None
+
+    def all_ids(self) -> Set[int]:
+        return (set(self._row_by_id) - self.tombstones) | self.delta.all_ids()
+
+    def get_vector(self, email_id: int) -> Optional[np.ndarray]:
+        vector = self.delta.get_vector(email_id)
+        if vector is not None:
+            return vector
+        row = self._main_row(email_id)
+        return None if row is None else np.asarray(self.vectors[row])
+
+    def upsert(self, rows: Iterable[Tuple[int, bytes]]) -> int:
+        rows = list(rows)
+        for email_id, _ in rows:
+            if self._main_row(email_id) is not None:
+                self.tombstones.add(email_id)
+        applied = self.delta.upsert(rows)
+        self.dirty = True
+        return applied
+
+    def remove(self, email_ids: Iterable[int]) -> int:
+        removed = 0
+        email_ids = list(email_ids)
+        for email_id in email_ids:
+            if self._main_row(email_id) is not None:
+                self.tombstones.add(email_id)
+                removed += 1
+        removed += self.delta.remove(email_ids)
+        if removed:
+            self.dirty = True
+        return removed
+
+    def query(
+        self,
+        vector: np.ndarray,
+        k: int,
+        threshold: float = 0.0,
+        exclude_ids: Optional[Iterable[int]] = None,
+        exhaustive: bool = False,
+    ) -> List[Tuple[int, float]]:
+        """Top-K über die nprobe nächsten IVF-Listen + Delta (Brute-Force)
+
+        Args:
+            exhaustive: Alle Listen statt nprobe (exakt) - für selektive
+                Filter, deren Treffer außerhalb der nächsten Listen liegen können
+        """
+        if k <= 0:
+            return []
+
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape[0] != self.dim:
+            logger.error(
+                f"❌ Dimension mismatch: query={vector.shape[0]}, index={self.dim}. "
+                f"Semantic Search funktioniert nicht zwischen unterschiedlichen Embedding-Models!"
+            )
+            return []
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return []
+        q = vector / norm
+        exclude_ids = list(exclude_ids or [])
+
+        hits = self.delta.query(q, k, threshold, exclude_ids)
+
+        nlist = self.centroids.shape[0]
+        if nlist and self.ids.shape[0]:
+            nprobe = nlist if exhaustive else min(self.nprobe, nlist)
+            probe = np.argpartition(self.centroids @ q, -nprobe)[-nprobe:]
+            ranges = [
+                (int(self.list_offsets[c]), int(self.list_offsets[c + 1]))
+                for c in probe if self.list_offsets[c + 1] > self.list_offsets[c]
+            ]
+            if ranges:
+                rows = np.concatenate([np.arange(a, b) for a, b in ranges])
+                scores = np.concatenate([np.asarray(self.vectors[a:b]) @ q for a, b in ranges])
+
+                valid = scores >= threshold
+                blocked = self.tombstones.union(exclude_ids)
+                if blocked:
+                    valid &= ~np.isin(self.ids[rows], np.fromiter(blocked, dtype=np.int64))
+
+                candidates = np.flatnonzero(valid)
+                if candidates.size > k:
+                    candidates = candidates[np.argpartition(scores[candidates], -k)[-k:]]
+                hits.extend(
+                    (int(self.ids[rows[c]]), float(scores[c])) for c in candidates
+                )
+
+        hits.sort(key=lambda hit: hit[1], reverse=True)
+        return hits[:k]
+
+    # ------------------------------------------------------------------
+    # Persistenz
+    # ------------------------------------------------------------------
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        """Schreibt Main-Segment (falls neu) + state.npz atomar"""
+        path = Path(path or get_index_path(self.user_id, self.model))
+        path.mkdir(parents=True, exist_ok=True)
+
+        with _save_lock(path):
+            self._save_locked(path)
+
+        self.dirty = False
+        return path
+
+    def _save_locked(self, path: Path) -> None:
+        if self.generation is None or not (path / self.generation).is_dir():
+            generation = f"gen-{int(time.time() * 1000)}-{os.getpid()}-{os.urandom(3).hex()}"
+            gen_dir = path / generation
+            gen_dir.mkdir()
+            for name in _MAIN_ARRAYS:
+                np.save(gen_dir / f"{name}.npy", np.asarray(getattr(self, name)))
+            self.generation = generation
+
+        meta = {
+            "version": ANN_INDEX_VERSION,
+            "user_id": self.user_id,
+            "model": self.model,
+            "dim": self.dim,
+            "generation": self.generation,
+            "nprobe": self.nprobe,
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+        }
+        tmp_state = path / f"state.{os.getpid()}.tmp"
+        with open(tmp_state, "wb") as f:
+            np.savez(
+                f,
+                meta=np.array(json.dumps(meta)),
+                tombstones=np.fromiter(self.tombstones, dtype=np.int64),
+                delta_matrix=self.delta.matrix,
+                delta_ids=self.delta.ids,
+            )
+        os.replace(tmp_state, path / "state.npz")
+
+        # Alte Generationen entfernen (bestehende mmaps bleiben unter POSIX gültig),
+        # nur was state.npz nicht mehr referenziert und die Grace-Period überschritten hat
+        keep = {self.generation, _current_generation(path)}
+        _remove_stale_generations(path, {g for g in keep if g})
+
+    @classmethod
+    def load(cls, user_id: int, model: str, path: Optional[Path] = None) -> Optional["IVFIndex"]:
+        """Öffnet einen persistierten Index (Main-Segment per mmap)
+
+        Returns:
+            IVFIndex oder None (kein/inkompatibler/defekter Index)
+        """
+        path = Path(path or get_index_path(user_id, model))
+        state_file = path / "state.npz"
+        if not state_file.exists():
+            return None
+
+        try:
+            with np.load(state_file, allow_pickle=False) as state:
+                meta = json.loads(str(state["meta"]))
+                if meta.get("version") != ANN_INDEX_VERSION or meta.get("model") != model:
+                    logger.info(f"ANN-Index {path} inkompatibel (Version/Model) → ignoriert")
+                    return None
+
+                index = cls(user_id, model, int(meta["dim"]))
+                gen_dir = path / meta["generation"]
+                for name in _MAIN_ARRAYS:
+                    setattr(index, name, np.load(gen_dir / f"{name}.npy", mmap_mode="r"))
+                # Kleine Arrays in den RAM (werden bei jeder Query gebraucht)
+                index.centroids = np.array(index.centroids)
+                index.list_offsets = np.array(index.list_offsets)
+
+                index.tombstones = set(int(i) for i in state["tombstones"])
+                index.delta.upsert(
+                    (int(email_id), vector.tobytes())
+                    for email_id, vector in zip(state["delta_ids"], state["delta_matrix"])
+                )
+
+            index._row_by_id = {int(email_id): row for row, email_id in enumerate(index.ids)}
+            index.nprobe = int(meta.get("nprobe") or cls.DEFAULT_NPROBE)
+            index.generation = meta["generation"]
+            index.watermark = datetime.fromisoformat(meta["watermark"]) if meta.get("watermark") else None
+            index.dirty = False
+            return index
+
+        except Exception as e:
+            logger.warning(f"⚠️  ANN-Index {path} konnte nicht geladen werden: {e}")
+            return None
+
+
+# =============================================================================
+# RECALL BENCHMARK
+# =============================================================================
+
+def benchmark_recall(
+    ann: IVFIndex,
+    exact: EmbeddingIndex,
+    queries: np.ndarray,
+    k: int = 10,
+) -> Dict[str, Any]:
+    """Vergleicht ANN-Treffer mit dem Brute-Force-Pfad
+
+    Args:
+        ann: IVF-Index
+        exact: Exakter In-Memory-Index über die gleichen Embeddings
+        queries: Query-Vektoren (m, dim)
+        k: Top-K
+
+    Returns:
+        Dict mit recall_at_k, Latenzen (ms) und nprobe
+    """
+    recalls, ann_ms, exact_ms = [], [], []
+
+    for q in queries:
+        started = time.perf_counter()
+        expected = {email_id for email_id, _ in exact.query(q, k, threshold=-1.0)}
+        exact_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        found = {email_id for email_id, _ in ann.query(q, k, threshold=-1.0)}
+        ann_ms.append((time.perf_counter() - started) * 1000)
+
+        if expected:
+            recalls.append(len(found & expected) / len(expected))
+
+    return {
+        "queries": len(queries),
+        "k": k,
+        "nprobe": ann.nprobe,
+        "nlist": int(ann.centroids.shape[0]),
+        "recall_at_k": round(float(np.mean(recalls)) if recalls else 0.0, 4),
+        "ann_ms_avg": round(float(np.mean(ann_ms)) if ann_ms else 0.0, 3),
+        "exact_ms_avg": round(float(np.mean(exact_ms)) if exact_ms else 0.0, 3),
+    }
@@ -22,6 +22,9 @@ from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 from collections import OrderedDict
 
+from src.services import spacy_context
+from src.services.plain_text import clean_html_fallback, html_to_plain_text, is_html
+
 logger = logging.getLogger(__name__)
 
 # Debug Logger Import
@@ -36,20 +39,10 @@ _sanitizer_instance = None
 
 
 def get_spacy_model():
+    """Geteiltes spaCy Modell (spacy_context, de_core_news_md mit sm-Fallback)"""
     global _nlp
     if _nlp is None:
-        try:
-            import spacy
-            # Versuche zuerst das bessere md-Modell
-            try:
-                _nlp = spacy.load("de_core_news_md")
-                logger.info("✅ spaCy geladen: de_core_news_md")
-            except OSError:
-                _nlp = spacy.load("de_core_news_sm")
-                logger.info("✅ spaCy geladen: de_core_news_sm (Fallback)")
-        except Exception as e:
-            logger.warning(f"⚠️ spaCy nicht verfügbar: {e}")
-            _nlp = False
+        _nlp = spacy_context.get_nlp() or False
     return _nlp if _nlp else None
 
 
@@ -279,155 +272,19 @@ class ContentSanitizer:
     
     def _is_html(self, text: str) -> bool:
         """Prüft ob Text HTML enthält."""
-        if not text:
-            return False
-        # Schneller Check auf typische HTML-Marker
-        html_markers = ['<html', '<body', '<div', '<p ', '<p>', '<span', '<table', '<!DOCTYPE']
-        text_lower = text[:1000].lower()  # Nur ersten 1000 Zeichen prüfen
-        return any(marker in text_lower for marker in html_markers)
+        return is_html(text)
     
     def _html_to_plain_text(self, html: str) -> tuple[str, str]:
-        """Konvertiert HTML zu sauberem Plain Text via inscriptis (optimiert für Emails).
+        """Konvertiert HTML zu Plain Text (gemeinsamer Konverter, services/plain_text.py).
         
         Returns:
             tuple: (tool_name, plain_text)
         """
-        if not html:
-            return ("none", "")
-        
-        # Methode 1: inscriptis (beste Qualität für Emails)
-        try:
-            from inscriptis import get_text
-            from inscriptis.model.config import ParserConfig
-            
-            # Konfiguration für Email-optimierte Ausgabe
-            config = ParserConfig(
-                display_links=False,     # Links NICHT ausschreiben (spart 30-50% Text)
-                display_images=False,    # Keine Bild-Platzhalter
-                display_anchors=False,   # Keine Anker
-                annotation_rules=None
-            )
-            
-            text = get_text(html, config)
-            
-            # Bereinige Whitespace
-            import html as html_module
-            text = html_module.unescape(text)
-            
-            # Entferne übermäßige Leerzeilen (max 2)
-            text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-            text = text.strip()
-            
-            # Bereinige Markdown-Link-Artefakte von inscriptis
-            text = re.sub(r'\[\s*([^\]]+)\s*\]\([^)]+\)', r'\1', text)  # [text](url) → text
-            text = re.sub(r'\s+\|\s+', ' | ', text)  # Normalisiere | Trennzeichen
-            
-            logger.info(f"✅ HTML→Plain Text (inscriptis): {len(html)} chars → {len(text)} chars")
-            return ("inscriptis", text)
-            
-        except ImportError:
-            logger.warning("⚠️ inscriptis nicht verfügbar, versuche html2text...")
-        except Exception as e:
-            logger.warning(f"⚠️ inscriptis fehlgeschlagen: {e}, versuche html2text...")
-        
-        # Methode 2: html2text (Fallback)
-        try:
-            import html2text
-            
-            h = html2text.HTML2Text()
-            h.ignore_links = False
-            h.ignore_images = True
-            h.ignore_emphasis = True
-            h.body_width = 0  # Keine Zeilenumbrüche erzwingen
-            h.unicode_snob = True
-            h.skip_internal_links = True
-            
-            text = h.handle(html)
-            
-            # Bereinige Markdown-Artefakte
-            text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)  # **bold** → bold
-            text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)  # [text](url) → text
-            text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-            text = text.strip()
-            
-            logger.info(f"✅ HTML→Plain Text (html2text): {len(html)} chars → {len(text)} chars")
-            return ("html2text", text)
-            
-        except ImportError:
-            logger.warning("⚠️ html2text nicht verfügbar, versuche BeautifulSoup...")
-        except Exception as e:
-            logger.warning(f"⚠️ html2text fehlgeschlagen: {e}, versuche BeautifulSoup...")
-        
-        # Methode 3: BeautifulSoup (Fallback)
-        try:
-            from bs4 import BeautifulSoup
-            
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # Entferne Script und Style Tags
-            for tag in soup.find_all(['script', 'style', 'head', 'meta', 'link']):
-                tag.decompose()
-            
-            # Ersetze <br> mit Zeilenumbrüchen
-            for br in soup.find_all('br'):
-                br.replace_with('\n')
-            
-            # Füge Zeilenumbrüche nach Block-Elementen ein
-            for tag in soup.find_all(['p', 'div', 'tr', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                tag.append('\n')
-            
-            text = soup.get_text()
-            
-            import html as html_module
-            text = html_module.unescape(text)
-            text = re.sub(r'[^\S\n]+', ' ', text)
-            text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-            lines = [line.strip() for line in text.split('\n')]
-            text = '\n'.join(lines)
-            text = text.strip()
-            
-            logger.info(f"✅ HTML→Plain Text (BeautifulSoup): {len(html)} chars → {len(text)} chars")
-            return ("BeautifulSoup", text)
-            
-        except ImportError:
-            logger.warning("⚠️ BeautifulSoup nicht verfügbar, Fallback auf Regex")
-        except Exception as e:
-            logger.warning(f"⚠️ BeautifulSoup fehlgeschlagen: {e}, Fallback auf Regex")
-        
-        # Methode 4: Regex (letzter Fallback)
-        text = self._clean_html_fallback(html)
-        logger.info(f"✅ HTML→Plain Text (regex-fallback): {len(html)} chars → {len(text)} chars")
-        return ("regex-fallback", text)
+        return html_to_plain_text(html)
     
     def _clean_html_fallback(self, text: str) -> str:
-        """Fallback: Bereinigt HTML-Tags und Entities via Regex (wenn BeautifulSoup nicht verfügbar)."""
-        if not text:
-            return text
-        # HTML-Tags entfernen (mit Zeilenumbruch für Block-Tags)
-        text = re.sub(r'<br\s*/?>', '\n', text, flags=re.IGNORECASE)
-        text = re.sub(r'</p>', '\n', text, flags=re.IGNORECASE)
-        text = re.sub(r'</div>', '\n', text, flags=re.IGNORECASE)
-        text = re.sub(r'</tr>', '\n', text, flags=re.IGNORECASE)
-        text = re.sub(r'<[^>]+>', '', text)
-        # HTML-Entities
-        text = re.sub(r'&nbsp;', ' ', text)
-        text = re.sub(r'&amp;', '&', text)
-        text = re.sub(r'&lt;', '<', text)
-        text = re.sub(r'&gt;', '>', text)
-        text = re.sub(r'&#43;', '+', text)
-        text = re.sub(r'&#8211;', '–', text)
-        text = re.sub(r'&#8230;', '…', text)
-        text = re.sub(r'&#\d+;', '', text)
-        text = re.sub(r'&\w+;', '', text)
-        # Outlook XML
-        text = re.sub(r'<o:[^>]*>', '', text)
-        text = re.sub(r'</o:[^>]*>', '', text)
-        # Bereinige Whitespace
-        text = re.sub(r'[^\S\n]+', ' ', text)
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-        lines = [line.strip() for line in text.split('\n')]
-        text = '\n'.join(lines)
-        return text.strip()
+        """Fallback: Bereinigt HTML-Tags und Entities via Regex."""
+        return clean_html_fallback(text)
     
     def sanitize(self, subject: str, body: str, level: int = 3, existing_map: Optional[EntityMap] = None, session_id: Optional[str] = None) -> SanitizationResult:
         """Standard-Anonymisierung ohne Rollen-Ersetzung."""
@@ -862,7 +719,7 @@ class ContentSanitizer:
             def overlaps(s, e):
                 return any(not (e <= ps or s >= pe) for ps, pe in protected)
             
-            doc = nlp(text)
+            doc = spacy_context.parse(text, nlp)
             counts = {}
             ents = []
             
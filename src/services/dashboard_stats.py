@@ -0,0 +1,114 @@
+"""
+Dashboard Stats Service - Prioritäten-Matrix per SQL-Aggregation
+
+Das Dashboard (Landing Page) braucht nur Zählwerte: offene Mails pro
+Matrix-Zelle, pro Ampelfarbe und die Anzahl erledigter Mails. Statt alle
+ProcessedEmail-Zeilen zu laden und in Python zu zählen, liefert EINE
+GROUP BY-Abfrage max. 2 × 9 × Farben Zeilen - unabhängig von der Mailbox-Größe
+werden keine ORM-Objekte mehr materialisiert.
+
+Usage:
+    from src.services.dashboard_stats import DashboardStatsService
+
+    stats = DashboardStatsService.get_matrix_stats(db, user.id, account_id)
+    stats["matrix"]["33"], stats["amp_colors"]["rot"], stats["stats"]["done"]
+"""
+
+import importlib
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+models = importlib.import_module(".02_models", "src")
+
+logger = logging.getLogger(__name__)
+
+AMP_COLORS = ("rot", "gelb", "grün")
+
+
+def build_matrix_stats(rows: Iterable[Tuple[Any, Any, Any, Any, int]]) -> Dict[str, Any]:
+    """Baut die Dashboard-Werte aus aggregierten Zeilen
+
+    Args:
+        rows: (done, matrix_x, matrix_y, farbe, count)
+
+    Returns:
+        {
+            "matrix": {"11": n, ..., "33": n},   # nur offene Mails
+            "amp_colors": {"rot": n, "gelb": n, "grün": n},
+            "high_priority_count": n,
+            "stats": {"total": n, "open": n, "done": n},
+        }
+    """
+    matrix = {f"{x}{y}": 0 for x in range(1, 4) for y in range(1, 4)}
+    amp_colors = dict.fromkeys(AMP_COLORS, 0)
+    open_count = 0
+    done_count = 0
+
+    for done, matrix_x, matrix_y, farbe, count in rows:
+        if done:
+            done_count += count
+            continue
+
+        open_count += count
+        key = f"{matrix_x}{matrix_y}"
+        if key in matrix:
+            matrix[key] += count
+        if farbe in amp_colors:
+            amp_colors[farbe] += count
+
+    return {
+        "matrix": matrix,
+        "amp_colors": amp_colors,
+        "high_priority_count": amp_colors["rot"],
+        "stats": {
+            "total": open_count + done_count,
+            "open": open_count,
+            "done": done_count,
+        },
+    }
+
+
+class DashboardStatsService:
+    """Aggregierte Zählwerte für die 3x3-Prioritäten-Matrix"""
+
+    @staticmethod
+    def get_matrix_stats(
+        session: Session, user_id: int, account_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Offene Mails pro Zelle/Farbe + erledigte Mails in einer Abfrage
+
+        Args:
+            session: SQLAlchemy Session
+            user_id: User ID
+            account_id: Optional - nur dieser Mail-Account
+
+        Returns:
+            Siehe build_matrix_stats()
+        """
+        Processed = models.ProcessedEmail
+        Raw = models.RawEmail
+
+        query = (
+            session.query(
+                Processed.done,
+                Processed.matrix_x,
+                Processed.matrix_y,
+                Processed.farbe,
+                func.count(Processed.id),
+            )
+            .join(Raw, Processed.raw_email_id == Raw.id)
+            .filter(
+                Raw.user_id == user_id,
+                Raw.deleted_at.is_(None),
+                Processed.deleted_at.is_(None),
+                Processed.done.isnot(None),
+            )
+        )
+        if account_id:
+            query = query.filter(Raw.mail_account_id == account_id)
+
+        rows = query.group_by(Processed.done, Processed.matrix_x, Processed.matrix_y, Processed.farbe).all()
+        return build_matrix_stats(rows)
@@ -0,0 +1,311 @@
+"""
+Embedding Cache - Content-Hash Cache für Email-Embeddings
+
+Newsletter, Benachrichtigungen und Duplikate (gleiche Message-ID in INBOX
+und Archiv, mehrere Accounts) liefern wortgleichen Text - jeder Embedding-Call
+kostet auf Ollama 50-300 ms. Der Cache speichert fertige (normalisierte)
+Embeddings unter (model, HMAC(Cache-Key, model|normalisierter Text)) und wird
+vor dem Embedding-Backend gefragt.
+
+Zero-Knowledge: Der Cache-Key wird aus dem Master-Key des Users abgeleitet
+(derive_cache_key) - ohne ihn lässt sich kein geratener Mailtext bestätigen,
+und gleiche Inhalte verschiedener User ergeben verschiedene Keys (Treffer nur
+innerhalb eines Users, z.B. INBOX/Archiv oder mehrere Accounts).
+
+Speicher: lokale SQLite-Datei (stdlib sqlite3, WAL) - prozess- und
+threadübergreifend nutzbar (Web, Celery-Worker, Pipeline-Threads), ohne
+DB-Session des Aufrufers.
+
+Eviction:
+- TTL: Einträge, die EMBEDDING_CACHE_TTL_DAYS nicht genutzt wurden
+- Größe: über EMBEDDING_CACHE_MAX_ENTRIES fliegen die am längsten
+  ungenutzten Einträge (LRU über last_used_at)
+
+Layout:
+    {EMBEDDING_CACHE_PATH}  (Default: data/embedding_cache/embeddings.sqlite3)
+
+Usage:
+    from src.services.embedding_cache import EmbeddingCache, derive_cache_key
+
+    key = derive_cache_key(master_key)
+    cached = EmbeddingCache.get(key, model, text)
+    if cached is None:
+        cached = ...  # Backend
+        EmbeddingCache.put(key, model, text, cached)
+"""
+
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+# 🚀 PERFORMANCE: Konfiguration über Umgebungsvariablen
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+EMBEDDING_CACHE_TTL_SECONDS = int(float(os.getenv("EMBEDDING_CACHE_TTL_DAYS", "30")) * 86400)
+
+_KEY_CONTEXT = b"ki-mail-helper/embedding-cache/v1"
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def get_cache_path() -> Path:
+    """Pfad der Cache-Datei (EMBEDDING_CACHE_PATH)
+
+    Returns:
+        Path: data/embedding_cache/embeddings.sqlite3 im Projekt-Root (Default, außerhalb von src/)
+    """
+    configured = os.getenv("EMBEDDING_CACHE_PATH")
+    if configured:
+        return Path(configured)
+    return Path(__file__).resolve().parents[2] / "data" / "embedding_cache" / "embeddings.sqlite3"
+
+
+def derive_cache_key(master_key: str) -> bytes:
+    """Leitet den Cache-Key aus dem Master-Key (DEK) ab - getrennt vom Verschlüsselungs-Key"""
+    return hmac.new(base64.b64decode(master_key), _KEY_CONTEXT, hashlib.sha256).digest()
+
+
+def normalize_text(text: str) -> str:
+    """Normalisiert Text für den Cache-Key (Unicode NFKC, Whitespace zusammengefasst)
+
+    Mails, die sich nur in Zeilenumbrüchen/Einrückung unterscheiden, teilen sich
+    damit ein Embedding.
+    """
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text or "")).strip()
+
+
+def content_hash(key: bytes, model: str, text: str) -> str:
+    """HMAC-SHA256 (hex) über Model + normalisierten Text mit dem Cache-Key des Users"""
+    payload = f"{model}|{normalize_text(text)}"
+    return hmac.new(key, payload.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistenter (model, HMAC-Key) → Embedding-Bytes Cache
+
+    Alle Methoden sind fehlertolerant: Jeder SQLite-Fehler wird als Miss
+    behandelt, die Embedding-Generierung läuft dann normal weiter.
+    """
+
+    # Nach so vielen Schreibvorgängen (pro Prozess) läuft prune()
+    PRUNE_INTERVAL = 500
+    # Beim Überschreiten von max_entries wird auf diesen Anteil gekürzt
+    PRUNE_TARGET_RATIO = 0.9
+
+    _lock = threading.RLock()
+    _conn: Optional[sqlite3.Connection] = None
+    _conn_pid: Optional[int] = None
+    _conn_path: Optional[Path] = None
+    _writes_since_prune = 0
+    _stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+
+    @classmethod
+    def _connection(cls) -> sqlite3.Connection:
+        """Verbindung pro Prozess (neu nach fork, z.B. Celery prefork)"""
+        path = get_cache_path()
+        if cls._conn is not None and cls._conn_pid == os.getpid() and cls._conn_path == path:
+            return cls._conn
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS keyed_embeddings (
+                model TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hit_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (model, content_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_keyed_embeddings_last_used ON keyed_embeddings (last_used_at)"
+        )
+        cls._conn, cls._conn_pid, cls._conn_path = conn, os.getpid(), path
+        return conn
+
+    @classmethod
+    def get(cls, key: bytes, model: str, text: str) -> Optional[bytes]:
+        """Embedding-Bytes für (model, text) oder None"""
+        return cls.get_many(key, model, [text]).get(content_hash(key, model, text))
+
+    @classmethod
+    def get_many(cls, key: bytes, model: str, texts: Iterable[str]) -> Dict[str, bytes]:
+        """Treffer für mehrere Texte
+
+        Args:
+            key: Cache-Key des Users (derive_cache_key)
+
+        Returns:
+            Dict content_hash → Embedding-Bytes (nur Treffer)
+        """
+        if not EMBEDDING_CACHE_ENABLED or not model or not key:
+            return {}
+        hashes = list(dict.fromkeys(content_hash(key, model, text) for text in texts))
+        if not hashes:
+            return {}
+
+        now = time.time()
+        found: Dict[str, bytes] = {}
+        with cls._lock:
+            try:
+                conn = cls._connection()
+                # SQLite: max. 999 Parameter pro Statement
+                for start in range(0, len(hashes), 500):
+                    chunk = hashes[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT content_hash, embedding FROM keyed_embeddings "
+                        f"WHERE model = ? AND last_used_at >= ? AND content_hash IN ({placeholders})",
+                        [model, now - EMBEDDING_CACHE_TTL_SECONDS, *chunk],
+                    ).fetchall()
+                    found.update(rows)
+                    hit_hashes = [row[0] for row in rows]
+                    if hit_hashes:
+                        conn.execute(
+                            f"UPDATE keyed_embeddings SET last_used_at = ?, hit_count = hit_count + 1 "
+                            f"WHERE model = ? AND content_hash IN ({','.join('?' * len(hit_hashes))})",
+                            [now, model, *hit_hashes],
+                        )
+            except sqlite3.Error as e:
+                cls._stats["errors"] += 1
+                logger.warning(f"⚠️  Embedding-Cache Lesefehler: {e}")
+                return {}
+
+            cls._stats["hits"] += len(found)
+            cls._stats["misses"] += len(hashes) - len(found)
+        return {key: bytes(value) for key, value in found.items()}
+
+    @classmethod
+    def put(cls, key: bytes, model: str, text: str, embedding: bytes) -> None:
+        """Speichert ein Embedding"""
+        cls.put_many(key, model, [(text, embedding)])
+
+    @classmethod
+    def put_many(cls, key: bytes, model: str, items: List[tuple]) -> None:
+        """Speichert mehrere (text, embedding_bytes) Paare"""
+        if not EMBEDDING_CACHE_ENABLED or not model or not key:
+            return
+        rows = [
+            (model, content_hash(key, model, text), embedding)
+            for text, embedding in items if embedding
+        ]
+        if not rows:
+            return
+
+        now = time.time()
+        with cls._lock:
+            try:
+                conn = cls._connection()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO keyed_embeddings "
+                    "(model, content_hash, embedding, created_at, last_used_at, hit_count) "
+                    "VALUES (?, ?, ?, ?, ?, 0)",
+                    [(m, h, sqlite3.Binary(e), now, now) for m, h, e in rows],
+                )
+            except sqlite3.Error as e:
+                cls._stats["errors"] += 1
+                logger.warning(f"⚠️  Embedding-Cache Schreibfehler: {e}")
+                return
+
+            cls._stats["writes"] += len(rows)
+            cls._writes_since_prune += len(rows)
+            if cls._writes_since_prune >= cls.PRUNE_INTERVAL:
+                cls.prune()
+
+    @classmethod
+    def prune(cls, max_entries: Optional[int] = None) -> int:
+        """Eviction: abgelaufene Einträge + LRU über max_entries
+
+        Returns:
+            Anzahl entfernter Einträge
+        """
+        max_entries = EMBEDDING_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        removed = 0
+        with cls._lock:
+            cls._writes_since_prune = 0
+            try:
+                conn = cls._connection()
+                removed += conn.execute(
+                    "DELETE FROM keyed_embeddings WHERE last_used_at < ?",
+                    (time.time() - EMBEDDING_CACHE_TTL_SECONDS,),
+                ).rowcount
+
+                count = conn.execute("SELECT COUNT(*) FROM keyed_embeddings").fetchone()[0]
+                if count > max_entries:
+                    excess = count - int(max_entries * cls.PRUNE_TARGET_RATIO)
+                    removed += conn.execute(
+                        "DELETE FROM keyed_embeddings WHERE (model, content_hash) IN ("
+                        "SELECT model, content_hash FROM keyed_embeddings ORDER BY last_used_at LIMIT ?)",
+                        (excess,),
+                    ).rowcount
+            except sqlite3.Error as e:
+                cls._stats["errors"] += 1
+                logger.warning(f"⚠️  Embedding-Cache Prune fehlgeschlagen: {e}")
+                return removed
+
+            cls._stats["evictions"] += removed
+        if removed:
+            logger.info(f"🧹 Embedding-Cache: {removed} Einträge entfernt")
+        return removed
+
+    @classmethod
+    def clear(cls, model: Optional[str] = None) -> int:
+        """Löscht alle Einträge (optional nur für ein Model, z.B. nach Model-Wechsel)"""
+        with cls._lock:
+            try:
+                conn = cls._connection()
+                if model:
+                    return conn.execute("DELETE FROM keyed_embeddings WHERE model = ?", (model,)).rowcount
+                return conn.execute("DELETE FROM keyed_embeddings").rowcount
+            except sqlite3.Error as e:
+                cls._stats["errors"] += 1
+                logger.warning(f"⚠️  Embedding-Cache Clear fehlgeschlagen: {e}")
+                return 0
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """Hit-Rate (pro Prozess) und Belegung der Cache-Datei"""
+        with cls._lock:
+            stats: Dict[str, Any] = dict(cls._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+            stats["enabled"] = EMBEDDING_CACHE_ENABLED
+            stats["max_entries"] = EMBEDDING_CACHE_MAX_ENTRIES
+            stats["ttl_seconds"] = EMBEDDING_CACHE_TTL_SECONDS
+            if not EMBEDDING_CACHE_ENABLED:
+                return stats
+            try:
+                conn = cls._connection()
+                entries, stored_hits = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(hit_count), 0) FROM keyed_embeddings"
+                ).fetchone()
+                stats["entries"] = entries
+                stats["stored_hits"] = stored_hits
+                stats["models"] = dict(conn.execute(
+                    "SELECT model, COUNT(*) FROM keyed_embeddings GROUP BY model"
+                ).fetchall())
+                stats["file_bytes"] = get_cache_path().stat().st_size
+            except (sqlite3.Error, OSError) as e:
+                logger.debug(f"Embedding-Cache Stats unvollständig: {e}")
+        return stats
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        with cls._lock:
+            cls._stats = dict.fromkeys(cls._stats, 0)
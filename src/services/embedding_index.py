@@ -0,0 +1,455 @@
+"""
+Embedding Index Service - Vektorisierte Semantic Search
+
+Hält pro (User, Embedding-Model) eine zusammenhängende float32-Matrix mit
+vor-normalisierten Zeilen + parallelem ID-Array.
+Eine Suche ist damit ein einziges Matrix-Vektor-Produkt + argpartition Top-K
+statt ORM-Scan über alle RawEmails (inkl. verschlüsselter Bodies).
+
+Ordner/Account stehen bewusst NICHT im Index: ein MOVE ändert weder COUNT
+noch embedding_generated_at und bliebe in anderen Prozessen unbemerkt.
+Gefiltert wird in SQL (SemanticSearchService._ranked_hits, Over-Fetch).
+
+Synchronisation mit der DB (Web-Prozess und Celery-Worker schreiben getrennt):
+- Fingerprint (COUNT, MAX(embedding_generated_at)) wird geprüft
+- Neue/geänderte Embeddings → inkrementelles Nachladen (nur Delta)
+- Count passt danach nicht (Deletes) → Abgleich der ID-Menge (ohne Blobs)
+- Ab EMBEDDING_ANN_MIN_VECTORS: persistierter IVF-Index (services/ann_index.py),
+  den neu gestartete Worker per mmap öffnen statt alle Blobs zu laden
+- Im gleichen Prozess: notify_embedding()/notify_deleted() halten den Index
+  ohne DB-Roundtrip aktuell
+
+Usage:
+    from src.services.embedding_index import EmbeddingIndexCache
+
+    index = EmbeddingIndexCache.get_index(db, user_id, "all-minilm:22m")
+    hits = index.query(query_vector, k=20, threshold=0.25)  # [(email_id, score)]
+"""
+
+import logging
+import os
+import threading
+import time
+import importlib
+import weakref
+from datetime import datetime
+from typing import Optional, List, Tuple, Iterable, Dict, Any
+
+import numpy as np
+from cachetools import TTLCache
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+models = importlib.import_module(".02_models", "src")
+
+logger = logging.getLogger(__name__)
+
+# Speicher-Budget aller Indizes im Prozess-Cache (Heap-Bytes, mmap zählt nicht)
+INDEX_CACHE_MAX_MB = float(os.getenv("EMBEDDING_INDEX_CACHE_MB", "512"))
+# Indizes die länger nicht benutzt wurden verfallen (inaktive User)
+INDEX_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_INDEX_CACHE_TTL", "3600"))
+
+
+class EmbeddingIndex:
+    """In-Memory Embedding-Matrix eines Users für ein Embedding-Model"""
+
+    def __init__(self, user_id: int, model: str, dim: Optional[int] = None):
+        self.user_id = user_id
+        self.model = model
+        self.dim = dim
+        self.matrix = np.empty((0, dim or 0), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self._row_by_id: Dict[int, int] = {}
+        # Sync-Status gegenüber der DB
+        self.watermark: Optional[datetime] = None
+        self.last_checked: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return int(self.ids.shape[0])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.matrix.nbytes)
+
+    @staticmethod
+    def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        """L2-Normalisierung pro Zeile (Null-Zeilen bleiben 0)"""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32, copy=False)
+
+    def upsert(self, rows: Iterable[Tuple[int, bytes]]) -> int:
+        """Fügt Embeddings hinzu bzw. überschreibt vorhandene Zeilen
+
+        Args:
+            rows: Iterable von (email_id, embedding_bytes)
+
+        Returns:
+            Anzahl übernommener Zeilen (falsche Dimension wird übersprungen)
+        """
+        # Neue Zeilen nach ID (doppelte IDs im Batch: letzte gewinnt)
+        pending: Dict[int, np.ndarray] = {}
+        updated = 0
+        skipped = 0
+
+        for email_id, embedding_bytes in rows:
+            if not embedding_bytes:
+                continue
+            vector = np.frombuffer(embedding_bytes, dtype=np.float32)
+            if self.dim is None:
+                self.dim = int(vector.shape[0])
+                self.matrix = np.empty((0, self.dim), dtype=np.float32)
+            if vector.shape[0] != self.dim:
+                skipped += 1
+                continue
+
+            row = self._row_by_id.get(email_id)
+            if row is not None:
+                self.matrix[row] = self.normalize_rows(vector[np.newaxis, :])[0]
+                updated += 1
+            else:
+                pending[email_id] = vector
+
+        if skipped:
+            logger.warning(
+                f"⚠️  EmbeddingIndex User {self.user_id}: {skipped} Embeddings mit "
+                f"falscher Dimension übersprungen (erwartet {self.dim})"
+            )
+
+        new_ids = list(pending)
+        if new_ids:
+            start = self.size
+            block = self.normalize_rows(np.vstack(list(pending.values())))
+            # Neue Arrays zuweisen (laufende Queries sehen konsistenten Stand)
+            self.matrix = np.vstack([self.matrix, block])
+            self.ids = np.concatenate([self.ids, np.asarray(new_ids, dtype=np.int64)])
+            for offset, email_id in enumerate(new_ids):
+                self._row_by_id[email_id] = start + offset
+
+        return updated + len(new_ids)
+
+    def remove(self, email_ids: Iterable[int]) -> int:
+        """Entfernt Embeddings (z.B. nach Soft-Delete)"""
+        rows = [self._row_by_id[i] for i in email_ids if i in self._row_by_id]
+        if not rows:
+            return 0
+
+        keep = np.ones(self.size, dtype=bool)
+        keep[rows] = False
+        self.matrix = self.matrix[keep]
+        self.ids = self.ids[keep]
+        self._row_by_id = {int(email_id): row for row, email_id in enumerate(self.ids)}
+        return len(rows)
+
+    def contains(self, email_id: int) -> bool:
+        return email_id in self._row_by_id
+
+    def all_ids(self) -> set:
+        return set(self._row_by_id)
+
+    def get_vector(self, email_id: int) -> Optional[np.ndarray]:
+        row = self._row_by_id.get(email_id)
+        return None if row is None else self.matrix[row]
+
+    def query(
+        self,
+        vector: np.ndarray,
+        k: int,
+        threshold: float = 0.0,
+        exclude_ids: Optional[Iterable[int]] = None,
+        exhaustive: bool = False,
+    ) -> List[Tuple[int, float]]:
+        """Top-K Cosine Similarity (ein Matrix-Vektor-Produkt)
+
+        Args:
+            vector: Query-Vektor (wird normalisiert)
+            k: Maximale Anzahl Treffer
+            threshold: Minimale Similarity
+            exclude_ids: Optional - Email-IDs die nicht zurückkommen sollen
+            exhaustive: Ohne Wirkung (immer exakt), Interface wie IVFIndex
+
+        Returns:
+            Liste (email_id, similarity), absteigend sortiert
+        """
+        if self.size == 0 or k <= 0:
+            return []
+
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape[0] != self.dim:
+            logger.error(
+                f"❌ Dimension mismatch: query={vector.shape[0]}, index={self.dim}. "
+                f"Semantic Search funktioniert nicht zwischen unterschiedlichen Embedding-Models!"
+            )
+            return []
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return []
+
+        scores = self.matrix @ (vector / norm)
+
+        valid = scores >= threshold
+        if exclude_ids:
+            for email_id in exclude_ids:
+                row = self._row_by_id.get(email_id)
+                if row is not None:
+                    valid[row] = False
+
+        candidates = np.flatnonzero(valid)
+        if candidates.size == 0:
+            return []
+
+        if candidates.size > k:
+            top = np.argpartition(scores[candidates], -k)[-k:]
+            candidates = candidates[top]
+        order = candidates[np.argsort(scores[candidates])[::-1]]
+
+        return [(int(self.ids[row]), float(scores[row])) for row in order]
+
+
+class EmbeddingIndexCache:
+    """Prozessweiter Cache der Embedding-Indizes
+
+    {(user_id, model): EmbeddingIndex | IVFIndex}
+
+    Begrenzt per LRU + TTL auf INDEX_CACHE_MAX_MB Heap-Bytes, damit
+    langlebige Worker nicht mit jedem User wachsen. Verdrängte Indizes
+    werden beim nächsten Zugriff neu geladen (ANN-Index per mmap).
+    """
+
+    # {(user_id, model): EmbeddingIndex}
+    _indexes = TTLCache(
+        maxsize=int(INDEX_CACHE_MAX_MB * 1024 * 1024), ttl=INDEX_CACHE_TTL_SECONDS,
+        getsizeof=lambda index: max(index.nbytes, 1),
+    )
+    # _lock schützt nur die Dicts; Sync/Build/Save eines Index laufen unter
+    # dessen Key-Lock, damit der Rebuild eines Users keine anderen Suchen blockiert
+    _lock = threading.RLock()
+    # {(user_id, model): threading.Lock} - schwach referenziert: ein Lock lebt
+    # nur solange ein Aufrufer ihn hält, das Dict wächst nicht mit jedem User
+    _key_locks = weakref.WeakValueDictionary()
+
+    # Fingerprint-Check höchstens alle N Sekunden (Ergebnisse werden beim
+    # Laden der Zeilen ohnehin gegen deleted_at/Filter verifiziert)
+    REFRESH_INTERVAL_SECONDS = 5.0
+    BUILD_BATCH_SIZE = 2000
+    # Ab dieser Größe: persistierter IVF-Index (services/ann_index.py), 0 = aus
+    ANN_MIN_VECTORS = int(os.getenv("EMBEDDING_ANN_MIN_VECTORS", "5000"))
+
+    @classmethod
+    def _base_query(cls, db: Session, user_id: int, model: str, *columns):
+        return db.query(*columns).filter(
+            models.RawEmail.user_id == user_id,
+            models.RawEmail.deleted_at.is_(None),
+            models.RawEmail.email_embedding.isnot(None),
+            models.RawEmail.embedding_model == model,
+        )
+
+    @classmethod
+    def _row_columns(cls):
+        return (
+            models.RawEmail.id,
+            models.RawEmail.email_embedding,
+        )
+
+    @classmethod
+    def _fingerprint(cls, db: Session, user_id: int, model: str) -> Tuple[int, Optional[datetime]]:
+        count, max_generated = cls._base_query(
+            db, user_id, model,
+            func.count(models.RawEmail.id),
+            func.max(models.RawEmail.embedding_generated_at),
+        ).one()
+        return int(count or 0), max_generated
+
+    @classmethod
+    def _build(cls, db: Session, user_id: int, model: str):
+        started = time.perf_counter()
+        count, max_generated = cls._fingerprint(db, user_id, model)
+
+        index = EmbeddingIndex(user_id, model)
+        rows = cls._base_query(db, user_id, model, *cls._row_columns()).yield_per(
+            cls.BUILD_BATCH_SIZE
+        )
+        index.upsert(rows)
+        index.watermark = max_generated
+        index.last_checked = time.monotonic()
+
+        logger.info(
+            f"🧮 EmbeddingIndex User {user_id} ({model}): {index.size}/{count} Embeddings, "
+            f"dim={index.dim}, {index.nbytes / 1024 / 1024:.1f} MB "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        return cls._maybe_persist(index)
+
+    @classmethod
+    def _maybe_persist(cls, index):
+        """Ab ANN_MIN_VECTORS: IVF-Index bauen/kompaktieren und auf Disk schreiben"""
+        if cls.ANN_MIN_VECTORS <= 0:
+            return index
+
+        from src.services.ann_index import IVFIndex
+
+        try:
+            if isinstance(index, IVFIndex):
+                if index.needs_compaction():
+                    index = index.compact()
+            elif index.size >= cls.ANN_MIN_VECTORS:
+                index = IVFIndex.from_embedding_index(index)
+            else:
+                return index
+
+            if index.dirty:
+                path = index.save()
+                logger.info(
+                    f"💾 ANN-Index User {index.user_id} ({index.model}): {index.size} Embeddings, "
+                    f"{index.centroids.shape[0]} Listen → {path}"
+                )
+        except Exception as e:
+            logger.warning(f"⚠️  ANN-Index für User {index.user_id} nicht persistiert: {e}")
+        return index
+
+    @classmethod
+    def _reconcile(cls, db: Session, index) -> None:
+        """Gleicht die ID-Menge ab (nur IDs, keine Blobs): Deletes + fehlende Zeilen"""
+        db_ids = {
+            email_id for (email_id,) in
+            cls._base_query(db, index.user_id, index.model, models.RawEmail.id)
+        }
+        index_ids = index.all_ids()
+
+        removed = index.remove(index_ids - db_ids)
+        missing = list(db_ids - index_ids)
+        loaded = 0
+        for start in range(0, len(missing), cls.BUILD_BATCH_SIZE):
+            chunk = missing[start:start + cls.BUILD_BATCH_SIZE]
+            loaded += index.upsert(
+                cls._base_query(db, index.user_id, index.model, *cls._row_columns())
+                .filter(models.RawEmail.id.in_(chunk))
+            )
+
+        logger.debug(
+            f"🧮 EmbeddingIndex User {index.user_id}: Reconcile "
+            f"-{removed} gelöscht, +{loaded} nachgeladen"
+        )
+
+    @classmethod
+    def _sync(cls, db: Session, index):
+        """Gleicht den Index mit der DB ab (Delta + ID-Reconcile)"""
+        count, max_generated = cls._fingerprint(db, index.user_id, index.model)
+
+        if max_generated is not None and (
+            index.watermark is None or max_generated > index.watermark
+        ):
+            delta_query = cls._base_query(db, index.user_id, index.model, *cls._row_columns())
+            if index.watermark is not None:
+                delta_query = delta_query.filter(
+                    models.RawEmail.embedding_generated_at > index.watermark
+                )
+            applied = index.upsert(delta_query.yield_per(cls.BUILD_BATCH_SIZE))
+            index.watermark = max_generated
+            logger.debug(f"🧮 EmbeddingIndex User {index.user_id}: {applied} Embeddings nachgeladen")
+
+        if index.size != count:
+            # Deletes oder Embeddings ohne Timestamp
+            cls._reconcile(db, index)
+
+        index.last_checked = time.monotonic()
+        return cls._maybe_persist(index)
+
+    @classmethod
+    def _key_lock(cls, key: Tuple[int, str]) -> threading.Lock:
+        with cls._lock:
+            return cls._key_locks.setdefault(key, threading.Lock())
+
+    @classmethod
+    def get_index(cls, db: Session, user_id: int, model: str):
+        """Liefert einen (mit der DB abgeglichenen) Index für User + Model
+
+        Reihenfolge: Prozess-Cache → persistierter ANN-Index (mmap) → Neuaufbau
+        """
+        key = (user_id, model)
+        with cls._key_lock(key):
+            with cls._lock:
+                index = cls._indexes.get(key)
+            if index is None and cls.ANN_MIN_VECTORS > 0:
+                from src.services.ann_index import IVFIndex
+                index = IVFIndex.load(user_id, model)
+                if index is not None:
+                    logger.info(
+                        f"📂 ANN-Index User {user_id} ({model}) geöffnet: {index.size} Embeddings (mmap)"
+                    )
+                    index = cls._sync(db, index)
+            if index is None:
+                index = cls._build(db, user_id, model)
+            elif time.monotonic() - index.last_checked >= cls.REFRESH_INTERVAL_SECONDS:
+                index = cls._sync(db, index)
+            cls._store(key, index)
+            return index
+
+    @classmethod
+    def _store(cls, key: Tuple[int, str], index) -> None:
+        """Legt den Index in den Cache (Größe wird bei jedem Zugriff neu bewertet)"""
+        with cls._lock:
+            try:
+                cls._indexes[key] = index
+            except ValueError:
+                # Größer als das ganze Budget → nicht cachen
+                cls._indexes.pop(key, None)
+                logger.warning(
+                    f"⚠️  EmbeddingIndex User {key[0]} ({key[1]}) mit "
+                    f"{index.nbytes / 1024 / 1024:.1f} MB übersteigt EMBEDDING_INDEX_CACHE_MB"
+                )
+
+    @classmethod
+    def _user_indexes(cls, user_id: int) -> List[Tuple[Tuple[int, str], Any]]:
+        with cls._lock:
+            return [(key, index) for key, index in cls._indexes.items() if key[0] == user_id]
+
+    @classmethod
+    def notify_embedding(
+        cls,
+        user_id: int,
+        email_id: int,
+        embedding_bytes: bytes,
+        model: str,
+    ) -> None:
+        """Hook nach dem Schreiben eines Embeddings (nur wenn Index geladen)"""
+        if not embedding_bytes or email_id is None:
+            return
+        for key, index in cls._user_indexes(user_id):
+            with cls._key_lock(key):
+                if key[1] == model:
+                    index.upsert([(email_id, embedding_bytes)])
+                elif index.contains(email_id):
+                    # Model-Wechsel für diese Email → aus altem Index entfernen
+                    index.remove([email_id])
+
+    @classmethod
+    def notify_deleted(cls, user_id: int, email_ids: Iterable[int]) -> None:
+        """Hook nach (Soft-)Delete von Emails"""
+        email_ids = list(email_ids)
+        if not email_ids:
+            return
+        for key, index in cls._user_indexes(user_id):
+            with cls._key_lock(key):
+                index.remove(email_ids)
+
+    @classmethod
+    def invalidate(cls, user_id: Optional[int] = None) -> None:
+        """Verwirft Indizes (eines Users oder alle)"""
+        with cls._lock:
+            if user_id is None:
+                cls._indexes.clear()
+            else:
+                for key in [k for k in cls._indexes if k[0] == user_id]:
+                    del cls._indexes[key]
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """Anzahl Indizes/Embeddings und Heap-Bytes (mmap nicht mitgezählt)"""
+        with cls._lock:
+            return {
+                "indexes": len(cls._indexes),
+                "embeddings": sum(i.size for i in cls._indexes.values()),
+                "bytes": sum(i.nbytes for i in cls._indexes.values()),
+            }
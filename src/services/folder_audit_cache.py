@@ -0,0 +1,224 @@
+"""
+Folder Audit Cache - persistierte Audit-Ergebnisse pro (Account, Ordner, UIDVALIDITY, UID)
+
+Der Folder-Audit hat bei jedem Öffnen bis zu 5000 Header (inkl. Power-Header)
+in 200er-Batches mit 100ms Pause neu geholt und analyze_email() (Homoglyphen,
+Typosquatting, Scam-Score) für jede Mail erneut ausgeführt.
+
+Jetzt wird pro UID gespeichert (verschlüsselt mit dem Master-Key, da Betreff
+und Absender enthalten sind):
+- features: die aus IMAP geparsten Header-Daten (Eingabe von analyze_email)
+- result: Kategorie, Confidence, Reasons (Ausgabe von analyze_email)
+- config_fingerprint: Hash der Audit-Config + Trusted Senders zum Zeitpunkt
+  der Analyse (AuditConfigCache.get_fingerprint)
+
+Beim erneuten Audit:
+- Neue UIDs → IMAP-Fetch + Analyse
+- Gleicher Fingerprint, jünger als AUDIT_CACHE_MAX_AGE_HOURS → Ergebnis direkt
+- Config geändert / zu alt (altersabhängige Regeln) → Neu-Bewertung aus den
+  gespeicherten Features, ohne IMAP-Fetch
+- UIDVALIDITY-Wechsel oder UID nicht mehr auf dem Server → Eintrag gelöscht
+
+Usage:
+    cache = FolderAuditCache(db, user_id, account_id, folder, uidvalidity, master_key)
+    cached = cache.load()
+    ...
+    cache.store([(uid, features, result)], fingerprint)
+    cache.prune(server_uids)
+    db.commit()
+"""
+
+import hashlib
+import importlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+models = importlib.import_module(".02_models", "src")
+encryption = importlib.import_module(".08_encryption", "src")
+
+logger = logging.getLogger(__name__)
+
+# Stunden, die ein Ergebnis ohne Neu-Bewertung gilt (Alters-Regeln in analyze_email)
+AUDIT_CACHE_MAX_AGE_HOURS = int(os.getenv("AUDIT_CACHE_MAX_AGE_HOURS", "24"))
+
+# Erhöhen, wenn sich Heuristiken in analyze_email ändern (→ alles neu bewerten)
+AUDIT_ANALYSIS_VERSION = 1
+
+# UIDs pro IN(...)
+_CHUNK = 1000
+
+
+def _canonical(value: Any) -> Any:
+    """Sets/Dicts in eine deterministische JSON-Form bringen"""
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical(v) for v in value)
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def config_fingerprint(audit_config: Optional[dict], trusted_senders: Iterable[Tuple] = ()) -> str:
+    """Hash über Audit-Config, Trusted Senders und AUDIT_ANALYSIS_VERSION"""
+    payload = {
+        "version": AUDIT_ANALYSIS_VERSION,
+        "config": _canonical(audit_config or {}),
+        "trusted_senders": sorted(json.dumps(list(t), default=str) for t in trusted_senders),
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+@dataclass
+class CachedAudit:
+    """Ein gespeichertes Audit-Ergebnis"""
+    uid: int
+    features: Dict[str, Any]
+    result: Dict[str, Any]
+    fingerprint: str
+    analyzed_at: datetime
+
+    def is_fresh(self, fingerprint: str, now: Optional[datetime] = None) -> bool:
+        """Ergebnis wiederverwendbar (gleiche Config, nicht zu alt)?"""
+        if self.fingerprint != fingerprint:
+            return False
+        analyzed_at = self.analyzed_at
+        if analyzed_at.tzinfo is None:
+            analyzed_at = analyzed_at.replace(tzinfo=UTC)
+        return (now or datetime.now(UTC)) - analyzed_at < timedelta(hours=AUDIT_CACHE_MAX_AGE_HOURS)
+
+
+class FolderAuditCache:
+    """Lesen/Schreiben von folder_audit_cache für EINEN Ordner
+
+    Fehler beim Schreiben werden geloggt, nie geworfen - der Audit selbst
+    funktioniert auch ohne Cache. Geschrieben wird nur per Savepoint in die
+    Session des Callers, committen muss der Caller (Fehler rollen nur den
+    Savepoint zurück).
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        user_id: int,
+        account_id: int,
+        folder: str,
+        uidvalidity: int,
+        master_key: str,
+    ):
+        self.session = session
+        self.user_id = user_id
+        self.account_id = account_id
+        self.folder = folder
+        self.uidvalidity = uidvalidity
+        self.master_key = master_key
+
+    def _folder_query(self):
+        Entry = models.FolderAuditCacheEntry
+        return self.session.query(Entry).filter(
+            Entry.user_id == self.user_id,
+            Entry.mail_account_id == self.account_id,
+            Entry.folder == self.folder,
+        )
+
+    def load(self) -> Dict[int, CachedAudit]:
+        """Alle Einträge des Ordners (Einträge alter UIDVALIDITY werden verworfen)"""
+        Entry = models.FolderAuditCacheEntry
+        try:
+            with self.session.begin_nested():
+                stale = self._folder_query().filter(
+                    Entry.uidvalidity != self.uidvalidity
+                ).delete(synchronize_session=False)
+                if stale:
+                    logger.info(f"🗑️ Audit-Cache {self.folder}: {stale} Einträge alter UIDVALIDITY verworfen")
+
+                rows = self._folder_query().with_entities(
+                    Entry.uid, Entry.encrypted_data, Entry.config_fingerprint, Entry.analyzed_at
+                ).all()
+        except Exception as e:
+            logger.warning(f"⚠️ Audit-Cache {self.folder} nicht lesbar: {e}")
+            return {}
+
+        decryptor = encryption.BatchDecryptor(self.master_key)
+        cached: Dict[int, CachedAudit] = {}
+        for uid, encrypted_data, fingerprint, analyzed_at in rows:
+            try:
+                payload = json.loads(decryptor.decrypt(encrypted_data))
+            except Exception:
+                continue  # z.B. nach Key-Wechsel → wird neu analysiert
+            cached[uid] = CachedAudit(
+                uid=uid,
+                features=payload.get("features", {}),
+                result=payload.get("result", {}),
+                fingerprint=fingerprint,
+                analyzed_at=analyzed_at,
+            )
+        return cached
+
+    def store(self, entries: Iterable[Tuple[int, Dict[str, Any], Dict[str, Any]]], fingerprint: str) -> int:
+        """Schreibt (uid, features, result) - ersetzt vorhandene Einträge dieser UIDs
+
+        Returns:
+            Anzahl geschriebener Einträge
+        """
+        Entry = models.FolderAuditCacheEntry
+        encryptor = encryption.BatchEncryptor(self.master_key)
+        now = datetime.now(UTC)
+        mappings = [
+            {
+                "user_id": self.user_id,
+                "mail_account_id": self.account_id,
+                "folder": self.folder,
+                "uidvalidity": self.uidvalidity,
+                "uid": uid,
+                "config_fingerprint": fingerprint,
+                "encrypted_data": encryptor.encrypt(
+                    json.dumps({"features": features, "result": result}, default=str)
+                ),
+                "analyzed_at": now,
+            }
+            for uid, features, result in entries
+        ]
+        if not mappings:
+            return 0
+
+        try:
+            with self.session.begin_nested():
+                uids = [m["uid"] for m in mappings]
+                for i in range(0, len(uids), _CHUNK):
+                    self._folder_query().filter(
+                        Entry.uidvalidity == self.uidvalidity,
+                        Entry.uid.in_(uids[i:i + _CHUNK]),
+                    ).delete(synchronize_session=False)
+                self.session.bulk_insert_mappings(Entry, mappings)
+        except Exception as e:
+            logger.warning(f"⚠️ Audit-Cache {self.folder} nicht gespeichert: {e}")
+            return 0
+        return len(mappings)
+
+    def prune(self, server_uids: Set[int]) -> int:
+        """Entfernt Einträge für UIDs, die nicht mehr im Ordner sind"""
+        Entry = models.FolderAuditCacheEntry
+        try:
+            with self.session.begin_nested():
+                gone = sorted(
+                    uid for (uid,) in self._folder_query().with_entities(Entry.uid)
+                    if uid not in server_uids
+                )
+                deleted = 0
+                for i in range(0, len(gone), _CHUNK):
+                    deleted += self._folder_query().filter(
+                        Entry.uid.in_(gone[i:i + _CHUNK])
+                    ).delete(synchronize_session=False)
+            return deleted
+        except Exception as e:
+            logger.warning(f"⚠️ Audit-Cache {self.folder} nicht bereinigt: {e}")
+            return 0
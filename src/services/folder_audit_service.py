@@ -24,6 +24,7 @@ logger = logging.getLogger(__name__)
 _models_cache = None
 _mail_sync_cache = None
 _trusted_senders_cache = None
+_folder_audit_cache_cache = None
 
 def _get_models():
     """Cached import of models module."""
@@ -46,6 +47,16 @@ def _get_trusted_senders():
         _trusted_senders_cache = importlib.import_module(".services.trusted_senders", "src")
     return _trusted_senders_cache
 
+def _get_folder_audit_cache():
+    """Cached import of folder_audit_cache module."""
+    global _folder_audit_cache_cache
+    if _folder_audit_cache_cache is None:
+        _folder_audit_cache_cache = importlib.import_module(".services.folder_audit_cache", "src")
+    return _folder_audit_cache_cache
+
+# FLAGS-Refresh für gecachte UIDs (nur FLAGS → größere Batches als Header-Fetch)
+FLAGS_BATCH_SIZE = 1000
+
 
 # =============================================================================
 # Audit Config Loader (aus DB statt hardcoded)
@@ -169,6 +180,31 @@ class AuditConfigCache:
         cls._cache[cache_key] = config
         return config
     
+    @classmethod
+    def get_fingerprint(cls, db_session, user_id: int, account_id: Optional[int] = None) -> str:
+        """Fingerprint von Audit-Config + Trusted Senders (für folder_audit_cache).
+        
+        Trusted Senders werden frisch gelesen (eine Abfrage), da ihre Änderung
+        clear_cache() nicht auslöst.
+        """
+        models = _get_models()
+        config = cls.get_config(db_session, user_id, account_id)
+        trusted = []
+        try:
+            TrustedSender = models.TrustedSender
+            trusted = db_session.query(
+                TrustedSender.sender_pattern,
+                TrustedSender.pattern_type,
+                TrustedSender.account_id,
+            ).filter(
+                TrustedSender.user_id == user_id,
+                (TrustedSender.account_id == account_id) |
+                (TrustedSender.account_id == None)
+            ).all()
+        except Exception as e:
+            logger.warning(f"Failed to load trusted senders for fingerprint: {e}")
+        return _get_folder_audit_cache().config_fingerprint(config, [tuple(t) for t in trusted])
+    
     @classmethod
     def clear_cache(cls, user_id: Optional[int] = None):
         """Löscht Cache (bei Config-Änderungen)."""
@@ -2063,6 +2099,223 @@ class FolderAuditService:
         info.reasons = reasons
         return info
     
+    @staticmethod
+    def _build_email_info(uid: int, data: dict, target_folder: str) -> TrashEmailInfo:
+        """Parst eine IMAP-FETCH-Antwort (ENVELOPE, BODYSTRUCTURE, Power-Header)."""
+        envelope = data.get(b'ENVELOPE')
+        flags = data.get(b'FLAGS', [])
+        size = data.get(b'RFC822.SIZE', 0)
+        bodystructure = data.get(b'BODYSTRUCTURE')
+        
+        # Envelope parsen
+        subject = ""
+        sender = ""
+        sender_name = ""
+        date = None
+        
+        if envelope:
+            # Subject
+            if envelope.subject:
+                try:
+                    subject = envelope.subject.decode('utf-8', errors='replace')
+                except:
+                    subject = str(envelope.subject)
+            
+            # From
+            if envelope.from_ and len(envelope.from_) > 0:
+                from_addr = envelope.from_[0]
+                if from_addr.mailbox and from_addr.host:
+                    try:
+                        mailbox = from_addr.mailbox.decode('utf-8', errors='replace')
+                        host = from_addr.host.decode('utf-8', errors='replace')
+                        sender = f"{mailbox}@{host}"
+                    except:
+                        sender = str(from_addr)
+                if from_addr.name:
+                    try:
+                        sender_name = from_addr.name.decode('utf-8', errors='replace')
+                    except:
+                        sender_name = str(from_addr.name)
+            
+            # Date
+            if envelope.date:
+                date = envelope.date
+                if date.tzinfo is None:
+                    date = date.replace(tzinfo=UTC)
+        
+        # Attachments prüfen und Namen extrahieren
+        has_attachments = False
+        attachment_names = []
+        content_summary = ""
+        if bodystructure:
+            has_attachments, attachment_names, content_summary = FolderAuditService._extract_attachment_info(bodystructure)
+        
+        # Power-Header parsen
+        has_list_unsubscribe = False
+        is_reply = False
+        in_reply_to_msgid = None
+        spam_score = None
+        auth_results = None
+        reply_to = None  # NEU: Für Scam-Detection (From ≠ Reply-To)
+        
+        # Header-Daten aus verschiedenen möglichen Keys extrahieren
+        header_data = None
+        for key in data.keys():
+            if isinstance(key, bytes) and b'HEADER.FIELDS' in key:
+                header_data = data[key]
+                break
+        
+        if header_data:
+            try:
+                header_text = header_data.decode('utf-8', errors='replace') if isinstance(header_data, bytes) else str(header_data)
+                header_lower = header_text.lower()
+                
+                # List-Unsubscribe = Newsletter (99% zuverlässig!)
+                has_list_unsubscribe = 'list-unsubscribe:' in header_lower
+                
+                # In-Reply-To oder References = Teil einer Konversation
+                is_reply = 'in-reply-to:' in header_lower or 'references:' in header_lower
+                
+                # Extrahiere In-Reply-To Message-ID für DB-Lookup
+                # Nutze _extract_folded_header um sicherzugehen dass wir die ganze ID erwischen
+                irt_header = FolderAuditService._extract_folded_header(header_text, 'in-reply-to:')
+                if irt_header:
+                    # Extrahiere <id@server> aus dem Header
+                    msgid_match = re.search(r'<([^>]+)>', irt_header)
+                    if msgid_match:
+                        in_reply_to_msgid = msgid_match.group(1)
+                
+                # Fallback zu References wenn kein In-Reply-To
+                if not in_reply_to_msgid:
+                    ref_header = FolderAuditService._extract_folded_header(header_text, 'references:')
+                    if ref_header:
+                        # Nimm die LETZTE ID aus References (meist der direkte Vorgänger)
+                        msgids = re.findall(r'<([^>]+)>', ref_header)
+                        if msgids:
+                            in_reply_to_msgid = msgids[-1]
+
+                # X-Spam-Score parsen
+                if 'x-spam-score:' in header_lower:
+                    score_match = re.search(r'x-spam-score:\s*([\d.]+)', header_lower)
+                    if score_match:
+                        try:
+                            spam_score = float(score_match.group(1))
+                        except ValueError:
+                            pass
+                
+                # X-Spam-Status parsen (SpamAssassin)
+                if 'x-spam-status:' in header_lower:
+                    if 'yes' in header_lower.split('x-spam-status:')[1][:20]:
+                        spam_score = spam_score or 5.0  # Default hoher Score wenn "Yes"
+                
+                # Authentication-Results (SPF/DKIM/DMARC)
+                # WICHTIG: Header können über mehrere Zeilen "gefoldet" sein
+                if 'authentication-results:' in header_lower:
+                    auth_results = FolderAuditService._extract_folded_header(
+                        header_text, 'authentication-results:'
+                    )
+                
+                # Reply-To Header (für Scam-Detection: From ≠ Reply-To)
+                if 'reply-to:' in header_lower:
+                    reply_to_header = FolderAuditService._extract_folded_header(
+                        header_text, 'reply-to:'
+                    )
+                    if reply_to_header:
+                        # Extrahiere Email-Adresse aus Reply-To
+                        email_match = re.search(r'[\w.\-+]+@[\w.\-]+\.\w+', reply_to_header)
+                        if email_match:
+                            reply_to = email_match.group(0)
+                    
+            except Exception as e:
+                logger.debug(f"Header parsing error: {e}")
+        
+        # TrashEmailInfo erstellen
+        return TrashEmailInfo(
+            uid=uid,
+            subject=subject,
+            sender=sender,
+            sender_name=sender_name,
+            date=date,
+            has_attachments=has_attachments,
+            attachment_names=attachment_names,
+            content_summary=content_summary,
+            flags=[f.decode() if isinstance(f, bytes) else str(f) for f in flags],
+            size=size,
+            has_list_unsubscribe=has_list_unsubscribe,
+            is_reply=is_reply,
+            in_reply_to_msgid=in_reply_to_msgid,
+            spam_score=spam_score,
+            auth_results=auth_results,
+            reply_to=reply_to,
+            folder=target_folder,
+        )
+    
+    @staticmethod
+    def _email_features(info: TrashEmailInfo) -> dict:
+        """Eingabe von analyze_email als JSON-fähiges Dict (für den Audit-Cache)."""
+        return {
+            'subject': info.subject,
+            'sender': info.sender,
+            'sender_name': info.sender_name,
+            'date': info.date.isoformat() if info.date else None,
+            'has_attachments': info.has_attachments,
+            'attachment_names': info.attachment_names,
+            'content_summary': info.content_summary,
+            'flags': info.flags,
+            'size': info.size,
+            'has_list_unsubscribe': info.has_list_unsubscribe,
+            'is_reply': info.is_reply,
+            'in_reply_to_msgid': info.in_reply_to_msgid,
+            'spam_score': info.spam_score,
+            'auth_results': info.auth_results,
+            'reply_to': info.reply_to,
+        }
+    
+    @staticmethod
+    def _email_from_features(uid: int, features: dict, target_folder: str) -> TrashEmailInfo:
+        """Baut TrashEmailInfo aus gecachten Features (Gegenstück zu _email_features)."""
+        date = features.get('date')
+        return TrashEmailInfo(
+            uid=uid,
+            subject=features.get('subject', ""),
+            sender=features.get('sender', ""),
+            sender_name=features.get('sender_name', ""),
+            date=datetime.fromisoformat(date) if date else None,
+            has_attachments=features.get('has_attachments', False),
+            attachment_names=list(features.get('attachment_names', [])),
+            content_summary=features.get('content_summary', ""),
+            flags=list(features.get('flags', [])),
+            size=features.get('size', 0),
+            has_list_unsubscribe=features.get('has_list_unsubscribe', False),
+            is_reply=features.get('is_reply', False),
+            in_reply_to_msgid=features.get('in_reply_to_msgid'),
+            spam_score=features.get('spam_score'),
+            auth_results=features.get('auth_results'),
+            reply_to=features.get('reply_to'),
+            folder=target_folder,
+        )
+    
+    @staticmethod
+    def _email_result(info: TrashEmailInfo) -> dict:
+        """Ausgabe von analyze_email (inkl. dekodierter Header) für den Audit-Cache."""
+        return {
+            'subject': info.subject,
+            'sender_name': info.sender_name,
+            'category': info.category.value,
+            'confidence': info.confidence,
+            'reasons': info.reasons,
+        }
+    
+    @staticmethod
+    def _apply_result(info: TrashEmailInfo, result: dict) -> TrashEmailInfo:
+        """Übernimmt ein gecachtes analyze_email-Ergebnis."""
+        info.subject = result.get('subject', info.subject)
+        info.sender_name = result.get('sender_name', info.sender_name)
+        info.category = TrashCategory(result.get('category', TrashCategory.REVIEW.value))
+        info.confidence = result.get('confidence', 0.0)
+        info.reasons = list(result.get('reasons', []))
+        return info
+    
     @staticmethod
     def fetch_and_analyze_trash(
         fetcher,
@@ -2070,10 +2323,15 @@ class FolderAuditService:
         db_session=None,
         user_id: Optional[int] = None,
         account_id: Optional[int] = None,
-        folder: Optional[str] = None
+        folder: Optional[str] = None,
+        master_key: Optional[str] = None
     ) -> FolderAuditResult:
         """Holt Emails aus einem Ordner und analysiert sie.
         
+        Mit master_key (+ db_session, user_id, account_id) werden Ergebnisse pro
+        UID im folder_audit_cache gespeichert: erneute Audits holen nur neue UIDs
+        vom Server und bewerten gecachte Features bei Config-Änderung neu.
+        
         Args:
             fetcher: Verbundener MailFetcher
             limit: Maximale Anzahl Emails
@@ -2081,6 +2339,7 @@ class FolderAuditService:
             user_id: Optionale User-ID
             account_id: Optionale Account-ID für User-Trusted-Senders
             folder: Optionaler Ordnername (default: Trash-Folder)
+            master_key: Optionaler Master-Key für den Audit-Cache
             
         Returns:
             FolderAuditResult mit kategorisierten Emails
@@ -2123,11 +2382,39 @@ class FolderAuditService:
                 return result
             
             # UIDs holen (neueste zuerst)
-            uids = conn.search(['ALL'])
+            server_uids = conn.search(['ALL'])
+            uids = server_uids
             if limit and len(uids) > limit:
                 uids = uids[-limit:]  # Neueste
             
-            logger.info(f"📥 Fetching {len(uids)} Email-Header...")
+            # Audit-Cache: nur UIDs ohne gespeichertes Ergebnis vom Server holen
+            audit_cache = None
+            cached = {}
+            fingerprint = None
+            to_store = []
+            uidvalidity = folder_info.get(b'UIDVALIDITY')
+            if master_key and db_session and user_id and account_id and uidvalidity:
+                audit_cache = _get_folder_audit_cache().FolderAuditCache(
+                    db_session, user_id, account_id, target_folder, int(uidvalidity), master_key
+                )
+                cached = audit_cache.load()
+                fingerprint = AuditConfigCache.get_fingerprint(db_session, user_id, account_id)
+            
+            cached_uids = [uid for uid in uids if uid in cached]
+            fetch_uids = [uid for uid in uids if uid not in cached]
+            
+            # Gecachte UIDs: nur FLAGS aktualisieren (\Flagged fließt in die Bewertung ein)
+            current_flags = {}
+            for batch_start in range(0, len(cached_uids), FLAGS_BATCH_SIZE):
+                if batch_start > 0:
+                    time.sleep(0.1)  # 100ms
+                batch_data = conn.fetch(cached_uids[batch_start:batch_start + FLAGS_BATCH_SIZE], ['FLAGS'])
+                for uid, data in batch_data.items():
+                    current_flags[uid] = [
+                        f.decode() if isinstance(f, bytes) else str(f) for f in data.get(b'FLAGS', [])
+                    ]
+            
+            logger.info(f"📥 Fetching {len(fetch_uids)} Email-Header...")
             
             # Header fetchen inkl. Power-Header für bessere Analyse
             # BODY.PEEK vermeidet \Seen Flag zu setzen
@@ -2138,8 +2425,8 @@ class FolderAuditService:
             BATCH_SIZE = 200  # Konservativ für Exchange
             all_fetch_data = {}
             
-            for batch_start in range(0, len(uids), BATCH_SIZE):
-                batch_uids = uids[batch_start:batch_start + BATCH_SIZE]
+            for batch_start in range(0, len(fetch_uids), BATCH_SIZE):
+                batch_uids = fetch_uids[batch_start:batch_start + BATCH_SIZE]
                 
                 # Rate-Limiting: Pause zwischen Batches (außer beim ersten)
                 if batch_start > 0:
@@ -2156,157 +2443,12 @@ class FolderAuditService:
                 all_fetch_data.update(batch_data)
                 
                 if batch_start > 0 and (batch_start + BATCH_SIZE) % 1000 == 0:
-                    logger.debug(f"  ... {batch_start + len(batch_uids)}/{len(uids)} Header geholt")
+                    logger.debug(f"  ... {batch_start + len(batch_uids)}/{len(fetch_uids)} Header geholt")
             
             for uid, data in all_fetch_data.items():
                 try:
-                    envelope = data.get(b'ENVELOPE')
-                    flags = data.get(b'FLAGS', [])
-                    size = data.get(b'RFC822.SIZE', 0)
-                    bodystructure = data.get(b'BODYSTRUCTURE')
-                    
-                    # Envelope parsen
-                    subject = ""
-                    sender = ""
-                    sender_name = ""
-                    date = None
-                    
-                    if envelope:
-                        # Subject
-                        if envelope.subject:
-                            try:
-                                subject = envelope.subject.decode('utf-8', errors='replace')
-                            except:
-                                subject = str(envelope.subject)
-                        
-                        # From
-                        if envelope.from_ and len(envelope.from_) > 0:
-                            from_addr = envelope.from_[0]
-                            if from_addr.mailbox and from_addr.host:
-                                try:
-                                    mailbox = from_addr.mailbox.decode('utf-8', errors='replace')
-                                    host = from_addr.host.decode('utf-8', errors='replace')
-                                    sender = f"{mailbox}@{host}"
-                                except:
-                                    sender = str(from_addr)
-                            if from_addr.name:
-                                try:
-                                    sender_name = from_addr.name.decode('utf-8', errors='replace')
-                                except:
-                                    sender_name = str(from_addr.name)
-                        
-                        # Date
-                        if envelope.date:
-                            date = envelope.date
-                            if date.tzinfo is None:
-                                date = date.replace(tzinfo=UTC)
-                    
-                    # Attachments prüfen und Namen extrahieren
-                    has_attachments = False
-                    attachment_names = []
-                    content_summary = ""
-                    if bodystructure:
-                        has_attachments, attachment_names, content_summary = FolderAuditService._extract_attachment_info(bodystructure)
-                    
-                    # Power-Header parsen
-                    has_list_unsubscribe = False
-                    is_reply = False
-                    in_reply_to_msgid = None
-                    spam_score = None
-                    auth_results = None
-                    reply_to = None  # NEU: Für Scam-Detection (From ≠ Reply-To)
-                    
-                    # Header-Daten aus verschiedenen möglichen Keys extrahieren
-                    header_data = None
-                    for key in data.keys():
-                        if isinstance(key, bytes) and b'HEADER.FIELDS' in key:
-                            header_data = data[key]
-                            break
-                    
-                    if header_data:
-                        try:
-                            header_text = header_data.decode('utf-8', errors='replace') if isinstance(header_data, bytes) else str(header_data)
-                            header_lower = header_text.lower()
-                            
-                            # List-Unsubscribe = Newsletter (99% zuverlässig!)
-                            has_list_unsubscribe = 'list-unsubscribe:' in header_lower
-                            
-                            # In-Reply-To oder References = Teil einer Konversation
-                            is_reply = 'in-reply-to:' in header_lower or 'references:' in header_lower
-                            
-                            # Extrahiere In-Reply-To Message-ID für DB-Lookup
-                            # Nutze _extract_folded_header um sicherzugehen dass wir die ganze ID erwischen
-                            irt_header = FolderAuditService._extract_folded_header(header_text, 'in-reply-to:')
-                            if irt_header:
-                                # Extrahiere <id@server> aus dem Header
-                                msgid_match = re.search(r'<([^>]+)>', irt_header)
-                                if msgid_match:
-                                    in_reply_to_msgid = msgid_match.group(1)
-                            
-                            # Fallback zu References wenn kein In-Reply-To
-                            if not in_reply_to_msgid:
-                                ref_header = FolderAuditService._extract_folded_header(header_text, 'references:')
-                                if ref_header:
-                                    # Nimm die LETZTE ID aus References (meist der direkte Vorgänger)
-                                    msgids = re.findall(r'<([^>]+)>', ref_header)
-                                    if msgids:
-                                        in_reply_to_msgid = msgids[-1]
-
-                            # X-Spam-Score parsen
-                            if 'x-spam-score:' in header_lower:
-                                score_match = re.search(r'x-spam-score:\s*([\d.]+)', header_lower)
-                                if score_match:
-                                    try:
-                                        spam_score = float(score_match.group(1))
-                                    except ValueError:
-                                        pass
-                            
-                            # X-Spam-Status parsen (SpamAssassin)
-                            if 'x-spam-status:' in header_lower:
-                                if 'yes' in header_lower.split('x-spam-status:')[1][:20]:
-                                    spam_score = spam_score or 5.0  # Default hoher Score wenn "Yes"
-                            
-                            # Authentication-Results (SPF/DKIM/DMARC)
-                            # WICHTIG: Header können über mehrere Zeilen "gefoldet" sein
-                            if 'authentication-results:' in header_lower:
-                                auth_results = FolderAuditService._extract_folded_header(
-                                    header_text, 'authentication-results:'
-                                )
-                            
-                            # Reply-To Header (für Scam-Detection: From ≠ Reply-To)
-                            if 'reply-to:' in header_lower:
-                                reply_to_header = FolderAuditService._extract_folded_header(
-                                    header_text, 'reply-to:'
-                                )
-                                if reply_to_header:
-                                    # Extrahiere Email-Adresse aus Reply-To
-                                    email_match = re.search(r'[\w.\-+]+@[\w.\-]+\.\w+', reply_to_header)
-                                    if email_match:
-                                        reply_to = email_match.group(0)
-                                
-                        except Exception as e:
-                            logger.debug(f"Header parsing error: {e}")
-                    
-                    # TrashEmailInfo erstellen
-                    email_info = TrashEmailInfo(
-                        uid=uid,
-                        subject=subject,
-                        sender=sender,
-                        sender_name=sender_name,
-                        date=date,
-                        has_attachments=has_attachments,
-                        attachment_names=attachment_names,
-                        content_summary=content_summary,
-                        flags=[f.decode() if isinstance(f, bytes) else str(f) for f in flags],
-                        size=size,
-                        has_list_unsubscribe=has_list_unsubscribe,
-                        is_reply=is_reply,
-                        in_reply_to_msgid=in_reply_to_msgid,
-                        spam_score=spam_score,
-                        auth_results=auth_results,
-                        reply_to=reply_to,
-                        folder=target_folder,
-                    )
+                    email_info = FolderAuditService._build_email_info(uid, data, target_folder)
+                    features = FolderAuditService._email_features(email_info)
                     
                     # Analysieren
                     email_info = FolderAuditService.analyze_email(
@@ -2317,11 +2459,54 @@ class FolderAuditService:
                         account_domain=account_domain
                     )
                     result.emails.append(email_info)
+                    if audit_cache:
+                        to_store.append((uid, features, FolderAuditService._email_result(email_info)))
                     
                 except Exception as e:
                     logger.warning(f"Fehler bei UID {uid}: {e}")
                     continue
             
+            # Gecachte UIDs: Ergebnis übernehmen oder aus Features neu bewerten
+            if cached_uids:
+                now = datetime.now(UTC)
+                reused = 0
+                for uid in cached_uids:
+                    flags = current_flags.get(uid)
+                    if flags is None:
+                        continue  # Zwischen SEARCH und FETCH gelöscht
+                    try:
+                        entry = cached[uid]
+                        flags_changed = sorted(flags) != sorted(entry.features.get('flags', []))
+                        features = dict(entry.features, flags=flags)
+                        email_info = FolderAuditService._email_from_features(uid, features, target_folder)
+                        
+                        if not flags_changed and entry.is_fresh(fingerprint, now):
+                            FolderAuditService._apply_result(email_info, entry.result)
+                            reused += 1
+                        else:
+                            email_info = FolderAuditService.analyze_email(
+                                email_info,
+                                db_session=db_session,
+                                user_id=user_id,
+                                account_id=account_id,
+                                account_domain=account_domain
+                            )
+                            to_store.append((uid, features, FolderAuditService._email_result(email_info)))
+                        result.emails.append(email_info)
+                    except Exception as e:
+                        logger.warning(f"Fehler bei gecachter UID {uid}: {e}")
+                        continue
+                
+                logger.info(
+                    f"💾 Audit-Cache {target_folder}: {reused} übernommen, "
+                    f"{len(cached_uids) - reused} neu bewertet, {len(fetch_uids)} neu geholt"
+                )
+            
+            if audit_cache:
+                audit_cache.store(to_store, fingerprint)
+                audit_cache.prune(set(server_uids))
+                result.emails.sort(key=lambda e: e.uid)
+            
             # Statistiken
             result.total = len(result.emails)
             result.safe_count = sum(1 for e in result.emails if e.category == TrashCategory.SAFE)
@@ -2364,7 +2549,8 @@ class FolderAuditService:
         db_session=None,
         user_id: Optional[int] = None,
         account_id: Optional[int] = None,
-        exclude_folders: Optional[List[str]] = None
+        exclude_folders: Optional[List[str]] = None,
+        master_key: Optional[str] = None
     ) -> FolderAuditResult:
         """Scannt ALLE Ordner eines Accounts und analysiert Emails.
         
@@ -2376,6 +2562,7 @@ class FolderAuditService:
             user_id: Optionale User-ID
             account_id: Optionale Account-ID für User-Trusted-Senders
             exclude_folders: Ordner die übersprungen werden sollen
+            master_key: Optionaler Master-Key für den Audit-Cache
             
         Returns:
             FolderAuditResult mit kategorisierten Emails aus allen Ordnern
@@ -2467,7 +2654,8 @@ class FolderAuditService:
                         db_session=db_session,
                         user_id=user_id,
                         account_id=account_id,
-                        folder=folder_name
+                        folder=folder_name,
+                        master_key=master_key
                     )
                     
                     if folder_result.total > 0:
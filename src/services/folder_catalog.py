@@ -0,0 +1,233 @@
+"""
+Folder Catalog Service - Server-Ordnerliste aus DB/Memory statt Live-IMAP
+
+Ordner-Dropdowns (Listen-Ansicht, /account/<id>/folders) haben bisher bei
+jedem Aufruf IMAP-Credentials entschlüsselt, eingeloggt, LIST ausgeführt und
+die Verbindung wieder geschlossen (1-3 s Handshake pro Request).
+
+Jetzt:
+- Der Sync-Task schreibt die ohnehin abgefragte LIST-Antwort in email_folders
+- Lesen: Memory-Cache (FOLDER_CATALOG_TTL) → email_folders → bekannte
+  Ordner aus mail_server_state → erst dann (einmalig) Live-IMAP
+- Explizites Refresh: refresh_from_server() (z.B. ?refresh=1 am Endpoint)
+
+Usage:
+    from src.services.folder_catalog import FolderCatalogService
+
+    names = FolderCatalogService.get_folder_names(db, user.id, account.id)
+    FolderCatalogService.store(db, user.id, account.id, connection.list_folders())
+"""
+
+import importlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+models = importlib.import_module(".02_models", "src")
+mail_fetcher_mod = importlib.import_module(".06_mail_fetcher", "src")
+
+logger = logging.getLogger(__name__)
+
+# Sekunden, die eine Ordnerliste pro Prozess im Memory bleibt
+FOLDER_CATALOG_TTL = int(os.getenv("FOLDER_CATALOG_TTL", "300"))
+
+# RFC 6154 SPECIAL-USE Flags → special_folder_type
+SPECIAL_USE_FLAGS = {
+    "\\sent": "sent",
+    "\\trash": "trash",
+    "\\drafts": "drafts",
+    "\\junk": "junk",
+    "\\archive": "archive",
+    "\\all": "all",
+    "\\flagged": "flagged",
+}
+
+
+def _flag_names(flags) -> List[str]:
+    return [
+        (flag.decode() if isinstance(flag, bytes) else str(flag)).lower()
+        for flag in flags or ()
+    ]
+
+
+def parse_folder_list(mailboxes) -> List[Dict[str, Any]]:
+    """Normalisiert IMAPClient.list_folders() (flags, delimiter, name) Tupel
+
+    \\Noselect-Ordner (reine Hierarchie-Knoten) werden übersprungen.
+
+    Returns:
+        Liste von {"name", "imap_path", "special_folder_type"}, nach Name sortiert
+    """
+    folders = {}
+    for flags, _delimiter, folder_name in mailboxes or ():
+        flag_names = _flag_names(flags)
+        if "\\noselect" in flag_names:
+            continue
+        imap_path = folder_name.decode() if isinstance(folder_name, bytes) else str(folder_name)
+        special = next((SPECIAL_USE_FLAGS[f] for f in flag_names if f in SPECIAL_USE_FLAGS), None)
+        if special is None and imap_path.upper() == "INBOX":
+            special = "inbox"
+        folders[imap_path] = {
+            "name": mail_fetcher_mod.decode_imap_folder_name(imap_path),
+            "imap_path": imap_path,
+            "special_folder_type": special,
+        }
+    return sorted(folders.values(), key=lambda f: f["name"])
+
+
+class FolderCatalogService:
+    """Ordner-Katalog pro Mail-Account (email_folders + Memory-Cache)"""
+
+    _lock = threading.Lock()
+    _cache: Dict[Tuple[int, int], Tuple[float, List[str]]] = {}
+
+    @classmethod
+    def _cache_get(cls, key: Tuple[int, int]) -> Optional[List[str]]:
+        with cls._lock:
+            entry = cls._cache.get(key)
+            if entry and time.monotonic() - entry[0] < FOLDER_CATALOG_TTL:
+                return list(entry[1])
+            cls._cache.pop(key, None)
+            return None
+
+    @classmethod
+    def _cache_set(cls, key: Tuple[int, int], names: List[str]) -> None:
+        with cls._lock:
+            cls._cache[key] = (time.monotonic(), list(names))
+
+    @classmethod
+    def invalidate(cls, user_id: Optional[int] = None, account_id: Optional[int] = None) -> None:
+        """Verwirft Memory-Einträge (alle, pro User oder pro Account)"""
+        with cls._lock:
+            for key in list(cls._cache):
+                if (user_id is None or key[0] == user_id) and (account_id is None or key[1] == account_id):
+                    del cls._cache[key]
+
+    @classmethod
+    def store(cls, session: Session, user_id: int, account_id: int, mailboxes) -> List[str]:
+        """Schreibt eine LIST-Antwort in email_folders (Upsert + Löschen verschwundener)
+
+        Schreibt nur per Savepoint in die Session des Callers - committed nicht
+        (der Sync-Task committed mit seinen übrigen Änderungen). Ein Fehler rollt
+        nur den Savepoint zurück, wird geloggt, nie geworfen.
+
+        Returns:
+            Ordnernamen (sortiert)
+        """
+        parsed = parse_folder_list(mailboxes)
+        names = [f["name"] for f in parsed]
+        EmailFolder = models.EmailFolder
+
+        try:
+            with session.begin_nested():
+                existing = {
+                    folder.imap_path: folder
+                    for folder in session.query(EmailFolder).filter_by(
+                        user_id=user_id, mail_account_id=account_id
+                    )
+                }
+                for entry in parsed:
+                    folder = existing.pop(entry["imap_path"], None)
+                    if folder is None:
+                        folder = EmailFolder(
+                            user_id=user_id, mail_account_id=account_id, imap_path=entry["imap_path"]
+                        )
+                        session.add(folder)
+                    folder.name = entry["name"]
+                    folder.special_folder_type = entry["special_folder_type"]
+                    folder.is_special_folder = entry["special_folder_type"] is not None
+                for folder in existing.values():
+                    session.delete(folder)
+        except Exception as e:
+            logger.warning(f"⚠️  Ordner-Katalog für Account {account_id} nicht gespeichert: {e}")
+            return names
+
+        cls._cache_set((user_id, account_id), names)
+        logger.debug(f"📁 Ordner-Katalog Account {account_id}: {len(names)} Ordner")
+        return names
+
+    @classmethod
+    def get_folder_names(cls, session: Session, user_id: int, account_id: int) -> List[str]:
+        """Ordnernamen ohne IMAP-Verbindung
+
+        Reihenfolge: Memory (TTL) → email_folders → mail_server_state.
+        Leere Liste, wenn der Account noch nie synchronisiert wurde.
+        """
+        key = (user_id, account_id)
+        cached = cls._cache_get(key)
+        if cached is not None:
+            return cached
+
+        names = [
+            name for (name,) in session.query(models.EmailFolder.name)
+            .filter_by(user_id=user_id, mail_account_id=account_id)
+            .order_by(models.EmailFolder.name)
+        ]
+        if not names:
+            # Fallback: Ordner, die der State-Sync (mail_sync_v2) schon kennt
+            State = models.MailServerState
+            names = sorted(
+                folder for (folder,) in session.query(State.folder)
+                .filter(
+                    State.user_id == user_id,
+                    State.mail_account_id == account_id,
+                    State.is_deleted == False,
+                )
+                .distinct()
+            )
+
+        if names:
+            cls._cache_set(key, names)
+        return names
+
+    @classmethod
+    def refresh_from_server(cls, session: Session, account, master_key: str) -> List[str]:
+        """Explizites Refresh: Live-LIST beim IMAP-Server und speichern (committed)
+
+        Eigene Unit of Work der Web-Endpoints, daher Commit hier statt in store().
+
+        Raises:
+            Exception bei Entschlüsselungs-/IMAP-Fehlern (Caller entscheidet)
+        """
+        encryption = importlib.import_module(".08_encryption", "src")
+
+        fetcher = mail_fetcher_mod.MailFetcher(
+            server=encryption.CredentialManager.decrypt_server(
+                account.encrypted_imap_server, master_key
+            ),
+            username=encryption.CredentialManager.decrypt_email_address(
+                account.encrypted_imap_username, master_key
+            ),
+            password=encryption.CredentialManager.decrypt_imap_password(
+                account.encrypted_imap_password, master_key
+            ),
+            port=account.imap_port,
+        )
+        fetcher.connect()
+        try:
+            if not fetcher.connection:
+                raise ConnectionError("IMAP-Verbindung fehlgeschlagen")
+            mailboxes = fetcher.connection.list_folders()
+        finally:
+            fetcher.disconnect()
+
+        names = cls.store(session, account.user_id, account.id, mailboxes)
+        session.commit()
+        return names
+
+    @classmethod
+    def get_or_refresh(
+        cls, session: Session, account, master_key: Optional[str], refresh: bool = False
+    ) -> List[str]:
+        """Katalog lesen; Live-IMAP nur bei refresh=True oder leerem Katalog"""
+        if not refresh:
+            names = cls.get_folder_names(session, account.user_id, account.id)
+            if names or not master_key:
+                return names
+        if not master_key or account.auth_type != "imap":
+            return cls.get_folder_names(session, account.user_id, account.id)
+        return cls.refresh_from_server(session, account, master_key)
@@ -3,31 +3,25 @@ Phase Y2: Hybrid Pipeline
 Kombiniert 8 Detektoren + Ensemble Learning für finale Scores.
 """
 
-import spacy
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 import logging
 
+from src.services import spacy_context
+
 logger = logging.getLogger(__name__)
 
-# 🔴 KRITISCH: Global spaCy Cache - verhindert 150MB reload pro Email!
-_spacy_nlp_cache = None
-
-def _get_cached_spacy_model(model_name: str = "de_core_news_md"):
-    """Gibt gecachtes spaCy Modell zurück (kein Reload pro Email)."""
-    global _spacy_nlp_cache
-    if _spacy_nlp_cache is None:
-        try:
-            _spacy_nlp_cache = spacy.load(model_name)
-            logger.info(f"✅ spaCy Model gecacht: {model_name} (~150MB)")
-        except OSError:
-            logger.warning(f"⚠️ {model_name} nicht verfügbar, versuche sm...")
-            try:
-                _spacy_nlp_cache = spacy.load("de_core_news_sm")
-            except OSError:
-                logger.error("❌ Kein spaCy Modell verfügbar!")
-                raise
-    return _spacy_nlp_cache
+# Body-Limit für die Analyse (Memory), Detektoren parsen davon die ersten 2000 Zeichen
+MAX_ANALYSIS_CHARS = 10000
+DETECTOR_TEXT_CHARS = 2000
+
+
+def _get_cached_spacy_model():
+    """Gibt das geteilte spaCy Modell zurück (kein Reload pro Email, siehe spacy_context)."""
+    nlp = spacy_context.get_nlp()
+    if nlp is None:
+        raise OSError("Kein spaCy Modell verfügbar")
+    return nlp
 
 from src.services.spacy_detectors import (
     ImperativeDetector,
@@ -40,6 +34,7 @@ from src.services.spacy_detectors import (
 )
 from src.services.spacy_config_manager import SpacyConfigManager
 from src.services.ensemble_combiner import EnsembleCombiner
+from src.services.plain_text import to_plain_text
 
 
 class HybridPipeline:
@@ -71,7 +66,7 @@ class HybridPipeline:
         self.sgd_classifier = sgd_classifier
 
         # spaCy Modell laden (GLOBAL CACHED - verhindert 150MB reload!)
-        self.nlp = _get_cached_spacy_model("de_core_news_md")
+        self.nlp = _get_cached_spacy_model()
 
         # Config Manager
         self.config_manager = SpacyConfigManager(db_session)
@@ -109,30 +104,49 @@ class HybridPipeline:
                 "final_method": "ensemble"  # "spacy_only" oder "ensemble"
             }
         """
+        # Alle NLP-Detektoren teilen sich ein Doc (ein Parse pro Email)
+        with spacy_context.doc_scope():
+            return self._analyze(account_id, sender_email, subject, body)
+
+    def analyze_batch(self, emails: List[Dict], n_process: Optional[int] = None) -> List[Dict]:
+        """
+        Analyse vieler Emails: Texte vorab gebündelt per nlp.pipe parsen.
+        
+        Args:
+            emails: Liste von Dicts mit account_id, sender_email, subject, body
+            n_process: Prozesse für nlp.pipe (Default SPACY_N_PROCESS)
+            
+        Returns:
+            Ergebnisse wie analyze(), gleiche Reihenfolge
+        """
+        texts = [self.detector_text(email["subject"], email["body"]) for email in emails]
+        with spacy_context.doc_scope():
+            spacy_context.parse_many(texts, self.nlp, n_process=n_process)
+            return [self.analyze(**email) for email in emails]
+
+    @classmethod
+    def detector_text(cls, subject: str, body: str) -> str:
+        """Text, den die NLP-Detektoren parsen (Key für vorab geparste Docs)"""
+        return cls._analysis_text(subject, body)[:DETECTOR_TEXT_CHARS]
+
+    @staticmethod
+    def _analysis_text(subject: str, body: str) -> str:
+        """Volltext für die NLP-Analyse (Plain Text, Body gekürzt)"""
         # Memory-Optimierung: HTML zu Plain Text konvertieren falls nötig
         # und Body auf 10.000 Zeichen begrenzen
-        MAX_ANALYSIS_CHARS = 10000
-        processed_body = body
-        
-        # HTML erkennen und konvertieren
-        if processed_body and ('<html' in processed_body.lower() or '<body' in processed_body.lower() or '<div' in processed_body.lower()):
-            try:
-                from inscriptis import get_text
-                from inscriptis.model.config import ParserConfig
-                config = ParserConfig(display_links=False, display_images=False)
-                processed_body = get_text(processed_body, config)
-            except ImportError:
-                # Fallback: Regex HTML-Cleanup
-                import re
-                processed_body = re.sub(r'<[^>]+>', ' ', processed_body)
-                processed_body = re.sub(r'\s+', ' ', processed_body).strip()
+        # (process_pending_raw_emails übergibt bereits den gespeicherten Plain Text)
+        processed_body = to_plain_text(body)
         
         # Body kürzen
         if processed_body and len(processed_body) > MAX_ANALYSIS_CHARS:
             processed_body = processed_body[:MAX_ANALYSIS_CHARS]
         
+        return f"{subject}\n\n{processed_body}"
+
+    def _analyze(self, account_id: int, sender_email: str, subject: str, body: str) -> Dict:
+        """analyze() im aktiven doc_scope"""
         # Volltext für NLP-Analyse
-        full_text = f"{subject}\n\n{processed_body}"
+        full_text = self._analysis_text(subject, body)
 
         # Account-Config laden
         config = self.config_manager.load_account_config(account_id)
@@ -5,12 +5,15 @@ Workflow:
 ═══════════════════════════════════════════════════════════════════════════
 
 SCHRITT 1: STATE = SERVER-ABBILD (sync_state_with_server)
-    Für jeden Filter-Ordner:
-        a) Server scannen → alle Mails in RAM
-        b) DELETE FROM mail_server_state WHERE folder = X
-        c) INSERT alle Server-Mails in mail_server_state
+    Für jeden Filter-Ordner (Marker in mail_folder_sync_state):
+        Inkrementell (gleiche UIDVALIDITY wie beim letzten Sync):
+            a) UIDNEXT/EXISTS/HIGHESTMODSEQ aus SELECT vergleichen
+            b) Neue/gelöschte UIDs per UID-Set-Diff (UID SEARCH nur wenn nötig)
+            c) ENVELOPE nur für neue UIDs, Flags per CHANGEDSINCE (CONDSTORE)
+            d) Bulk-INSERT / UPDATE ... WHERE uid IN / DELETE ... WHERE uid IN
+        Voll (erster Sync, UIDVALIDITY-Wechsel):
+            DELETE FROM mail_server_state WHERE folder = X + Bulk-INSERT
     
-    → Kein UPDATE nötig! Einfach DELETE + INSERT
     → State ist danach 1:1 Abbild vom Server (für die Filter-Ordner)
 
 SCHRITT 2: FETCH (insert_fetched_mail)
@@ -31,22 +34,35 @@ SCHRITT 3: RAW SYNC (sync_raw_emails_with_state)
 """
 
 import hashlib
+import importlib
 import logging
+import os
 from datetime import datetime, UTC
 from typing import Dict, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass, field
 
+from sqlalchemy.exc import IntegrityError
+
 logger = logging.getLogger(__name__)
 
+# Inkrementeller State-Sync (UIDNEXT/CONDSTORE-Marker); false = immer DELETE + INSERT
+MAIL_SYNC_INCREMENTAL = os.getenv("MAIL_SYNC_INCREMENTAL", "true").lower() in ("true", "1", "yes")
+# UIDs pro ENVELOPE/FLAGS-FETCH im State-Sync
+STATE_FETCH_BATCH = 500
+# UIDs pro IN(...) bei Bulk-UPDATE/DELETE
+STATE_BULK_CHUNK = 1000
+
 
 @dataclass
 class SyncStats:
     """Statistiken eines Sync-Vorgangs"""
-    # Schritt 1: State mit Server (DELETE + INSERT pro Ordner)
+    # Schritt 1: State mit Server (inkrementell oder DELETE + INSERT pro Ordner)
     folders_scanned: int = 0
     mails_on_server: int = 0
     state_inserted: int = 0
+    state_updated: int = 0
     state_deleted: int = 0
+    folders_unchanged: int = 0
     
     # Schritt 2: Fetch
     fetch_candidates: int = 0
@@ -89,6 +105,23 @@ def get_stable_id(message_id: Optional[str], content_hash: str) -> str:
     return message_id if message_id else f"hash:{content_hash}"
 
 
+def _select_int(folder_info: Dict, key: bytes) -> Optional[int]:
+    """Liest UIDVALIDITY/UIDNEXT/EXISTS/HIGHESTMODSEQ aus der SELECT-Antwort"""
+    value = folder_info.get(key)
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else None
+    return int(value) if value is not None else None
+
+
+def _flags_to_str(flags) -> str:
+    return ' '.join(f.decode() if isinstance(f, bytes) else str(f) for f in flags or ())
+
+
+def _chunks(items: List, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
 class MailSyncServiceV2:
     """
     Sauberer Mail-Sync Service nach dem 3-Schritt-Workflow.
@@ -125,12 +158,9 @@ class MailSyncServiceV2:
         """
         Schritt 1: Filter-Ordner scannen und mail_server_state aktualisieren.
         
-        PRO ORDNER:
-          a) Server scannen → alle Mails in RAM
-          b) DELETE FROM mail_server_state WHERE folder = X
-          c) INSERT alle Server-Mails in mail_server_state
+        PRO ORDNER: siehe _sync_folder_state() - inkrementell über die
+        Marker in mail_folder_sync_state, sonst DELETE + INSERT.
         
-        → Kein UPDATE nötig! Einfach DELETE + INSERT pro Ordner
         → State ist danach 1:1 Abbild vom Server
         
         Args:
@@ -157,7 +187,7 @@ class MailSyncServiceV2:
                     logger.info("📭 Keine Ordner zum Scannen - Schritt 1 übersprungen")
                     return stats
             
-            # 2. Pro Ordner: DELETE + INSERT (simpel und robust!)
+            # 2. Pro Ordner: inkrementell bzw. DELETE + INSERT
             total_folders = len(folders_to_scan)
             
             logger.info(f"🔍 DEBUG: progress_callback ist {'GESETZT' if progress_callback else 'NICHT GESETZT'}")
@@ -192,7 +222,8 @@ class MailSyncServiceV2:
             logger.info(
                 f"✅ Schritt 1 abgeschlossen: {stats.folders_scanned} Ordner, "
                 f"{stats.mails_on_server} Server-Mails, "
-                f"+{stats.state_inserted} inserted, {stats.state_deleted}🗑 deleted"
+                f"+{stats.state_inserted} inserted, ~{stats.state_updated} updated, "
+                f"{stats.state_deleted}🗑 deleted, {stats.folders_unchanged} Ordner unverändert"
             )
             
         except Exception as e:
@@ -211,108 +242,79 @@ class MailSyncServiceV2:
         """
         Synchronisiert mail_server_state für EINEN Ordner.
         
-        Simpel: DELETE alle für diesen Ordner, dann INSERT alle vom Server.
+        Inkrementell (Marker vorhanden, gleiche UIDVALIDITY):
+          - UIDNEXT + EXISTS unverändert → kein UID SEARCH (keine neuen/gelöschten Mails)
+          - sonst UID SEARCH ALL (nur UIDs) → neue/gelöschte UIDs per Set-Diff
+          - ENVELOPE nur für neue UIDs
+          - Flags: CONDSTORE → FETCH (FLAGS) CHANGEDSINCE <letzter HIGHESTMODSEQ>,
+                   ohne CONDSTORE → FLAGS aller bekannten UIDs (ohne ENVELOPE)
+          - Anwenden als Bulk-INSERT / UPDATE ... WHERE uid IN / DELETE ... WHERE uid IN
+        
+        Voll (erster Sync, UIDVALIDITY-Wechsel, MAIL_SYNC_INCREMENTAL=false):
+          DELETE alle für diesen Ordner, dann Bulk-INSERT aller vom Server.
+        
+        QRESYNC (VANISHED) wird nicht genutzt: IMAPClient unterstützt keine
+        SELECT-Parameter, der UID-Set-Diff liefert dasselbe Ergebnis.
         
         Args:
             folder: Ordner-Name (z.B. "INBOX")
             stats: SyncStats-Objekt zum Aktualisieren
             progress_callback: Optional callback für Batch-Progress
+        
+        Returns:
+            Anzahl Mails im Ordner (0 bei Fehler)
         """
-        MailServerState = self.models.MailServerState
-        now = datetime.now(UTC)
+        MailFolderSyncState = self.models.MailFolderSyncState
         
         try:
-            # a) Server scannen für diesen Ordner
             folder_info = self.conn.select_folder(folder, readonly=True)
-            uidvalidity = folder_info.get(b'UIDVALIDITY')
-            if uidvalidity:
-                uidvalidity = int(uidvalidity[0]) if isinstance(uidvalidity, list) else int(uidvalidity)
+            uidvalidity = _select_int(folder_info, b'UIDVALIDITY')
+            uidnext = _select_int(folder_info, b'UIDNEXT')
+            exists = _select_int(folder_info, b'EXISTS')
+            highestmodseq = (
+                _select_int(folder_info, b'HIGHESTMODSEQ') if self._has_condstore() else None
+            )
             
-            uids = self.conn.search(['ALL'])
-            server_mails = []
+            marker = self.session.query(MailFolderSyncState).filter_by(
+                user_id=self.user_id,
+                mail_account_id=self.account_id,
+                folder=folder
+            ).first()
             
-            if uids:
-                # Batch-Fetch ENVELOPEs
-                total_uids = len(uids)
-                
-                for i in range(0, total_uids, 500):
-                    # Progress: Batch-Update (nur wenn >500 Mails im Ordner)
-                    if total_uids > 500 and progress_callback:
-                        processed = min(i + 500, total_uids)
-                        percent = int((processed / total_uids) * 100)
-                        progress_callback(
-                            phase="state_sync_batch",
-                            message=f"Scanne Mails... {percent}%",
-                            processed=processed,
-                            total=total_uids,
+            if (
+                MAIL_SYNC_INCREMENTAL
+                and marker is not None
+                and uidvalidity is not None
+                and marker.uidvalidity == uidvalidity
+            ):
+                mail_count = self._sync_folder_incremental(
+                    folder, marker, uidvalidity, uidnext, exists, highestmodseq,
+                    stats, progress_callback
+                )
+            else:
+                mail_count = self._sync_folder_full(folder, uidvalidity, stats, progress_callback)
+                if uidvalidity is not None:
+                    if marker is None:
+                        marker = MailFolderSyncState(
+                            user_id=self.user_id,
+                            mail_account_id=self.account_id,
                             folder=folder
                         )
-                    
-                    batch_uids = uids[i:i+500]
-                    envelopes = self.conn.fetch(batch_uids, ['ENVELOPE', 'FLAGS'])
-                    
-                    for uid, data in envelopes.items():
-                        envelope = data.get(b'ENVELOPE')
-                        flags = data.get(b'FLAGS', [])
-                        
-                        message_id = self._extract_message_id(envelope)
-                        from_addr, subject, date = self._extract_envelope_data(envelope)
-                        date_str = date.isoformat() if date else None
-                        content_hash = compute_content_hash(date_str, from_addr, subject)
-                        
-                        flags_str = ' '.join(
-                            f.decode() if isinstance(f, bytes) else str(f) 
-                            for f in flags
-                        )
-                        
-                        server_mails.append(ServerMail(
-                            folder=folder,
-                            uid=uid,
-                            uidvalidity=uidvalidity,
-                            message_id=message_id,
-                            content_hash=content_hash,
-                            flags=flags_str,
-                            envelope_from=from_addr,
-                            envelope_subject=subject,
-                            envelope_date=date
-                        ))
+                        self.session.add(marker)
+                    marker.last_full_sync_at = datetime.now(UTC)
             
-            stats.mails_on_server += len(server_mails)
-            
-            # b) DELETE alle State-Einträge für diesen Ordner
-            deleted = self.session.query(MailServerState).filter(
-                MailServerState.user_id == self.user_id,
-                MailServerState.mail_account_id == self.account_id,
-                MailServerState.folder == folder
-            ).delete()
-            stats.state_deleted += deleted
-            
-            # c) INSERT alle Server-Mails
-            for mail in server_mails:
-                new_entry = MailServerState(
-                    user_id=self.user_id,
-                    mail_account_id=self.account_id,
-                    folder=mail.folder,
-                    uid=mail.uid,
-                    uidvalidity=mail.uidvalidity,
-                    message_id=mail.message_id,
-                    content_hash=mail.content_hash,
-                    envelope_from=mail.envelope_from,
-                    envelope_subject=mail.envelope_subject,
-                    envelope_date=mail.envelope_date,
-                    flags=mail.flags,
-                    is_deleted=False,
-                    first_seen_at=now,
-                    last_seen_at=now
-                )
-                self.session.add(new_entry)
-                stats.state_inserted += 1
+            # Marker erst nach erfolgreichem Abgleich fortschreiben
+            if marker is not None and uidvalidity is not None:
+                marker.uidvalidity = uidvalidity
+                marker.uidnext = uidnext
+                marker.highestmodseq = highestmodseq
+                marker.message_count = mail_count
             
             stats.folders_scanned += 1
-            logger.debug(f"  ✓ {folder}: {len(server_mails)} Mails (deleted {deleted}, inserted {len(server_mails)})")
+            stats.mails_on_server += mail_count
             
             # Return mail count für Progress-Callback
-            return len(server_mails)
+            return mail_count
             
         except IntegrityError as e:
             # UniqueViolation: Parallel läuft ein anderer Worker!
@@ -326,6 +328,218 @@ class MailSyncServiceV2:
             logger.warning(f"  ⚠️ {folder}: {e}")
             return 0  # Return 0 bei Fehler
     
+    def _sync_folder_full(
+        self,
+        folder: str,
+        uidvalidity: Optional[int],
+        stats: SyncStats,
+        progress_callback: Optional[callable] = None
+    ) -> int:
+        """Voller Abgleich: DELETE alle State-Einträge des Ordners + Bulk-INSERT"""
+        MailServerState = self.models.MailServerState
+        
+        uids = self.conn.search(['ALL'])
+        server_mails = self._fetch_server_mails(folder, uids, uidvalidity, progress_callback)
+        
+        deleted = self.session.query(MailServerState).filter(
+            MailServerState.user_id == self.user_id,
+            MailServerState.mail_account_id == self.account_id,
+            MailServerState.folder == folder
+        ).delete(synchronize_session=False)
+        stats.state_deleted += deleted
+        
+        self._insert_state_rows(server_mails)
+        stats.state_inserted += len(server_mails)
+        
+        logger.debug(f"  ✓ {folder}: {len(server_mails)} Mails (voll: deleted {deleted}, inserted {len(server_mails)})")
+        return len(server_mails)
+    
+    def _sync_folder_incremental(
+        self,
+        folder: str,
+        marker,
+        uidvalidity: int,
+        uidnext: Optional[int],
+        exists: Optional[int],
+        highestmodseq: Optional[int],
+        stats: SyncStats,
+        progress_callback: Optional[callable] = None
+    ) -> int:
+        """Inkrementeller Abgleich gegen die bekannten (uid, flags) des Ordners"""
+        MailServerState = self.models.MailServerState
+        now = datetime.now(UTC)
+        
+        folder_filter = (
+            MailServerState.user_id == self.user_id,
+            MailServerState.mail_account_id == self.account_id,
+            MailServerState.folder == folder,
+        )
+        
+        # Reste einer älteren UIDVALIDITY (z.B. abgebrochener Voll-Sync)
+        stale = self.session.query(MailServerState).filter(
+            *folder_filter, MailServerState.uidvalidity != uidvalidity
+        ).delete(synchronize_session=False)
+        
+        known: Dict[int, Optional[str]] = dict(
+            self.session.query(MailServerState.uid, MailServerState.flags).filter(
+                *folder_filter, MailServerState.uidvalidity == uidvalidity
+            )
+        )
+        
+        # a) Neue / gelöschte UIDs
+        if uidnext is not None and uidnext == marker.uidnext and exists == len(known):
+            # Kein APPEND seit dem letzten Sync und gleiche Anzahl → auch kein EXPUNGE
+            server_uids = set(known)
+        else:
+            server_uids = set(self.conn.search(['ALL']))
+        
+        new_uids = sorted(server_uids - known.keys())
+        gone_uids = sorted(known.keys() - server_uids)
+        remaining = server_uids & known.keys()
+        
+        # b) Flag-Änderungen der bekannten UIDs
+        changed_flags: Dict[int, str] = {}
+        if highestmodseq is not None and marker.highestmodseq is not None:
+            if remaining and highestmodseq != marker.highestmodseq:
+                response = self.conn.fetch(
+                    '1:*', ['FLAGS'], modifiers=[f'CHANGEDSINCE {marker.highestmodseq}']
+                )
+                for uid, data in response.items():
+                    if uid in remaining:
+                        changed_flags[uid] = _flags_to_str(data.get(b'FLAGS'))
+        elif remaining:
+            for batch_uids in _chunks(sorted(remaining), STATE_FETCH_BATCH):
+                for uid, data in self.conn.fetch(batch_uids, ['FLAGS']).items():
+                    if uid in remaining:
+                        changed_flags[uid] = _flags_to_str(data.get(b'FLAGS'))
+        changed_flags = {
+            uid: flags for uid, flags in changed_flags.items() if flags != (known[uid] or '')
+        }
+        
+        if not new_uids and not gone_uids and not changed_flags and not stale:
+            stats.folders_unchanged += 1
+            logger.debug(f"  ✓ {folder}: {len(remaining)} Mails (unverändert)")
+            return len(remaining)
+        
+        # c) ENVELOPE nur für neue UIDs
+        new_mails = self._fetch_server_mails(folder, new_uids, uidvalidity, progress_callback)
+        
+        # d) Set-basiert anwenden
+        deleted = stale
+        for batch_uids in _chunks(gone_uids, STATE_BULK_CHUNK):
+            deleted += self.session.query(MailServerState).filter(
+                *folder_filter,
+                MailServerState.uidvalidity == uidvalidity,
+                MailServerState.uid.in_(batch_uids)
+            ).delete(synchronize_session=False)
+        
+        # Ein UPDATE pro Flag-Kombination (typisch: "\Seen", "", "\Seen \Flagged")
+        uids_by_flags: Dict[str, List[int]] = {}
+        for uid, flags in changed_flags.items():
+            uids_by_flags.setdefault(flags, []).append(uid)
+        updated = 0
+        for flags, uids in uids_by_flags.items():
+            for batch_uids in _chunks(sorted(uids), STATE_BULK_CHUNK):
+                updated += self.session.query(MailServerState).filter(
+                    *folder_filter,
+                    MailServerState.uidvalidity == uidvalidity,
+                    MailServerState.uid.in_(batch_uids)
+                ).update({'flags': flags, 'last_seen_at': now}, synchronize_session=False)
+        
+        self._insert_state_rows(new_mails)
+        
+        stats.state_inserted += len(new_mails)
+        stats.state_updated += updated
+        stats.state_deleted += deleted
+        
+        mail_count = len(remaining) + len(new_mails)
+        logger.debug(
+            f"  ✓ {folder}: {mail_count} Mails (inkrementell: +{len(new_mails)}, "
+            f"~{updated}, -{deleted})"
+        )
+        return mail_count
+    
+    def _fetch_server_mails(
+        self,
+        folder: str,
+        uids: List[int],
+        uidvalidity: Optional[int],
+        progress_callback: Optional[callable] = None
+    ) -> List[ServerMail]:
+        """ENVELOPE + FLAGS für die angegebenen UIDs (in Batches)"""
+        server_mails = []
+        total_uids = len(uids)
+        
+        for i in range(0, total_uids, STATE_FETCH_BATCH):
+            # Progress: Batch-Update (nur wenn mehr als ein Batch)
+            if total_uids > STATE_FETCH_BATCH and progress_callback:
+                processed = min(i + STATE_FETCH_BATCH, total_uids)
+                percent = int((processed / total_uids) * 100)
+                progress_callback(
+                    phase="state_sync_batch",
+                    message=f"Scanne Mails... {percent}%",
+                    processed=processed,
+                    total=total_uids,
+                    folder=folder
+                )
+            
+            batch_uids = uids[i:i + STATE_FETCH_BATCH]
+            envelopes = self.conn.fetch(batch_uids, ['ENVELOPE', 'FLAGS'])
+            
+            for uid, data in envelopes.items():
+                envelope = data.get(b'ENVELOPE')
+                
+                message_id = self._extract_message_id(envelope)
+                from_addr, subject, date = self._extract_envelope_data(envelope)
+                date_str = date.isoformat() if date else None
+                content_hash = compute_content_hash(date_str, from_addr, subject)
+                
+                server_mails.append(ServerMail(
+                    folder=folder,
+                    uid=uid,
+                    uidvalidity=uidvalidity,
+                    message_id=message_id,
+                    content_hash=content_hash,
+                    flags=_flags_to_str(data.get(b'FLAGS', [])),
+                    envelope_from=from_addr,
+                    envelope_subject=subject,
+                    envelope_date=date
+                ))
+        
+        return server_mails
+    
+    def _insert_state_rows(self, server_mails: List[ServerMail]) -> None:
+        """Bulk-INSERT in mail_server_state (ohne ORM-Objekte pro Mail)"""
+        if not server_mails:
+            return
+        now = datetime.now(UTC)
+        self.session.bulk_insert_mappings(self.models.MailServerState, [
+            {
+                "user_id": self.user_id,
+                "mail_account_id": self.account_id,
+                "folder": mail.folder,
+                "uid": mail.uid,
+                "uidvalidity": mail.uidvalidity,
+                "message_id": mail.message_id,
+                "content_hash": mail.content_hash,
+                "envelope_from": mail.envelope_from,
+                "envelope_subject": mail.envelope_subject,
+                "envelope_date": mail.envelope_date,
+                "flags": mail.flags,
+                "is_deleted": False,
+                "first_seen_at": now,
+                "last_seen_at": now,
+            }
+            for mail in server_mails
+        ])
+    
+    def _has_condstore(self) -> bool:
+        """Server unterstützt CONDSTORE (RFC 7162) → HIGHESTMODSEQ / CHANGEDSINCE"""
+        try:
+            return bool(self.conn.has_capability('CONDSTORE'))
+        except Exception:
+            return False
+    
     def _get_known_folders(self) -> List[str]:
         """
         Gibt die Ordner zurück die bereits in mail_server_state bekannt sind.
@@ -479,8 +693,28 @@ class MailSyncServiceV2:
                     raw.deleted_at = now
                     stats.raw_deleted += 1
             
+            # Verlinkungen auf gelöschte raw_emails lösen: State-Zeilen bleiben beim
+            # inkrementellen Schritt 1 erhalten (früher setzte DELETE + INSERT sie zurück)
+            self.session.flush()
+            deleted_raw_ids = self.session.query(RawEmail.id).filter(
+                RawEmail.user_id == self.user_id,
+                RawEmail.mail_account_id == self.account_id,
+                RawEmail.deleted_at.isnot(None)
+            )
+            self.session.query(MailServerState).filter(
+                MailServerState.user_id == self.user_id,
+                MailServerState.mail_account_id == self.account_id,
+                MailServerState.raw_email_id.in_(deleted_raw_ids)
+            ).update({'raw_email_id': None}, synchronize_session=False)
+            
             self.session.commit()
             
+            if stats.raw_deleted:
+                # Semantic-Search-Index (falls in diesem Prozess geladen) verwerfen -
+                # MOVEs betreffen ihn nicht (Ordner-Filter laufen in SQL)
+                from src.services.embedding_index import EmbeddingIndexCache
+                EmbeddingIndexCache.invalidate(self.user_id)
+            
             logger.info(
                 f"✅ Schritt 3: {stats.raw_deleted} Duplikate/Orphans gelöscht, "
                 f"{stats.raw_updated} MOVE erkannt, {stats.raw_linked} verlinkt"
@@ -581,7 +815,10 @@ class MailSyncServiceV2:
         encrypted_subject: Optional[str] = None,
         encrypted_body: Optional[str] = None,
         received_at: Optional[datetime] = None,
-        flags: Optional[str] = None
+        flags: Optional[str] = None,
+        subject: Optional[str] = None,
+        sender: Optional[str] = None,
+        search_key: Optional[bytes] = None
     ) -> int:
         """
         SCHRITT 2: INSERT für gefetchte Mail - NUR in raw_emails!
@@ -591,7 +828,9 @@ class MailSyncServiceV2:
         - folder/uid updates → Schritt 3
         
         WICHTIG: Der Caller muss die verschlüsselten Felder übergeben!
-        Diese Methode macht keine Verschlüsselung.
+        Diese Methode macht keine Verschlüsselung. Mit search_key (und
+        Klartext-Betreff/Absender) wird die Mail direkt in den Blind-Index
+        der Suche geschrieben, sonst erst vom Login-Backfill.
         
         Args:
             folder: IMAP Ordner
@@ -604,6 +843,9 @@ class MailSyncServiceV2:
             encrypted_body: Verschlüsselter Body
             received_at: Empfangsdatum
             flags: IMAP Flags
+            subject: Betreff im Klartext (nur für den Such-Index)
+            sender: Absender im Klartext (nur für den Such-Index)
+            search_key: search_index.derive_search_key(Master-Key)
         
         Returns:
             raw_email_id
@@ -636,6 +878,12 @@ class MailSyncServiceV2:
         self.session.add(new_raw)
         self.session.flush()  # Get ID
         
+        if search_key:
+            search_index = importlib.import_module(".services.search_index", "src")
+            search_index.SearchIndexService.index_email(
+                self.session, new_raw, subject, sender, search_key=search_key
+            )
+        
         logger.debug(f"📥 Fetch INSERT: {folder}/{uid} (id={new_raw.id})")
         
         return new_raw.id
@@ -727,7 +975,9 @@ def run_full_sync(
         folders_scanned=stats1.folders_scanned,
         mails_on_server=stats1.mails_on_server,
         state_inserted=stats1.state_inserted,
+        state_updated=stats1.state_updated,
         state_deleted=stats1.state_deleted,
+        folders_unchanged=stats1.folders_unchanged,
         raw_updated=stats3.raw_updated,
         raw_deleted=stats3.raw_deleted,
         raw_linked=stats3.raw_linked,
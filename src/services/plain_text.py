@@ -0,0 +1,245 @@
+"""
+Plain Text Service - HTML→Text einmal pro Email, verschlüsselt persistiert
+
+Die HTML→Text-Konvertierung (inscriptis, 50-500 ms bei großen Marketing-Mails)
+lief bisher für dieselbe Mail mehrfach: beim Persistieren (Spracherkennung),
+in process_pending_raw_emails, in HybridPipeline.analyze und im
+ContentSanitizer - bei jedem Reprocess erneut.
+
+Jetzt:
+- EIN Konverter (html_to_plain_text) für alle Stellen
+- Ergebnis wird nach der Entschlüsselung einmal berechnet und als
+  raw_emails.encrypted_plain_body (Zero-Knowledge, gleicher Schlüssel wie
+  encrypted_body) mit plain_body_version gespeichert
+- Bestandsmails ohne (oder mit veralteter) Version werden lazy beim nächsten
+  Lesen nachgezogen (ensure) - kein Migrations-Lauf nötig
+
+PLAIN_TEXT_VERSION erhöhen, wenn sich die Konvertierung ändert: alle
+gespeicherten Texte gelten dann als veraltet und werden neu erzeugt.
+
+Usage:
+    from src.services.plain_text import PlainTextService, to_plain_text
+
+    plain = to_plain_text(body)                                  # nur konvertieren
+    plain = PlainTextService.ensure(raw_email, master_key)       # lesen oder nachziehen
+"""
+
+import html as html_module
+import importlib
+import logging
+import re
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Version der Konvertierung (gespeichert in raw_emails.plain_body_version)
+PLAIN_TEXT_VERSION = 1
+
+_HTML_MARKERS = ('<html', '<body', '<div', '<p ', '<p>', '<span', '<table', '<!doctype')
+
+
+def is_html(text: Optional[str]) -> bool:
+    """Prüft ob Text HTML enthält (typische Marker in den ersten 1000 Zeichen)"""
+    if not text:
+        return False
+    text_lower = text[:1000].lower()
+    return any(marker in text_lower for marker in _HTML_MARKERS)
+
+
+def html_to_plain_text(html: str) -> Tuple[str, str]:
+    """Konvertiert HTML zu sauberem Plain Text via inscriptis (optimiert für Emails).
+
+    Fallbacks: html2text → BeautifulSoup → Regex.
+
+    Returns:
+        tuple: (tool_name, plain_text)
+    """
+    if not html:
+        return ("none", "")
+
+    # Methode 1: inscriptis (beste Qualität für Emails)
+    try:
+        from inscriptis import get_text
+        from inscriptis.model.config import ParserConfig
+
+        # Konfiguration für Email-optimierte Ausgabe
+        config = ParserConfig(
+            display_links=False,     # Links NICHT ausschreiben (spart 30-50% Text)
+            display_images=False,    # Keine Bild-Platzhalter
+            display_anchors=False,   # Keine Anker
+            annotation_rules=None
+        )
+
+        text = get_text(html, config)
+
+        # Bereinige Whitespace
+        text = html_module.unescape(text)
+
+        # Entferne übermäßige Leerzeilen (max 2)
+        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+        text = text.strip()
+
+        # Bereinige Markdown-Link-Artefakte von inscriptis
+        text = re.sub(r'\[\s*([^\]]+)\s*\]\([^)]+\)', r'\1', text)  # [text](url) → text
+        text = re.sub(r'\s+\|\s+', ' | ', text)  # Normalisiere | Trennzeichen
+
+        logger.info(f"✅ HTML→Plain Text (inscriptis): {len(html)} chars → {len(text)} chars")
+        return ("inscriptis", text)
+
+    except ImportError:
+        logger.warning("⚠️ inscriptis nicht verfügbar, versuche html2text...")
+    except Exception as e:
+        logger.warning(f"⚠️ inscriptis fehlgeschlagen: {e}, versuche html2text...")
+
+    # Methode 2: html2text (Fallback)
+    try:
+        import html2text
+
+        h = html2text.HTML2Text()
+        h.ignore_links = False
+        h.ignore_images = True
+        h.ignore_emphasis = True
+        h.body_width = 0  # Keine Zeilenumbrüche erzwingen
+        h.unicode_snob = True
+        h.skip_internal_links = True
+
+        text = h.handle(html)
+
+        # Bereinige Markdown-Artefakte
+        text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)  # **bold** → bold
+        text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)  # [text](url) → text
+        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+        text = text.strip()
+
+        logger.info(f"✅ HTML→Plain Text (html2text): {len(html)} chars → {len(text)} chars")
+        return ("html2text", text)
+
+    except ImportError:
+        logger.warning("⚠️ html2text nicht verfügbar, versuche BeautifulSoup...")
+    except Exception as e:
+        logger.warning(f"⚠️ html2text fehlgeschlagen: {e}, versuche BeautifulSoup...")
+
+    # Methode 3: BeautifulSoup (Fallback)
+    try:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # Entferne Script und Style Tags
+        for tag in soup.find_all(['script', 'style', 'head', 'meta', 'link']):
+            tag.decompose()
+
+        # Ersetze <br> mit Zeilenumbrüchen
+        for br in soup.find_all('br'):
+            br.replace_with('\n')
+
+        # Füge Zeilenumbrüche nach Block-Elementen ein
+        for tag in soup.find_all(['p', 'div', 'tr', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+            tag.append('\n')
+
+        text = soup.get_text()
+
+        text = html_module.unescape(text)
+        text = re.sub(r'[^\S\n]+', ' ', text)
+        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+        lines = [line.strip() for line in text.split('\n')]
+        text = '\n'.join(lines)
+        text = text.strip()
+
+        logger.info(f"✅ HTML→Plain Text (BeautifulSoup): {len(html)} chars → {len(text)} chars")
+        return ("BeautifulSoup", text)
+
+    except ImportError:
+        logger.warning("⚠️ BeautifulSoup nicht verfügbar, Fallback auf Regex")
+    except Exception as e:
+        logger.warning(f"⚠️ BeautifulSoup fehlgeschlagen: {e}, Fallback auf Regex")
+
+    # Methode 4: Regex (letzter Fallback)
+    text = clean_html_fallback(html)
+    logger.info(f"✅ HTML→Plain Text (regex-fallback): {len(html)} chars → {len(text)} chars")
+    return ("regex-fallback", text)
+
+
+def clean_html_fallback(text: str) -> str:
+    """Fallback: Bereinigt HTML-Tags und Entities via Regex (wenn BeautifulSoup nicht verfügbar)."""
+    if not text:
+        return text
+    # HTML-Tags entfernen (mit Zeilenumbruch für Block-Tags)
+    text = re.sub(r'<br\s*/?>', '\n', text, flags=re.IGNORECASE)
+    text = re.sub(r'</p>', '\n', text, flags=re.IGNORECASE)
+    text = re.sub(r'</div>', '\n', text, flags=re.IGNORECASE)
+    text = re.sub(r'</tr>', '\n', text, flags=re.IGNORECASE)
+    text = re.sub(r'<[^>]+>', '', text)
+    # HTML-Entities
+    text = re.sub(r'&nbsp;', ' ', text)
+    text = re.sub(r'&amp;', '&', text)
+    text = re.sub(r'&lt;', '<', text)
+    text = re.sub(r'&gt;', '>', text)
+    text = re.sub(r'&#43;', '+', text)
+    text = re.sub(r'&#8211;', '–', text)
+    text = re.sub(r'&#8230;', '…', text)
+    text = re.sub(r'&#\d+;', '', text)
+    text = re.sub(r'&\w+;', '', text)
+    # Outlook XML
+    text = re.sub(r'<o:[^>]*>', '', text)
+    text = re.sub(r'</o:[^>]*>', '', text)
+    # Bereinige Whitespace
+    text = re.sub(r'[^\S\n]+', ' ', text)
+    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+    lines = [line.strip() for line in text.split('\n')]
+    text = '\n'.join(lines)
+    return text.strip()
+
+
+def to_plain_text(body: Optional[str]) -> Optional[str]:
+    """Body als Plain Text - HTML wird konvertiert, Text unverändert zurückgegeben"""
+    if not is_html(body):
+        return body
+    return html_to_plain_text(body)[1]
+
+
+class PlainTextService:
+    """Lesen/Schreiben des persistierten Plain Texts (raw_emails.encrypted_plain_body)"""
+
+    @staticmethod
+    def load(raw_email, master_key: str) -> Optional[str]:
+        """Gespeicherter Plain Text, None wenn fehlend oder veraltete Version"""
+        if raw_email.plain_body_version != PLAIN_TEXT_VERSION or raw_email.encrypted_plain_body is None:
+            return None
+        encryption = importlib.import_module(".08_encryption", "src")
+        return encryption.EmailDataManager.decrypt_email_body(raw_email.encrypted_plain_body, master_key)
+
+    @staticmethod
+    def store(raw_email, plain_body: Optional[str], master_key: str) -> None:
+        """Plain Text verschlüsselt am RawEmail setzen (Caller committed)"""
+        encryption = importlib.import_module(".08_encryption", "src")
+        raw_email.encrypted_plain_body = encryption.EmailDataManager.encrypt_email_body(
+            plain_body or "", master_key
+        )
+        raw_email.plain_body_version = PLAIN_TEXT_VERSION
+
+    @staticmethod
+    def ensure(raw_email, master_key: str, decrypted_body: Optional[str] = None) -> str:
+        """Plain Text lesen oder (lazy Backfill) einmalig erzeugen und speichern
+
+        Args:
+            raw_email: RawEmail (Caller committed)
+            master_key: Master-Key des Users
+            decrypted_body: Bereits entschlüsselter Body (spart Entschlüsselung)
+        """
+        try:
+            plain_body = PlainTextService.load(raw_email, master_key)
+        except Exception as e:
+            logger.warning(f"⚠️ Plain Text von RawEmail {raw_email.id} nicht lesbar, neu erzeugen: {e}")
+            plain_body = None
+        if plain_body is not None:
+            return plain_body
+
+        if decrypted_body is None:
+            encryption = importlib.import_module(".08_encryption", "src")
+            decrypted_body = encryption.EmailDataManager.decrypt_email_body(
+                raw_email.encrypted_body or "", master_key
+            )
+        plain_body = to_plain_text(decrypted_body) or ""
+        PlainTextService.store(raw_email, plain_body, master_key)
+        return plain_body
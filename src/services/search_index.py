@@ -0,0 +1,338 @@
+"""
+Search Index Service - Blind-Index für Betreff/Absender-Suche
+
+Zero-Knowledge-kompatible Suche über verschlüsselte Felder: Statt bei jeder
+Suche alle Emails zu entschlüsseln, werden beim Persistieren HMAC-Tokens der
+normalisierten Wörter (und Wort-Präfixe) aus Betreff + Absender in
+email_search_tokens geschrieben. Die Suche ist dann ein indizierter SQL-Lookup
+(user_id, token) - mit korrekter Pagination, ohne Entschlüsselung.
+
+Token:
+    HMAC-SHA256(search_key, "<kind>:<wort>")[:32 hex]
+    kind "w" = ganzes Wort, "p" = Präfix (SEARCH_INDEX_MIN_PREFIX..MAX_PREFIX)
+    search_key = HMAC-SHA256(Master-Key/DEK des Users, Kontext) - ohne den
+    Master-Key sind Tokens weder berechenbar noch auf Klartext rückführbar.
+
+Semantik:
+    Jedes Query-Wort muss als Wort-Präfix in Betreff oder Absender vorkommen
+    (AND): "rechn müll" findet "Rechnung von Müller". Wörter unter MIN_PREFIX
+    bzw. über MAX_PREFIX Zeichen matchen nur als ganzes Wort. Teilstrings
+    mitten im Wort ("chnung") werden - anders als die frühere Suche über
+    entschlüsselte Texte - nicht gefunden.
+
+Bestand (search_indexed_at IS NULL, z.B. Mails vor Einführung des Index):
+    Indexiert der Celery-Task backfill_search_index im Hintergrund (beim Login
+    gestartet). Bis dahin werden diese Emails bei der Suche entschlüsselt und
+    mit derselben Semantik geprüft (text_matches) - Ergebnisse bleiben
+    vollständig, der Web-Request schreibt nichts.
+
+Usage:
+    from src.services.search_index import SearchIndexService
+
+    # Beim Persistieren (Klartext verfügbar)
+    SearchIndexService.index_email(session, raw_email, subject, sender, master_key)
+
+    # Suche (Subquery mit RawEmail-IDs)
+    ids = SearchIndexService.matching_email_ids(session, user_id, "rechnung", master_key)
+    query = query.filter(RawEmail.id.in_(ids))
+
+    # Bestand nachindexieren (Celery-Task, commit pro Batch)
+    SearchIndexService.backfill(session, user_id, master_key)
+"""
+
+import base64
+import hashlib
+import hmac
+import importlib
+import logging
+import os
+import re
+import unicodedata
+from datetime import datetime, UTC
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import func, select, union
+from sqlalchemy.orm import Session
+
+models = importlib.import_module(".02_models", "src")
+encryption = importlib.import_module(".08_encryption", "src")
+
+logger = logging.getLogger(__name__)
+
+# Präfix-Tokens für Wörter ab MIN_PREFIX bis MAX_PREFIX Zeichen (0 = nur ganze Wörter)
+SEARCH_INDEX_MIN_PREFIX = 3
+SEARCH_INDEX_MAX_PREFIX = int(os.getenv("SEARCH_INDEX_MAX_PREFIX", "12"))
+# Emails pro Batch beim Entschlüsseln nicht indexierter Emails (Backfill/Fallback)
+SEARCH_INDEX_SCAN_BATCH = 500
+
+_KEY_CONTEXT = b"ki-mail-helper/search-index/v1"
+_WORD_RE = re.compile(r"\w+")
+
+
+def derive_search_key(master_key: str) -> bytes:
+    """Leitet den Such-Key aus dem Master-Key (DEK) ab - getrennt vom Verschlüsselungs-Key"""
+    return hmac.new(base64.b64decode(master_key), _KEY_CONTEXT, hashlib.sha256).digest()
+
+
+def normalize_words(text: Optional[str]) -> List[str]:
+    """Wörter für den Index: Unicode NFKC, casefold, an Nicht-Wortzeichen getrennt
+
+    "Max.Mustermann@Firma.de" → ["max", "mustermann", "firma", "de"]
+    """
+    return _WORD_RE.findall(unicodedata.normalize("NFKC", text or "").casefold())
+
+
+def _token(key: bytes, kind: str, value: str) -> str:
+    return hmac.new(key, f"{kind}:{value}".encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def text_tokens(key: bytes, *texts: Optional[str]) -> Set[str]:
+    """Alle Index-Tokens (Wörter + Präfixe) für die gegebenen Texte"""
+    tokens: Set[str] = set()
+    for text in texts:
+        for word in normalize_words(text):
+            tokens.add(_token(key, "w", word))
+            for length in range(SEARCH_INDEX_MIN_PREFIX, min(len(word), SEARCH_INDEX_MAX_PREFIX) + 1):
+                tokens.add(_token(key, "p", word[:length]))
+    return tokens
+
+
+def _word_matches(query_word: str, words: Set[str]) -> bool:
+    if SEARCH_INDEX_MIN_PREFIX <= len(query_word) <= SEARCH_INDEX_MAX_PREFIX:
+        return any(word.startswith(query_word) for word in words)
+    return query_word in words
+
+
+def text_matches(query: str, *texts: Optional[str]) -> bool:
+    """Klartext-Gegenstück zu query_tokens/text_tokens (gleiche Semantik)"""
+    query_words = list(dict.fromkeys(normalize_words(query)))
+    if not query_words:
+        return False
+    words = {word for text in texts for word in normalize_words(text)}
+    return all(_word_matches(query_word, words) for query_word in query_words)
+
+
+def query_tokens(key: bytes, query: str) -> List[str]:
+    """Ein Token pro (eindeutigem) Query-Wort - alle müssen matchen"""
+    tokens = []
+    for word in dict.fromkeys(normalize_words(query)):
+        if SEARCH_INDEX_MIN_PREFIX <= len(word) <= SEARCH_INDEX_MAX_PREFIX:
+            tokens.append(_token(key, "p", word))
+        else:
+            tokens.append(_token(key, "w", word))
+    return tokens
+
+
+class SearchIndexService:
+    """Schreiben und Abfragen des Blind-Index (email_search_tokens)"""
+
+    @staticmethod
+    def index_email(
+        session: Session,
+        raw_email,
+        subject: Optional[str],
+        sender: Optional[str],
+        master_key: Optional[str] = None,
+        search_key: Optional[bytes] = None,
+    ) -> int:
+        """Schreibt die Tokens einer Email (ersetzt vorhandene)
+
+        Args:
+            session: SQLAlchemy Session (Caller committed)
+            raw_email: RawEmail mit ID (nach flush)
+            subject: Betreff im Klartext
+            sender: Absender im Klartext
+            master_key: Master-Key des Users (oder search_key direkt)
+            search_key: Bereits abgeleiteter Such-Key (für Batches)
+
+        Returns:
+            Anzahl geschriebener Tokens
+        """
+        key = search_key or derive_search_key(master_key)
+        tokens = text_tokens(key, subject, sender)
+
+        session.query(models.EmailSearchToken).filter_by(
+            raw_email_id=raw_email.id
+        ).delete(synchronize_session=False)
+        if tokens:
+            session.bulk_insert_mappings(models.EmailSearchToken, [
+                {"user_id": raw_email.user_id, "raw_email_id": raw_email.id, "token": token}
+                for token in tokens
+            ])
+        raw_email.search_indexed_at = datetime.now(UTC)
+        return len(tokens)
+
+    @staticmethod
+    def index_new_emails(session: Session, items: Iterable[tuple], search_key: bytes) -> int:
+        """Tokens für frisch eingefügte Emails in EINEM Bulk-INSERT
+
+        Kein Löschen vorhandener Tokens (neue IDs haben keine); search_indexed_at
+        setzt der Caller direkt in der Insert-Zeile.
+
+        Args:
+            items: (raw_email_id, user_id, subject, sender) Tupel
+
+        Returns:
+            Anzahl geschriebener Tokens
+        """
+        mappings = [
+            {"user_id": user_id, "raw_email_id": raw_email_id, "token": token}
+            for raw_email_id, user_id, subject, sender in items
+            for token in text_tokens(search_key, subject, sender)
+        ]
+        if mappings:
+            session.bulk_insert_mappings(models.EmailSearchToken, mappings)
+        return len(mappings)
+
+    @staticmethod
+    def has_unindexed(session: Session, user_id: int) -> bool:
+        """True wenn der User Emails ohne Tokens hat (Backfill ausstehend)"""
+        return session.query(
+            session.query(models.RawEmail.id)
+            .filter(
+                models.RawEmail.user_id == user_id,
+                models.RawEmail.search_indexed_at.is_(None),
+            )
+            .exists()
+        ).scalar()
+
+    @staticmethod
+    def backfill(
+        session: Session,
+        user_id: int,
+        master_key: str,
+        limit: Optional[int] = None,
+        batch_size: int = SEARCH_INDEX_SCAN_BATCH,
+        on_batch=None,
+    ) -> int:
+        """Indexiert Emails ohne Tokens (Bestand vor Einführung des Index)
+
+        Entschlüsselt nur Betreff + Absender und committed pro Batch. Läuft im
+        Celery-Task backfill_search_index, nicht im Web-Request.
+
+        Args:
+            limit: Max. Emails (None = alle)
+            on_batch: Optional callback(indexed) nach jedem Commit (Progress)
+
+        Returns:
+            Anzahl indexierter Emails
+        """
+        key = derive_search_key(master_key)
+        decryptor = encryption.BatchDecryptor(master_key)
+        indexed = 0
+
+        while limit is None or indexed < limit:
+            batch_limit = batch_size if limit is None else min(batch_size, limit - indexed)
+            batch = (
+                session.query(models.RawEmail)
+                .filter(
+                    models.RawEmail.user_id == user_id,
+                    models.RawEmail.search_indexed_at.is_(None),
+                )
+                .order_by(models.RawEmail.id)
+                .limit(batch_limit)
+                .all()
+            )
+            if not batch:
+                break
+
+            for raw_email in batch:
+                try:
+                    subject, sender = decryptor.decrypt_many(
+                        (raw_email.encrypted_subject, raw_email.encrypted_sender)
+                    )
+                except Exception as e:
+                    # Nicht entschlüsselbar → ohne Tokens markieren (sonst Endlosschleife)
+                    logger.warning(f"⚠️  Suchindex: RawEmail {raw_email.id} nicht entschlüsselbar: {e}")
+                    subject = sender = None
+                SearchIndexService.index_email(session, raw_email, subject, sender, search_key=key)
+
+            session.commit()
+            indexed += len(batch)
+            if on_batch:
+                on_batch(indexed)
+
+        if indexed:
+            logger.info(f"🔎 Suchindex: {indexed} Emails für User {user_id} nachindexiert")
+        return indexed
+
+    @staticmethod
+    def match_unindexed(session: Session, user_id: int, query: str, master_key: str) -> List[int]:
+        """IDs nicht indexierter Emails, deren Betreff/Absender passen (Entschlüsselung, read-only)"""
+        decryptor = encryption.BatchDecryptor(master_key)
+        RawEmail = models.RawEmail
+        matches: List[int] = []
+        last_id = 0
+        while True:
+            rows = (
+                session.query(RawEmail.id, RawEmail.encrypted_subject, RawEmail.encrypted_sender)
+                .filter(
+                    RawEmail.user_id == user_id,
+                    RawEmail.search_indexed_at.is_(None),
+                    RawEmail.id > last_id,
+                )
+                .order_by(RawEmail.id)
+                .limit(SEARCH_INDEX_SCAN_BATCH)
+                .all()
+            )
+            if not rows:
+                break
+            for raw_email_id, encrypted_subject, encrypted_sender in rows:
+                try:
+                    subject, sender = decryptor.decrypt_many((encrypted_subject, encrypted_sender))
+                except Exception:
+                    continue
+                if text_matches(query, subject, sender):
+                    matches.append(raw_email_id)
+            last_id = rows[-1][0]
+        return matches
+
+    @staticmethod
+    def matching_email_ids(
+        session: Session,
+        user_id: int,
+        query: str,
+        master_key: str,
+        include_unindexed: bool = True,
+    ):
+        """Subquery der RawEmail-IDs, deren Betreff/Absender alle Query-Wörter enthalten
+
+        Args:
+            include_unindexed: Noch nicht indexierte Emails per Entschlüsselung
+                prüfen (vollständige Ergebnisse, solange der Backfill läuft)
+
+        Returns:
+            SQLAlchemy Select (für RawEmail.id.in_(...)) oder None bei leerer Query
+        """
+        tokens = query_tokens(derive_search_key(master_key), query)
+        if not tokens:
+            return None
+
+        Token = models.EmailSearchToken
+        indexed = (
+            select(Token.raw_email_id)
+            .where(Token.user_id == user_id, Token.token.in_(tokens))
+            .group_by(Token.raw_email_id)
+            .having(func.count(func.distinct(Token.token)) == len(tokens))
+        )
+        if not include_unindexed or not SearchIndexService.has_unindexed(session, user_id):
+            return indexed
+
+        unindexed_ids = SearchIndexService.match_unindexed(session, user_id, query, master_key)
+        logger.debug(f"🔎 Suchindex unvollständig (User {user_id}): {len(unindexed_ids)} Treffer per Entschlüsselung")
+        if not unindexed_ids:
+            return indexed
+        return union(
+            indexed,
+            select(models.RawEmail.id).where(models.RawEmail.id.in_(unindexed_ids)),
+        )
+
+    @staticmethod
+    def delete_for_emails(session: Session, raw_email_ids: Iterable[int]) -> int:
+        """Entfernt Tokens (z.B. vor einem Re-Index)"""
+        raw_email_ids = list(raw_email_ids)
+        if not raw_email_ids:
+            return 0
+        return session.query(models.EmailSearchToken).filter(
+            models.EmailSearchToken.raw_email_id.in_(raw_email_ids)
+        ).delete(synchronize_session=False)
@@ -0,0 +1,175 @@
+"""
+spaCy Context - ein Modell, ein Parse pro Text und Email
+
+Bisher hatte jede Komponente ihr eigenes Modell-Handle (HybridPipeline:
+de_core_news_md, UrgencyBooster: de_core_news_sm, ContentSanitizer: md/sm)
+und die fünf NLP-Detektoren der HybridPipeline haben denselben Text je
+einmal geparst. spaCy-Parsing ist der größte CPU-Anteil der Worker.
+
+Jetzt:
+- get_nlp(): ein prozessweites Modell (SPACY_MODEL, Fallback de_core_news_sm)
+- doc_scope(): Doc-Cache für die Dauer der Verarbeitung einer Email -
+  parse() liefert für denselben Text (und dasselbe Modell) dasselbe Doc
+- parse_many(): nlp.pipe (n_process/batch_size) für viele Texte auf einmal,
+  füllt den aktiven Scope vor bzw. liefert Docs für enter_email_scope()
+
+Ohne aktiven Scope parst parse() direkt (Verhalten wie vorher).
+
+Usage:
+    from src.services import spacy_context
+
+    with spacy_context.doc_scope():
+        doc = spacy_context.parse(text)     # parst
+        doc = spacy_context.parse(text)     # aus dem Scope
+
+    # Schleifen: Texte des Batches vorab per nlp.pipe parsen, dann
+    # pro Email ein eigener (vorgefüllter) Scope, im finally geschlossen
+    docs = spacy_context.parse_many(texts)
+    token = spacy_context.enter_email_scope({texts[i]: docs[i]})
+    try:
+        ...
+    finally:
+        spacy_context.exit_scope(token)
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SPACY_MODEL = os.getenv("SPACY_MODEL", "de_core_news_md")
+# nlp.pipe in parse_many: Prozesse (1 = im Worker-Prozess) und Texte pro Batch
+SPACY_N_PROCESS = max(1, int(os.getenv("SPACY_N_PROCESS", "1")))
+SPACY_PIPE_BATCH_SIZE = max(1, int(os.getenv("SPACY_PIPE_BATCH_SIZE", "32")))
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def get_nlp():
+    """Prozessweites spaCy-Modell (lazy, thread-safe), None wenn nicht verfügbar"""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                _nlp = _load_model()
+    return _nlp if _nlp else None
+
+
+def _load_model():
+    try:
+        import spacy
+    except ImportError as e:
+        logger.warning(f"⚠️ spaCy nicht verfügbar: {e}")
+        return False
+    for model_name in dict.fromkeys((SPACY_MODEL, "de_core_news_sm")):
+        try:
+            nlp = spacy.load(model_name)
+            logger.info(f"✅ spaCy Model geladen (geteilt): {model_name}")
+            return nlp
+        except OSError:
+            logger.warning(f"⚠️ {model_name} nicht verfügbar")
+    logger.error("❌ Kein spaCy Modell verfügbar!")
+    return False
+
+
+class DocScope:
+    """Docs einer Email, Key = (Modell, Text)"""
+
+    def __init__(self):
+        self.docs: Dict[tuple, object] = {}
+        self.parsed = 0
+        self.reused = 0
+
+
+_scope: ContextVar[Optional[DocScope]] = ContextVar("spacy_doc_scope", default=None)
+
+
+@contextmanager
+def doc_scope():
+    """Doc-Cache für einen Block; verschachtelt wird der äußere Scope genutzt"""
+    current = _scope.get()
+    if current is not None:
+        yield current
+        return
+    token = _scope.set(DocScope())
+    try:
+        yield _scope.get()
+    finally:
+        _scope.reset(token)
+
+
+def enter_email_scope(preparsed: Optional[Dict[str, object]] = None, nlp=None) -> Token:
+    """Eigener Scope für eine Email (auch innerhalb eines äußeren Scopes)
+
+    Für Schleifen, die sich nicht in einen with-Block fassen lassen -
+    immer mit exit_scope(token) im finally schließen.
+
+    Args:
+        preparsed: Optional {Text: Doc} aus parse_many() - parse() trifft dann den Cache
+        nlp: Modell, mit dem preparsed erzeugt wurde (Default: get_nlp())
+    """
+    scope = DocScope()
+    if preparsed:
+        nlp = nlp or get_nlp()
+        scope.docs.update(((id(nlp), text), doc) for text, doc in preparsed.items())
+    return _scope.set(scope)
+
+
+def exit_scope(token: Token) -> None:
+    """Scope schließen (Docs freigeben) und den vorherigen wiederherstellen"""
+    _scope.reset(token)
+
+
+def parse(text: str, nlp=None):
+    """Doc für text - im aktiven Scope nur einmal geparst
+
+    Args:
+        text: Zu parsender Text (Aufrufer kürzt selbst, z.B. text[:2000])
+        nlp: Modell (Default: get_nlp())
+    """
+    nlp = nlp or get_nlp()
+    scope = _scope.get()
+    if scope is None:
+        return nlp(text)
+    key = (id(nlp), text)
+    doc = scope.docs.get(key)
+    if doc is None:
+        doc = scope.docs[key] = nlp(text)
+        scope.parsed += 1
+    else:
+        scope.reused += 1
+    return doc
+
+
+def parse_many(
+    texts: Iterable[str],
+    nlp=None,
+    n_process: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> List[object]:
+    """Viele Texte per nlp.pipe parsen (Reihenfolge wie texts)
+
+    Im aktiven Scope werden bereits geparste Texte übersprungen und die
+    neuen Docs dort abgelegt - nachfolgende parse()-Aufrufe treffen den Cache.
+    """
+    nlp = nlp or get_nlp()
+    texts = list(texts)
+    scope = _scope.get()
+    docs = scope.docs if scope is not None else {}
+    missing = [text for text in dict.fromkeys(texts) if (id(nlp), text) not in docs]
+    if missing:
+        piped = nlp.pipe(
+            missing,
+            n_process=n_process or SPACY_N_PROCESS,
+            batch_size=batch_size or SPACY_PIPE_BATCH_SIZE,
+        )
+        for text, doc in zip(missing, piped):
+            docs[(id(nlp), text)] = doc
+        if scope is not None:
+            scope.parsed += len(missing)
+    return [docs[(id(nlp), text)] for text in texts]
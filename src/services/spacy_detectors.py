@@ -3,17 +3,22 @@ Phase Y2: spaCy Hybrid Detectors
 Intelligente NLP-basierte Detection für Urgency/Importance Scoring.
 """
 
-import spacy
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
 import re
 
+from src.services import spacy_context
+
 
 class SpacyDetectorBase:
-    """Base Class für alle spaCy Detectors."""
+    """Base Class für alle spaCy Detectors.
+
+    Parsen über spacy_context.parse: im aktiven doc_scope teilen sich alle
+    Detektoren das Doc desselben Texts (ein Parse statt fünf pro Email).
+    """
 
     def __init__(self, nlp=None):
-        self.nlp = nlp or spacy.load("de_core_news_md")
+        self.nlp = nlp or spacy_context.get_nlp()
 
     def analyze(self, text: str) -> Dict:
         """
@@ -58,7 +63,7 @@ class ImperativeDetector(SpacyDetectorBase):
                 "details": "2 Imperative erkannt: prüfen, freigeben"
             }
         """
-        doc = self.nlp(text[:2000])  # Limit für Performance
+        doc = spacy_context.parse(text[:2000], self.nlp)  # Limit für Performance
         imperatives = []
 
         # Deutsche Imperative sind schwierig für spaCy
@@ -175,7 +180,7 @@ class DeadlineDetector(SpacyDetectorBase):
                 "details": "Deadline in 2 Tagen: Freitag"
             }
         """
-        doc = self.nlp(text[:2000])
+        doc = spacy_context.parse(text[:2000], self.nlp)
         deadlines = []
         urgency_boost = 0
 
@@ -279,7 +284,7 @@ class KeywordDetector(SpacyDetectorBase):
                 "details": "2x Urgency-Time, 1x Eskalation"
             }
         """
-        doc = self.nlp(text[:2000])
+        doc = spacy_context.parse(text[:2000], self.nlp)
         lemmas = [token.lemma_.lower() for token in doc if not token.is_punct]
 
         matched_sets = {}
@@ -341,7 +346,7 @@ class QuestionDetector(SpacyDetectorBase):
                 "details": "3 Fragen erkannt (Info-Anfrage)"
             }
         """
-        doc = self.nlp(text[:2000])
+        doc = spacy_context.parse(text[:2000], self.nlp)
 
         question_count = 0
 
@@ -397,7 +402,7 @@ class NegationDetector(SpacyDetectorBase):
                 "details": "2 Negationen: nicht, kein"
             }
         """
-        doc = self.nlp(text[:2000])
+        doc = spacy_context.parse(text[:2000], self.nlp)
 
         negations = []
 
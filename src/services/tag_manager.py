@@ -15,11 +15,17 @@ Phase 11c: Tag-Embeddings für semantische Ähnlichkeit
 
 from datetime import datetime, UTC
 from typing import List, Optional, Tuple, Dict, Any
+from collections import Counter
+from cachetools import TTLCache
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 import numpy as np
+import hashlib
 import logging
 import importlib
+import os
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +72,196 @@ def get_suggestion_threshold(total_tags: int) -> float:
         return 0.80
 
 
+# ============================================================================
+# 🚀 PERFORMANCE: Cache-Budget für TagEmbeddingCache (langlebige Worker)
+# ============================================================================
+
+# Speicher-Budget (MB) je Cache: Tag-Embeddings und gestapelte Tag-Matrizen
+TAG_CACHE_MAX_MB = float(os.getenv("TAG_EMBEDDING_CACHE_MB", "64"))
+# Einträge die länger nicht benutzt wurden verfallen (inaktive User)
+TAG_CACHE_TTL_SECONDS = int(os.getenv("TAG_EMBEDDING_CACHE_TTL", "3600"))
+# Max. User mit eigenem Embedding-Client / Model-Eintrag
+TAG_CACHE_MAX_USERS = int(os.getenv("TAG_EMBEDDING_CACHE_MAX_USERS", "256"))
+# Optional: generierte Tag-Embeddings prozessübergreifend via Redis teilen
+TAG_SHARED_CACHE_ENABLED = os.getenv("TAG_EMBEDDING_SHARED_CACHE", "false").lower() == "true"
+TAG_SHARED_CACHE_TTL_SECONDS = int(os.getenv("TAG_EMBEDDING_SHARED_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+class _CountingTTLCache(TTLCache):
+    """TTLCache (LRU + TTL) der Evictions mitzählt"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.evictions = 0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        self.evictions += len(expired)
+        return expired
+
+
+class TagMatrix:
+    """Phase F.2: Alle Tag-Embeddings eines Users als gestapelte Matrix
+
+    Statt pro Email über alle Tags zu iterieren (Similarity, Negative-Similarity,
+    Penalty, Thresholds einzeln) wird eine Email - oder ein ganzer Batch - mit
+    einer Matrix-Multiplikation gegen alle Tags bewertet:
+
+        positive:  (T, d) normalisierte Tag-Embeddings
+        negative:  (T, d) normalisierte negative Embeddings (0-Zeile = keins)
+        Thresholds, negative_count: (T,) Vektoren
+
+    Tags ohne Embedding oder mit abweichender Dimension fehlen in der Matrix
+    (entspricht Similarity 0.0 → werden nie vorgeschlagen).
+    """
+
+    def __init__(
+        self,
+        tag_ids: np.ndarray,
+        names: List[str],
+        sources: List[str],
+        positive: np.ndarray,
+        negative: np.ndarray,
+        has_negative: np.ndarray,
+        negative_counts: np.ndarray,
+        suggest_thresholds: np.ndarray,
+        auto_thresholds: np.ndarray,
+        fingerprint: tuple = (),
+        model: Optional[str] = None,
+        total_tags: Optional[int] = None,
+    ):
+        self.tag_ids = tag_ids
+        self.names = names
+        self.sources = sources
+        self.positive = positive
+        self.negative = negative
+        self.has_negative = has_negative
+        self.negative_counts = negative_counts
+        self.suggest_thresholds = suggest_thresholds
+        self.auto_thresholds = auto_thresholds
+        self.fingerprint = fingerprint
+        self.model = model
+        self.total_tags = total_tags if total_tags is not None else len(tag_ids)
+
+    @property
+    def size(self) -> int:
+        return len(self.tag_ids)
+
+    @property
+    def dim(self) -> int:
+        return self.positive.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self.positive.nbytes + self.negative.nbytes + self.tag_ids.nbytes
+            + self.negative_counts.nbytes + self.suggest_thresholds.nbytes
+            + self.auto_thresholds.nbytes + self.has_negative.nbytes
+        )
+
+    @staticmethod
+    def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    @classmethod
+    def build(
+        cls,
+        tags: List[models.EmailTag],
+        embeddings: List[Optional[np.ndarray]],
+        fingerprint: tuple = (),
+        model: Optional[str] = None,
+    ) -> "TagMatrix":
+        """Stapelt Tag-Embeddings (aus TagEmbeddingCache.get_tag_embedding)"""
+        dims = Counter(len(e) for e in embeddings if e is not None and len(e) > 0)
+        dim = dims.most_common(1)[0][0] if dims else 0
+        
+        rows = [
+            (tag, emb) for tag, emb in zip(tags, embeddings)
+            if emb is not None and len(emb) == dim
+        ]
+        skipped = sum(1 for e in embeddings if e is not None and len(e) != dim)
+        if skipped:
+            logger.error(
+                f"❌ DIMENSIONS-MISMATCH: {skipped} Tag-Embeddings ≠ {dim} dims werden ignoriert. "
+                f"Wahrscheinlich Model-Wechsel ohne Tag-Reset!"
+            )
+        
+        positive = np.zeros((len(rows), dim), dtype=np.float32)
+        negative = np.zeros((len(rows), dim), dtype=np.float32)
+        has_negative = np.zeros(len(rows), dtype=bool)
+        negative_counts = np.zeros(len(rows), dtype=np.float32)
+        suggest_thresholds = np.zeros(len(rows), dtype=np.float32)
+        auto_thresholds = np.zeros(len(rows), dtype=np.float32)
+        sources = []
+        
+        for i, (tag, emb) in enumerate(rows):
+            positive[i] = emb
+            if tag.negative_embedding:
+                try:
+                    neg = np.frombuffer(tag.negative_embedding, dtype=np.float32)
+                    if len(neg) == dim:
+                        negative[i] = neg
+                        has_negative[i] = True
+                except Exception as e:
+                    logger.warning(f"Negative-Embedding von Tag '{tag.name}' unlesbar: {e}")
+            negative_counts[i] = tag.negative_count or 0
+            suggest_thresholds[i], auto_thresholds[i] = TagEmbeddingCache._get_thresholds_for_tag(tag)
+            if tag.learned_embedding:
+                sources.append("learned")
+            elif tag.description:
+                sources.append("description")
+            else:
+                sources.append("name")
+        
+        return cls(
+            tag_ids=np.array([tag.id for tag, _ in rows], dtype=np.int64),
+            names=[tag.name for tag, _ in rows],
+            sources=sources,
+            positive=cls._normalize_rows(positive),
+            negative=cls._normalize_rows(negative),
+            has_negative=has_negative,
+            negative_counts=negative_counts,
+            suggest_thresholds=suggest_thresholds,
+            auto_thresholds=auto_thresholds,
+            fingerprint=fingerprint,
+            model=model,
+            total_tags=len(tags),
+        )
+
+    def score(self, email_embeddings: np.ndarray, max_penalty: float = 0.20) -> Tuple[np.ndarray, np.ndarray]:
+        """Bewertet n Emails gegen alle Tags in einem Schritt
+
+        Args:
+            email_embeddings: (n, d) oder (d,) Email-Embeddings (nicht normalisiert)
+            max_penalty: Maximale Negative-Feedback-Penalty
+
+        Returns:
+            (similarities, penalties) jeweils (n, T) - similarities bereits
+            um die Penalty reduziert (identisch zu calculate_negative_penalty)
+        """
+        emails = np.atleast_2d(np.asarray(email_embeddings, dtype=np.float32))
+        emails = self._normalize_rows(emails)
+        
+        positive = emails @ self.positive.T
+        negative = emails @ self.negative.T
+        negative[:, ~self.has_negative] = 0.0
+        
+        penalties = calculate_negative_penalties(
+            positive, negative, self.negative_counts, max_penalty=max_penalty
+        )
+        similarities = np.where(
+            negative > 0.0, np.maximum(0.0, positive - penalties), positive
+        )
+        return similarities, penalties
+
+
 class TagEmbeddingCache:
     """Phase F.2: Cache für Tag-Embeddings mit Learning
     
@@ -75,11 +271,137 @@ class TagEmbeddingCache:
     1. learned_embedding (aggregiert aus assigned emails) - BESTE Qualität!
     2. description Embedding (semantische Beschreibung)
     3. name Embedding (nur Tag-Name, schwächste Option)
+    
+    Alle Caches sind begrenzt (LRU + TTL, Speicher-Budget in Bytes), damit
+    Celery-Worker bei vielen Usern nicht unbegrenzt wachsen. Keys enthalten
+    das Embedding-Model, ein Model-Wechsel trifft also nie alte Einträge.
     """
     
-    _cache: dict = {}  # {user_id: {tag_id: embedding}}
-    _ai_client_cache: dict = {}  # {user_id: ai_client}
-    _current_model: dict = {}  # {user_id: "model-name"} - für Auto-Invalidierung bei Model-Wechsel
+    # {(user_id, tag_id, model, embedding_updated_at, negative_updated_at): embedding}
+    _cache = _CountingTTLCache(
+        maxsize=int(TAG_CACHE_MAX_MB * 1024 * 1024), ttl=TAG_CACHE_TTL_SECONDS,
+        getsizeof=lambda emb: emb.nbytes,
+    )
+    # {user_id: TagMatrix} - gestapelte Embeddings für Batch-Scoring
+    _matrix_cache = _CountingTTLCache(
+        maxsize=int(TAG_CACHE_MAX_MB * 1024 * 1024), ttl=TAG_CACHE_TTL_SECONDS,
+        getsizeof=lambda matrix: max(matrix.nbytes, 1),
+    )
+    _ai_client_cache = _CountingTTLCache(maxsize=TAG_CACHE_MAX_USERS, ttl=TAG_CACHE_TTL_SECONDS)  # {user_id: ai_client}
+    _current_model = _CountingTTLCache(maxsize=TAG_CACHE_MAX_USERS, ttl=TAG_CACHE_TTL_SECONDS)  # {user_id: "model-name"} - für Auto-Invalidierung bei Model-Wechsel
+    _stats: dict = {"hits": 0, "misses": 0, "shared_hits": 0, "shared_errors": 0, "matrix_hits": 0, "matrix_builds": 0}
+    _lock = threading.RLock()
+    _shared_client = None  # Redis-Client (None = noch nicht verbunden, False = nicht verfügbar)
+    
+    @classmethod
+    def _cache_get(cls, cache, key):
+        with cls._lock:
+            return cache.get(key)
+    
+    @classmethod
+    def _cache_put(cls, cache, key, value):
+        with cls._lock:
+            try:
+                cache[key] = value
+            except ValueError:
+                # Einzelner Eintrag größer als das gesamte Budget → nicht cachen
+                logger.warning(f"⚠️  Tag-Cache: Eintrag {key} überschreitet Budget ({TAG_CACHE_MAX_MB} MB)")
+    
+    @classmethod
+    def _drop_entries(cls, user_id: int, tag_id: Optional[int] = None):
+        """Entfernt Embeddings eines Users (oder eines Tags) aus dem Cache"""
+        with cls._lock:
+            for key in [k for k in list(cls._cache.keys())
+                        if k[0] == user_id and (tag_id is None or k[1] == tag_id)]:
+                cls._cache.pop(key, None)
+            cls._matrix_cache.pop(user_id, None)
+    
+    @classmethod
+    def clear_all(cls):
+        """Leert alle In-Memory-Caches (z.B. nach Batch-Reprocess / Model-Wechsel)"""
+        with cls._lock:
+            cls._cache.clear()
+            cls._matrix_cache.clear()
+            cls._ai_client_cache.clear()
+            cls._current_model.clear()
+    
+    @classmethod
+    def get_stats(cls) -> dict:
+        """Cache-Statistiken (für Admin-Endpoint / Monitoring)"""
+        with cls._lock:
+            lookups = cls._stats["hits"] + cls._stats["misses"]
+            return {
+                **cls._stats,
+                "hit_rate": round(cls._stats["hits"] / lookups, 4) if lookups else None,
+                "embeddings": len(cls._cache),
+                "embeddings_bytes": cls._cache.currsize,
+                "embeddings_evictions": cls._cache.evictions,
+                "matrices": len(cls._matrix_cache),
+                "matrices_bytes": cls._matrix_cache.currsize,
+                "matrices_evictions": cls._matrix_cache.evictions,
+                "users": len(cls._current_model),
+                "clients": len(cls._ai_client_cache),
+                "clients_evictions": cls._ai_client_cache.evictions,
+                "budget_bytes": cls._cache.maxsize,
+                "ttl_seconds": TAG_CACHE_TTL_SECONDS,
+                "max_users": TAG_CACHE_MAX_USERS,
+                "shared_cache": TAG_SHARED_CACHE_ENABLED and bool(cls._shared_client),
+            }
+    
+    @classmethod
+    def _get_shared_cache(cls):
+        """Redis für prozessübergreifendes Teilen (nur wenn TAG_EMBEDDING_SHARED_CACHE=true)"""
+        if not TAG_SHARED_CACHE_ENABLED:
+            return None
+        if cls._shared_client is None:
+            try:
+                import redis
+                cls._shared_client = redis.Redis.from_url(
+                    os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                    socket_connect_timeout=1, socket_timeout=1,
+                )
+            except Exception as e:
+                logger.warning(f"⚠️  Shared Tag-Cache nicht verfügbar: {e}")
+                cls._shared_client = False
+        return cls._shared_client or None
+    
+    @staticmethod
+    def _shared_key(tag: models.EmailTag, model: str) -> str:
+        """Key (tag_id, model, version) - version ändert sich mit dem Embedding-Text"""
+        text = tag.description if tag.description else tag.name
+        version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        return f"tag_embedding:{tag.id}:{model}:{version}"
+    
+    @classmethod
+    def _shared_get(cls, tag: models.EmailTag, model: str) -> Optional[np.ndarray]:
+        client = cls._get_shared_cache()
+        if client is None:
+            return None
+        try:
+            data = client.get(cls._shared_key(tag, model))
+        except Exception as e:
+            cls._stats["shared_errors"] += 1
+            logger.debug(f"Shared Tag-Cache get fehlgeschlagen: {e}")
+            return None
+        if not data:
+            return None
+        cls._stats["shared_hits"] += 1
+        return np.frombuffer(data, dtype=np.float32)
+    
+    @classmethod
+    def _shared_put(cls, tag: models.EmailTag, model: str, embedding: np.ndarray):
+        client = cls._get_shared_cache()
+        if client is None:
+            return
+        try:
+            client.set(
+                cls._shared_key(tag, model),
+                embedding.astype(np.float32).tobytes(),
+                ex=TAG_SHARED_CACHE_TTL_SECONDS,
+            )
+        except Exception as e:
+            cls._stats["shared_errors"] += 1
+            logger.debug(f"Shared Tag-Cache set fehlgeschlagen: {e}")
     
     @classmethod
     def preload_user_tags(cls, user_id: int, db: Session) -> int:
@@ -114,9 +436,6 @@ class TagEmbeddingCache:
         logger.info(f"✅ {loaded_count}/{len(tags)} Tag-Embeddings geladen und gecacht")
         return loaded_count
     
-    _ai_client_cache: dict = {}  # {user_id: ai_client}
-    _current_model: dict = {}  # {user_id: "model-name"} - für Auto-Invalidierung bei Model-Wechsel
-    
     @classmethod
     def _get_ai_client_for_user(cls, user_id: int, db: Session = None):
         """Holt dedizierten Embedding-Client für Tag-Embeddings
@@ -141,36 +460,31 @@ class TagEmbeddingCache:
             
             if db:
                 # Sample: Erste Email mit Embedding holen
-                sample_email = db.query(models.RawEmail).filter(
-                    models.RawEmail.user_id == user_id,
-                    models.RawEmail.email_embedding.isnot(None),
-                    models.RawEmail.embedding_model.isnot(None)
-                ).first()
+                email_model = cls._email_model_query(user_id, db).scalar()
                 
-                if sample_email:
-                    embedding_model = sample_email.embedding_model
+                if email_model:
+                    embedding_model = email_model
                     logger.info(f"🔍 Tag-Embeddings: Using model from emails: {embedding_model}")
                 else:
                     logger.warning(f"⚠️  No emails with embeddings found for user {user_id}, using default: {embedding_model}")
             
             # 🆕 AUTO-INVALIDIERUNG: Prüfe ob Model geändert wurde
-            if user_id in cls._current_model:
-                old_model = cls._current_model[user_id]
-                if old_model != embedding_model:
-                    logger.info(f"🔄 Model-Wechsel erkannt: {old_model} → {embedding_model}")
-                    # Cache komplett leeren bei Model-Wechsel!
-                    if user_id in cls._cache:
-                        cls._cache[user_id].clear()
-                    if user_id in cls._ai_client_cache:
-                        del cls._ai_client_cache[user_id]
-                    logger.info(f"🗑️  Tag-Cache für User {user_id} geleert (Model-Wechsel)")
+            old_model = cls._cache_get(cls._current_model, user_id)
+            if old_model is not None and old_model != embedding_model:
+                logger.info(f"🔄 Model-Wechsel erkannt: {old_model} → {embedding_model}")
+                # Cache komplett leeren bei Model-Wechsel (Speicher freigeben)
+                cls._drop_entries(user_id)
+                with cls._lock:
+                    cls._ai_client_cache.pop(user_id, None)
+                logger.info(f"🗑️  Tag-Cache für User {user_id} geleert (Model-Wechsel)")
             
             # Speichere aktuelles Model
-            cls._current_model[user_id] = embedding_model
+            cls._cache_put(cls._current_model, user_id, embedding_model)
             
             # Cache Check NACH Model-Validierung
-            if user_id in cls._ai_client_cache:
-                return cls._ai_client_cache[user_id]
+            client = cls._cache_get(cls._ai_client_cache, user_id)
+            if client is not None:
+                return client
             
             # 2. Embedding-Client mit dem ermittelten Model erstellen
             # WICHTIG: LocalOllamaClient für Chunking-Support nutzen!
@@ -180,7 +494,7 @@ class TagEmbeddingCache:
                 base_url="http://127.0.0.1:11434"
             )
             
-            cls._ai_client_cache[user_id] = client
+            cls._cache_put(cls._ai_client_cache, user_id, client)
             logger.info(f"✅ Tag-Embeddings: Created LocalOllamaClient with {embedding_model}")
             return client
             
@@ -208,8 +522,15 @@ class TagEmbeddingCache:
             return None
         
         # Check Cache NACH Model-Validierung
-        if tag.user_id in cls._cache and tag.id in cls._cache[tag.user_id]:
-            return cls._cache[tag.user_id][tag.id]
+        # Key enthält die Lern-Zeitstempel: neu trainierte Embeddings (auch aus
+        # anderen Prozessen) treffen nie einen alten Eintrag
+        model = cls._cache_get(cls._current_model, tag.user_id)
+        cache_key = (tag.user_id, tag.id, model, tag.embedding_updated_at, tag.negative_updated_at)
+        cached = cls._cache_get(cls._cache, cache_key)
+        if cached is not None:
+            cls._stats["hits"] += 1
+            return cached
+        cls._stats["misses"] += 1
         
         # 1. PRIORITÄT: Learned Embedding (aggregiert aus assigned emails)
         if tag.learned_embedding:
@@ -218,9 +539,7 @@ class TagEmbeddingCache:
                 logger.debug(f"🎓 Tag '{tag.name}': Using learned embedding ({len(embedding_array)} dims)")
                 
                 # Cache speichern
-                if tag.user_id not in cls._cache:
-                    cls._cache[tag.user_id] = {}
-                cls._cache[tag.user_id][tag.id] = embedding_array
+                cls._cache_put(cls._cache, cache_key, embedding_array)
                 return embedding_array
             except Exception as e:
                 logger.warning(f"Learned embedding konvertierung fehlgeschlagen: {e}")
@@ -228,6 +547,12 @@ class TagEmbeddingCache:
         # 2. FALLBACK: Description Embedding (semantische Beschreibung)
         text_for_embedding = tag.description if tag.description else tag.name
         
+        # Von anderem Prozess bereits generiert? (optional, Redis)
+        shared = cls._shared_get(tag, model)
+        if shared is not None:
+            cls._cache_put(cls._cache, cache_key, shared)
+            return shared
+        
         # Client wurde bereits oben geholt (mit Model-Validierung!)
         # LocalOllamaClient nutzt _get_embedding() (mit Chunking!)
         logger.info(f"🔍 DEBUG: Generiere Embedding für Tag '{tag.name}' mit Text: '{text_for_embedding[:100]}...'")
@@ -250,9 +575,8 @@ class TagEmbeddingCache:
             logger.info(f"📝 Tag '{tag.name}': Generated embedding from {source} ('{text_for_embedding[:50]}...')")
             
             # Cache speichern
-            if tag.user_id not in cls._cache:
-                cls._cache[tag.user_id] = {}
-            cls._cache[tag.user_id][tag.id] = embedding_array
+            cls._cache_put(cls._cache, cache_key, embedding_array)
+            cls._shared_put(tag, model, embedding_array)
             
             return embedding_array
         else:
@@ -262,16 +586,101 @@ class TagEmbeddingCache:
     @classmethod
     def invalidate_tag_cache(cls, tag_id: int, user_id: int):
         """Invalidiert Cache für einen spezifischen Tag"""
-        if user_id in cls._cache and tag_id in cls._cache[user_id]:
-            del cls._cache[user_id][tag_id]
+        cls._drop_entries(user_id, tag_id)
     
     @classmethod
     def invalidate_user_cache(cls, user_id: int):
         """Invalidiert Cache für einen User (z.B. nach Settings-Änderung)"""
-        if user_id in cls._cache:
-            del cls._cache[user_id]
-        if user_id in cls._ai_client_cache:
-            del cls._ai_client_cache[user_id]
+        cls._drop_entries(user_id)
+        with cls._lock:
+            cls._ai_client_cache.pop(user_id, None)
+    
+    @staticmethod
+    def _email_model_query(user_id: int, db: Session):
+        """Embedding-Model einer Email des Users mit Embedding (LIMIT 1)"""
+        return db.query(models.RawEmail.embedding_model).filter(
+            models.RawEmail.user_id == user_id,
+            models.RawEmail.email_embedding.isnot(None),
+            models.RawEmail.embedding_model.isnot(None)
+        ).limit(1)
+
+    @classmethod
+    def _tag_fingerprint(cls, user_id: int, db: Session) -> tuple:
+        """Günstiger Änderungs-Fingerprint der Tags eines Users (ohne Embedding-Blobs)
+
+        Erkennt neue/gelöschte Tags, geänderte Namen/Beschreibungen sowie neu
+        gelernte positive/negative Embeddings auch aus anderen Prozessen
+        (Celery-Worker vs. Web).
+        Enthält das Embedding-Model (Settings + Emails): ein Model-Wechsel in
+        einem anderen Prozess baut die Matrix neu statt alte Dimensionen zu liefern.
+        """
+        preferred_model = db.query(models.User.preferred_embedding_model).filter(
+            models.User.id == user_id
+        ).scalar_subquery()
+        row = db.query(
+            func.count(models.EmailTag.id),
+            func.max(models.EmailTag.id),
+            func.max(models.EmailTag.embedding_updated_at),
+            func.max(models.EmailTag.negative_updated_at),
+            func.sum(models.EmailTag.negative_count),
+            preferred_model,
+            cls._email_model_query(user_id, db).scalar_subquery(),
+        ).filter(
+            models.EmailTag.user_id == user_id
+        ).one()
+        # EmailTag hat kein updated_at → Hash über Name/Beschreibung (kleine Textspalten)
+        texts = hashlib.sha256()
+        for tag_id, name, description in db.query(
+            models.EmailTag.id, models.EmailTag.name, models.EmailTag.description
+        ).filter(models.EmailTag.user_id == user_id).order_by(models.EmailTag.id):
+            texts.update(f"{tag_id}\0{name}\0{description or ''}\n".encode("utf-8"))
+        return tuple(row) + (texts.hexdigest()[:16],)
+    
+    @classmethod
+    def get_tag_matrix(cls, user_id: int, db: Session) -> Optional["TagMatrix"]:
+        """🚀 PERFORMANCE: Gestapelte Tag-Matrix eines Users (gecacht)
+
+        Wird nur neu aufgebaut wenn sich der Fingerprint ändert oder der Cache
+        invalidiert wurde - pro Email bleiben damit 2 leichte Queries (Aggregat +
+        id/Name/Beschreibung für den Text-Hash) statt aller EmailTag-Zeilen
+        inkl. Embedding-Blobs.
+
+        Returns:
+            TagMatrix oder None wenn der User keine Tags hat
+        """
+        fingerprint = cls._tag_fingerprint(user_id, db)
+        cached = cls._cache_get(cls._matrix_cache, user_id)
+        if cached is not None and cached.fingerprint == fingerprint:
+            cls._stats["matrix_hits"] += 1
+            return cached
+        if cached is not None and cached.fingerprint[-1] != fingerprint[-1]:
+            # Name/Beschreibung geändert (evtl. in anderem Prozess) → Text-Embeddings neu holen
+            cls._drop_entries(user_id)
+        
+        tags = db.query(models.EmailTag).filter(
+            models.EmailTag.user_id == user_id
+        ).order_by(models.EmailTag.id).all()
+        
+        if not tags:
+            with cls._lock:
+                cls._matrix_cache.pop(user_id, None)
+            return None
+        
+        embeddings = []
+        for tag in tags:
+            embedding = cls.get_tag_embedding(tag, db)
+            if embedding is None:
+                logger.warning(f"⚠️  Phase F.2: Could not get embedding for tag '{tag.name}'")
+            embeddings.append(embedding)
+        
+        matrix = TagMatrix.build(tags, embeddings, fingerprint, cls._cache_get(cls._current_model, user_id))
+        cls._cache_put(cls._matrix_cache, user_id, matrix)
+        cls._stats["matrix_builds"] += 1
+        logger.info(
+            f"🧮 Tag-Matrix für User {user_id}: {matrix.size}/{len(tags)} Tags, "
+            f"dim={matrix.dim}, {int(matrix.has_negative.sum())} mit Negative-Feedback"
+        )
+        return matrix
     
     @classmethod
     def compute_similarity(cls, emb1: np.ndarray, emb2: np.ndarray) -> float:
@@ -791,6 +1200,9 @@ class TagManager:
         
         OPTIMIERT: Nutzt vorhandene Email-Embeddings direkt (bereits beim Fetch generiert),
         kein Re-Embedding nötig! Mit dynamischen Thresholds basierend auf Tag-Anzahl.
+        🚀 PERFORMANCE: Bewertung per Matrix-Vektor-Produkt gegen die gecachte TagMatrix
+        (positive + negative Similarity, Penalty und source-spezifische Thresholds vektorisiert),
+        Tag-Objekte werden nur für tatsächliche Treffer geladen.
         
         Args:
             db: Database session
@@ -803,127 +1215,62 @@ class TagManager:
         Returns:
             Liste von (Tag, Ähnlichkeit) Tupeln, sortiert nach Ähnlichkeit
         """
-        # Alle Tags des Users holen
-        tags = db.query(models.EmailTag).filter(
-            models.EmailTag.user_id == user_id
-        ).all()
-        
-        if not tags:
+        matrix = TagEmbeddingCache.get_tag_matrix(user_id, db)
+        if matrix is None:
             logger.info(f"⚠️  Phase F.2: User {user_id} has no tags")
             return []
         
-        total_tags = len(tags)
-        
         # Dynamischer Threshold basierend auf Tag-Anzahl (wenn nicht explizit gesetzt)
         if min_similarity is None:
-            min_similarity = get_suggestion_threshold(total_tags)
+            min_similarity = get_suggestion_threshold(matrix.total_tags)
         
         logger.info(
-            f"🔍 Phase F.2: Checking {total_tags} tags for user {user_id} "
-            f"(threshold={min_similarity:.0%}, auto-assign={AUTO_ASSIGN_SIMILARITY_THRESHOLD:.0%})"
+            f"🔍 Phase F.2: Checking email against {matrix.size} tags "
+            f"for user {user_id} (threshold={min_similarity:.0%}, "
+            f"auto-assign={AUTO_ASSIGN_SIMILARITY_THRESHOLD:.0%})"
         )
         
-        # Email-Embedding konvertieren
+        if matrix.size == 0:
+            return []
+        
         try:
             email_embedding = np.frombuffer(email_embedding_bytes, dtype=np.float32)
-            logger.info(f"🔍 DEBUG: Email-Embedding - Shape: {email_embedding.shape}, Dtype: {email_embedding.dtype}")
         except Exception as e:
             logger.warning(f"Konnte Email-Embedding nicht konvertieren: {e}")
             return []
-        
-        # Ähnlichkeiten berechnen
-        similarities: List[Tuple[models.EmailTag, float, str]] = []  # (tag, similarity, source)
-        exclude_set = set(exclude_tag_ids or [])
-        
-        if exclude_set:
-            logger.info(f"⏭️  Phase F.2: Excluding {len(exclude_set)} already assigned tags")
-        
-        for tag in tags:
-            # Skip bereits zugewiesene Tags
-            if tag.id in exclude_set:
-                logger.debug(f"⏭️  Phase F.2: Skipping already assigned tag '{tag.name}'")
-                continue
-            
-            # Tag-Embedding holen (nutzt jetzt OllamaEmbeddingClient!)
-            tag_embedding = TagEmbeddingCache.get_tag_embedding(tag, db)
-            if tag_embedding is None:
-                logger.warning(f"⚠️  Phase F.2: Could not get embedding for tag '{tag.name}'")
-                continue
-            
-            logger.info(f"🔍 DEBUG: Tag '{tag.name}' Embedding - Shape: {tag_embedding.shape}, Dtype: {tag_embedding.dtype}")
-            
-            # Cosine Similarity berechnen
-            similarity = TagEmbeddingCache.compute_similarity(email_embedding, tag_embedding)
-            
-            logger.info(
-                f"🔍 DEBUG: Similarity Berechnung - "
-                f"Email norm: {np.linalg.norm(email_embedding):.4f}, "
-                f"Tag norm: {np.linalg.norm(tag_embedding):.4f}, "
-                f"Dot product: {np.dot(email_embedding, tag_embedding):.4f}"
-            )
-            
-            # 🚫 Phase F.3: Negative Feedback berücksichtigen
-            negative_sim = get_negative_similarity(email_embedding, tag)
-            penalty = 0.0
-            
-            if negative_sim > 0.0:
-                penalty = calculate_negative_penalty(
-                    positive_similarity=similarity,
-                    negative_similarity=negative_sim,
-                    negative_count=tag.negative_count or 0,
-                    max_penalty=0.20
-                )
-                # Penalty vom Similarity-Score abziehen
-                original_similarity = similarity
-                similarity = max(0.0, similarity - penalty)
-                
-                logger.info(
-                    f"🚫 Tag '{tag.name}': Negative feedback applied "
-                    f"(neg_sim={negative_sim:.3f}, penalty={penalty:.3f}, "
-                    f"{original_similarity:.3f} → {similarity:.3f})"
-                )
-            
-            # 🆕 Source-spezifische Thresholds holen
-            suggest_threshold, auto_assign_threshold = TagEmbeddingCache._get_thresholds_for_tag(tag)
-            
-            # Embedding-Quelle bestimmen (für Logging)
-            if tag.learned_embedding:
-                source = "learned"
-            elif tag.description:
-                source = "description"
-            else:
-                source = "name"
-            
-            # Konfidenz-Level mit source-spezifischen Thresholds bestimmen
-            will_auto_assign = similarity >= auto_assign_threshold
-            will_suggest = similarity >= suggest_threshold
-            
-            # LOG mit allen Details
-            logger.info(
-                f"📊 Tag '{tag.name}' ({source}): similarity={similarity:.4f} "
-                f"thresh=[suggest={suggest_threshold:.0%}, auto={auto_assign_threshold:.0%}] "
-                f"→ (auto={will_auto_assign}, suggest={will_suggest})"
+        if len(email_embedding) != matrix.dim:
+            logger.error(
+                f"❌ DIMENSIONS-MISMATCH: Email-Embedding {len(email_embedding)} dims, "
+                f"Tags {matrix.dim} dims. Lösung: Button 'Alle Emails neu embedden' klicken."
             )
-            
-            if will_suggest:
-                similarities.append((tag, similarity, source))
-                if will_auto_assign:
-                    logger.info(f"✅ AUTO-ASSIGN: Tag '{tag.name}' ({similarity:.0%})")
-                else:
-                    logger.info(f"💡 SUGGEST: Tag '{tag.name}' ({similarity:.0%})")
-        
-        # Nach Ähnlichkeit sortieren (höchste zuerst)
-        similarities_sorted = sorted(similarities, key=lambda x: x[1], reverse=True)
+            return []
         
-        # Top-K auswählen
-        result = [(tag, sim) for tag, sim, _ in similarities_sorted[:top_k]]
+        similarities, penalties = matrix.score(email_embedding[np.newaxis, :])
+        similarities, penalties = similarities[0], penalties[0]
+        candidates = np.flatnonzero(similarities >= matrix.suggest_thresholds)
+        if exclude_tag_ids:
+            candidates = candidates[~np.isin(matrix.tag_ids[candidates], list(exclude_tag_ids))]
+        
+        results: List[Tuple[models.EmailTag, float]] = []
+        order = candidates[np.argsort(-similarities[candidates], kind="stable")][:top_k]
+        for col in order:
+            similarity = float(similarities[col])
+            auto = similarity >= matrix.auto_thresholds[col]
+            logger.debug(
+                f"{'✅ AUTO-ASSIGN' if auto else '💡 SUGGEST'}: Tag '{matrix.names[col]}' "
+                f"({matrix.sources[col]}) {similarity:.0%}"
+                + (f" (negative penalty {penalties[col]:.3f})" if penalties[col] > 0 else "")
+            )
+            tag = db.get(models.EmailTag, int(matrix.tag_ids[col]))
+            if tag is not None:
+                results.append((tag, similarity))
         
         logger.info(
-            f"✅ Phase F.2: Returning {len(result)} tag suggestions "
+            f"✅ Phase F.2: Returning {len(results)} tag suggestions "
             f"(dynamic thresholds: learned=75%, description=50%, name=35%)"
         )
         
-        return result
+        return results
     
     @staticmethod
     def get_tag_suggestions_for_email(
@@ -1413,3 +1760,25 @@ def calculate_negative_penalty(
     return penalty
 
 
+def calculate_negative_penalties(
+    positive_similarity: np.ndarray,
+    negative_similarity: np.ndarray,
+    negative_count: np.ndarray,
+    max_penalty: float = 0.20
+) -> np.ndarray:
+    """Vektorisierte Variante von calculate_negative_penalty (gleiche Formel)
+
+    Args:
+        positive_similarity: (n, T) Similarities zu den Tag-Embeddings
+        negative_similarity: (n, T) Similarities zu den negative-Embeddings
+        negative_count: (T,) Anzahl negativer Beispiele pro Tag
+        max_penalty: Maximale Penalty (0.0-1.0)
+
+    Returns:
+        (n, T) Penalty-Werte, 0.0 wo negative_similarity <= 0
+    """
+    ratio = negative_similarity / np.maximum(positive_similarity, 0.01)
+    base_penalty = np.where(ratio >= 1.0, max_penalty, max_penalty * ratio)
+    count_factor = np.minimum(1.0 + (negative_count - 1) * 0.075, 1.3)
+    penalty = np.minimum(base_penalty * count_factor, max_penalty)
+    return np.where(negative_similarity > 0.0, penalty, 0.0)
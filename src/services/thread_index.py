@@ -0,0 +1,409 @@
+"""
+Thread Index - persistenter Message-ID → Thread-Index (message_thread_index)
+
+ThreadCalculator.from_message_id_chain (06_mail_fetcher.py) sieht nur die
+Mails EINES fetch_new_emails-Batches: Antworten aus einem späteren Sync oder
+einem anderen Ordner starteten bisher einen neuen Thread, ein sauberes
+Re-Threading ging nur über einen kompletten Refetch.
+
+message_thread_index ist ein Union-Find über Message-ID, In-Reply-To und
+References aller Emails des Users:
+- Ein Knoten pro Message-ID (auch für Eltern, die nicht im Postfach liegen -
+  zwei Antworten auf dieselbe fehlende Mail landen so im selben Thread)
+- Alle Knoten einer Konversation tragen dieselbe thread_id (flach gespeichert,
+  Lookup = eine indizierte Abfrage)
+- Verbindet eine neue Mail zwei bestehende Threads (fehlendes Glied taucht
+  auf), wird der kleinere Thread umgelabelt - in message_thread_index und
+  raw_emails (Union by Size, thread_summary wird nachgeführt)
+
+Nebenläufigkeit: Knoten werden per INSERT ... ON CONFLICT DO NOTHING
+geschrieben; Keys, die ein paralleler Worker gerade angelegt hat, werden
+nachgelesen und deren Threads zusammengelegt. Rebuilds nehmen pro User einen
+exklusiven Advisory-Lock (PostgreSQL), assign() einen geteilten.
+
+Zero-Knowledge: In-Reply-To/References sind in raw_emails verschlüsselt,
+deshalb speichert der Index nur HMAC(aus dem Master-Key abgeleiteter Key,
+Message-ID).
+
+Pflege:
+- _persist_raw_emails: assign() pro Bulk-INSERT-Chunk
+- Lazy: ensure_built() beim ersten Sync eines Users
+- Manuell: scripts/rebuild_thread_index.py (ein Streaming-Durchlauf)
+
+Usage:
+    from src.services.thread_index import ThreadIndexService, derive_thread_key
+
+    key = derive_thread_key(master_key)
+    thread_ids = ThreadIndexService.assign(
+        db, user.id, key, [(message_id, in_reply_to, references, fallback_thread_id)]
+    )
+"""
+
+import base64
+import hashlib
+import hmac
+import importlib
+import logging
+import re
+import uuid
+from collections import Counter
+from datetime import datetime, UTC
+from typing import Dict, Hashable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+models = importlib.import_module(".02_models", "src")
+encryption = importlib.import_module(".08_encryption", "src")
+thread_summary = importlib.import_module(".services.thread_summary", "src")
+
+logger = logging.getLogger(__name__)
+
+_KEY_CONTEXT = b"ki-mail-helper/thread-index/v1"
+_MESSAGE_ID_RE = re.compile(r"<([^<>\s]+)>")
+
+# Keys pro IN(...)
+_CHUNK = 500
+# Namespace für pg_advisory_xact_lock(namespace, user_id)
+_LOCK_NAMESPACE = 0x7468  # "th"
+
+
+def derive_thread_key(master_key: str) -> bytes:
+    """Leitet den Index-Key aus dem Master-Key (DEK) ab - getrennt vom Verschlüsselungs-Key"""
+    return hmac.new(base64.b64decode(master_key), _KEY_CONTEXT, hashlib.sha256).digest()
+
+
+def parse_message_ids(value: Optional[str]) -> List[str]:
+    """"<a@x> <b@y>" → ["a@x", "b@y"] (auch ohne spitze Klammern)"""
+    if not value:
+        return []
+    ids = _MESSAGE_ID_RE.findall(value) or value.split()
+    return [message_id.strip("<>") for message_id in ids if "@" in message_id]
+
+
+def message_links(
+    message_id: Optional[str], in_reply_to: Optional[str], references: Optional[str]
+) -> List[str]:
+    """Eigene Message-ID (falls vorhanden) gefolgt von allen verlinkten, ohne Duplikate"""
+    ids = parse_message_ids(message_id) + parse_message_ids(in_reply_to) + parse_message_ids(references)
+    return list(dict.fromkeys(ids))
+
+
+def message_key(key: bytes, message_id: str) -> str:
+    return hmac.new(key, message_id.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+class _UnionFind:
+    """In-Memory Union-Find mit Path Halving"""
+
+    def __init__(self):
+        self.parent: Dict[Hashable, Hashable] = {}
+
+    def find(self, item: Hashable) -> Hashable:
+        self.parent.setdefault(item, item)
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a: Hashable, b: Hashable) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+    def link_all(self, items: Sequence[Hashable]) -> None:
+        for item in items:
+            self.find(item)
+        for item in items[1:]:
+            self.union(items[0], item)
+
+
+class ThreadIndexService:
+    """Pflege von message_thread_index und Zuordnung der thread_ids"""
+
+    @staticmethod
+    def _lock_user(session: Session, user_id: int, shared: bool = False) -> None:
+        """Advisory-Lock pro User bis Transaktionsende (nur PostgreSQL, SQLite serialisiert selbst)"""
+        if session.get_bind().dialect.name != "postgresql":
+            return
+        lock = "pg_advisory_xact_lock_shared" if shared else "pg_advisory_xact_lock"
+        session.execute(
+            text(f"SELECT {lock}(:namespace, :user_id)"),
+            {"namespace": _LOCK_NAMESPACE, "user_id": user_id},
+        )
+
+    @staticmethod
+    def _insert_nodes(session: Session, nodes: List[dict]) -> Set[str]:
+        """Schreibt Knoten als INSERT ... ON CONFLICT DO NOTHING
+
+        Returns:
+            message_keys der tatsächlich eingefügten Knoten
+        """
+        from sqlalchemy.exc import IntegrityError
+
+        Node = models.MessageThreadNode
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            inserted = set()
+            for node in nodes:
+                try:
+                    with session.begin_nested():
+                        session.add(Node(**node))
+                    inserted.add(node["message_key"])
+                except IntegrityError:
+                    pass
+            return inserted
+
+        stmt = (
+            insert(Node)
+            .on_conflict_do_nothing(index_elements=["user_id", "message_key"])
+            .returning(Node.message_key)
+        )
+        inserted = set()
+        for i in range(0, len(nodes), _CHUNK):
+            inserted.update(key for (key,) in session.execute(stmt, nodes[i:i + _CHUNK]))
+        return inserted
+
+    @staticmethod
+    def _load_nodes(session: Session, user_id: int, keys: List[str]) -> Dict[str, str]:
+        Node = models.MessageThreadNode
+        nodes: Dict[str, str] = {}
+        for i in range(0, len(keys), _CHUNK):
+            nodes.update(
+                session.query(Node.message_key, Node.thread_id).filter(
+                    Node.user_id == user_id,
+                    Node.message_key.in_(keys[i:i + _CHUNK]),
+                )
+            )
+        return nodes
+
+    @staticmethod
+    def _merge_threads(session: Session, user_id: int, thread_ids: Set[str]) -> str:
+        """Legt Threads zusammen - der größte behält seine ID
+
+        Returns:
+            thread_id des zusammengelegten Threads
+        """
+        Node = models.MessageThreadNode
+        sizes = dict(
+            session.query(Node.thread_id, func.count(Node.id))
+            .filter(Node.user_id == user_id, Node.thread_id.in_(thread_ids))
+            .group_by(Node.thread_id)
+        )
+        winner = max(sorted(thread_ids), key=lambda thread_id: sizes.get(thread_id, 0))
+        losers = sorted(thread_ids - {winner})
+
+        session.query(Node).filter(
+            Node.user_id == user_id, Node.thread_id.in_(losers)
+        ).update({Node.thread_id: winner}, synchronize_session=False)
+        session.query(models.RawEmail).filter(
+            models.RawEmail.user_id == user_id, models.RawEmail.thread_id.in_(losers)
+        ).update({models.RawEmail.thread_id: winner}, synchronize_session=False)
+        # Bulk-UPDATE umgeht die ORM-Events → Threads explizit vormerken
+        thread_summary.ThreadSummaryService.mark_dirty(session, user_id, [winner, *losers])
+
+        logger.info(f"🧵 {len(losers)} Thread(s) in {winner} zusammengelegt")
+        return winner
+
+    @staticmethod
+    def assign(
+        session: Session,
+        user_id: int,
+        thread_key: bytes,
+        emails: Sequence[Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]],
+    ) -> List[Optional[str]]:
+        """Ordnet neuen Emails ihre thread_id zu und schreibt neue Knoten (Caller committed)
+
+        Eine Abfrage für alle Message-IDs des Batches, Union-Find im Speicher,
+        ein INSERT ... ON CONFLICT DO NOTHING für neue Knoten. Verbindet der
+        Batch bestehende Threads, werden diese zusammengelegt - ebenso, wenn
+        ein paralleler Worker einen der neuen Knoten zuerst angelegt hat.
+
+        Args:
+            emails: (message_id, in_reply_to, references, fallback_thread_id) -
+                fallback_thread_id gilt nur für Emails ganz ohne Message-IDs
+
+        Returns:
+            thread_id pro Email (gleiche Reihenfolge)
+        """
+        links = [
+            [message_key(thread_key, m) for m in message_links(message_id, in_reply_to, references)]
+            for message_id, in_reply_to, references, _ in emails
+        ]
+        keys = sorted({key for email_keys in links for key in email_keys})
+        if not keys:
+            return [fallback for *_, fallback in emails]
+
+        ThreadIndexService._lock_user(session, user_id, shared=True)
+        existing = ThreadIndexService._load_nodes(session, user_id, keys)
+
+        uf = _UnionFind()
+        for email_keys in links:
+            uf.link_all(email_keys)
+
+        known: Dict[Hashable, Set[str]] = {}
+        for key, thread_id in existing.items():
+            known.setdefault(uf.find(key), set()).add(thread_id)
+
+        resolved: Dict[Hashable, str] = {}
+        for root, thread_ids in known.items():
+            if len(thread_ids) == 1:
+                resolved[root] = next(iter(thread_ids))
+            else:
+                resolved[root] = ThreadIndexService._merge_threads(session, user_id, thread_ids)
+
+        for email_keys in links:
+            if email_keys:
+                root = uf.find(email_keys[0])
+                if root not in resolved:
+                    resolved[root] = str(uuid.uuid4())
+
+        now = datetime.now(UTC)
+        new_nodes = [
+            {"user_id": user_id, "message_key": key, "thread_id": resolved[uf.find(key)], "created_at": now}
+            for key in keys
+            if key not in existing
+        ]
+        if new_nodes:
+            inserted = ThreadIndexService._insert_nodes(session, new_nodes)
+            conflicts = [node["message_key"] for node in new_nodes if node["message_key"] not in inserted]
+            if conflicts:
+                # Paralleler Worker war schneller: dessen Threads mit unseren zusammenlegen
+                racing: Dict[Hashable, Set[str]] = {}
+                for key, thread_id in ThreadIndexService._load_nodes(session, user_id, conflicts).items():
+                    root = uf.find(key)
+                    if thread_id != resolved[root]:
+                        racing.setdefault(root, {resolved[root]}).add(thread_id)
+                for root, thread_ids in racing.items():
+                    resolved[root] = ThreadIndexService._merge_threads(session, user_id, thread_ids)
+
+        return [
+            resolved[uf.find(email_keys[0])] if email_keys else fallback
+            for email_keys, (*_, fallback) in zip(links, emails)
+        ]
+
+    @staticmethod
+    def rebuild_user(session: Session, user_id: int, master_key: str, batch_size: int = 1000) -> int:
+        """Baut den Index für einen User komplett neu auf und threadet alle Emails neu
+
+        Ein Streaming-Durchlauf über raw_emails (yield_per), Union-Find im
+        Speicher. Bestehende thread_ids bleiben erhalten, wo möglich (Mehrheit
+        pro Konversation), geänderte werden per Bulk-UPDATE geschrieben.
+        Caller committed; hält bis dahin den exklusiven Lock des Users.
+
+        Returns:
+            Anzahl Threads
+        """
+        RawEmail = models.RawEmail
+        key = derive_thread_key(master_key)
+        decryptor = encryption.BatchDecryptor(master_key)
+
+        ThreadIndexService._lock_user(session, user_id)
+
+        session.query(models.MessageThreadNode).filter_by(user_id=user_id).delete(
+            synchronize_session=False
+        )
+
+        uf = _UnionFind()
+        emails: List[Tuple[int, Optional[str], Optional[str]]] = []
+        rows = (
+            session.query(
+                RawEmail.id,
+                RawEmail.thread_id,
+                RawEmail.message_id,
+                RawEmail.encrypted_in_reply_to,
+                RawEmail.encrypted_references,
+            )
+            .filter(RawEmail.user_id == user_id)
+            .order_by(RawEmail.id)
+            .yield_per(batch_size)
+        )
+        for raw_id, thread_id, message_id, encrypted_in_reply_to, encrypted_references in rows:
+            try:
+                in_reply_to, references = decryptor.decrypt_many(
+                    (encrypted_in_reply_to, encrypted_references)
+                )
+            except Exception:
+                in_reply_to = references = None
+            email_keys = [message_key(key, m) for m in message_links(message_id, in_reply_to, references)]
+            uf.link_all(email_keys)
+            emails.append((raw_id, thread_id, email_keys[0] if email_keys else None))
+
+        # Pro Konversation die häufigste bisherige thread_id behalten
+        votes: Dict[Hashable, Counter] = {}
+        for _, thread_id, email_key in emails:
+            if email_key and thread_id:
+                votes.setdefault(uf.find(email_key), Counter())[thread_id] += 1
+
+        resolved: Dict[Hashable, str] = {}
+        used: Set[str] = set()
+        for root in sorted(votes, key=lambda r: -sum(votes[r].values())):
+            for thread_id, _ in votes[root].most_common():
+                if thread_id not in used:
+                    resolved[root] = thread_id
+                    used.add(thread_id)
+                    break
+
+        updates = []
+        for raw_id, thread_id, email_key in emails:
+            if not email_key:
+                continue
+            root = uf.find(email_key)
+            if root not in resolved:
+                resolved[root] = str(uuid.uuid4())
+            if resolved[root] != thread_id:
+                updates.append({"id": raw_id, "thread_id": resolved[root]})
+
+        for i in range(0, len(updates), batch_size):
+            session.bulk_update_mappings(RawEmail, updates[i:i + batch_size])
+
+        now = datetime.now(UTC)
+        nodes = [
+            {"user_id": user_id, "message_key": node, "thread_id": resolved[uf.find(node)], "created_at": now}
+            for node in uf.parent
+        ]
+        for i in range(0, len(nodes), batch_size):
+            session.bulk_insert_mappings(models.MessageThreadNode, nodes[i:i + batch_size])
+
+        thread_summary.ThreadSummaryService.rebuild_user(session, user_id)
+        logger.info(
+            f"🧵 Thread-Index für User {user_id} neu aufgebaut: {len(nodes)} Message-IDs, "
+            f"{len(resolved)} Threads, {len(updates)} Emails neu zugeordnet"
+        )
+        return len(resolved)
+
+    @staticmethod
+    def ensure_built(session: Session, user_id: int, master_key: str) -> bool:
+        """Lazy-Aufbau beim ersten Sync (Bestand vor Einführung des Index)
+
+        Parallele Syncs desselben Users warten auf den Lock und sehen danach
+        den fertigen Index, statt ein zweites Mal aufzubauen.
+
+        Returns:
+            True wenn neu aufgebaut wurde
+        """
+        def has_index() -> bool:
+            return session.query(
+                session.query(models.MessageThreadNode.id).filter_by(user_id=user_id).exists()
+            ).scalar()
+
+        if has_index():
+            return False
+        ThreadIndexService._lock_user(session, user_id)
+
+        has_emails = session.query(
+            session.query(models.RawEmail.id)
+            .filter(models.RawEmail.user_id == user_id, models.RawEmail.message_id.isnot(None))
+            .exists()
+        ).scalar()
+        if has_index() or not has_emails:
+            session.commit()  # Lock freigeben
+            return False
+
+        ThreadIndexService.rebuild_user(session, user_id, master_key)
+        session.commit()
+        return True
@@ -0,0 +1,230 @@
+"""
+Thread Summary Service - materialisierte Thread-Übersicht (thread_summary)
+
+get_threads_summary lief bisher als GROUP BY über alle RawEmails des Users
+und lud danach jede Email der gewählten Threads zweimal (neueste + älteste).
+thread_summary hält pro Thread Anzahl, Ungelesene, neuestes/ältestes Datum,
+Absender der neuesten und Betreff der ältesten Email (verschlüsselte Blobs).
+
+Pflege:
+- Automatisch: Session-Events in 02_models.py merken geänderte
+  (user_id, thread_id) und rufen vor dem Commit refresh_threads() auf
+  (Flag/Move/Delete in sync_raw_emails_with_state, Aktionen, Auto-Rules, Purge)
+- Bulk-INSERT/UPDATEs an der Session vorbei (_persist_raw_emails,
+  _invalidate_folder): mark_dirty() aufrufen
+- Lazy: ensure_built() baut die Tabelle beim ersten Lesen eines Users
+  (auch nach invalidate_users(), falls refresh_threads() scheitert)
+- Manuell: scripts/rebuild_thread_summary.py
+
+Usage:
+    from src.services.thread_summary import ThreadSummaryService
+
+    ThreadSummaryService.ensure_built(db, user.id)
+    rows = ThreadSummaryService.base_query(db, user.id).limit(50).all()
+"""
+
+import importlib
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+models = importlib.import_module(".02_models", "src")
+
+logger = logging.getLogger(__name__)
+
+# Threads pro IN(...)-Abfrage
+REFRESH_CHUNK_SIZE = 500
+
+
+class ThreadSummaryService:
+    """Pflege und Abfrage von thread_summary"""
+
+    @staticmethod
+    def mark_dirty(session: Session, user_id: int, thread_ids: Iterable[str]) -> None:
+        """Threads beim nächsten Commit neu berechnen (für Bulk-UPDATEs ohne ORM-Events)"""
+        keys = {(user_id, thread_id) for thread_id in thread_ids if thread_id}
+        if keys:
+            session.info.setdefault(models.THREAD_SUMMARY_DIRTY_KEY, set()).update(keys)
+
+    @staticmethod
+    def _compute(rows) -> Dict[str, dict]:
+        """Aggregiert nach (thread_id, received_at, id) sortierte Email-Zeilen"""
+        summaries: Dict[str, dict] = {}
+        for thread_id, account_id, received_at, uid, is_seen, sender, subject in rows:
+            summary = summaries.get(thread_id)
+            if summary is None:
+                # Erste Zeile = älteste Email = Root
+                summary = summaries[thread_id] = {
+                    "mail_account_id": account_id,
+                    "email_count": 0,
+                    "unread_count": 0,
+                    "oldest_date": received_at,
+                    "root_subject": subject,
+                }
+            summary["email_count"] += 1
+            if is_seen is False:
+                summary["unread_count"] += 1
+            # Letzte Zeile = neueste Email
+            summary["mail_account_id"] = account_id
+            summary["latest_date"] = received_at
+            summary["latest_uid"] = uid
+            summary["latest_sender"] = sender
+        return summaries
+
+    @staticmethod
+    def _refresh_chunk(session: Session, user_id: int, thread_ids: List[str]) -> int:
+        RawEmail = models.RawEmail
+        rows = (
+            session.query(
+                RawEmail.thread_id,
+                RawEmail.mail_account_id,
+                RawEmail.received_at,
+                RawEmail.imap_uid,
+                RawEmail.imap_is_seen,
+                RawEmail.encrypted_sender,
+                RawEmail.encrypted_subject,
+            )
+            .filter(
+                RawEmail.user_id == user_id,
+                RawEmail.thread_id.in_(thread_ids),
+                RawEmail.deleted_at.is_(None),
+            )
+            .order_by(RawEmail.thread_id, RawEmail.received_at, RawEmail.id)
+        )
+        computed = ThreadSummaryService._compute(rows)
+
+        existing = {
+            summary.thread_id: summary
+            for summary in session.query(models.ThreadSummary).filter(
+                models.ThreadSummary.user_id == user_id,
+                models.ThreadSummary.thread_id.in_(thread_ids),
+            )
+        }
+        for thread_id in thread_ids:
+            values = computed.get(thread_id)
+            summary = existing.get(thread_id)
+            if values is None:
+                if summary is not None:
+                    session.delete(summary)
+                continue
+            if summary is None:
+                summary = models.ThreadSummary(user_id=user_id, thread_id=thread_id)
+                session.add(summary)
+            for key, value in values.items():
+                setattr(summary, key, value)
+        return len(computed)
+
+    @staticmethod
+    def refresh_threads(session: Session, keys: Iterable[Tuple[int, str]]) -> int:
+        """Berechnet die angegebenen Threads neu (Upsert, leere Threads werden entfernt)
+
+        Args:
+            keys: (user_id, thread_id) Paare
+
+        Returns:
+            Anzahl Threads mit mindestens einer Email
+        """
+        by_user: Dict[int, Set[str]] = {}
+        for user_id, thread_id in keys:
+            if thread_id:
+                by_user.setdefault(user_id, set()).add(thread_id)
+
+        refreshed = 0
+        for user_id, thread_ids in by_user.items():
+            ordered = sorted(thread_ids)
+            for start in range(0, len(ordered), REFRESH_CHUNK_SIZE):
+                refreshed += ThreadSummaryService._refresh_chunk(
+                    session, user_id, ordered[start:start + REFRESH_CHUNK_SIZE]
+                )
+        session.flush()
+        return refreshed
+
+    @staticmethod
+    def invalidate_users(session: Session, user_ids: Iterable[int]) -> None:
+        """Verwirft thread_summary der User (ensure_built() baut beim nächsten Lesen neu)
+
+        Fallback, wenn refresh_threads() vor dem Commit scheitert - eine leere
+        Summary ist der Rebuild-Marker, eine veraltete bliebe unbemerkt.
+        """
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return
+        session.query(models.ThreadSummary).filter(
+            models.ThreadSummary.user_id.in_(user_ids)
+        ).delete(synchronize_session=False)
+        logger.warning(f"🧵 thread_summary für User {user_ids} verworfen (Rebuild beim nächsten Lesen)")
+
+    @staticmethod
+    def rebuild_user(session: Session, user_id: int) -> int:
+        """Baut thread_summary für einen User komplett neu auf (Caller committed)
+
+        Returns:
+            Anzahl Threads
+        """
+        session.query(models.ThreadSummary).filter_by(user_id=user_id).delete(
+            synchronize_session=False
+        )
+        thread_ids = [
+            thread_id for (thread_id,) in session.query(models.RawEmail.thread_id)
+            .filter(
+                models.RawEmail.user_id == user_id,
+                models.RawEmail.thread_id.isnot(None),
+                models.RawEmail.deleted_at.is_(None),
+            )
+            .distinct()
+        ]
+        count = ThreadSummaryService.refresh_threads(
+            session, ((user_id, thread_id) for thread_id in thread_ids)
+        )
+        logger.info(f"🧵 thread_summary für User {user_id} neu aufgebaut: {count} Threads")
+        return count
+
+    @staticmethod
+    def ensure_built(session: Session, user_id: int) -> bool:
+        """Lazy-Aufbau beim ersten Lesen (Bestand vor Einführung der Tabelle
+        oder nach invalidate_users)
+
+        Returns:
+            True wenn neu aufgebaut wurde
+        """
+        has_summary = session.query(
+            session.query(models.ThreadSummary.id).filter_by(user_id=user_id).exists()
+        ).scalar()
+        if has_summary:
+            return False
+
+        has_threads = session.query(
+            session.query(models.RawEmail.id)
+            .filter(
+                models.RawEmail.user_id == user_id,
+                models.RawEmail.thread_id.isnot(None),
+                models.RawEmail.deleted_at.is_(None),
+            )
+            .exists()
+        ).scalar()
+        if not has_threads:
+            return False
+
+        ThreadSummaryService.rebuild_user(session, user_id)
+        session.commit()
+        return True
+
+    @staticmethod
+    def base_query(
+        session: Session,
+        user_id: int,
+        account_id: Optional[int] = None,
+        min_count: Optional[int] = None,
+        thread_ids: Optional[List[str]] = None,
+    ):
+        """Gefilterte Abfrage auf thread_summary (ohne Sortierung/Pagination)"""
+        Summary = models.ThreadSummary
+        query = session.query(Summary).filter(Summary.user_id == user_id)
+        if account_id:
+            query = query.filter(Summary.mail_account_id == account_id)
+        if min_count and min_count > 0:
+            query = query.filter(Summary.email_count >= min_count)
+        if thread_ids is not None:
+            query = query.filter(Summary.thread_id.in_(thread_ids))
+        return query
@@ -0,0 +1,192 @@
+"""
+Translation Cache - Übersetzungen pro Segment (Absatz) statt pro Email
+
+Opus-MT hat bisher jede Email komplett neu übersetzt - auch identische
+Footer, Disclaimer und Mailing-List-Bodies. Jetzt wird pro Segment (Absatz
+bzw. ≤350-Zeichen-Chunk, siehe translator_service.split_segments) gecacht:
+
+- Memory (pro Prozess, LRU, TRANSLATION_MEMORY_CACHE_SIZE Segmente)
+  Key: SHA-256(Modell, Quellsprache, normalisiertes Segment)
+- Persistent (translation_cache, pro User, Zero-Knowledge):
+  Key: HMAC-SHA256(aus dem Master-Key abgeleiteter Key, Modell|Sprache|Segment)
+  Wert: Übersetzung, verschlüsselt mit dem Master-Key
+  Begrenzung: Einträge älter als TRANSLATION_CACHE_TTL_DAYS fliegen raus,
+  über TRANSLATION_CACHE_MAX_ENTRIES pro User die ältesten (nach created_at)
+
+Usage:
+    cache = PersistentTranslationCache(db, user.id, master_key)
+    translator.translate_sync(text, 'de', source_lang='it', engine='local', cache=cache)
+"""
+
+import base64
+import hashlib
+import hmac
+import importlib
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta, UTC
+from typing import Dict, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Segmente pro Prozess im Memory-LRU
+TRANSLATION_MEMORY_CACHE_SIZE = int(os.getenv("TRANSLATION_MEMORY_CACHE_SIZE", "5000"))
+# Persistente Segmente pro User / Lebensdauer (translation_cache)
+TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "20000"))
+TRANSLATION_CACHE_TTL = timedelta(days=float(os.getenv("TRANSLATION_CACHE_TTL_DAYS", "180")))
+
+_KEY_CONTEXT = b"ki-mail-helper/translation-cache/v1"
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Keys pro IN(...)
+_CHUNK = 500
+
+
+def normalize_segment(segment: str) -> str:
+    """Unicode NFKC + zusammengefasste Whitespaces (Opus-MT ignoriert beides)"""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", segment or "")).strip()
+
+
+def segment_hash(model_name: str, source_lang: str, segment: str) -> str:
+    """Memory-Key: (Modell, Quellsprache, normalisiertes Segment)"""
+    payload = f"{model_name}\0{source_lang}\0{normalize_segment(segment)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SegmentMemoryCache:
+    """Prozessweiter LRU für übersetzte Segmente (geteilt von allen Aufrufern)"""
+
+    _lock = threading.Lock()
+    _cache: "OrderedDict[str, str]" = OrderedDict()
+
+    @classmethod
+    def get_many(cls, keys: Iterable[str]) -> Dict[str, str]:
+        found = {}
+        with cls._lock:
+            for key in keys:
+                value = cls._cache.get(key)
+                if value is not None:
+                    cls._cache.move_to_end(key)
+                    found[key] = value
+        return found
+
+    @classmethod
+    def put_many(cls, values: Dict[str, str]) -> None:
+        with cls._lock:
+            for key, value in values.items():
+                cls._cache[key] = value
+                cls._cache.move_to_end(key)
+            while len(cls._cache) > TRANSLATION_MEMORY_CACHE_SIZE:
+                cls._cache.popitem(last=False)
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._cache.clear()
+
+
+class PersistentTranslationCache:
+    """translation_cache-Tabelle für EINEN User (verschlüsselt, HMAC-Keys)
+
+    Schreibt nur per Savepoint in die Session des Callers - committed nicht.
+    Fehler werden geloggt, nie geworfen (Übersetzung funktioniert auch ohne).
+    """
+
+    def __init__(self, session: Session, user_id: int, master_key: str):
+        self.session = session
+        self.user_id = user_id
+        self.master_key = master_key
+        self._key = hmac.new(base64.b64decode(master_key), _KEY_CONTEXT, hashlib.sha256).digest()
+
+    def cache_key(self, model_name: str, source_lang: str, segment: str) -> str:
+        payload = f"{model_name}\0{source_lang}\0{normalize_segment(segment)}"
+        return hmac.new(self._key, payload.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def get_many(self, model_name: str, source_lang: str, segments: Iterable[str]) -> Dict[str, str]:
+        """{segment: Übersetzung} für alle gecachten Segmente"""
+        models = importlib.import_module(".02_models", "src")
+        encryption = importlib.import_module(".08_encryption", "src")
+        Entry = models.TranslationCacheEntry
+
+        by_key = {self.cache_key(model_name, source_lang, s): s for s in segments}
+        keys = list(by_key)
+        found: Dict[str, str] = {}
+        try:
+            decryptor = encryption.BatchDecryptor(self.master_key)
+            for i in range(0, len(keys), _CHUNK):
+                rows = self.session.query(Entry.cache_key, Entry.encrypted_translation).filter(
+                    Entry.user_id == self.user_id,
+                    Entry.cache_key.in_(keys[i:i + _CHUNK]),
+                )
+                for cache_key, encrypted_translation in rows:
+                    found[by_key[cache_key]] = decryptor.decrypt(encrypted_translation)
+        except Exception as e:
+            logger.warning(f"⚠️ Übersetzungs-Cache nicht lesbar: {e}")
+        return found
+
+    def _prune(self, Entry, now: datetime) -> int:
+        """Abgelaufene und über TRANSLATION_CACHE_MAX_ENTRIES liegende (älteste) Einträge löschen"""
+        query = self.session.query(Entry).filter(Entry.user_id == self.user_id)
+        removed = query.filter(Entry.created_at < now - TRANSLATION_CACHE_TTL).delete(
+            synchronize_session=False
+        )
+        # Ein DELETE statt COUNT + Nachladen der ältesten IDs bei jedem put_many
+        newest = (
+            select(Entry.id)
+            .where(Entry.user_id == self.user_id)
+            .order_by(Entry.created_at.desc(), Entry.id.desc())
+            .limit(TRANSLATION_CACHE_MAX_ENTRIES)
+        )
+        removed += query.filter(Entry.id.not_in(newest)).delete(synchronize_session=False)
+        if removed:
+            logger.debug(f"🧹 Übersetzungs-Cache User {self.user_id}: {removed} Einträge entfernt")
+        return removed
+
+    def put_many(self, model_name: str, source_lang: str, translations: Dict[str, str]) -> int:
+        """Speichert {segment: Übersetzung} (vorhandene Keys bleiben unverändert)"""
+        if not translations:
+            return 0
+        models = importlib.import_module(".02_models", "src")
+        encryption = importlib.import_module(".08_encryption", "src")
+        Entry = models.TranslationCacheEntry
+
+        by_key = {
+            self.cache_key(model_name, source_lang, segment): translated
+            for segment, translated in translations.items()
+        }
+        try:
+            with self.session.begin_nested():
+                keys = list(by_key)
+                for i in range(0, len(keys), _CHUNK):
+                    for (cache_key,) in self.session.query(Entry.cache_key).filter(
+                        Entry.user_id == self.user_id,
+                        Entry.cache_key.in_(keys[i:i + _CHUNK]),
+                    ):
+                        by_key.pop(cache_key, None)
+                if not by_key:
+                    return 0
+                encryptor = encryption.BatchEncryptor(self.master_key)
+                now = datetime.now(UTC)
+                self.session.bulk_insert_mappings(Entry, [
+                    {
+                        "user_id": self.user_id,
+                        "cache_key": cache_key,
+                        "model_name": model_name,
+                        "encrypted_translation": encryptor.encrypt(translated),
+                        "created_at": now,
+                    }
+                    for cache_key, translated in by_key.items()
+                ])
+                self._prune(Entry, now)
+        except Exception as e:
+            # z.B. paralleler Worker hat dasselbe Segment gerade gespeichert
+            logger.warning(f"⚠️ Übersetzungs-Cache nicht gespeichert: {e}")
+            return 0
+        return len(by_key)
@@ -6,24 +6,34 @@ Features:
 - Spracherkennung via fastText (lid.176.bin Modell)
 - Übersetzung via Cloud-LLM (OpenAI/Anthropic/Mistral)
 - Lokale Übersetzung via Opus-MT (Helsinki-NLP)
-- Chunking für lange Texte (Opus-MT 512 Token Limit)
+- Segmentierung in Absätze/Chunks (Opus-MT 512 Token Limit)
+- Übersetzungs-Cache pro Segment (Memory + verschlüsselt in translation_cache)
+- Gebündelte Opus-MT Inferenz: viele Segmente (auch mehrerer Emails) pro generate()
 - LRU-Cache für Opus-MT Modelle (RAM-Management)
 - Sync-Wrapper für Celery-Integration
 
-Version: 1.2.0
-Datum: 2026-01-23
+Version: 1.3.0
+Datum: 2026-02-06
 """
 
 import os
 import logging
 import asyncio
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List
 from dataclasses import dataclass
 from pathlib import Path
 from collections import OrderedDict
 
+from src.services.translation_cache import SegmentMemoryCache, segment_hash
+
 logger = logging.getLogger(__name__)
 
+# Max. Zeichen pro Segment (lange Absätze werden an Satzenden aufgeteilt)
+MAX_CHARS_PER_SEGMENT = 350
+
+# Token-Budget pro generate()-Aufruf: Segmente × längstes Segment (inkl. Padding)
+OPUS_MT_BATCH_TOKENS = int(os.getenv("OPUS_MT_BATCH_TOKENS", "4096"))
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # Data Classes
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -81,6 +91,49 @@ LANGUAGE_NAMES = {
 SUPPORTED_TARGET_LANGUAGES = ['de', 'en', 'fr', 'it', 'es', 'pt', 'nl', 'pl']
 
 
+def opus_model_name(source_lang: str, target_lang: str) -> str:
+    """Opus-MT Modell-Name, Format: Helsinki-NLP/opus-mt-{src}-{tgt}"""
+    return f"Helsinki-NLP/opus-mt-{source_lang}-{target_lang}"
+
+
+def split_segments(text: str) -> List[str]:
+    """
+    Zerlegt Text in Übersetzungs-Segmente.
+    
+    Ein Segment pro Absatz; Absätze über MAX_CHARS_PER_SEGMENT werden an
+    Satzenden (notfalls hart) in Chunks bis MAX_CHARS_PER_SEGMENT geteilt.
+    Gleiche Absätze (Footer, Disclaimer) ergeben so gleiche Cache-Keys.
+    """
+    # KRITISCH: Trailing Spaces pro Zeile entfernen (inscriptis lässt die stehen)
+    # Ohne dies: Leere Chunks → Opus-MT halluziniert "Es ist nicht bekannt, ob"
+    text = '\n'.join(line.rstrip() for line in (text or '').split('\n'))
+    
+    segments = []
+    for para in text.split('\n\n'):
+        # Leere Absätze überspringen (verhindert Halluzinationen)
+        if not para.strip():
+            continue
+        if len(para) <= MAX_CHARS_PER_SEGMENT:
+            segments.append(para)
+            continue
+        
+        # Zu langer Absatz: an Satzenden trennen, zu lange Sätze hart trennen
+        current_chunk = ""
+        for sentence in para.replace('. ', '.\n').split('\n'):
+            for i in range(0, len(sentence), MAX_CHARS_PER_SEGMENT):
+                chunk_part = sentence[i:i + MAX_CHARS_PER_SEGMENT]
+                if not chunk_part.strip():
+                    continue
+                if current_chunk and len(current_chunk) + len(chunk_part) + 1 > MAX_CHARS_PER_SEGMENT:
+                    segments.append(current_chunk)
+                    current_chunk = chunk_part
+                else:
+                    current_chunk += (" " if current_chunk else "") + chunk_part
+        if current_chunk.strip():
+            segments.append(current_chunk)
+    return segments
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # TranslatorService
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -259,7 +312,8 @@ class TranslatorService:
         source_lang: Optional[str] = None,
         engine: str = 'cloud',
         provider: Optional[str] = None,
-        model_override: Optional[str] = None
+        model_override: Optional[str] = None,
+        cache=None
     ) -> TranslationResult:
         """
         Übersetzt einen Text in die Zielsprache.
@@ -271,6 +325,7 @@ class TranslatorService:
             engine: 'cloud' (LLM) oder 'local' (Opus-MT)
             provider: KI-Provider ('openai', 'anthropic', 'ollama', 'mistral')
             model_override: Optionales Modell-Override
+            cache: Optionaler PersistentTranslationCache (nur engine='local')
             
         Returns:
             TranslationResult
@@ -284,7 +339,7 @@ class TranslatorService:
         source_name = LANGUAGE_NAMES.get(source_lang, source_lang)
         
         if engine == 'local':
-            return await self._translate_local(text, source_lang, target_lang)
+            return await self._translate_local(text, source_lang, target_lang, cache=cache)
         else:
             return await self._translate_cloud(
                 text, source_lang, target_lang, 
@@ -347,7 +402,6 @@ REGELN:
             ai_client = ai_client_module.build_client(provider=provider, model=model)
             
             # generate_text ist synchron - wir rufen es im Thread-Pool auf
-            import asyncio
             loop = asyncio.get_event_loop()
             translated = await loop.run_in_executor(
                 None,
@@ -370,7 +424,8 @@ REGELN:
         self,
         text: str,
         source_lang: str,
-        target_lang: str
+        target_lang: str,
+        cache=None
     ) -> TranslationResult:
         """
         Lokale Übersetzung via Opus-MT (Helsinki-NLP).
@@ -378,18 +433,14 @@ REGELN:
         Modelle werden bei erstem Aufruf heruntergeladen (~300MB pro Sprachpaar).
         Cached in ~/.cache/huggingface/hub/
         """
-        import asyncio
-        
-        # Mapping für Opus-MT Modell-Namen
-        # Format: Helsinki-NLP/opus-mt-{src}-{tgt}
-        model_name = f"Helsinki-NLP/opus-mt-{source_lang}-{target_lang}"
+        model_name = opus_model_name(source_lang, target_lang)
         
         try:
             # Synchrone Transformers-Aufrufe in Thread-Pool
             loop = asyncio.get_event_loop()
             translated = await loop.run_in_executor(
                 None,
-                lambda: self._run_opus_translation(model_name, text)
+                lambda: self._run_opus_translation(model_name, text, source_lang, cache)
             )
             
             return TranslationResult(
@@ -402,34 +453,22 @@ REGELN:
             
         except Exception as e:
             logger.error(f"Local translation error: {e}")
-            # Fallback-Info für User
-            if "does not appear to have a file named" in str(e):
-                raise ValueError(
-                    f"Kein Opus-MT Modell für {source_lang}→{target_lang} verfügbar. "
-                    f"Bitte Cloud-Übersetzung verwenden."
-                )
+            self._raise_missing_model(e, source_lang, target_lang)
             raise
     
-    def _run_opus_translation(self, model_name: str, text: str) -> str:
+    @staticmethod
+    def _raise_missing_model(error: Exception, source_lang: str, target_lang: str) -> None:
+        """Fallback-Info für User, wenn es kein Opus-MT Modell für das Sprachpaar gibt."""
+        if "does not appear to have a file named" in str(error):
+            raise ValueError(
+                f"Kein Opus-MT Modell für {source_lang}→{target_lang} verfügbar. "
+                f"Bitte Cloud-Übersetzung verwenden."
+            )
+    
+    def _get_opus_model(self, model_name: str) -> Tuple[Any, Any]:
         """
-        Führt Opus-MT Übersetzung synchron aus (für Thread-Pool).
-        
-        Mit LRU-Cache (max 2 Modelle) und Chunking für lange Texte.
+        Lädt ein Opus-MT Modell (Tokenizer, Modell) - LRU-Cache mit max 2 Modellen.
         """
-        if not text or not text.strip():
-            return text
-
-        from transformers import MarianMTModel, MarianTokenizer
-        import os
-        
-        # KRITISCH: Trailing Spaces pro Zeile entfernen (inscriptis lässt die stehen)
-        # Ohne dies: Leere Chunks → Opus-MT halluziniert "Es ist nicht bekannt, ob"
-        lines = [line.rstrip() for line in text.split('\n')]
-        text = '\n'.join(lines)
-        
-        # DEBUG: Log den EXACT Text der übersetzt wird
-        logger.info(f"🔍 OPUS-MT Input ({len(text)} chars):\n{repr(text[:500])}\n")
-        
         # LRU-Cache für Opus-MT Modelle (RAM-Management)
         MAX_CACHED_MODELS = 2  # Max 600MB RAM (300MB pro Modell)
         
@@ -444,6 +483,7 @@ REGELN:
                 del self._opus_models[oldest]
             
             logger.info(f"📥 Lade Opus-MT Modell: {model_name}")
+            from transformers import MarianMTModel, MarianTokenizer
             
             # FIX Phase 27: Timeout + Local-first + Error Handling
             try:
@@ -482,98 +522,147 @@ REGELN:
         
         # Move to end (LRU)
         self._opus_models.move_to_end(model_name)
-        tokenizer, model = self._opus_models[model_name]
+        return self._opus_models[model_name]
+    
+    def _generate_batched(self, model_name: str, segments: List[str]) -> Dict[str, str]:
+        """
+        Übersetzt Segmente mit möglichst wenigen generate()-Aufrufen.
+        
+        Segmente werden nach Token-Länge sortiert (wenig Padding) und so
+        gebündelt, dass Anzahl × längstes Segment OPUS_MT_BATCH_TOKENS nicht
+        übersteigt.
+        """
+        tokenizer, model = self._get_opus_model(model_name)
+        lengths = [len(ids) for ids in tokenizer(segments)['input_ids']]
+        order = sorted(range(len(segments)), key=lengths.__getitem__)
+        
+        translated = {}
+        
+        def run(batch):
+            texts = [segments[i] for i in batch]
+            tokens = tokenizer(texts, return_tensors='pt', padding=True, max_length=512)
+            output = model.generate(**tokens, max_length=512)
+            for text, decoded in zip(texts, tokenizer.batch_decode(output, skip_special_tokens=True)):
+                translated[text] = decoded
+        
+        batch = []
+        batch_max = 0
+        calls = 0
+        for i in order:
+            longest = max(batch_max, lengths[i])
+            if batch and longest * (len(batch) + 1) > OPUS_MT_BATCH_TOKENS:
+                run(batch)
+                calls += 1
+                batch = []
+                longest = lengths[i]
+            batch.append(i)
+            batch_max = longest
+        if batch:
+            run(batch)
+            calls += 1
+        
+        logger.debug(f"Opus-MT: {len(segments)} Segmente in {calls} generate()-Aufrufen")
+        return translated
+    
+    def _translate_segments(
+        self,
+        model_name: str,
+        segments: List[str],
+        source_lang: str = "",
+        cache=None
+    ) -> List[str]:
+        """
+        Übersetzt Segmente: Memory-Cache → persistenter Cache → gebündelte Inferenz.
+        
+        Returns:
+            Übersetzungen in der Reihenfolge von segments
+        """
+        unique = list(dict.fromkeys(segments))
+        hashes = {segment: segment_hash(model_name, source_lang, segment) for segment in unique}
+        
+        memory = SegmentMemoryCache.get_many(hashes.values())
+        translations = {
+            segment: memory[hashes[segment]] for segment in unique if hashes[segment] in memory
+        }
+        missing = [segment for segment in unique if segment not in translations]
+        
+        if missing and cache is not None:
+            stored = cache.get_many(model_name, source_lang, missing)
+            translations.update(stored)
+            SegmentMemoryCache.put_many({hashes[s]: t for s, t in stored.items()})
+            missing = [segment for segment in missing if segment not in stored]
+        
+        if missing:
+            generated = self._generate_batched(model_name, missing)
+            translations.update(generated)
+            SegmentMemoryCache.put_many({hashes[s]: t for s, t in generated.items()})
+            if cache is not None:
+                cache.put_many(model_name, source_lang, generated)
+        
+        logger.debug(
+            f"🌍 {len(unique)} Segmente: {len(unique) - len(missing)} aus Cache, "
+            f"{len(missing)} übersetzt"
+        )
+        return [translations[segment] for segment in segments]
+    
+    def _run_opus_translation(
+        self,
+        model_name: str,
+        text: str,
+        source_lang: str = "",
+        cache=None
+    ) -> str:
+        """
+        Führt Opus-MT Übersetzung synchron aus (für Thread-Pool).
         
-        # Prüfe Token-Count statt Zeichen-Count (präziser!)
-        test_tokens = tokenizer(text, return_tensors='pt', padding=True, max_length=512)
-        token_count = test_tokens['input_ids'].shape[1]
+        Text wird in Segmente (Absätze) zerlegt, gecachte Segmente übernommen
+        und der Rest gebündelt übersetzt. Absätze werden mit Leerzeilen verbunden.
+        """
+        if not text or not text.strip():
+            return text
         
-        if token_count <= 512:
-            # Text passt in ein Chunk - DIREKT übersetzen!
-            logger.debug(f"Text OK: {len(text)} chars = {token_count} tokens (< 512)")
-            translated_tokens = model.generate(**test_tokens, max_length=512)
-            return tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
+        segments = split_segments(text)
+        logger.info(f"🔍 OPUS-MT Input: {len(text)} chars, {len(segments)} Segmente")
+        return "\n\n".join(self._translate_segments(model_name, segments, source_lang, cache))
+    
+    def translate_batch_sync(
+        self,
+        texts: List[str],
+        target_lang: str,
+        source_lang: str,
+        cache=None
+    ) -> List[TranslationResult]:
+        """
+        Übersetzt mehrere Texte einer Quellsprache lokal (Opus-MT) in einem Durchlauf.
         
-        # Text zu lang: Chunking nötig
-        logger.warning(f"Text zu lang: {len(text)} chars = {token_count} tokens - Chunking aktiviert")
-        MAX_CHARS_PER_CHUNK = 350  # Konservativ für Chunking
+        Die Segmente aller Texte werden dedupliziert und gemeinsam gebündelt
+        (z.B. alle it-Mails eines Sync-Batches).
         
-        # Langer Text: In Absätze/Chunks aufteilen
-        logger.debug(f"Text zu lang ({len(text)} Zeichen), Chunking aktiviert")
+        Raises:
+            ValueError wenn es kein Opus-MT Modell für das Sprachpaar gibt
+        """
+        model_name = opus_model_name(source_lang, target_lang)
+        per_text = [split_segments(text) if text and text.strip() else [] for text in texts]
         
-        # Strategie: An Absätzen trennen, große Paragraphen aufteilen
-        paragraphs = text.split('\n\n')
-        translated_chunks = []
-        current_chunk = ""
+        try:
+            translated = iter(self._translate_segments(
+                model_name, [segment for segments in per_text for segment in segments], source_lang, cache
+            ))
+        except Exception as e:
+            logger.error(f"Local translation error: {e}")
+            self._raise_missing_model(e, source_lang, target_lang)
+            raise
         
-        for para in paragraphs:
-            # Leere Absätze überspringen (verhindert Halluzinationen)
-            if not para.strip():
-                continue
-
-            # Wenn Paragraph selbst zu lang, in Sätze aufteilen
-            if len(para) > MAX_CHARS_PER_CHUNK:
-                # Versuche an Satzenden zu trennen
-                sentences = para.replace('. ', '.\n').split('\n')
-                for sentence in sentences:
-                    if not sentence.strip():
-                        continue
-
-                    # Falls einzelner Satz immer noch zu lang, hart trennen
-                    if len(sentence) > MAX_CHARS_PER_CHUNK:
-                        for i in range(0, len(sentence), MAX_CHARS_PER_CHUNK):
-                            chunk_part = sentence[i:i+MAX_CHARS_PER_CHUNK]
-                            if not chunk_part.strip():
-                                continue
-
-                            if current_chunk and len(current_chunk) + len(chunk_part) + 1 > MAX_CHARS_PER_CHUNK:
-                                # Aktuellen Chunk übersetzen (OHNE truncation!)
-                                if current_chunk.strip():
-                                    tokens = tokenizer(current_chunk, return_tensors='pt', padding=True, max_length=512)
-                                    translated_tokens = model.generate(**tokens, max_length=512)
-                                    translated_chunks.append(
-                                        tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
-                                    )
-                                current_chunk = chunk_part
-                            else:
-                                current_chunk += (" " if current_chunk else "") + chunk_part
-                    else:
-                        if current_chunk and len(current_chunk) + len(sentence) + 1 > MAX_CHARS_PER_CHUNK:
-                            # Aktuellen Chunk übersetzen (OHNE truncation!)
-                            if current_chunk.strip():
-                                tokens = tokenizer(current_chunk, return_tensors='pt', padding=True, max_length=512)
-                                translated_tokens = model.generate(**tokens, max_length=512)
-                                translated_chunks.append(
-                                    tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
-                                )
-                            current_chunk = sentence
-                        else:
-                            current_chunk += (" " if current_chunk else "") + sentence
-                continue
-            
-            if len(current_chunk) + len(para) + 2 > MAX_CHARS_PER_CHUNK:
-                # Chunk übersetzen (OHNE truncation!)
-                if current_chunk and current_chunk.strip():
-                    tokens = tokenizer(current_chunk, return_tensors='pt', padding=True, max_length=512)
-                    translated_tokens = model.generate(**tokens, max_length=512)
-                    translated_chunks.append(
-                        tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
-                    )
-                current_chunk = para
-            else:
-                current_chunk += ("\n\n" if current_chunk else "") + para
-        
-        # Letzten Chunk übersetzen (OHNE truncation!)
-        if current_chunk and current_chunk.strip():
-            tokens = tokenizer(current_chunk, return_tensors='pt', padding=True, max_length=512)
-            translated_tokens = model.generate(**tokens, max_length=512)
-            translated_chunks.append(
-                tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
+        return [
+            TranslationResult(
+                translated_text="\n\n".join(next(translated) for _ in segments) if segments else text,
+                source_language=source_lang,
+                target_language=target_lang,
+                engine='local',
+                model_used=model_name.split('/')[-1]
             )
-        
-        result = "\n\n".join(translated_chunks)
-        logger.debug(f"Chunking abgeschlossen: {len(translated_chunks)} chunks → {len(result)} Zeichen")
-        return result
+            for text, segments in zip(texts, per_text)
+        ]
     
     # ═══════════════════════════════════════════════════════════════════════════
     # Sync Wrapper für Celery
@@ -586,7 +675,8 @@ REGELN:
         source_lang: Optional[str] = None,
         engine: str = 'local',
         provider: Optional[str] = None,
-        model_override: Optional[str] = None
+        model_override: Optional[str] = None,
+        cache=None
     ) -> TranslationResult:
         """
         Synchroner Wrapper für translate() - für Celery-Tasks.
@@ -594,7 +684,7 @@ REGELN:
         Verwendet asyncio.run() um async-Funktion synchron auszuführen.
         """
         return asyncio.run(self.translate(
-            text, target_lang, source_lang, engine, provider, model_override
+            text, target_lang, source_lang, engine, provider, model_override, cache=cache
         ))
 
 
@@ -612,8 +702,6 @@ def get_translator() -> TranslatorService:
 # ═══════════════════════════════════════════════════════════════════════════════
 
 if __name__ == "__main__":
-    import asyncio
-    
     service = TranslatorService()
     
     # Test Detection
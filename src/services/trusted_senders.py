@@ -6,9 +6,12 @@ Nur für Emails von diesen Sendern wird UrgencyBooster (spaCy) verwendet.
 """
 
 import logging
+import os
 import re
 import importlib
-from typing import Optional, List, Dict
+import threading
+import time
+from typing import Optional, List, Dict, Iterable, Tuple
 from datetime import datetime, UTC
 from sqlalchemy import func, update
 
@@ -16,6 +19,10 @@ logger = logging.getLogger(__name__)
 
 MAX_TRUSTED_SENDERS_PER_USER = 500
 
+# Sekunden, die ein kompilierter Matcher pro Prozess gilt. Änderungen über
+# TrustedSenderManager/API invalidieren sofort - die TTL deckt andere Worker ab.
+TRUSTED_SENDER_CACHE_TTL = int(os.getenv("TRUSTED_SENDER_CACHE_TTL", "60"))
+
 
 def prepare_suggestion(sender: str, suggested_type: str) -> str:
     """
@@ -73,11 +80,156 @@ EMAIL_REGEX = r'^[a-zA-Z0-9]+([._+-][a-zA-Z0-9]+)*@[a-zA-Z0-9]+([.-][a-zA-Z0-9]+
 DOMAIN_REGEX = r'^([a-zA-Z0-9]([a-zA-Z0-9-]*[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$'
 
 
+def normalize_sender_address(sender_email: str) -> str:
+    """Extrahiert die Adresse aus "Display Name" <email@domain.com> (lowercase)"""
+    sender_lower = (sender_email or "").lower().strip()
+    email_match = re.search(r'<(.+?)>', sender_lower)
+    if email_match:
+        sender_lower = email_match.group(1).strip()
+    return sender_lower
+
+
+class _SenderScope:
+    """Patterns EINES Scopes (ein Account oder global) als Lookup-Strukturen
+
+    - exact: Adresse → Eintrag
+    - email_domain: "@domain" → Eintrag
+    - domain: Trie über umgekehrte Labels (de → firma → mail), damit
+      "firma.de" genau firma.de und *.firma.de trifft, aber nie test-firma.de
+    """
+
+    _LEAF = ""  # Label-Strings sind nie leer
+
+    def __init__(self):
+        self.exact: Dict[str, Dict] = {}
+        self.email_domain: Dict[str, Dict] = {}
+        self.domain_trie: Dict = {}
+
+    def add(self, entry: Dict) -> None:
+        pattern = entry['pattern']
+        pattern_type = entry['pattern_type']
+        if pattern_type == 'exact':
+            self.exact.setdefault(pattern, entry)
+        elif pattern_type == 'email_domain':
+            self.email_domain.setdefault(pattern, entry)
+        elif pattern_type == 'domain':
+            node = self.domain_trie
+            for label in reversed(pattern.split('.')):
+                node = node.setdefault(label, {})
+            node.setdefault(self._LEAF, entry)
+
+    def match(self, sender_lower: str) -> Optional[Dict]:
+        """Spezifischstes Pattern: exact → @domain → längste (Sub-)Domain"""
+        entry = self.exact.get(sender_lower)
+        if entry:
+            return entry
+
+        if '@' not in sender_lower:
+            return None
+        parts = sender_lower.split('@')
+        entry = self.email_domain.get('@' + parts[1])
+        if entry or len(parts) != 2 or not self.domain_trie:
+            return entry
+
+        node = self.domain_trie
+        for label in reversed(parts[1].split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            entry = node.get(self._LEAF, entry)
+        return entry
+
+
+class CompiledSenderMatcher:
+    """Alle Trusted Sender eines Users, kompiliert für O(Labels)-Lookups
+
+    Reihenfolge wie bisher: account-spezifische Patterns vor globalen
+    (account_id=NULL); ohne account_id nur globale.
+    """
+
+    def __init__(self, entries: Iterable[Dict]):
+        self._scopes: Dict[Optional[int], _SenderScope] = {}
+        for entry in entries:
+            self._scopes.setdefault(entry['account_id'], _SenderScope()).add(entry)
+
+    def match(self, sender_email: str, account_id: Optional[int] = None) -> Optional[Dict]:
+        sender_lower = normalize_sender_address(sender_email)
+        if not sender_lower:
+            return None
+        if account_id:
+            scope = self._scopes.get(account_id)
+            entry = scope.match(sender_lower) if scope else None
+            if entry:
+                return dict(entry)
+        scope = self._scopes.get(None)
+        entry = scope.match(sender_lower) if scope else None
+        return dict(entry) if entry else None
+
+
 class TrustedSenderManager:
     """Verwaltet Trusted Sender für User"""
     
-    @staticmethod
-    def is_trusted_sender(db, user_id: int, sender_email: str, account_id: Optional[int] = None) -> Optional[Dict]:
+    # Kompilierte Matcher pro User: user_id → (monotonic timestamp, matcher)
+    _lock = threading.Lock()
+    _matchers: Dict[int, Tuple[float, CompiledSenderMatcher]] = {}
+    
+    @classmethod
+    def invalidate(cls, user_id: Optional[int] = None) -> None:
+        """Verwirft kompilierte Matcher (nach Add/Update/Delete)"""
+        with cls._lock:
+            if user_id is None:
+                cls._matchers.clear()
+            else:
+                cls._matchers.pop(user_id, None)
+    
+    @classmethod
+    def get_matcher(cls, db, user_id: int) -> CompiledSenderMatcher:
+        """Kompilierter Matcher für alle Trusted Sender des Users (gecacht)"""
+        with cls._lock:
+            cached = cls._matchers.get(user_id)
+            if cached and time.monotonic() - cached[0] < TRUSTED_SENDER_CACHE_TTL:
+                return cached[1]
+        
+        models = importlib.import_module(".02_models", "src")
+        TrustedSender = models.TrustedSender
+        rows = db.query(
+            TrustedSender.id,
+            TrustedSender.label,
+            TrustedSender.use_urgency_booster,
+            TrustedSender.sender_pattern,
+            TrustedSender.pattern_type,
+            TrustedSender.account_id,
+        ).filter(TrustedSender.user_id == user_id).order_by(TrustedSender.id).all()
+        
+        matcher = CompiledSenderMatcher(
+            {
+                'id': row.id,
+                'label': row.label,
+                'use_urgency_booster': row.use_urgency_booster,
+                'pattern': row.sender_pattern,
+                'pattern_type': row.pattern_type,
+                'account_id': row.account_id,
+            }
+            for row in rows
+        )
+        with cls._lock:
+            cls._matchers[user_id] = (time.monotonic(), matcher)
+        return matcher
+    
+    @classmethod
+    def match_senders(
+        cls, db, user_id: int, senders: Iterable[str], account_id: Optional[int] = None
+    ) -> Dict[str, Optional[Dict]]:
+        """Batch-Variante von is_trusted_sender (ein Matcher-Lookup für alle Sender)
+        
+        Returns:
+            {sender: Treffer-dict oder None}
+        """
+        matcher = cls.get_matcher(db, user_id)
+        return {sender: matcher.match(sender, account_id) for sender in senders}
+    
+    @classmethod
+    def is_trusted_sender(cls, db, user_id: int, sender_email: str, account_id: Optional[int] = None) -> Optional[Dict]:
         """
         Prüft ob Sender vertrauenswürdig ist.
         
@@ -85,6 +237,8 @@ class TrustedSenderManager:
         - Wenn account_id None: Prüft nur user_id (global)
         - Wenn account_id gegeben: Prüft zuerst account-spezifische, dann globale
         
+        Nutzt den gecachten CompiledSenderMatcher - keine DB-Abfrage pro Email.
+        
         Args:
             sender_email: Email address, may include display name like "Name" <email@domain.com>
         
@@ -92,95 +246,10 @@ class TrustedSenderManager:
             None wenn nicht trusted
             dict mit {'id', 'label', 'use_urgency_booster', 'pattern', 'account_id'} wenn trusted
         """
-        models = importlib.import_module(".02_models", "src")
-        
-        # Extract email from "Display Name" <email@domain.com> format if present
-        sender_lower = sender_email.lower().strip()
-        email_match = re.search(r'<(.+?)>', sender_lower)
-        if email_match:
-            sender_lower = email_match.group(1).strip()
-        
-        if '@' in sender_lower:
-            domain = sender_lower.split('@')[1]
-            email_domain = '@' + domain
-        else:
-            domain = sender_lower
-            email_domain = None
-        
-        # Hole alle Trusted Sender für User
-        # Wenn account_id gegeben: Erst account-spezifische, dann globale (NULL)
-        query = db.query(models.TrustedSender).filter_by(user_id=user_id)
-        
-        if account_id:
-            # Order: account-specific first, then global (account_id=NULL)
-            trusted_senders = query.filter(
-                (models.TrustedSender.account_id == account_id) |
-                (models.TrustedSender.account_id.is_(None))
-            ).order_by(
-                models.TrustedSender.account_id.desc()  # Account-specific first
-            ).all()
-        else:
-            # Only global (account_id=NULL)
-            trusted_senders = query.filter(models.TrustedSender.account_id.is_(None)).all()
-        
-        # Pattern ist bereits normalisiert
-        for ts in trusted_senders:
-            pattern = ts.sender_pattern
-            
-            if ts.pattern_type == 'exact':
-                if pattern == sender_lower:
-                    logger.debug(f"✅ Trusted sender matched (exact): {sender_email}")
-                    return {
-                        'id': ts.id,
-                        'label': ts.label,
-                        'use_urgency_booster': ts.use_urgency_booster,
-                        'pattern': ts.sender_pattern,
-                        'pattern_type': 'exact',
-                        'account_id': ts.account_id
-                    }
-            
-            elif ts.pattern_type == 'email_domain' and email_domain:
-                if pattern == email_domain:
-                    logger.debug(f"✅ Trusted sender matched (email_domain): {sender_email}")
-                    return {
-                        'id': ts.id,
-                        'label': ts.label,
-                        'use_urgency_booster': ts.use_urgency_booster,
-                        'pattern': ts.sender_pattern,
-                        'pattern_type': 'email_domain',
-                        'account_id': ts.account_id
-                    }
-            
-            elif ts.pattern_type == 'domain':
-                # SECURITY: Match exact domain OR subdomains (e.g., company.com matches @company.com and @mail.company.com)
-                # BUT NOT: test-company.com (different domain - suffix spoofing attack)
-                parts = sender_lower.split('@')
-                if len(parts) == 2:
-                    sender_domain = parts[1]
-                    # Exact domain match: @company.com
-                    if sender_domain == pattern:
-                        logger.debug(f"✅ Trusted sender matched (domain exact): {sender_email}")
-                        return {
-                            'id': ts.id,
-                            'label': ts.label,
-                            'use_urgency_booster': ts.use_urgency_booster,
-                            'pattern': ts.sender_pattern,
-                            'pattern_type': 'domain',
-                            'account_id': ts.account_id
-                        }
-                    # Subdomain match: @mail.company.com (but NOT test-company.com)
-                    elif sender_domain.endswith('.' + pattern):
-                        logger.debug(f"✅ Trusted sender matched (domain subdomain): {sender_email}")
-                        return {
-                            'id': ts.id,
-                            'label': ts.label,
-                            'use_urgency_booster': ts.use_urgency_booster,
-                            'pattern': ts.sender_pattern,
-                            'pattern_type': 'domain',
-                            'account_id': ts.account_id
-                        }
-        
-        return None
+        match = cls.get_matcher(db, user_id).match(sender_email, account_id)
+        if match:
+            logger.debug(f"✅ Trusted sender matched ({match['pattern_type']}): {sender_email}")
+        return match
     
     @staticmethod
     def add_trusted_sender(
@@ -272,6 +341,7 @@ class TrustedSenderManager:
         try:
             db.add(trusted)
             db.commit()
+            TrustedSenderManager.invalidate(user_id)
             
             logger.info(f"✅ User {user_id} added trusted sender: {sender_pattern} ({pattern_type})")
             
@@ -14,11 +14,12 @@ WICHTIG: Läuft NUR auf Trusted Senders (User-definiert)!
 
 import logging
 import re
-import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from concurrent.futures import ThreadPoolExecutor, TimeoutError
 
+from src.services import spacy_context
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,9 +47,6 @@ def safe_regex_search(pattern: str, text: str, timeout_seconds: int = 2) -> Opti
         logger.error(f"Error in safe_regex_search: {e}")
         return None
 
-_spacy_de = None
-_spacy_lock = threading.Lock()
-
 ACTION_VERBS_SET = {
     'senden', 'schicken', 'überweisen', 'bezahlen',
     'bestätigen', 'antworten', 'rückmelden',
@@ -70,20 +68,8 @@ INVOICE_KEYWORDS_SET = {
 
 
 def _load_spacy_de():
-    """Lädt deutsches spaCy Model (lazy) mit Thread-Safety"""
-    global _spacy_de
-    if _spacy_de is None:
-        with _spacy_lock:
-            if _spacy_de is None:
-                try:
-                    import spacy
-                    _spacy_de = spacy.load("de_core_news_sm")
-                    logger.info("✅ spaCy Deutsch-Model geladen (de_core_news_sm)")
-                except Exception as e:
-                    logger.warning(f"⚠️ spaCy Deutsch-Model konnte nicht geladen werden: {e}")
-                    logger.warning(f"   Installieren Sie mit: python -m spacy download de_core_news_sm")
-                    _spacy_de = False
-    return _spacy_de if _spacy_de else None
+    """Deutsches spaCy Model - geteilt mit HybridPipeline/Sanitizer (spacy_context)"""
+    return spacy_context.get_nlp()
 
 
 class UrgencyBooster:
@@ -117,7 +103,7 @@ class UrgencyBooster:
             return self._fallback_heuristics(subject, body)
         
         text = f"{subject} {body[:1000]}"
-        doc = self.nlp(text)
+        doc = spacy_context.parse(text, self.nlp)
         
         signals = {
             'time_pressure': False,
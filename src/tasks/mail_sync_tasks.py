@@ -14,21 +14,43 @@ import logging
 import importlib
 import json
 import gc
+import os
+import time
 from datetime import datetime, UTC
-from typing import Dict, Any, Callable, Optional
+from types import SimpleNamespace
+from typing import Dict, Any, Callable, Optional, Tuple
 from sqlalchemy import text as sa_text  # 🆕 Für raw SQL queries
 
 from src.celery_app import celery_app
 from src.helpers.database import get_session, get_user, get_mail_account
+from src.tasks.progress_reporter import ProgressReporter
 
 # Phase 17: Semantic Search
-from src.semantic_search import generate_embedding_for_email
+from src.semantic_search import generate_embeddings_for_emails, notify_embedding_written
 
 logger = logging.getLogger(__name__)
 
 # Layer 4 Security: Resource Exhaustion Prevention
 MAX_EMAILS_PER_REQUEST = 1000
 
+# sync_all_accounts: max. gleichzeitig synchronisierte Accounts pro User
+SYNC_ALL_MAX_PARALLEL = max(1, int(os.getenv("SYNC_ALL_MAX_PARALLEL", "3")))
+# Sync-Pipeline: RawEmail-IDs pro Batch (Chain nlp → llm)
+PIPELINE_BATCH_SIZE = max(1, int(os.getenv("PIPELINE_BATCH_SIZE", "50")))
+# Sync-Pipeline: Lease pro Account (Sekunden) - solange läuft kein zweiter Chord über dieselben IDs
+PIPELINE_LEASE_SECONDS = max(60, int(os.getenv("PIPELINE_LEASE_SECONDS", "1800")))
+# Stufen verlängern die Lease aus dem Fortschritts-Callback höchstens so oft (Sekunden)
+PIPELINE_LEASE_RENEW_SECONDS = PIPELINE_LEASE_SECONDS // 6
+# Rate-Limit der LLM-Stufe pro Worker (Celery-Format, z.B. "30/m"; leer = unbegrenzt)
+LLM_TASK_RATE_LIMIT = os.getenv("LLM_TASK_RATE_LIMIT") or None
+
+# Bulk-Persist: neue Mails pro INSERT ... ON CONFLICT
+PERSIST_BATCH_SIZE = max(1, int(os.getenv("PERSIST_BATCH_SIZE", "200")))
+# Werte pro IN(...) beim Vorladen vorhandener Mails
+PERSIST_LOOKUP_CHUNK = 1000
+# Platzhalter: Key/message_id ist im laufenden Batch bereits zum Insert vorgemerkt
+_PENDING_INSERT = object()
+
 
 def _get_dek_from_service_token(service_token_id: int, session) -> str:
     """
@@ -177,6 +199,10 @@ def _fetch_raw_emails(
         # 1. Liste alle Ordner (IMAPClient: list_folders() gibt direkt Liste zurück!)
         mailboxes = fetcher.connection.list_folders()
         
+        # Ordner-Katalog aktualisieren (Dropdowns lesen ab jetzt aus der DB)
+        folder_catalog = importlib.import_module(".services.folder_catalog", "src")
+        folder_catalog.FolderCatalogService.store(session, account.user_id, account.id, mailboxes)
+        
         # mailboxes ist Liste von (flags, delimiter, name) Tuples
         folders = []
         for flags, delimiter, folder_name in mailboxes:
@@ -382,6 +408,92 @@ def _fetch_raw_emails(
         fetcher.disconnect()
 
 
+def _preload_existing_raw_emails(session, models, user, account, raw_emails: list[Dict[str, Any]]):
+    """Lädt vorhandene RawEmails für einen ganzen Fetch-Batch (statt 1-3 Queries pro Mail)
+
+    Returns:
+        (by_key, by_msgid, by_hash) - by_key nur aktive Mails mit
+        (folder, uidvalidity, uid), by_msgid/by_hash inkl. gelöschter (Undelete)
+    """
+    RawEmail = models.RawEmail
+    folders = {d.get("imap_folder") for d in raw_emails if d.get("imap_folder")}
+    uids = {d.get("imap_uid") for d in raw_emails if d.get("imap_uid")}
+    message_ids = {d.get("message_id") for d in raw_emails if d.get("message_id")}
+    content_hashes = {d.get("content_hash") for d in raw_emails if d.get("content_hash")}
+    account_filter = (RawEmail.user_id == user.id, RawEmail.mail_account_id == account.id)
+
+    by_key = {}
+    uid_list = sorted(uids)
+    for i in range(0, len(uid_list), PERSIST_LOOKUP_CHUNK):
+        rows = session.query(RawEmail).filter(
+            *account_filter,
+            RawEmail.imap_folder.in_(folders),
+            RawEmail.imap_uid.in_(uid_list[i:i + PERSIST_LOOKUP_CHUNK]),
+            RawEmail.deleted_at.is_(None),
+        )
+        for raw in rows:
+            by_key[(raw.imap_folder, raw.imap_uidvalidity, raw.imap_uid)] = raw
+
+    def _first_by(column, values):
+        found = {}
+        values = sorted(values)
+        for i in range(0, len(values), PERSIST_LOOKUP_CHUNK):
+            rows = (
+                session.query(RawEmail)
+                .filter(*account_filter, column.in_(values[i:i + PERSIST_LOOKUP_CHUNK]))
+                .order_by(RawEmail.id)
+            )
+            for raw in rows:
+                found.setdefault(getattr(raw, column.key), raw)
+        return found
+
+    by_msgid = _first_by(RawEmail.message_id, message_ids)
+    by_hash = _first_by(RawEmail.content_hash, content_hashes)
+    return by_key, by_msgid, by_hash
+
+
+def _insert_raw_email_rows(session, models, rows: list[Dict[str, Any]]) -> Dict[tuple, int]:
+    """Schreibt neue RawEmails als INSERT ... ON CONFLICT DO NOTHING (ein Statement pro Chunk)
+
+    Konflikte auf dem RFC-Key (user, account, folder, uidvalidity, uid) werden
+    übersprungen. Andere Datenbanken: Einzel-INSERT je Zeile in einem Savepoint.
+
+    Returns:
+        {(folder, uidvalidity, uid): raw_email_id} der tatsächlich eingefügten Zeilen
+    """
+    from sqlalchemy.exc import IntegrityError
+
+    RawEmail = models.RawEmail
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        inserted = {}
+        for row in rows:
+            try:
+                with session.begin_nested():
+                    raw_email = RawEmail(**row)
+                    session.add(raw_email)
+                inserted[(row["imap_folder"], row["imap_uidvalidity"], row["imap_uid"])] = raw_email.id
+            except IntegrityError:
+                pass
+        return inserted
+
+    stmt = (
+        insert(RawEmail)
+        .on_conflict_do_nothing(
+            index_elements=["user_id", "mail_account_id", "imap_folder", "imap_uidvalidity", "imap_uid"]
+        )
+        .returning(RawEmail.id, RawEmail.imap_folder, RawEmail.imap_uidvalidity, RawEmail.imap_uid)
+    )
+    return {
+        (folder, uidvalidity, uid): raw_id
+        for raw_id, folder, uidvalidity, uid in session.execute(stmt, rows)
+    }
+
+
 def _persist_raw_emails(
     session, user, account, raw_emails: list[Dict[str, Any]], master_key: str,
     progress_callback: Optional[Callable] = None
@@ -393,15 +505,39 @@ def _persist_raw_emails(
 
     Phase 14e: RFC-konform Unique Key (account, folder, uidvalidity, uid)
     Phase 17: Semantic Search - Embedding-Generierung
+
+    Bulk-Modus: vorhandene Keys/message_ids/content_hashes des Batches werden
+    mit je einer Abfrage vorgeladen, Felder mit einem BatchEncryptor
+    verschlüsselt und neue Mails in Chunks (PERSIST_BATCH_SIZE) per
+    INSERT ... ON CONFLICT DO NOTHING geschrieben - Anhänge und
+    Suchindex-Tokens ebenfalls als Bulk-INSERT. Übersetzungen (Opus-MT)
+    laufen pro Chunk gebündelt je Quellsprache mit Segment-Cache, thread_ids
+    kommen pro Chunk aus dem persistenten Message-ID-Index (thread_index).
+    Embeddings werden pro Chunk gesammelt und in Blöcken von
+    EMBEDDING_BATCH_SIZE per generate_embeddings_for_emails erzeugt.
+    HTML→Text läuft einmal pro Mail und wird als encrypted_plain_body mitgespeichert.
     """
     encryption = importlib.import_module(".08_encryption", "src")
     models = importlib.import_module(".02_models", "src")
     ai_client = importlib.import_module(".03_ai_client", "src")
+    search_index = importlib.import_module(".services.search_index", "src")
+    thread_summary = importlib.import_module(".services.thread_summary", "src")
+    translation_cache = importlib.import_module(".services.translation_cache", "src")
+    thread_index = importlib.import_module(".services.thread_index", "src")
+    plain_text_mod = importlib.import_module(".services.plain_text", "src")
+    embedding_api = importlib.import_module(".05_embedding_api", "src")
     
     saved = 0
     skipped = 0
     updated = 0
     total = len(raw_emails)
+    started = time.monotonic()
+    # Suchindex: HMAC-Key einmal pro Lauf ableiten (Klartext liegt hier ohnehin vor)
+    search_key = search_index.derive_search_key(master_key)
+    encryptor = encryption.BatchEncryptor(master_key)
+    # Persistenter Thread-Index statt nur Threading innerhalb des Fetch-Batches
+    thread_key = thread_index.derive_thread_key(master_key)
+    thread_index.ThreadIndexService.ensure_built(session, user.id, master_key)
     
     # Phase 17: AI-Client für Embeddings (User Settings EMBEDDING Model!)
     embedding_ai_client = None
@@ -417,6 +553,123 @@ def _persist_raw_emails(
     except Exception as e:
         logger.warning(f"⚠️ Embedding AI-Client nicht verfügbar: {e}")
     
+    # Vorhandene Mails für den ganzen Batch (statt Query pro Mail)
+    existing_by_key, existing_by_msgid, existing_by_hash = _preload_existing_raw_emails(
+        session, models, user, account, raw_emails
+    )
+    
+    # Neue Mails, die auf den nächsten Bulk-INSERT warten: (row, attachments, subject, sender)
+    pending = []
+    # Parallel zu pending: (message_id, in_reply_to, references) im Klartext für den Thread-Index
+    pending_links = []
+    # Davon zu übersetzen: (row, Quellsprache, Text)
+    pending_translations = []
+    # Davon zu embedden: (row, Betreff, Plain-Text-Body) im Klartext
+    pending_embeddings = []
+    segment_cache = translation_cache.PersistentTranslationCache(session, user.id, master_key)
+    
+    def _translate_pending():
+        """Opus-MT für alle vorgemerkten Mails des Chunks - ein Durchlauf pro Sprache"""
+        by_lang = {}
+        for row, source_lang, text in pending_translations:
+            by_lang.setdefault(source_lang, []).append((row, text))
+        pending_translations.clear()
+        
+        for source_lang, jobs in by_lang.items():
+            try:
+                from src.services.translator_service import get_translator
+                results = get_translator().translate_batch_sync(
+                    [text for _, text in jobs],
+                    target_lang='de',
+                    source_lang=source_lang,
+                    cache=segment_cache,
+                )
+            except Exception as trans_err:
+                logger.warning(f"⚠️  Translation fehlgeschlagen ({source_lang}, {len(jobs)} Mails): {trans_err}")
+                continue
+            
+            for (row, _), result in zip(jobs, results):
+                # Verschlüsseln der Übersetzung
+                row["encrypted_translation_de"] = encryptor.encrypt(result.translated_text)
+                row["translation_engine"] = result.model_used
+                row["processing_status"] = max(
+                    row["processing_status"], models.EmailProcessingStatus.TRANSLATION_DONE
+                )
+            logger.info(f"🌍 Translated {len(jobs)} Mails {source_lang}→de via {results[0].model_used}")
+    
+    def _embed_pending():
+        """Embeddings für alle vorgemerkten Mails des Chunks - ein Request pro EMBEDDING_BATCH_SIZE"""
+        jobs = list(pending_embeddings)
+        pending_embeddings.clear()
+        
+        for batch in embedding_api.iter_batches(jobs):
+            try:
+                results = generate_embeddings_for_emails(
+                    [(subject, body) for _, subject, body in batch],
+                    ai_client=embedding_ai_client,
+                    model_name=resolved_model,
+                    master_key=master_key
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Embedding-Fehler ({len(batch)} Mails): {e}")
+                continue
+            
+            embedded = 0
+            for (row, _, _), (embedding_bytes, embedding_model, generated_at) in zip(batch, results):
+                if not embedding_bytes:
+                    continue
+                row["email_embedding"] = embedding_bytes
+                row["embedding_model"] = embedding_model
+                row["embedding_generated_at"] = generated_at
+                row["processing_status"] = max(
+                    row["processing_status"], models.EmailProcessingStatus.EMBEDDING_DONE
+                )
+                embedded += 1
+            logger.debug(f"🔍 {embedded}/{len(batch)} Embeddings generiert")
+    
+    def _flush_pending():
+        nonlocal saved, skipped
+        if not pending:
+            return
+        _embed_pending()
+        _translate_pending()
+        assigned = thread_index.ThreadIndexService.assign(
+            session, user.id, thread_key,
+            [(*links, row["thread_id"]) for (row, _, _, _), links in zip(pending, pending_links)],
+        )
+        for (row, _, _, _), thread_id in zip(pending, assigned):
+            row["thread_id"] = thread_id
+        inserted = _insert_raw_email_rows(session, models, [row for row, _, _, _ in pending])
+        
+        attachment_rows = []
+        index_items = []
+        thread_ids = []
+        for row, attachments, subject, sender in pending:
+            raw_id = inserted.get((row["imap_folder"], row["imap_uidvalidity"], row["imap_uid"]))
+            if raw_id is None:
+                skipped += 1
+                logger.debug(
+                    f"⏭️  Duplikat übersprungen: {row['imap_folder']}/{row['imap_uid']} "
+                    f"(UIDVALIDITY={row['imap_uidvalidity']})"
+                )
+                continue
+            saved += 1
+            if row["email_embedding"]:
+                notify_embedding_written(SimpleNamespace(id=raw_id, **row))
+            index_items.append((raw_id, user.id, subject, sender))
+            thread_ids.append(row["thread_id"])
+            attachment_rows.extend(dict(att, raw_email_id=raw_id) for att in attachments)
+        
+        # Blind-Index für Betreff/Absender-Suche (ohne spätere Entschlüsselung)
+        search_index.SearchIndexService.index_new_emails(session, index_items, search_key)
+        if attachment_rows:
+            session.bulk_insert_mappings(models.EmailAttachment, attachment_rows)
+            logger.debug(f"📎 {len(attachment_rows)} Anhänge gespeichert")
+        # Core-INSERT umgeht die ORM-Events → Threads explizit vormerken
+        thread_summary.ThreadSummaryService.mark_dirty(session, user.id, thread_ids)
+        pending.clear()
+        pending_links.clear()
+    
     for idx, raw_email_data in enumerate(raw_emails, 1):
         # Progress-Callback
         if progress_callback and idx % 10 == 0:
@@ -446,18 +699,13 @@ def _persist_raw_emails(
         # ════════════════════════════════════════════════════════════════
         
         # Check if exists by folder/uid/uidvalidity (RFC-konform)
-        existing = (
-            session.query(models.RawEmail)
-            .filter_by(
-                user_id=user.id,
-                mail_account_id=account.id,
-                imap_folder=imap_folder,
-                imap_uidvalidity=imap_uidvalidity,
-                imap_uid=imap_uid,
-            )
-            .filter(models.RawEmail.deleted_at.is_(None))
-            .first()
-        )
+        key = (imap_folder, imap_uidvalidity, imap_uid)
+        existing = existing_by_key.get(key)
+        
+        if existing is _PENDING_INSERT:
+            # Gleicher Key doppelt im Batch
+            skipped += 1
+            continue
         
         if existing:
             # UPDATE: Mail existiert bereits (gleicher folder/uid), nur Flags aktualisieren
@@ -472,132 +720,83 @@ def _persist_raw_emails(
         
         # ════════════════════════════════════════════════════════════════
         # WICHTIG: Prüfe ob message_id schon existiert (in IRGENDEINEM Ordner!)
+        # Fallback: content_hash (für Mails ohne message_id)
         # ════════════════════════════════════════════════════════════════
-        existing_by_msgid = None
-        
+        content_hash = raw_email_data.get("content_hash")
+        match, match_kind = None, None
         if message_id:
-            existing_by_msgid = (
-                session.query(models.RawEmail)
-                .filter_by(
-                    user_id=user.id,
-                    mail_account_id=account.id,
-                    message_id=message_id,
-                )
-                .first()
-            )
-            
-            if existing_by_msgid:
-                if existing_by_msgid.deleted_at:
-                    # WIEDERHERSTELLEN: Mail war gelöscht, ist aber wieder auf Server!
-                    existing_by_msgid.deleted_at = None
-                    existing_by_msgid.imap_folder = imap_folder
-                    existing_by_msgid.imap_uid = imap_uid
-                    existing_by_msgid.imap_uidvalidity = imap_uidvalidity
-                    existing_by_msgid.imap_flags = raw_email_data.get("imap_flags")
-                    existing_by_msgid.imap_is_seen = raw_email_data.get("imap_is_seen", False)
-                    existing_by_msgid.imap_is_flagged = raw_email_data.get("imap_is_flagged", False)
-                    existing_by_msgid.imap_is_answered = raw_email_data.get("imap_is_answered", False)
-                    existing_by_msgid.imap_last_seen_at = datetime.now(UTC)
-                    updated += 1
-                    logger.info(f"♻️ UNDELETE: {imap_folder}/{imap_uid} (id={existing_by_msgid.id})")
-                    continue
-                else:
-                    # Mail aktiv, anderer Ordner → Schritt 3 macht MOVE
-                    skipped += 1
-                    logger.debug(
-                        f"⏭️ Skip: message_id existiert bereits in {existing_by_msgid.imap_folder} "
-                        f"(Schritt 3 macht MOVE nach {imap_folder})"
-                    )
-                    continue
+            match, match_kind = existing_by_msgid.get(message_id), "message_id"
+        if match is None and content_hash:
+            match, match_kind = existing_by_hash.get(content_hash), "content_hash"
         
-        # Fallback: content_hash (für Mails ohne message_id)
-        content_hash = raw_email_data.get("content_hash")
-        if not existing_by_msgid and content_hash:
-            existing_by_hash = (
-                session.query(models.RawEmail)
-                .filter_by(
-                    user_id=user.id,
-                    mail_account_id=account.id,
-                    content_hash=content_hash,
+        if match is _PENDING_INSERT:
+            # Gleiche Mail in einem anderen Ordner desselben Batches
+            skipped += 1
+            continue
+        
+        if match:
+            if match.deleted_at:
+                # WIEDERHERSTELLEN: Mail war gelöscht, ist aber wieder auf Server!
+                match.deleted_at = None
+                match.imap_folder = imap_folder
+                match.imap_uid = imap_uid
+                match.imap_uidvalidity = imap_uidvalidity
+                match.imap_flags = raw_email_data.get("imap_flags")
+                match.imap_is_seen = raw_email_data.get("imap_is_seen", False)
+                match.imap_is_flagged = raw_email_data.get("imap_is_flagged", False)
+                match.imap_is_answered = raw_email_data.get("imap_is_answered", False)
+                match.imap_last_seen_at = datetime.now(UTC)
+                existing_by_key[key] = match
+                updated += 1
+                logger.info(f"♻️ UNDELETE: {imap_folder}/{imap_uid} (id={match.id})")
+            else:
+                # Mail aktiv, anderer Ordner → Schritt 3 macht MOVE
+                skipped += 1
+                logger.debug(
+                    f"⏭️ Skip: {match_kind} existiert bereits in {match.imap_folder} "
+                    f"(Schritt 3 macht MOVE nach {imap_folder})"
                 )
-                .first()
-            )
-            
-            if existing_by_hash:
-                if existing_by_hash.deleted_at:
-                    # WIEDERHERSTELLEN
-                    existing_by_hash.deleted_at = None
-                    existing_by_hash.imap_folder = imap_folder
-                    existing_by_hash.imap_uid = imap_uid
-                    existing_by_hash.imap_uidvalidity = imap_uidvalidity
-                    existing_by_hash.imap_flags = raw_email_data.get("imap_flags")
-                    existing_by_hash.imap_is_seen = raw_email_data.get("imap_is_seen", False)
-                    existing_by_hash.imap_is_flagged = raw_email_data.get("imap_is_flagged", False)
-                    existing_by_hash.imap_is_answered = raw_email_data.get("imap_is_answered", False)
-                    existing_by_hash.imap_last_seen_at = datetime.now(UTC)
-                    updated += 1
-                    logger.info(f"♻️ UNDELETE: {imap_folder}/{imap_uid} (id={existing_by_hash.id})")
-                    continue
-                else:
-                    skipped += 1
-                    logger.debug(
-                        f"⏭️ Skip: content_hash existiert bereits in {existing_by_hash.imap_folder} "
-                        f"(Schritt 3 macht MOVE nach {imap_folder})"
-                    )
-                    continue
+            continue
         
+        # Ab hier neu: Keys für Duplikate innerhalb des Batches reservieren
+        existing_by_key[key] = _PENDING_INSERT
+        if message_id:
+            existing_by_msgid[message_id] = _PENDING_INSERT
+        if content_hash:
+            existing_by_hash[content_hash] = _PENDING_INSERT
+
         # ════════════════════════════════════════════════════════════════
         # PHASE 17: KLARTEXT IST HIER NOCH VERFÜGBAR!
         # ════════════════════════════════════════════════════════════════
         subject_plain = raw_email_data.get("subject", "")
         body_plain = raw_email_data.get("body", "")
+        # HTML→Text EINMAL pro Mail - gespeichert (encrypted_plain_body) und hier
+        # für Embedding, Spracherkennung und Übersetzung genutzt
+        try:
+            body_text = plain_text_mod.to_plain_text(body_plain) or ""
+        except Exception as html_err:
+            logger.warning(f"⚠️ HTML-Konvertierung fehlgeschlagen: {html_err}, nutze Original")
+            body_text = body_plain or ""
         
         # ════════════════════════════════════════════════════════════════
-        # NEU: Embedding generieren (VOR Verschlüsselung!)
+        # NEU: Embedding vormerken (VOR Verschlüsselung!)
+        # Erzeugt gebündelt pro Chunk in _flush_pending()
         # ════════════════════════════════════════════════════════════════
-        embedding_bytes = None
-        embedding_model = None
-        embedding_generated_at = None
-        
-        if embedding_ai_client and (subject_plain or body_plain):
-            try:
-                embedding_bytes, embedding_model, embedding_generated_at = \
-                    generate_embedding_for_email(
-                        subject=subject_plain,
-                        body=body_plain,
-                        ai_client=embedding_ai_client,
-                        model_name=resolved_model
-                    )
-                if embedding_bytes:
-                    logger.debug(f"🔍 Embedding generiert für: {subject_plain[:50]}...")
-            except Exception as e:
-                logger.warning(f"⚠️ Embedding-Fehler: {e}")
+        embed = bool(embedding_ai_client and (subject_plain or body_plain))
         
         # ════════════════════════════════════════════════════════════════
         # PHASE 26: Auto-Translation (VOR Verschlüsselung!)
         # ════════════════════════════════════════════════════════════════
         detected_lang = None
-        encrypted_translation_de = None
-        translation_engine = None
+        text_to_translate = None
         
         if subject_plain or body_plain:
             try:
                 from src.services.translator_service import get_translator
                 translator = get_translator()
                 
-                # 1. Sprache erkennen - HTML-Stripping für korrekte Detection!
-                text_for_detection = f"{subject_plain}\n{body_plain[:1500]}"
-                
-                # HTML-Tags entfernen VOR Language Detection (verhindert "en" Bias)
-                if '<' in text_for_detection[:500]:
-                    try:
-                        from inscriptis import get_text
-                        from inscriptis.model.config import ParserConfig
-                        text_for_detection = get_text(text_for_detection, ParserConfig(display_links=False))
-                    except Exception:
-                        # Fallback: einfaches Strip von Tags
-                        import re
-                        text_for_detection = re.sub(r'<[^>]+>', ' ', text_for_detection)
+                # 1. Sprache erkennen - auf Plain Text (HTML würde "en" Bias erzeugen)
+                text_for_detection = f"{subject_plain}\n{body_text[:1500]}"
                 
                 detection = translator.detect_language(text_for_detection[:1000])
                 detected_lang = detection.language
@@ -605,110 +804,41 @@ def _persist_raw_emails(
                 logger.debug(f"🌍 Detected language: {detected_lang} ({detection.confidence:.2f})")
                 
                 # 2. Falls nicht Deutsch → übersetzen (Confidence > 70%)
+                #    Opus-MT läuft gebündelt pro Chunk in _flush_pending()
                 if detected_lang != 'de' and detection.confidence > 0.7:
-                    try:
-                        # Sync-Wrapper für Celery (asyncio.run intern)
-                        # Max 1500 Zeichen (Chunking in translator_service.py)
-                        text_to_translate = f"{subject_plain}\n\n{body_plain[:1500]}"
-                        
-                        result = translator.translate_sync(
-                            text=text_to_translate,
-                            target_lang='de',
-                            source_lang=detected_lang,
-                            engine='local'  # Opus-MT
-                        )
-                        
-                        # Verschlüsseln der Übersetzung
-                        encrypted_translation_de = encryption.EncryptionManager.encrypt_data(
-                            result.translated_text, master_key
-                        )
-                        translation_engine = result.model_used
-                        
-                        logger.info(f"🌍 Translated {detected_lang}→de via {translation_engine}")
-                        
-                    except Exception as trans_err:
-                        logger.warning(f"⚠️  Translation fehlgeschlagen: {trans_err}")
-                        
+                    # Max 1500 Zeichen (Segmentierung in translator_service.py)
+                    text_to_translate = f"{subject_plain}\n\n{body_text[:1500]}"
+                
             except Exception as lang_err:
                 logger.warning(f"⚠️  Language detection fehlgeschlagen: {lang_err}")
 
-        encrypted_sender = encryption.EmailDataManager.encrypt_email_sender(
-            raw_email_data["sender"], master_key
-        )
-        encrypted_subject = encryption.EmailDataManager.encrypt_email_subject(
-            raw_email_data["subject"], master_key
-        )
-        encrypted_body = encryption.EmailDataManager.encrypt_email_body(
-            raw_email_data["body"], master_key
-        )
-
-        encrypted_in_reply_to = None
-        if raw_email_data.get("in_reply_to"):
-            encrypted_in_reply_to = encryption.EncryptionManager.encrypt_data(
-                raw_email_data["in_reply_to"], master_key
-            )
-
-        encrypted_to = None
-        if raw_email_data.get("to"):
-            encrypted_to = encryption.EncryptionManager.encrypt_data(
-                raw_email_data["to"], master_key
-            )
-
-        encrypted_cc = None
-        if raw_email_data.get("cc"):
-            encrypted_cc = encryption.EncryptionManager.encrypt_data(
-                raw_email_data["cc"], master_key
-            )
-
-        encrypted_bcc = None
-        if raw_email_data.get("bcc"):
-            encrypted_bcc = encryption.EncryptionManager.encrypt_data(
-                raw_email_data["bcc"], master_key
-            )
-
-        encrypted_reply_to = None
-        if raw_email_data.get("reply_to"):
-            encrypted_reply_to = encryption.EncryptionManager.encrypt_data(
-                raw_email_data["reply_to"], master_key
-            )
-
-        encrypted_references = None
-        if raw_email_data.get("references"):
-            encrypted_references = encryption.EncryptionManager.encrypt_data(
-                raw_email_data["references"], master_key
-            )
 
-        # Inline-Attachments (CID-Bilder) verschlüsseln
-        encrypted_inline_attachments = None
+        # Inline-Attachments (CID-Bilder) + Phase 25 Kalenderdaten
         inline_attachments = raw_email_data.get("inline_attachments")
-        if inline_attachments:
-            import json
-            encrypted_inline_attachments = encryption.EncryptionManager.encrypt_data(
-                json.dumps(inline_attachments), master_key
-            )
-
-        # Phase 25: Kalenderdaten verschlüsseln
-        encrypted_calendar_data = None
         calendar_data = raw_email_data.get("calendar_data")
-        if calendar_data:
-            import json
-            encrypted_calendar_data = encryption.EncryptionManager.encrypt_data(
-                json.dumps(calendar_data, ensure_ascii=False), master_key
-            )
-
-        raw_email = models.RawEmail(
+        
+        # Phase 27: Processing Status - Translation (20) schon erledigt?
+        # Embedding (10) setzt _embed_pending()
+        processing_status = models.EmailProcessingStatus.NEW
+        if detected_lang == 'de':
+            processing_status = models.EmailProcessingStatus.TRANSLATION_DONE
+        
+        now = datetime.now(UTC)
+        row = dict(
             user_id=user.id,
             mail_account_id=account.id,
-            encrypted_sender=encrypted_sender,
-            encrypted_subject=encrypted_subject,
-            encrypted_body=encrypted_body,
+            encrypted_sender=encryptor.encrypt(raw_email_data["sender"]),
+            encrypted_subject=encryptor.encrypt(raw_email_data["subject"]),
+            encrypted_body=encryptor.encrypt(raw_email_data["body"]),
+            encrypted_plain_body=encryptor.encrypt(body_text),
+            plain_body_version=plain_text_mod.PLAIN_TEXT_VERSION,
             received_at=raw_email_data["received_at"],
-            imap_uid=raw_email_data.get("imap_uid"),
-            imap_folder=raw_email_data.get("imap_folder"),
-            imap_uidvalidity=raw_email_data.get("imap_uidvalidity"),
+            imap_uid=imap_uid,
+            imap_folder=imap_folder,
+            imap_uidvalidity=imap_uidvalidity,
             imap_flags=raw_email_data.get("imap_flags"),
-            message_id=raw_email_data.get("message_id"),
-            encrypted_in_reply_to=encrypted_in_reply_to,
+            message_id=message_id,
+            encrypted_in_reply_to=encryptor.encrypt_optional(raw_email_data.get("in_reply_to")),
             parent_uid=raw_email_data.get("parent_uid"),
             thread_id=raw_email_data.get("thread_id"),
             imap_is_seen=raw_email_data.get("imap_is_seen"),
@@ -716,97 +846,79 @@ def _persist_raw_emails(
             imap_is_flagged=raw_email_data.get("imap_is_flagged"),
             imap_is_deleted=raw_email_data.get("imap_is_deleted"),
             imap_is_draft=raw_email_data.get("imap_is_draft"),
-            encrypted_to=encrypted_to,
-            encrypted_cc=encrypted_cc,
-            encrypted_bcc=encrypted_bcc,
-            encrypted_reply_to=encrypted_reply_to,
+            encrypted_to=encryptor.encrypt_optional(raw_email_data.get("to")),
+            encrypted_cc=encryptor.encrypt_optional(raw_email_data.get("cc")),
+            encrypted_bcc=encryptor.encrypt_optional(raw_email_data.get("bcc")),
+            encrypted_reply_to=encryptor.encrypt_optional(raw_email_data.get("reply_to")),
             message_size=raw_email_data.get("message_size"),
-            encrypted_references=encrypted_references,
+            encrypted_references=encryptor.encrypt_optional(raw_email_data.get("references")),
             content_type=raw_email_data.get("content_type"),
             charset=raw_email_data.get("charset"),
             has_attachments=raw_email_data.get("has_attachments"),
             # Inline-Attachments (CID-Bilder) für korrektes HTML-Rendering
-            encrypted_inline_attachments=encrypted_inline_attachments,
+            encrypted_inline_attachments=(
+                encryptor.encrypt(json.dumps(inline_attachments)) if inline_attachments else None
+            ),
             # Phase 17: Semantic Search - Embeddings (NICHT verschlüsselt!)
-            email_embedding=embedding_bytes,
-            embedding_model=embedding_model,
-            embedding_generated_at=embedding_generated_at,
+            email_embedding=None,  # _embed_pending()
+            embedding_model=None,
+            embedding_generated_at=None,
             # Phase 26: Auto-Translation
             detected_language=detected_lang,
-            encrypted_translation_de=encrypted_translation_de,
-            translation_engine=translation_engine,
+            encrypted_translation_de=None,  # _translate_pending()
+            translation_engine=None,
             # Phase 25: Kalendereinladungen
             is_calendar_invite=raw_email_data.get("is_calendar_invite", False),
             calendar_method=calendar_data.get("method") if calendar_data else None,
-            encrypted_calendar_data=encrypted_calendar_data,
-            # Phase 27: Processing Status - Initial
-            processing_status=models.EmailProcessingStatus.NEW,  # Startet bei 0
+            encrypted_calendar_data=(
+                encryptor.encrypt(json.dumps(calendar_data, ensure_ascii=False)) if calendar_data else None
+            ),
+            # Phase 27: Processing Status
+            processing_status=processing_status,
             processing_retry_count=0,
-            processing_last_attempt_at=datetime.now(UTC),
+            processing_last_attempt_at=now,
+            # Suchindex-Tokens werden im selben Chunk geschrieben
+            search_indexed_at=now,
         )
         
-        try:
-            session.add(raw_email)
-            session.flush()  # Flush um raw_email.id zu bekommen
-            
-            # Phase 27: Status-Update nach erfolgreichem DB-Insert
-            # Embedding wurde bereits generiert → Status auf 10
-            if embedding_bytes:
-                raw_email.processing_status = models.EmailProcessingStatus.EMBEDDING_DONE
-            
-            # Translation wurde bereits gemacht → Status auf 20
-            if encrypted_translation_de or detected_lang == 'de':
-                raw_email.processing_status = models.EmailProcessingStatus.TRANSLATION_DONE
-            
-            session.flush()  # Status speichern
-            
-            # Klassische Anhänge speichern (verschlüsselt)
-            classic_attachments = raw_email_data.get("attachments", [])
-            if classic_attachments:
-                for att_data in classic_attachments:
-                    try:
-                        # Verschlüssele Anhang-Daten (base64)
-                        encrypted_att_data = encryption.EncryptionManager.encrypt_data(
-                            att_data["data"], master_key
-                        )
-                        
-                        attachment = models.EmailAttachment(
-                            raw_email_id=raw_email.id,
-                            filename=att_data["filename"],
-                            mime_type=att_data["mime_type"],
-                            size=att_data["size"],
-                            content_id=att_data.get("content_id"),
-                            encrypted_data=encrypted_att_data,
-                        )
-                        session.add(attachment)
-                    except Exception as att_err:
-                        logger.warning(f"⚠️ Anhang '{att_data.get('filename')}' nicht gespeichert: {att_err}")
-                
-                session.flush()
-                logger.debug(f"📎 {len(classic_attachments)} Anhänge für Email {raw_email.id} gespeichert")
-            
-            saved += 1
-        except Exception as e:
-            session.rollback()
-            if "UNIQUE constraint failed" in str(e) or "IntegrityError" in str(type(e).__name__):
-                skipped += 1
-                logger.debug(
-                    f"⏭️  Duplikat übersprungen: {imap_folder}/{imap_uid} "
-                    f"(UIDVALIDITY={imap_uidvalidity})"
-                )
-            else:
-                logger.error(f"❌ Fehler beim Speichern: {e}")
-                raise
+        # Klassische Anhänge (verschlüsselt)
+        attachments = []
+        for att_data in raw_email_data.get("attachments", []) or []:
+            try:
+                attachments.append({
+                    "filename": att_data["filename"],
+                    "mime_type": att_data["mime_type"],
+                    "size": att_data["size"],
+                    "content_id": att_data.get("content_id"),
+                    "encrypted_data": encryptor.encrypt(att_data["data"]),
+                })
+            except Exception as att_err:
+                logger.warning(f"⚠️ Anhang '{att_data.get('filename')}' nicht gespeichert: {att_err}")
+        
+        pending.append((row, attachments, raw_email_data.get("subject"), raw_email_data.get("sender")))
+        pending_links.append(
+            (message_id, raw_email_data.get("in_reply_to"), raw_email_data.get("references"))
+        )
+        if embed:
+            pending_embeddings.append((row, subject_plain, body_text))
+        if text_to_translate:
+            pending_translations.append((row, detected_lang, text_to_translate))
+        if len(pending) >= PERSIST_BATCH_SIZE:
+            _flush_pending()
+    
+    _flush_pending()
 
     if saved or updated or skipped:
         session.commit()
+        elapsed = max(time.monotonic() - started, 1e-6)
+        rate = f"{(saved + updated) / elapsed:.1f} Zeilen/s"
         if updated > 0 or skipped > 0:
             logger.info(
                 f"💾 {saved} neue Mails, {updated} aktualisiert, "
-                f"{skipped} Duplikate übersprungen"
+                f"{skipped} Duplikate übersprungen ({rate})"
             )
         else:
-            logger.info(f"💾 {saved} neue Mails gespeichert")
+            logger.info(f"💾 {saved} neue Mails gespeichert ({rate})")
     else:
         session.flush()
 
@@ -921,6 +1033,15 @@ def sync_user_emails(self, user_id: int, account_id: int, service_token_id: int,
     - Verhindert parallele Sync-Tasks für denselben Account via Redis-Lock
     - Timeout 3600s (1h) - wenn Task länger dauert, wird Lock automatisch freigegeben
     """
+    return _sync_account_locked(self, user_id, account_id, service_token_id, max_emails)
+
+
+def _sync_account_locked(self, user_id: int, account_id: int, service_token_id: int, max_emails: int | None = None):
+    """Redis-Lock pro Account + Sync (sync_user_emails und sync_account_step)
+
+    Raises:
+        Reject: Account wird bereits von einem anderen Task synchronisiert
+    """
     from celery.exceptions import Reject
     
     # Redis-Lock: Verhindert parallele Syncs desselben Accounts
@@ -960,7 +1081,7 @@ def sync_user_emails(self, user_id: int, account_id: int, service_token_id: int,
                 raise Reject("Account sync already in progress", requeue=False)
     
     try:
-        _execute_sync_with_lock(self, user_id, account_id, service_token_id, max_emails)
+        return _execute_sync_with_lock(self, user_id, account_id, service_token_id, max_emails)
     finally:
         # Lock freigeben (nur wenn wir ihn haben!)
         current_lock = redis_client.get(lock_key)
@@ -973,7 +1094,6 @@ def _execute_sync_with_lock(self, user_id: int, account_id: int, service_token_i
     """Eigentliche Sync-Logik (nach Lock-Acquisition)"""
     session = get_session()
     saved = 0
-    processed = 0
     sync_service = None
     stats1 = None
     master_key = None  # Wird aus ServiceToken geladen
@@ -996,7 +1116,6 @@ def _execute_sync_with_lock(self, user_id: int, account_id: int, service_token_i
         mail_fetcher_mod = importlib.import_module(".06_mail_fetcher", "src")
         mail_sync_v2 = importlib.import_module(".services.mail_sync_v2", "src")
         processing_mod = importlib.import_module(".12_processing", "src")
-        ai_client_mod = importlib.import_module(".03_ai_client", "src")
         # HINWEIS: 04_sanitizer entfernt - Sanitization-Level wird jetzt inline berechnet
         # Die eigentliche Anonymisierung erfolgt in 12_processing.py mit content_sanitizer.py (spaCy NER)
         
@@ -1004,13 +1123,9 @@ def _execute_sync_with_lock(self, user_id: int, account_id: int, service_token_i
         # PHASE 27: Resume unvollständige Emails (VOR dem Fetch!)
         # ═══════════════════════════════════════════════════════════════
         
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                "phase": "resume_incomplete",
-                "message": "Prüfe unvollständige Emails...",
-            }
-        )
+        # Gedrosselte Progress-Updates (max. ~2 Redis-Writes/s statt pro Mail/Batch)
+        progress = ProgressReporter(self)
+        progress.update(phase="resume_incomplete", message="Prüfe unvollständige Emails...", force=True)
         
         try:
             resumed = resume_incomplete_processing(session, user, account, master_key, self)
@@ -1050,21 +1165,15 @@ def _execute_sync_with_lock(self, user_id: int, account_id: int, service_token_i
         )
         fetcher.connect()
         
-        # Progress-Callback für State-Sync
-        def state_sync_progress(phase, message, **kwargs):
-            """Callback für kontinuierliche Progress-Updates während State-Sync."""
-            logger.info(f"🔔 DEBUG: Callback aufgerufen! phase={phase}, message={message}")
-            self.update_state(
-                state='PROGRESS',
-                meta={
-                    "phase": phase,
-                    "message": message,
-                    **kwargs
-                }
+        # Progress-Callback für State-Sync, Fetch und Persist (processed/total = Zähler)
+        def phase_progress(phase, message, **kwargs):
+            progress.update(
+                current=kwargs.get("processed"),
+                total=kwargs.get("total"),
+                phase=phase,
+                message=message,
+                **kwargs
             )
-            logger.info(f"✅ DEBUG: Status updated")
-        
-        logger.info(f"🎯 DEBUG: Callback-Funktion definiert, übergebe an sync_state_with_server")
         
         try:
             # Schritt 1: Nur State-Sync (kein Raw-Sync hier!)
@@ -1076,7 +1185,7 @@ def _execute_sync_with_lock(self, user_id: int, account_id: int, service_token_i
             )
             stats1 = sync_service.sync_state_with_server(
                 include_folders, 
-                progress_callback=state_sync_progress
+                progress_callback=phase_progress
             )
             
             logger.info(
@@ -1096,16 +1205,7 @@ def _execute_sync_with_lock(self, user_id: int, account_id: int, service_token_i
         # SCHRITT 2: Neue Mails fetchen (Delta-Fetch)
         # ═══════════════════════════════════════════════════════════════
         
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                "phase": "fetch_mails",
-                "message": "Lade neue Mails...",
-            }
-        )
-        
-        def fetch_progress(phase, message, **kwargs):
-            self.update_state(state='PROGRESS', meta={'phase': phase, 'message': message, **kwargs})
+        progress.update(phase="fetch_mails", message="Lade neue Mails...", force=True)
         
         # Bestimme max_emails dynamisch, wenn kein expliziter Wert übergeben wurde
         if max_emails is None:
@@ -1118,30 +1218,21 @@ def _execute_sync_with_lock(self, user_id: int, account_id: int, service_token_i
                 max_emails = 200
 
         raw_emails = _fetch_raw_emails(
-            account, master_key, max_emails, session, fetch_progress
+            account, master_key, max_emails, session, phase_progress
         )
         
         if raw_emails:
             logger.info(f"📧 {len(raw_emails)} Mails abgerufen, speichere in DB...")
             
-            def persist_progress(phase, message, **kwargs):
-                self.update_state(state='PROGRESS', meta={'phase': phase, 'message': message, **kwargs})
-            
             saved = _persist_raw_emails(
-                session, user, account, raw_emails, master_key, persist_progress
+                session, user, account, raw_emails, master_key, phase_progress
             )
         
         # ═══════════════════════════════════════════════════════════════
         # SCHRITT 3: raw_emails mit State synchronisieren (MOVE-Erkennung!)
         # ═══════════════════════════════════════════════════════════════
         
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                "phase": "sync_raw",
-                "message": "Synchronisiere Mails...",
-            }
-        )
+        progress.update(phase="sync_raw", message="Synchronisiere Mails...", force=True)
         
         try:
             if sync_service:
@@ -1154,70 +1245,12 @@ def _execute_sync_with_lock(self, user_id: int, account_id: int, service_token_i
             logger.error(f"❌ Schritt 3 fehlgeschlagen: {e}")
 
         # ═══════════════════════════════════════════════════════════════
-        # SCHRITT 4: AI-Verarbeitung
-        # ═══════════════════════════════════════════════════════════════
-        
-        provider = user.preferred_ai_provider or "ollama"
-        model = ai_client_mod.resolve_model(provider, user.preferred_ai_model)
-        # Level-Logik inline: Cloud-Provider brauchen volle Anonymisierung (Level 3), lokal Level 2
-        is_cloud_provider = ai_client_mod.provider_requires_cloud(provider)
-        sanitize_level = 3 if is_cloud_provider else 2
-        ai_instance = ai_client_mod.build_client(provider, model=model)
-        
-        logger.info(f"🤖 AI-Verarbeitung mit {provider}/{model}")
-
-        def progress_callback(idx: int, total: int, subject: str) -> None:
-            self.update_state(
-                state='PROGRESS',
-                meta={
-                    "phase": None,  # ⚠️ Phase clearen = Frontend zeigt Email-Counter
-                    "message": None,
-                    "current_email_index": idx,
-                    "total_emails": total,
-                    "current_subject": subject,
-                },
-            )
-
-        processed = processing_mod.process_pending_raw_emails(
-            session=session,
-            user=user,
-            master_key=master_key,
-            mail_account=account,
-            limit=max_emails,
-            ai=ai_instance,
-            sanitize_level=sanitize_level,
-            progress_callback=progress_callback,
-        )
-        
-        # ═══════════════════════════════════════════════════════════════
-        # SCHRITT 5: Auto-Action Rules nach Email-Fetch anwenden
+        # SCHRITT 4+5: Übergabe an die Pipeline (nlp → llm → Auto-Rules)
         # ═══════════════════════════════════════════════════════════════
+        # IMAP-Verbindung und Worker-Slot der Queue imap werden hier frei -
+        # AI-Verarbeitung und Auto-Rules laufen als eigene Tasks in ID-Batches.
         
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                "phase": "auto_rules",
-                "message": "Wende Auto-Rules an...",
-            }
-        )
-        
-        try:
-            from src.auto_rules_engine import AutoRulesEngine
-            
-            rules_engine = AutoRulesEngine(user_id, master_key, session)
-            rules_stats = rules_engine.process_new_emails(
-                since_minutes=60,
-                limit=500
-            )
-            
-            if rules_stats["rules_triggered"] > 0:
-                logger.info(
-                    f"🤖 Auto-Rules: {rules_stats['rules_triggered']} Regeln auf "
-                    f"{rules_stats['emails_checked']} E-Mails angewendet"
-                )
-        except Exception as rules_err:
-            # Auto-Rules sind optional - Job sollte nicht scheitern
-            logger.warning(f"⚠️ Auto-Rules fehlgeschlagen: {rules_err}")
+        pending_ids = processing_mod.pending_raw_email_ids(session, user, account, limit=max_emails)
         
         # ═══════════════════════════════════════════════════════════════
         # FINALISIERUNG
@@ -1230,15 +1263,18 @@ def _execute_sync_with_lock(self, user_id: int, account_id: int, service_token_i
             logger.info(f"🎉 Initialer Sync für Account {account.id} abgeschlossen")
         
         session.commit()
+        
+        pipeline_id, queued = _dispatch_processing_pipeline(user_id, account_id, service_token_id, pending_ids)
 
         logger.info(
-            f"✅ Job abgeschlossen (saved={saved}, processed={processed})"
+            f"✅ Sync abgeschlossen (saved={saved}), {queued} Mails an Pipeline {pipeline_id}"
         )
         
         return {
             "status": "success", 
             "saved": saved, 
-            "processed": processed, 
+            "queued_for_processing": queued,
+            "pipeline_id": pipeline_id,
             "folders_scanned": stats1.folders_scanned if stats1 else 0, 
             "mails_on_server": stats1.mails_on_server if stats1 else 0
         }
@@ -1264,6 +1300,305 @@ def _execute_sync_with_lock(self, user_id: int, account_id: int, service_token_i
         session.close()
 
 
+def _build_processing_ai(user):
+    """AI-Client + Sanitize-Level für process_pending_raw_emails (Einstellungen des Users)"""
+    ai_client_mod = importlib.import_module(".03_ai_client", "src")
+    provider = user.preferred_ai_provider or "ollama"
+    model = ai_client_mod.resolve_model(provider, user.preferred_ai_model)
+    # Level-Logik inline: Cloud-Provider brauchen volle Anonymisierung (Level 3), lokal Level 2
+    sanitize_level = 3 if ai_client_mod.provider_requires_cloud(provider) else 2
+    logger.info(f"🤖 AI-Verarbeitung mit {provider}/{model}")
+    return ai_client_mod.build_client(provider, model=model), sanitize_level
+
+
+def _pipeline_lease_key(user_id: int, account_id: int) -> str:
+    """Redis-Key der laufenden Pipeline eines Accounts (Wert: pipeline_id)"""
+    return f"sync_pipeline:user_{user_id}:account_{account_id}"
+
+
+def _dispatch_processing_pipeline(
+    user_id: int, account_id: int, service_token_id: int, raw_email_ids: list[int]
+) -> Tuple[str, int]:
+    """Startet die Verarbeitung als Chord über ID-Batches
+    
+    Pro Batch (PIPELINE_BATCH_SIZE IDs): process_emails_nlp (Queue nlp) →
+    classify_emails_llm (Queue llm). Callback finish_sync_pipeline (Queue imap)
+    wendet danach die Auto-Rules an. Batches laufen parallel, sodass z.B. die
+    NLP-Stufe von Batch 2 schon läuft, während Batch 1 beim LLM wartet.
+    
+    Pro Account läuft höchstens eine Pipeline (Redis-Lease mit der pipeline_id,
+    von den Stufen verlängert, vom Callback freigegeben). Läuft die vorige noch,
+    wird nichts gestartet - ihre IDs wären noch "pending" und würden doppelt
+    verarbeitet; was danach offen bleibt, holt der nächste Sync ab.
+    
+    Returns:
+        (pipeline_id, Anzahl übergebener Mails): Task-ID des Callbacks - die
+        Stufen melden ihren Fortschritt unter dieser ID (task_status im Blueprint
+        folgt ihr). Bei laufender Pipeline deren ID und 0.
+    """
+    from uuid import uuid4
+    from celery import chain, chord, group
+    
+    pipeline_id = str(uuid4())
+    lease_key = _pipeline_lease_key(user_id, account_id)
+    redis_client = celery_app.backend.client
+    if not redis_client.set(lease_key, pipeline_id, nx=True, ex=PIPELINE_LEASE_SECONDS):
+        active = redis_client.get(lease_key)
+        if active:
+            active = active.decode()
+            logger.info(
+                f"⏳ Pipeline {active} für Account {account_id} läuft noch - "
+                f"{len(raw_email_ids)} offene Mails folgen mit dem nächsten Sync"
+            )
+            return active, 0
+        # Lease ist zwischen SET und GET abgelaufen
+        redis_client.set(lease_key, pipeline_id, ex=PIPELINE_LEASE_SECONDS)
+    
+    total = len(raw_email_ids)
+    if not raw_email_ids:
+        finish_sync_pipeline.apply_async(
+            args=[[], user_id, account_id, service_token_id], task_id=pipeline_id
+        )
+        return pipeline_id, 0
+    
+    header = group(
+        chain(
+            process_emails_nlp.si(
+                raw_email_ids[offset:offset + PIPELINE_BATCH_SIZE],
+                user_id, account_id, service_token_id, pipeline_id, offset, total,
+            ),
+            classify_emails_llm.s(user_id, account_id, service_token_id, pipeline_id, offset, total),
+        )
+        for offset in range(0, total, PIPELINE_BATCH_SIZE)
+    )
+    chord(header)(
+        finish_sync_pipeline.s(user_id, account_id, service_token_id).set(task_id=pipeline_id)
+    )
+    return pipeline_id, total
+
+
+def _renew_pipeline_lease(user_id: int, account_id: int, pipeline_id: Optional[str]) -> None:
+    """Lease verlängern, solange Stufen der eigenen Pipeline laufen (Fehler nur loggen)"""
+    if not pipeline_id:
+        return
+    try:
+        redis_client = celery_app.backend.client
+        lease_key = _pipeline_lease_key(user_id, account_id)
+        current = redis_client.get(lease_key)
+        if current and current.decode() == pipeline_id:
+            redis_client.expire(lease_key, PIPELINE_LEASE_SECONDS)
+    except Exception as e:
+        logger.debug(f"Pipeline-Lease Account {account_id} nicht verlängert: {e}")
+
+
+def _release_pipeline_lease(user_id: int, account_id: int, pipeline_id: Optional[str]) -> None:
+    """Lease freigeben (nur wenn sie noch dieser Pipeline gehört)"""
+    if not pipeline_id:
+        return
+    try:
+        redis_client = celery_app.backend.client
+        lease_key = _pipeline_lease_key(user_id, account_id)
+        current = redis_client.get(lease_key)
+        if current and current.decode() == pipeline_id:
+            redis_client.delete(lease_key)
+    except Exception as e:
+        logger.warning(f"⚠️ Pipeline-Lease Account {account_id} nicht freigegeben: {e}")
+
+
+def _pipeline_progress(
+    reporter: Optional[ProgressReporter],
+    offset: int,
+    total: Optional[int],
+    renew_lease: Optional[Callable[[], None]] = None,
+) -> Optional[Callable]:
+    """progress_callback für process_pending_raw_emails - schreibt gedrosselt unter pipeline_id
+    
+    renew_lease läuft pro Email mit (höchstens alle PIPELINE_LEASE_RENEW_SECONDS),
+    damit ein langer LLM-Batch die Pipeline-Lease nicht überdauert.
+    """
+    if reporter is None and renew_lease is None:
+        return None
+    last_renewal = time.monotonic()
+    
+    def progress(idx: int, batch_total: int, subject: str) -> None:
+        nonlocal last_renewal
+        if renew_lease is not None and time.monotonic() - last_renewal >= PIPELINE_LEASE_RENEW_SECONDS:
+            last_renewal = time.monotonic()
+            renew_lease()
+        if reporter is None:
+            return
+        current = offset + idx
+        reporter.update(
+            current=current,
+            total=total or batch_total,
+            phase=None,  # ⚠️ Phase clearen = Frontend zeigt Email-Counter
+            message=None,
+            current_email_index=current,
+            total_emails=total or batch_total,
+            current_subject=subject,
+        )
+    return progress
+
+
+def _run_pipeline_stage(task, raw_email_ids, user_id, account_id, service_token_id,
+                        pipeline_id, offset, total, skip_classification: bool) -> int:
+    """Gemeinsamer Rumpf der Stufen nlp/llm: Kontext laden, process_pending_raw_emails"""
+    session = get_session()
+    master_key = None
+    reporter = ProgressReporter(task, task_id=pipeline_id) if pipeline_id else None
+    _renew_pipeline_lease(user_id, account_id, pipeline_id)
+    try:
+        user = get_user(session, user_id)
+        account = get_mail_account(session, account_id, user_id)
+        if not user or not account or not raw_email_ids:
+            return 0
+        
+        master_key = _get_dek_from_service_token(service_token_id, session)
+        if not master_key:
+            logger.error(f"❌ Pipeline {pipeline_id}: DEK konnte nicht aus ServiceToken geladen werden")
+            return 0
+        
+        processing_mod = importlib.import_module(".12_processing", "src")
+        ai_instance, sanitize_level = _build_processing_ai(user)
+        return processing_mod.process_pending_raw_emails(
+            session=session,
+            user=user,
+            master_key=master_key,
+            mail_account=account,
+            ai=ai_instance,
+            sanitize_level=sanitize_level,
+            progress_callback=_pipeline_progress(
+                reporter, offset, total,
+                renew_lease=lambda: _renew_pipeline_lease(user_id, account_id, pipeline_id),
+            ),
+            raw_email_ids=raw_email_ids,
+            skip_classification=skip_classification,
+        )
+    finally:
+        if reporter is not None:
+            reporter.flush()
+        # 🔒 Security: Sichere Master-Key Bereinigung aus RAM
+        if master_key is not None:
+            master_key = '\x00' * len(master_key)
+            del master_key
+            gc.collect()
+        session.close()
+
+
+@celery_app.task(
+    bind=True,
+    name="tasks.process_emails_nlp",
+    time_limit=None,
+    soft_time_limit=None
+)
+def process_emails_nlp(self, raw_email_ids: list[int], user_id: int, account_id: int, service_token_id: int,
+                       pipeline_id: str | None = None, offset: int = 0, total: int | None = None):
+    """
+    Pipeline-Stufe nlp (CPU): Sprache, Embedding, Übersetzung für einen ID-Batch
+    
+    Fehler brechen die Chain nicht ab - process_pending_raw_emails holt
+    fehlende Schritte in der LLM-Stufe bzw. beim nächsten Sync nach.
+    
+    Returns:
+        raw_email_ids (Eingabe für classify_emails_llm)
+    """
+    try:
+        done = _run_pipeline_stage(
+            self, raw_email_ids, user_id, account_id, service_token_id,
+            pipeline_id, offset, total, skip_classification=True,
+        )
+        logger.info(f"🧠 NLP-Stufe: {done}/{len(raw_email_ids)} Mails vorbereitet")
+    except Exception as e:
+        logger.exception(f"❌ NLP-Stufe fehlgeschlagen (Pipeline {pipeline_id}): {e}")
+    return raw_email_ids
+
+
+@celery_app.task(
+    bind=True,
+    name="tasks.classify_emails_llm",
+    rate_limit=LLM_TASK_RATE_LIMIT,
+    time_limit=None,
+    soft_time_limit=None
+)
+def classify_emails_llm(self, raw_email_ids: list[int], user_id: int, account_id: int, service_token_id: int,
+                        pipeline_id: str | None = None, offset: int = 0, total: int | None = None):
+    """
+    Pipeline-Stufe llm: AI-Klassifizierung + Tags für einen ID-Batch
+    
+    Returns:
+        Dict mit processed (Anzahl klassifizierter Mails)
+    """
+    try:
+        processed = _run_pipeline_stage(
+            self, raw_email_ids, user_id, account_id, service_token_id,
+            pipeline_id, offset, total, skip_classification=False,
+        )
+    except Exception as e:
+        logger.exception(f"❌ LLM-Stufe fehlgeschlagen (Pipeline {pipeline_id}): {e}")
+        return {"processed": 0, "error": str(e)}
+    return {"processed": processed}
+
+
+@celery_app.task(
+    bind=True,
+    name="tasks.finish_sync_pipeline",
+    time_limit=None,
+    soft_time_limit=None
+)
+def finish_sync_pipeline(self, batch_results: list, user_id: int, account_id: int, service_token_id: int):
+    """
+    Chord-Callback der Sync-Pipeline (Queue imap): Auto-Rules anwenden
+    
+    Auto-Rules können IMAP-Aktionen (Move/Flag) auslösen, deshalb wieder
+    in der Queue imap. Bei leerer Pipeline direkt mit [] aufgerufen.
+    Gibt zum Schluss die Pipeline-Lease des Accounts frei.
+    """
+    processed = sum((result or {}).get("processed", 0) for result in batch_results)
+    rules_triggered = 0
+    
+    session = get_session()
+    master_key = None
+    try:
+        self.update_state(
+            state='PROGRESS',
+            meta={
+                "phase": "auto_rules",
+                "message": "Wende Auto-Rules an...",
+            }
+        )
+        
+        master_key = _get_dek_from_service_token(service_token_id, session)
+        if master_key:
+            from src.auto_rules_engine import AutoRulesEngine
+            
+            rules_engine = AutoRulesEngine(user_id, master_key, session)
+            rules_stats = rules_engine.process_new_emails(
+                since_minutes=60,
+                limit=500
+            )
+            rules_triggered = rules_stats["rules_triggered"]
+            
+            if rules_triggered > 0:
+                logger.info(
+                    f"🤖 Auto-Rules: {rules_triggered} Regeln auf "
+                    f"{rules_stats['emails_checked']} E-Mails angewendet"
+                )
+    except Exception as rules_err:
+        # Auto-Rules sind optional - Pipeline sollte nicht scheitern
+        logger.warning(f"⚠️ Auto-Rules fehlgeschlagen: {rules_err}")
+    finally:
+        # 🔒 Security: Sichere Master-Key Bereinigung aus RAM
+        if master_key is not None:
+            master_key = '\x00' * len(master_key)
+            del master_key
+            gc.collect()
+        session.close()
+        _release_pipeline_lease(user_id, account_id, self.request.id)
+    
+    logger.info(f"✅ Pipeline Account {account_id} abgeschlossen (processed={processed})")
+    return {"status": "success", "processed": processed, "rules_triggered": rules_triggered}
+
+
 @celery_app.task(
     bind=True, 
     max_retries=2, 
@@ -1328,62 +1663,76 @@ def batch_reprocess_emails(self, user_id: int, service_token_id: int, provider:
         resolved_model = ai_client.resolve_model(provider, model)
         embedding_client = ai_client.build_client(provider, model=resolved_model)
         
-        # Update initial status
-        self.update_state(
-            state='PROGRESS',
-            meta={
-                "total_emails": total,
-                "current_email_index": 0,
-            }
-        )
-        
-        # Process each email
-        for idx, raw_email in enumerate(raw_emails, start=1):
-            try:
-                # Entschlüsseln
-                decrypted_subject = encryption.EmailDataManager.decrypt_email_subject(
-                    raw_email.encrypted_subject or "", master_key
-                )
-                decrypted_body = encryption.EmailDataManager.decrypt_email_body(
-                    raw_email.encrypted_body or "", master_key
-                )
+        # Update initial status (danach gedrosselt, max. ~2 Writes/s)
+        progress = ProgressReporter(self)
+        progress.update(current=0, total=total, total_emails=total, current_email_index=0, force=True)
+        
+        # Process in Blöcken von EMBEDDING_BATCH_SIZE - ein Embedding-Request pro Block
+        embedding_api = importlib.import_module(".05_embedding_api", "src")
+        idx = 0
+        for batch in embedding_api.iter_batches(raw_emails):
+            decrypted = []
+            for raw_email in batch:
+                idx += 1
+                try:
+                    # Entschlüsseln
+                    decrypted_subject = encryption.EmailDataManager.decrypt_email_subject(
+                        raw_email.encrypted_subject or "", master_key
+                    )
+                    decrypted_body = encryption.EmailDataManager.decrypt_email_body(
+                        raw_email.encrypted_body or "", master_key
+                    )
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"❌ [{idx}/{total}] Failed to reprocess email {raw_email.id}: {e}")
+                    continue
                 
                 # Progress-Update
-                self.update_state(
-                    state='PROGRESS',
-                    meta={
-                        "current_email_index": idx,
-                        "total_emails": total,
-                        "current_subject": decrypted_subject[:50] if decrypted_subject else "Kein Betreff",
-                    }
+                progress.update(
+                    current=idx,
+                    total=total,
+                    current_email_index=idx,
+                    total_emails=total,
+                    current_subject=decrypted_subject[:50] if decrypted_subject else "Kein Betreff",
                 )
                 
                 logger.info(f"🔄 [{idx}/{total}] Verarbeite: {decrypted_subject[:50] if decrypted_subject else 'Kein Betreff'}...")
-                
-                # Embedding generieren
-                embedding_bytes, model_name, timestamp = generate_embedding_for_email(
-                    subject=decrypted_subject,
-                    body=decrypted_body,
+                decrypted.append((idx, raw_email, decrypted_subject, decrypted_body))
+            
+            if not decrypted:
+                continue
+            
+            # Embeddings für den ganzen Block generieren
+            try:
+                results = generate_embeddings_for_emails(
+                    [(subject, body) for _, _, subject, body in decrypted],
                     ai_client=embedding_client,
-                    model_name=resolved_model
+                    model_name=resolved_model,
+                    master_key=master_key
                 )
-                
-                if embedding_bytes:
-                    raw_email.email_embedding = embedding_bytes
-                    raw_email.embedding_model = model_name or resolved_model
-                    raw_email.embedding_generated_at = timestamp
-                    
-                    session.flush()
-                    
-                    processed += 1
-                    logger.info(f"✅ [{idx}/{total}] Email {raw_email.id} embedded ({len(embedding_bytes)} bytes)")
-                else:
-                    failed += 1
-                    logger.warning(f"⚠️  [{idx}/{total}] Embedding failed for email {raw_email.id}")
-                    
             except Exception as e:
-                failed += 1
-                logger.error(f"❌ [{idx}/{total}] Failed to reprocess email {raw_email.id}: {e}")
+                failed += len(decrypted)
+                logger.error(f"❌ Embedding-Batch ({len(decrypted)} Emails) fehlgeschlagen: {e}")
+                continue
+            
+            for (email_idx, raw_email, _, _), (embedding_bytes, model_name, timestamp) in zip(decrypted, results):
+                try:
+                    if embedding_bytes:
+                        raw_email.email_embedding = embedding_bytes
+                        raw_email.embedding_model = model_name or resolved_model
+                        raw_email.embedding_generated_at = timestamp
+                        
+                        session.flush()
+                        notify_embedding_written(raw_email)
+                        
+                        processed += 1
+                        logger.info(f"✅ [{email_idx}/{total}] Email {raw_email.id} embedded ({len(embedding_bytes)} bytes)")
+                    else:
+                        failed += 1
+                        logger.warning(f"⚠️  [{email_idx}/{total}] Embedding failed for email {raw_email.id}")
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"❌ [{email_idx}/{total}] Failed to reprocess email {raw_email.id}: {e}")
         
         session.commit()
         
@@ -1394,8 +1743,7 @@ def batch_reprocess_emails(self, user_id: int, service_token_id: int, provider:
             from src.services.tag_manager import TagEmbeddingCache
             
             # 1. Memory-Cache leeren
-            TagEmbeddingCache._cache.clear()
-            TagEmbeddingCache._ai_client_cache.clear()
+            TagEmbeddingCache.clear_all()
             logger.info("🗑️  Tag-Embedding-Cache geleert")
             
             # 2. DB-Embeddings zurücksetzen (werden beim nächsten Tagging-Vorgang neu erstellt)
@@ -1453,11 +1801,70 @@ def batch_reprocess_emails(self, user_id: int, service_token_id: int, provider:
         session.close()
 
 
+def _fan_out_lanes(account_ids: list[int], max_parallel: int) -> list[list[int]]:
+    """Verteilt Accounts reihum auf max. max_parallel Lanes (pro Lane sequenziell)"""
+    lanes = min(max_parallel, len(account_ids))
+    return [account_ids[i::lanes] for i in range(lanes)] if lanes else []
+
+
+@celery_app.task(
+    bind=True,
+    max_retries=3,
+    default_retry_delay=60,
+    name="tasks.sync_account_step",
+    time_limit=None,
+    soft_time_limit=None
+)
+def sync_account_step(self, results: list | None, user_id: int, account_id: int, service_token_id: int):
+    """
+    Ein Account als Glied einer sync_all_accounts-Lane (Chain)
+    
+    Gleicher Redis-Lock wie sync_user_emails. Fehler landen im Ergebnis statt
+    die Chain bzw. den Chord abzubrechen - die übrigen Accounts laufen weiter.
+    
+    Args:
+        results: Ergebnisse der vorherigen Glieder dieser Lane
+    
+    Returns:
+        results + [Ergebnis dieses Accounts]
+    """
+    from celery.exceptions import Reject, Retry
+    
+    try:
+        result = _sync_account_locked(self, user_id, account_id, service_token_id)
+    except Retry:
+        raise
+    except Reject as e:
+        result = {"status": "skipped", "message": str(e.reason)}
+    except Exception as e:
+        logger.error(f"❌ Account {account_id}: {e}")
+        result = {"status": "error", "message": str(e)}
+    
+    return list(results or []) + [dict(result or {}, account_id=account_id)]
+
+
+@celery_app.task(name="tasks.sync_all_accounts_done")
+def sync_all_accounts_done(lane_results: list, user_id: int):
+    """Chord-Callback von sync_all_accounts: Ergebnisse aller Lanes zusammenfassen"""
+    results = [result for lane in lane_results for result in (lane or [])]
+    successful = sum(1 for result in results if result.get("status") == "success")
+    
+    logger.info(f"✅ Multi-Account-Sync User {user_id}: {successful}/{len(results)} Accounts erfolgreich")
+    return {
+        "status": "success",
+        "user_id": user_id,
+        "accounts_synced": successful,
+        "accounts_failed": len(results) - successful,
+        "total_accounts": len(results),
+        "accounts": results,
+    }
+
+
 @celery_app.task(
     bind=True, 
     max_retries=1, 
     name="tasks.sync_all_accounts",
-    # KEIN time_limit! Multi-Account-Sync kann Stunden dauern (ruft sync_user_emails für jeden Account)
+    # Nur Dispatch (Chord) - die Syncs selbst laufen in sync_account_step
     time_limit=None,
     soft_time_limit=None
 )
@@ -1467,37 +1874,106 @@ def sync_all_accounts(self, user_id: int, service_token_id: int):
     
     Phase 2 Security: ServiceToken Pattern
     - service_token_id wird an Sub-Tasks weitergegeben
+    
+    Fan-out statt .get() pro Account: Die Accounts werden reihum auf bis zu
+    SYNC_ALL_MAX_PARALLEL Lanes verteilt (Chain aus sync_account_step pro
+    Lane), alle Lanes laufen als Chord parallel, sync_all_accounts_done fasst
+    die Ergebnisse zusammen. Dieser Task blockiert keinen Worker-Slot mehr.
+    
+    Returns:
+        Dict mit chord_id (AsyncResult des Callbacks liefert das Gesamtergebnis)
     """
+    from celery import chain, chord, group
+    
     session = get_session()
     try:
         user = get_user(session, user_id)
         if not user:
             return {"status": "error", "message": "User nicht gefunden"}
         
-        successful = 0
-        failed = 0
-        
-        for acc in user.mail_accounts:
-            try:
-                logger.info(f"🔄 Sync Account {acc.id} ({acc.name})...")
-                result = sync_user_emails.apply_async(
-                    args=[user_id, acc.id, service_token_id]
-                ).get(timeout=600)  # 10 Minuten Timeout pro Account
-                
-                if result.get('status') == 'success':
-                    successful += 1
-                else:
-                    failed += 1
-                    
-            except Exception as e:
-                logger.error(f"❌ Account {acc.id}: {e}")
-                failed += 1
+        account_ids = [acc.id for acc in user.mail_accounts]
+    finally:
+        session.close()
+    
+    lanes = _fan_out_lanes(account_ids, SYNC_ALL_MAX_PARALLEL)
+    if not lanes:
+        return {"status": "success", "user_id": user_id, "accounts_synced": 0, "total_accounts": 0}
+    
+    header = group(
+        chain(
+            sync_account_step.s([], user_id, lane[0], service_token_id),
+            *(sync_account_step.s(user_id, account_id, service_token_id) for account_id in lane[1:]),
+        )
+        for lane in lanes
+    )
+    result = chord(header)(sync_all_accounts_done.s(user_id))
+    
+    logger.info(
+        f"🔄 Multi-Account-Sync User {user_id}: {len(account_ids)} Accounts "
+        f"in {len(lanes)} parallelen Lanes (chord {result.id})"
+    )
+    return {
+        "status": "dispatched",
+        "user_id": user_id,
+        "total_accounts": len(account_ids),
+        "parallel": len(lanes),
+        "chord_id": result.id,
+    }
+
+
+@celery_app.task(
+    bind=True,
+    name="tasks.backfill_search_index",
+    time_limit=None,
+    soft_time_limit=None
+)
+def backfill_search_index(self, user_id: int, service_token_id: int):
+    """
+    Indexiert Emails ohne Such-Tokens (Bestand vor dem Blind-Index) im Hintergrund
+    
+    Wird beim Login gestartet, solange search_indexed_at IS NULL-Zeilen existieren.
+    Pro User läuft höchstens ein Backfill (Redis-Lock), weitere Aufrufe enden sofort.
+    Bis zum Abschluss prüft die Suche die restlichen Emails per Entschlüsselung.
+    
+    Returns:
+        Dict mit indexed (Anzahl nachindexierter Emails)
+    """
+    search_index = importlib.import_module(".services.search_index", "src")
+    
+    lock_key = f"search_backfill_lock:user_{user_id}"
+    lock_value = self.request.id or "local"
+    redis_client = celery_app.backend.client
+    if not redis_client.set(lock_key, lock_value, nx=True, ex=3600):
+        logger.info(f"🔎 Suchindex-Backfill für User {user_id} läuft bereits")
+        return {"status": "skipped", "indexed": 0}
+    
+    session = get_session()
+    master_key = None
+    try:
+        master_key = _get_dek_from_service_token(service_token_id, session)
+        progress = ProgressReporter(self)
         
-        return {
-            "status": "success", 
-            "accounts_synced": successful,
-            "accounts_failed": failed
-        }
+        def on_batch(indexed: int) -> None:
+            # Lock verlängern, solange Batches durchlaufen
+            redis_client.expire(lock_key, 3600)
+            progress.update(phase="search_index", message="Suchindex wird aufgebaut...", indexed=indexed)
         
+        indexed = search_index.SearchIndexService.backfill(
+            session, user_id, master_key, on_batch=on_batch
+        )
+        progress.flush()
+        return {"status": "success", "indexed": indexed}
+    except Exception as e:
+        session.rollback()
+        logger.error(f"❌ Suchindex-Backfill User {user_id} fehlgeschlagen: {e}")
+        return {"status": "error", "indexed": 0, "error": str(e)}
     finally:
+        # 🔒 Security: Sichere Master-Key Bereinigung aus RAM
+        if master_key is not None:
+            master_key = '\x00' * len(master_key)
+            del master_key
+            gc.collect()
         session.close()
+        current_lock = redis_client.get(lock_key)
+        if current_lock and current_lock.decode() == lock_value:
+            redis_client.delete(lock_key)
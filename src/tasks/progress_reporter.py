@@ -0,0 +1,153 @@
+# src/tasks/progress_reporter.py
+"""Gedrosselte Progress-Updates für Celery Tasks.
+
+Jedes self.update_state() ist ein Write ins Result-Backend (Redis) inkl.
+JSON-Serialisierung. Bei tausenden Mails und mehreren parallelen Syncs
+wurde pro Mail bzw. pro State-Sync-Batch geschrieben.
+
+ProgressReporter fasst Updates zusammen:
+- Zeit: max. PROGRESS_MAX_UPDATES_PER_SEC Writes pro Sekunde (Default 2)
+- Anzahl: ein Write erst, wenn der Zähler um min_items weitergelaufen ist
+- Zwischenstände werden verworfen, es gilt immer der letzte Snapshot
+  (wie bisher ersetzt jedes update() die komplette meta)
+- force=True, der erste Snapshot und "fertig" (current >= total) gehen sofort raus
+
+Zusätzlich schreibt er Durchsatz und Restzeit in die meta
+(items_per_sec, eta_seconds, elapsed_seconds) - task_status liefert sie
+unverändert ans Frontend.
+
+Verwendung:
+    progress = ProgressReporter(self)
+    progress.update(phase="fetch_mails", message="Lade neue Mails...", force=True)
+    for idx, mail in enumerate(mails, 1):
+        progress.update(current=idx, total=len(mails), current_email_index=idx, total_emails=len(mails))
+    progress.flush()
+"""
+
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Max. Backend-Writes pro Sekunde und Task (0 = ungedrosselt)
+PROGRESS_MAX_UPDATES_PER_SEC = float(os.getenv("PROGRESS_MAX_UPDATES_PER_SEC", "2"))
+
+
+class ProgressReporter:
+    """Fasst PROGRESS-Updates eines Tasks zusammen und ergänzt Durchsatz/ETA"""
+
+    def __init__(
+        self,
+        task,
+        task_id: Optional[str] = None,
+        min_interval: Optional[float] = None,
+        min_items: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            task: Gebundener Celery-Task (self)
+            task_id: Fremde Task-ID für die Updates (z.B. pipeline_id), sonst eigene
+            min_interval: Mindestabstand zwischen Writes in Sekunden
+                (Default aus PROGRESS_MAX_UPDATES_PER_SEC)
+            min_items: Mindestfortschritt des Zählers zwischen zwei Writes
+        """
+        if min_interval is None:
+            min_interval = 1.0 / PROGRESS_MAX_UPDATES_PER_SEC if PROGRESS_MAX_UPDATES_PER_SEC > 0 else 0.0
+        self.task = task
+        self.task_id = task_id
+        self.min_interval = min_interval
+        self.min_items = max(1, min_items)
+        self._clock = clock
+
+        self._meta: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        self._last_emit: Optional[float] = None
+        self._last_emitted_current: Optional[int] = None
+
+        self._current: Optional[int] = None
+        self._total: Optional[int] = None
+        # Messfenster für Durchsatz/ETA (neu bei anderem total oder Rücksprung)
+        self._window_start: Optional[float] = None
+        self._window_start_current = 0
+
+        self.writes = 0
+
+    def update(
+        self,
+        current: Optional[int] = None,
+        total: Optional[int] = None,
+        force: bool = False,
+        **meta: Any,
+    ) -> bool:
+        """Neuer Snapshot; schreibt ihn nur, wenn Drossel es zulässt
+
+        Returns:
+            True wenn ins Backend geschrieben wurde
+        """
+        now = self._clock()
+        self._track(current, total, now)
+        self._meta = meta
+        self._dirty = True
+
+        finished = self._total is not None and self._current is not None and self._current >= self._total
+        if not (force or finished or self._last_emit is None):
+            if now - self._last_emit < self.min_interval:
+                return False
+            if (
+                current is not None
+                and self._last_emitted_current is not None
+                and current - self._last_emitted_current < self.min_items
+            ):
+                return False
+
+        self._emit(now)
+        return True
+
+    def flush(self) -> bool:
+        """Schreibt den letzten, noch nicht gesendeten Snapshot"""
+        if not self._dirty:
+            return False
+        self._emit(self._clock())
+        return True
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Durchsatz und Restzeit des aktuellen Messfensters"""
+        if self._window_start is None or self._current is None:
+            return {}
+        now = self._clock() if now is None else now
+        elapsed = now - self._window_start
+        done = self._current - self._window_start_current
+        result: Dict[str, Any] = {"elapsed_seconds": int(elapsed)}
+        if elapsed > 0 and done > 0:
+            rate = done / elapsed
+            result["items_per_sec"] = round(rate, 2)
+            if self._total is not None:
+                result["eta_seconds"] = int(max(0, self._total - self._current) / rate)
+        return result
+
+    def _track(self, current: Optional[int], total: Optional[int], now: float) -> None:
+        if current is None and total is None:
+            # Snapshot ohne Zähler (z.B. Phasen-Meldung) - keine veraltete ETA mitschicken
+            self._current = self._total = self._window_start = None
+            return
+        if total is not None and total != self._total:
+            self._total = total
+            self._window_start = None
+        if current is None:
+            return
+        if self._window_start is None or (self._current is not None and current < self._current):
+            self._window_start = now
+            self._window_start_current = current
+        self._current = current
+
+    def _emit(self, now: float) -> None:
+        # Direkter Aufruf ohne Worker (Tests, Scripts): keine Task-ID, kein Backend-Write
+        task_id = self.task_id or getattr(getattr(self.task, "request", None), "id", None)
+        if task_id:
+            meta = dict(self._meta or {})
+            meta.update(self.stats(now))
+            self.task.update_state(task_id=task_id, state="PROGRESS", meta=meta)
+            self.writes += 1
+        self._dirty = False
+        self._last_emit = now
+        self._last_emitted_current = self._current
@@ -59,6 +59,7 @@ from celery.exceptions import Reject
 
 from src.celery_app import celery_app
 from src.helpers.database import get_session_factory
+from src.tasks.progress_reporter import ProgressReporter
 from src.services.personal_classifier_service import (
     load_global_scaler,
     invalidate_classifier_cache,
@@ -671,6 +672,8 @@ def train_personal_classifier(
     
     db = SessionFactory()
     redis_lock = None
+    # Fortschritt in Schritten (1-10), gedrosselt wie beim Mail-Sync
+    progress = ProgressReporter(self)
     
     try:
         # =================================================================
@@ -710,6 +713,7 @@ def train_personal_classifier(
             # =============================================================
             # STEP 3: Daten sammeln
             # =============================================================
+            progress.update(current=3, total=10, phase="collect_data", message="Sammle Trainingsdaten...")
             X, y = _get_training_data(user_id, classifier_type, db, models)
             
             if len(y) == 0:
@@ -742,6 +746,7 @@ def train_personal_classifier(
             # =============================================================
             # STEP 6 + 7: Training (fit vs partial_fit Entscheidung)
             # =============================================================
+            progress.update(current=6, total=10, phase="train", message=f"Trainiere mit {len(y)} Samples...")
             personal_clf_path = _get_personal_classifier_path(user_id, classifier_type)
             _ensure_personal_classifier_dir(user_id)
             
@@ -760,6 +765,7 @@ def train_personal_classifier(
             # =============================================================
             # STEP 8: Atomic Write
             # =============================================================
+            progress.update(current=8, total=10, phase="save", message="Speichere Classifier...")
             _atomic_save_model(clf, personal_clf_path)
             logger.info(f"💾 Classifier gespeichert: {personal_clf_path}")
             
@@ -789,6 +795,7 @@ def train_personal_classifier(
             
             # Cache invalidieren
             invalidate_classifier_cache(user_id, classifier_type)
+            progress.update(current=10, total=10, phase="done", message="Training abgeschlossen")
             
             logger.info(
                 f"✅ Training erfolgreich: {user_id}/{classifier_type} "
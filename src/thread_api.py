@@ -13,7 +13,6 @@ from flask import Blueprint, jsonify, request, session, current_app
 from flask_login import login_required, current_user
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from sqlalchemy import func
 import logging
 import importlib
 
@@ -136,18 +135,10 @@ def get_threads_endpoint():
             except (ValueError, TypeError):
                 min_count = None
         
-        # Count mit Filtern
-        count_query = (
-            db.query(func.count(func.distinct(models.RawEmail.thread_id)))
-            .filter_by(user_id=user.id)
-            .filter(models.RawEmail.thread_id.isnot(None))
+        # Count mit Filtern (thread_summary: min_count ist jetzt exakt zählbar)
+        total_count = thread_service.ThreadService.count_threads(
+            db, user.id, account_id=filter_account_id, min_count=min_count
         )
-        if filter_account_id:
-            count_query = count_query.filter(models.RawEmail.mail_account_id == filter_account_id)
-        
-        # Note: min_count affects result count, but we can't easily pre-count it
-        # We'll just return total thread count for now
-        total_count = count_query.scalar() or 0
         
         summaries = thread_service.ThreadService.get_threads_summary(
             db, user.id, limit=limit, offset=offset, 
@@ -8,7 +8,6 @@ Uses: thread_id, parent_uid, message_id, received_at
 
 from typing import List, Dict, Optional, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case, and_
 import importlib
 import logging
 
@@ -100,6 +99,9 @@ class ThreadService:
     ) -> List[Dict[str, Any]]:
         """Get thread summaries with count, latest and oldest email
         
+        Reads the materialized thread_summary table (one indexed query, see
+        src/services/thread_summary.py). Soft-deleted emails are not counted.
+        
         Args:
             session: SQLAlchemy session
             user_id: User ID
@@ -120,98 +122,47 @@ class ThreadService:
                 has_unread
             }
         """
-        subquery = (
-            session.query(
-                models.RawEmail.thread_id,
-                func.count(models.RawEmail.id).label('count'),
-                func.max(models.RawEmail.received_at).label('latest_date'),
-                func.min(models.RawEmail.received_at).label('oldest_date'),
-                func.sum(
-                    case((models.RawEmail.imap_is_seen == False, 1), else_=0)
-                ).label('unread_count'),
-            )
-            .filter(models.RawEmail.user_id == user_id)
-            .filter(models.RawEmail.thread_id.isnot(None))
-        )
-        
-        if thread_ids:
-            subquery = subquery.filter(models.RawEmail.thread_id.in_(thread_ids))
-        
-        if account_id:
-            subquery = subquery.filter(models.RawEmail.mail_account_id == account_id)
-        
-        subquery = subquery.group_by(models.RawEmail.thread_id)
+        from src.services.thread_summary import ThreadSummaryService
         
-        # HAVING für min_count (nach GROUP BY!)
-        if min_count and min_count > 0:
-            subquery = subquery.having(func.count(models.RawEmail.id) >= min_count)
+        ThreadSummaryService.ensure_built(session, user_id)
         
-        subquery = (
-            subquery
-            .order_by(func.max(models.RawEmail.received_at).desc())
+        rows = (
+            ThreadSummaryService.base_query(
+                session, user_id, account_id=account_id,
+                min_count=min_count, thread_ids=thread_ids or None,
+            )
+            .order_by(models.ThreadSummary.latest_date.desc())
             .limit(limit)
             .offset(offset)
-            .subquery()
-        )
-        
-        results = session.query(subquery).all()
-        
-        if not results:
-            return []
-        
-        result_thread_ids = [row[0] for row in results]
-        
-        latest_emails = (
-            session.query(models.RawEmail)
-            .filter_by(user_id=user_id)
-            .filter(models.RawEmail.thread_id.in_(result_thread_ids))
-            .order_by(models.RawEmail.thread_id, models.RawEmail.received_at.desc())
             .all()
         )
         
-        root_emails = (
-            session.query(models.RawEmail)
-            .filter_by(user_id=user_id)
-            .filter(models.RawEmail.thread_id.in_(result_thread_ids))
-            .order_by(models.RawEmail.thread_id, models.RawEmail.received_at.asc())
-            .all()
-        )
-        
-        latest_map = {}
-        root_map = {}
-        seen_latest = set()
-        seen_root = set()
-        
-        for email in latest_emails:
-            if email.thread_id not in seen_latest:
-                latest_map[email.thread_id] = email
-                seen_latest.add(email.thread_id)
-        
-        for email in root_emails:
-            if email.thread_id not in seen_root:
-                root_map[email.thread_id] = email
-                seen_root.add(email.thread_id)
-        
-        summary = []
-        for row in results:
-            thread_id, count, latest_date, oldest_date, unread = row
-            latest_email = latest_map.get(thread_id)
-            root_email = root_map.get(thread_id)
-            
-            summary.append({
-                'thread_id': thread_id,
-                'count': count,
-                'latest_uid': latest_email.imap_uid if latest_email else None,
-                'latest_date': latest_date,
-                'oldest_date': oldest_date,
-                'has_unread': (unread or 0) > 0,
-                'latest_sender': (
-                    latest_email.encrypted_sender if latest_email else None
-                ),
-                'root_subject': root_email.encrypted_subject if root_email else None,
-            })
-        
-        return summary
+        return [
+            {
+                'thread_id': row.thread_id,
+                'count': row.email_count,
+                'latest_uid': row.latest_uid,
+                'latest_date': row.latest_date,
+                'oldest_date': row.oldest_date,
+                'has_unread': (row.unread_count or 0) > 0,
+                'latest_sender': row.latest_sender,
+                'root_subject': row.root_subject,
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def count_threads(
+        session: Session, user_id: int, account_id: Optional[int] = None,
+        min_count: Optional[int] = None
+    ) -> int:
+        """Count threads (same filters as get_threads_summary)"""
+        from src.services.thread_summary import ThreadSummaryService
+        
+        ThreadSummaryService.ensure_built(session, user_id)
+        return ThreadSummaryService.base_query(
+            session, user_id, account_id=account_id, min_count=min_count
+        ).count()
 
     @staticmethod
     def get_thread_subject(
@@ -278,40 +229,59 @@ class ThreadService:
         decryption_key: str,
         limit: int = 20,
     ) -> List[Dict[str, Any]]:
-        """Search conversations with client-side decryption
+        """Search conversations via the blind index (email_search_tokens)
         
-        IMPORTANT: Data is encrypted and cannot be searched at the database level with ILIKE.
-        This method loads ALL emails and filters after decryption.
+        Subject/sender are encrypted and cannot be searched with ILIKE. Instead
+        every query word is matched as a word prefix against HMAC tokens that
+        were written at persist time (see src/services/search_index.py) - an
+        indexed SQL lookup, no decryption of the mailbox. Emails without tokens
+        (stored before the index existed) are indexed by the backfill_search_index
+        task; until it finishes they are matched by decrypting subject/sender.
         
         Args:
             session: SQLAlchemy session
             user_id: User ID
-            query: Search string
-            decryption_key: Master key for decryption
+            query: Search string (all words must match)
+            decryption_key: Master key (derives the search key)
             limit: Maximum results
             
         Returns:
-            Similar to get_threads_summary()
+            Similar to get_threads_summary(), most recent threads first
         """
-        from src.thread_api import decrypt_email
+        from src.services.search_index import SearchIndexService
+        from src.services.thread_summary import ThreadSummaryService
         
-        all_emails = ThreadService.get_all_user_emails(session, user_id)
+        ThreadSummaryService.ensure_built(session, user_id)
+        matching_ids = SearchIndexService.matching_email_ids(
+            session, user_id, query, decryption_key
+        )
+        if matching_ids is None:
+            return []
         
-        matching_thread_ids = set()
-        for email in all_emails:
-            subject = decrypt_email(email.encrypted_subject, decryption_key)
-            sender = decrypt_email(email.encrypted_sender, decryption_key)
-            
-            combined = f"{subject} {sender}".lower()
-            if query.lower() in combined:
-                if email.thread_id:
-                    matching_thread_ids.add(email.thread_id)
+        matching_threads = (
+            session.query(models.RawEmail.thread_id)
+            .filter(
+                models.RawEmail.user_id == user_id,
+                models.RawEmail.thread_id.isnot(None),
+                models.RawEmail.id.in_(matching_ids),
+            )
+            .distinct()
+            .subquery()
+        )
+        thread_ids_list = [
+            thread_id for (thread_id,) in
+            session.query(models.ThreadSummary.thread_id)
+            .filter(
+                models.ThreadSummary.user_id == user_id,
+                models.ThreadSummary.thread_id.in_(matching_threads.select()),
+            )
+            .order_by(models.ThreadSummary.latest_date.desc())
+            .limit(limit)
+        ]
         
-        if not matching_thread_ids:
+        if not thread_ids_list:
             return []
         
-        thread_ids_list = list(matching_thread_ids)[:limit]
-        
         return ThreadService.get_threads_summary(
             session, user_id, limit=len(thread_ids_list), offset=0,
             thread_ids=thread_ids_list
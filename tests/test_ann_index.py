@@ -0,0 +1,132 @@
+"""
+Test IVFIndex (persistierter ANN-Index für Semantic Search)
+
+Prüft Recall gegen den Brute-Force-Pfad, Persistenz (mmap),
+inkrementelle Inserts/Deletes und Kompaktierung.
+"""
+
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.embedding_index import EmbeddingIndex
+from src.services import ann_index
+from src.services.ann_index import IVFIndex, benchmark_recall
+
+
+def _clustered_rows(n=3000, dim=32, clusters=40, seed=0):
+    """Synthetische Embeddings mit Themen-Clustern (wie echte Mails)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, size=n)
+    vectors = (centers[labels] + 0.3 * rng.normal(size=(n, dim))).astype(np.float32)
+    return [
+        (i + 1, vectors[i].tobytes())
+        for i in range(n)
+    ], vectors
+
+
+def _indexes(rows):
+    flat = EmbeddingIndex(user_id=1, model="test")
+    flat.upsert(rows)
+    return flat, IVFIndex.from_embedding_index(flat)
+
+
+class TestIVFIndex:
+    """Tests für IVFIndex"""
+
+    def test_recall_against_brute_force(self):
+        rows, vectors = _clustered_rows()
+        flat, ivf = _indexes(rows)
+        queries = vectors[np.random.default_rng(1).choice(len(vectors), 50)]
+
+        result = benchmark_recall(ivf, flat, queries, k=10)
+
+        assert result["recall_at_k"] >= 0.9
+        assert result["nlist"] > 1
+
+    def test_full_probe_is_exact(self):
+        rows, vectors = _clustered_rows(n=500)
+        flat, ivf = _indexes(rows)
+        ivf.nprobe = ivf.centroids.shape[0]
+
+        for q in vectors[:5]:
+            assert [h[0] for h in ivf.query(q, 10, -1.0)] == [h[0] for h in flat.query(q, 10, -1.0)]
+
+    def test_incremental_insert_update_delete(self):
+        rows, vectors = _clustered_rows(n=500)
+        _, ivf = _indexes(rows)
+        new_vector = np.random.default_rng(5).normal(size=vectors.shape[1]).astype(np.float32)
+
+        ivf.upsert([(10001, new_vector.tobytes())])
+        assert ivf.query(new_vector, 1, -1.0)[0][0] == 10001
+
+        # Update einer Main-Zeile: alte Version wird per Tombstone ausgeblendet
+        ivf.upsert([(7, new_vector.tobytes())])
+        assert {h[0] for h in ivf.query(new_vector, 2, -1.0)} == {7, 10001}
+        assert ivf.size == 501
+
+        ivf.remove([7, 10001])
+        assert ivf.size == 499
+        assert not ivf.contains(7)
+        assert 7 not in ivf.all_ids()
+        assert {7, 10001}.isdisjoint(h[0] for h in ivf.query(new_vector, 20, -1.0))
+
+    def test_save_and_load_mmap(self, tmp_path):
+        rows, vectors = _clustered_rows(n=800)
+        _, ivf = _indexes(rows)
+        ivf.upsert([(9999, vectors[3].tobytes())])
+        ivf.remove([5])
+        ivf.save(tmp_path)
+
+        loaded = IVFIndex.load(1, "test", tmp_path)
+
+        assert loaded is not None
+        assert isinstance(loaded.vectors, np.memmap)
+        assert loaded.size == ivf.size
+        assert loaded.all_ids() == ivf.all_ids()
+        for q in vectors[:5]:
+            assert loaded.query(q, 10, -1.0) == ivf.query(q, 10, -1.0)
+
+    def test_old_generations_survive_grace_period(self, tmp_path, monkeypatch):
+        """Test: Fremde/alte Generationen werden erst nach der Grace-Period gelöscht"""
+        rows, vectors = _clustered_rows(n=200)
+        _, ivf = _indexes(rows)
+        ivf.save(tmp_path)
+        first = ivf.generation
+
+        other = ivf.compact()
+        other.generation = None
+        other.save(tmp_path)
+
+        assert sorted(p.name for p in tmp_path.glob("gen-*")) == sorted({first, other.generation})
+        assert IVFIndex.load(1, "test", tmp_path).generation == other.generation
+
+        monkeypatch.setattr(ann_index, "GENERATION_GRACE_SECONDS", -1)
+        other.upsert([(9999, vectors[0].tobytes())])
+        other.save(tmp_path)
+
+        assert [p.name for p in tmp_path.glob("gen-*")] == [other.generation]
+
+    def test_load_rejects_other_model(self, tmp_path):
+        rows, _ = _clustered_rows(n=200)
+        _, ivf = _indexes(rows)
+        ivf.save(tmp_path)
+
+        assert IVFIndex.load(1, "other-model", tmp_path) is None
+
+    def test_compact_keeps_content(self, tmp_path):
+        rows, vectors = _clustered_rows(n=400)
+        _, ivf = _indexes(rows)
+        ivf.remove(range(1, 60))
+        ivf.upsert([(5000 + i, vectors[i].tobytes()) for i in range(40)])
+        assert ivf.needs_compaction()
+
+        compacted = ivf.compact()
+
+        assert compacted.all_ids() == ivf.all_ids()
+        assert compacted.delta.size == 0
+        assert not compacted.tombstones
@@ -0,0 +1,148 @@
+"""
+Test RuleMatcher (vorkompilierte Auto-Rules)
+
+Prüft Bedingungen, match_mode, Regex-Fehler und vorgeladene Tags ohne DB,
+dass Regeln nur einmal pro Engine kompiliert werden und die
+Batch-Entschlüsselung (BatchDecryptor, Body nur bei Bedarf).
+"""
+
+import sys
+import os
+import json
+import base64
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.auto_rules_engine import AutoRulesEngine, RuleMatcher, RULE_TEMPLATES
+
+encryption = importlib.import_module("src.08_encryption")
+
+MASTER_KEY = base64.b64encode(b"k" * 32).decode()
+
+
+def _rule(rule_id, conditions, actions=None):
+    return SimpleNamespace(
+        id=rule_id, name=f"Regel {rule_id}", conditions=conditions,
+        conditions_json=json.dumps(conditions), actions=actions or {},
+    )
+
+
+def _email(sender="Newsletter@Example.com", subject="Unser Newsletter", body="Zum Abmelden: UNSUBSCRIBE hier", **extra):
+    data = {
+        'email_id': 7, 'sender': sender, 'subject': subject, 'body': body,
+        'has_attachment': False, 'folder': 'INBOX', 'flags': '', 'is_seen': False, 'is_flagged': False,
+    }
+    data.update(extra)
+    return data
+
+
+def _engine():
+    return AutoRulesEngine(user_id=1, master_key="k", db_session=None)
+
+
+class TestRuleMatcher:
+    """Tests für RuleMatcher / CompiledRule"""
+
+    def test_templates(self):
+        rules = [_rule(i, template["conditions"]) for i, template in enumerate(RULE_TEMPLATES.values(), 1)]
+        matcher = RuleMatcher(rules)
+        scanned = matcher.scan(_email(subject="You are a WINNER"))
+
+        matched = {c.rule.id: c.match(scanned, _engine()) for c in matcher.rules}
+
+        assert matched[1].matched and matched[1].matched_conditions == ['sender_contains', 'body_contains']
+        assert matched[2].matched and matched[2].matched_conditions == ['subject_regex']
+        assert matched[3].matched and matched[3].match_details['sender_domain'] == "example.com"
+        assert not matched[4].matched
+        assert matcher.needs_body and not matcher.needs_tags
+
+    def test_literals_are_shared_and_lowercased(self):
+        matcher = RuleMatcher([
+            _rule(1, {"subject_contains": "Newsletter"}),
+            _rule(2, {"subject_contains": "NEWSLETTER", "subject_not_contains": "Rechnung"}),
+        ])
+
+        assert matcher.literals['subject'] == ("newsletter", "rechnung")
+        scanned = matcher.scan(_email())
+        assert scanned.literal_hits['subject'] == {"newsletter"}
+        assert matcher.rules[1].match(scanned, _engine()).matched_conditions == [
+            'subject_contains', 'subject_not_contains'
+        ]
+
+    def test_match_modes_and_empty_conditions(self):
+        matcher = RuleMatcher([
+            _rule(1, {"sender_contains": "news", "subject_equals": "anders"}),
+            _rule(2, {"match_mode": "any", "sender_contains": "news", "subject_equals": "anders"}),
+            _rule(3, {"match_mode": "any"}),
+        ])
+        scanned = matcher.scan(_email())
+
+        assert [c.match(scanned, _engine()).matched for c in matcher.rules] == [False, True, False]
+
+    def test_invalid_regex(self):
+        matcher = RuleMatcher([_rule(1, {"match_mode": "any", "subject_regex": "(", "folder_equals": "INBOX"})])
+
+        match = matcher.rules[0].match(matcher.scan(_email()), _engine())
+
+        assert match.matched and match.matched_conditions == ['folder_equals']
+        assert match.match_details['subject_regex_error'].startswith("Ungültiger Regex")
+
+    def test_preloaded_tags(self):
+        matcher = RuleMatcher([_rule(1, {"has_tag": "Rechnung", "not_has_tag": "Erledigt"})])
+
+        assert matcher.needs_tags
+        assert matcher.rules[0].match(matcher.scan(_email(), tag_names={"Rechnung"}), _engine()).matched
+        assert not matcher.rules[0].match(matcher.scan(_email(), tag_names={"Rechnung", "Erledigt"}), _engine()).matched
+
+
+class TestEngineMatcherCache:
+    """Regeln werden pro Engine nur einmal kompiliert"""
+
+    def test_matcher_cached_until_conditions_change(self):
+        engine = _engine()
+        rule = _rule(1, {"sender_contains": "news"})
+
+        first = engine.get_rule_matcher([rule])
+        assert engine.get_rule_matcher([rule]) is first
+        assert engine._match_rule(rule, _email()).matched
+
+        rule.conditions = {"sender_contains": "rechnung"}
+        rule.conditions_json = json.dumps(rule.conditions)
+        assert engine.get_rule_matcher([rule]) is not first
+        assert not engine._match_rule(rule, _email()).matched
+
+
+class TestBatchDecryption:
+    """Tests für BatchDecryptor / _decrypt_emails_for_matching"""
+
+    def test_compatible_with_encryption_manager(self):
+        blobs = [encryption.EncryptionManager.encrypt_data(text, MASTER_KEY) for text in ("a", "Grüße", "x" * 5000)]
+        decryptor = encryption.BatchDecryptor(MASTER_KEY)
+
+        assert decryptor.decrypt_many(blobs) == ["a", "Grüße", "x" * 5000]
+        assert decryptor.decrypt("") == ""
+        with pytest.raises(Exception):
+            decryptor.decrypt(encryption.EncryptionManager.encrypt_data("a", base64.b64encode(b"j" * 32).decode()))
+
+    def test_body_only_when_needed(self):
+        manager = encryption.EmailDataManager
+        raw = SimpleNamespace(
+            id=1, encrypted_sender=manager.encrypt_email_sender("a@b.de", MASTER_KEY),
+            encrypted_subject=manager.encrypt_email_subject("Betreff", MASTER_KEY),
+            encrypted_body=manager.encrypt_email_body("Body", MASTER_KEY),
+            has_attachments=True, imap_folder="INBOX", imap_flags="", imap_is_seen=False, imap_is_flagged=False,
+        )
+        broken = SimpleNamespace(**{**vars(raw), "id": 2, "encrypted_subject": "kaputt"})
+        engine = AutoRulesEngine(user_id=1, master_key=MASTER_KEY, db_session=None)
+
+        headers_only = engine._decrypt_emails_for_matching([(raw, 9), (broken, None)], needs_body=False)
+        with_body = engine._decrypt_emails_for_matching([(raw, 9)], needs_body=True)
+
+        assert headers_only[1]['sender'] == "a@b.de" and headers_only[1]['email_id'] == 9
+        assert headers_only[1]['body'] == ""
+        assert headers_only[2] is None
+        assert with_body[1]['body'] == "Body"
@@ -0,0 +1,43 @@
+"""
+Test BatchEncryptor (Bulk-Persist in _persist_raw_emails)
+
+Prüft, dass die Blobs mit EncryptionManager/BatchDecryptor kompatibel sind
+und leere Werte wie bei encrypt_data behandelt werden.
+"""
+
+import sys
+import os
+import base64
+import importlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+encryption = importlib.import_module("src.08_encryption")
+
+MASTER_KEY = base64.b64encode(b"k" * 32).decode()
+
+
+class TestBatchEncryptor:
+    """Tests für BatchEncryptor"""
+
+    def test_roundtrip_with_existing_decryption(self):
+        encryptor = encryption.BatchEncryptor(MASTER_KEY)
+        texts = ["a", "Grüße", "x" * 5000]
+        blobs = [encryptor.encrypt(text) for text in texts]
+
+        assert [encryption.EncryptionManager.decrypt_data(blob, MASTER_KEY) for blob in blobs] == texts
+        assert encryption.BatchDecryptor(MASTER_KEY).decrypt_many(blobs) == texts
+
+    def test_fresh_iv_per_value(self):
+        encryptor = encryption.BatchEncryptor(MASTER_KEY)
+
+        assert encryptor.encrypt("gleich") != encryptor.encrypt("gleich")
+
+    def test_empty_values(self):
+        encryptor = encryption.BatchEncryptor(MASTER_KEY)
+
+        assert encryptor.encrypt("") == ""
+        assert encryptor.encrypt(None) == ""
+        assert encryptor.encrypt_optional("") is None
+        assert encryptor.encrypt_optional(None) is None
+        assert encryption.EncryptionManager.decrypt_data(encryptor.encrypt_optional("cc@x.de"), MASTER_KEY) == "cc@x.de"
@@ -0,0 +1,49 @@
+"""
+Test Dashboard-Aggregation (Prioritäten-Matrix)
+
+Prüft dass build_matrix_stats aus GROUP BY-Zeilen die gleichen Werte liefert
+wie das frühere Zählen über alle geladenen Mails.
+"""
+
+import sys
+import os
+import importlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+dashboard_stats = importlib.import_module("src.services.dashboard_stats")
+
+
+class TestBuildMatrixStats:
+    """Tests für build_matrix_stats"""
+
+    def test_counts_open_cells_and_colors(self):
+        rows = [
+            (False, 3, 3, "rot", 4),
+            (False, 3, 3, "gelb", 1),
+            (False, 1, 2, "grün", 7),
+            (True, 3, 3, "rot", 5),
+            (True, None, None, None, 2),
+        ]
+
+        result = dashboard_stats.build_matrix_stats(rows)
+
+        assert result["matrix"]["33"] == 5
+        assert result["matrix"]["12"] == 7
+        assert result["matrix"]["11"] == 0
+        assert len(result["matrix"]) == 9
+        assert result["amp_colors"] == {"rot": 4, "gelb": 1, "grün": 7}
+        assert result["high_priority_count"] == 4
+        assert result["stats"] == {"total": 19, "open": 12, "done": 7}
+
+    def test_unscored_mails_count_as_open_only(self):
+        result = dashboard_stats.build_matrix_stats([(False, None, None, "blau", 3)])
+
+        assert sum(result["matrix"].values()) == 0
+        assert sum(result["amp_colors"].values()) == 0
+        assert result["stats"]["open"] == 3
+
+    def test_empty(self):
+        result = dashboard_stats.build_matrix_stats([])
+
+        assert result["stats"] == {"total": 0, "open": 0, "done": 0}
@@ -0,0 +1,140 @@
+"""
+Test Batch-Embeddings (Ollama /api/embed, OpenAI input-Array)
+
+Prüft Chunking nach EMBEDDING_BATCH_SIZE, Zuordnung der Ergebnisse zu den
+Eingabe-Positionen und den Fallback auf Einzel-Requests.
+"""
+
+import sys
+import os
+import importlib
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+embedding_api = importlib.import_module("src.05_embedding_api")
+semantic_search = importlib.import_module("src.semantic_search")
+
+
+class _Response:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+def _vector(text):
+    return [float(len(text)), 1.0, 0.0]
+
+
+def _patch_post(monkeypatch, fake_post):
+    """Leitet die HTTP-Session der Embedding-Clients auf fake_post um"""
+    monkeypatch.setattr(
+        embedding_api.requests.Session, "post", lambda session, *args, **kwargs: fake_post(*args, **kwargs)
+    )
+
+
+class TestOllamaBatch:
+    """Tests für OllamaEmbeddingClient.get_embeddings_batch"""
+
+    def test_chunks_by_batch_size(self, monkeypatch):
+        requests_seen = []
+
+        def fake_post(url, json, timeout):
+            requests_seen.append((url, list(json["input"])))
+            return _Response(200, {"embeddings": [_vector(t) for t in json["input"]]})
+
+        monkeypatch.setattr(embedding_api, "EMBEDDING_BATCH_SIZE", 2)
+        _patch_post(monkeypatch, fake_post)
+        client = embedding_api.OllamaEmbeddingClient(model="all-minilm:22m", base_url="http://ollama")
+
+        texts = ["a", "", "bbb", "cc", "dddd"]
+        results = client.get_embeddings_batch(texts)
+
+        assert results == [_vector("a"), None, _vector("bbb"), _vector("cc"), _vector("dddd")]
+        assert [inputs for _, inputs in requests_seen] == [["a", "bbb"], ["cc", "dddd"]]
+        assert all(url == "http://ollama/api/embed" for url, _ in requests_seen)
+        assert client.batch_stats.as_dict()["texts"] == 4
+
+    def test_fallback_without_embed_endpoint(self, monkeypatch):
+        def fake_post(url, json, timeout):
+            if url.endswith("/api/embed"):
+                return _Response(404, {})
+            return _Response(200, {"embedding": _vector(json["prompt"])})
+
+        _patch_post(monkeypatch, fake_post)
+        client = embedding_api.OllamaEmbeddingClient(model="all-minilm:22m", base_url="http://ollama")
+
+        assert client.get_embeddings_batch(["ab", "xyz"]) == [_vector("ab"), _vector("xyz")]
+
+
+class TestOpenAIBatch:
+    """Tests für OpenAIEmbeddingClient.get_embeddings_batch"""
+
+    def test_index_is_relative_to_request(self, monkeypatch):
+        def fake_post(url, headers, json, timeout):
+            # Reihenfolge bewusst vertauscht - Zuordnung nur über "index"
+            data = [{"index": i, "embedding": _vector(t)} for i, t in enumerate(json["input"])]
+            return _Response(200, {"data": list(reversed(data))})
+
+        monkeypatch.setattr(embedding_api, "EMBEDDING_BATCH_SIZE", 2)
+        _patch_post(monkeypatch, fake_post)
+        client = embedding_api.OpenAIEmbeddingClient(api_key="sk-test")
+
+        texts = ["a", "bb", " ", "cccc", "ddddd"]
+        assert client.get_embeddings_batch(texts) == [
+            _vector("a"), _vector("bb"), None, _vector("cccc"), _vector("ddddd")
+        ]
+        assert client.batch_stats.batches == 2
+
+    def test_ai_client_reuses_batch_client(self, monkeypatch):
+        def fake_post(url, headers, json, timeout):
+            return _Response(200, {"data": [{"index": i, "embedding": _vector(t)} for i, t in enumerate(json["input"])]})
+
+        _patch_post(monkeypatch, fake_post)
+        ai_client = importlib.import_module("src.03_ai_client")
+        client = ai_client.OpenAIClient(api_key="sk-test", model="text-embedding-3-small")
+
+        client._get_embeddings_batch(["a", "bb"])
+        batch_client = client._embedding_batch_client
+        client._get_embeddings_batch(["ccc"])
+
+        assert client._embedding_batch_client is batch_client
+        assert batch_client.batch_stats.batches == 2
+
+
+class TestGenerateEmbeddingsForEmails:
+    """Tests für semantic_search.generate_embeddings_for_emails"""
+
+    def test_batch_matches_single(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+
+        class _Client:
+            model = "all-minilm:22m"
+
+            def __init__(self):
+                self.batch_calls = 0
+
+            def _get_embedding(self, text):
+                return [float(len(text)), 2.0, 1.0]
+
+            def _get_embeddings_batch(self, texts):
+                self.batch_calls += 1
+                return [self._get_embedding(t) for t in texts]
+
+        client = _Client()
+        emails = [("Rechnung", "Bitte zahlen Sie die offene Rechnung bis Freitag, danke."), ("Hi", "kurz")]
+
+        batch = semantic_search.generate_embeddings_for_emails(emails, client)
+        monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "other.sqlite3"))  # ohne Cache-Treffer
+        single = [semantic_search.generate_embedding_for_email(s, b, client) for s, b in emails]
+
+        assert client.batch_calls == 1
+        assert np.allclose(
+            np.frombuffer(batch[0][0], dtype=np.float32), np.frombuffer(single[0][0], dtype=np.float32)
+        )
+        assert batch[0][1] == single[0][1]
+        assert batch[1][0] is None  # Text zu kurz
@@ -0,0 +1,144 @@
+"""
+Test EmbeddingCache (Content-Hash Cache für Email-Embeddings)
+
+Prüft Normalisierung, HMAC-Keys pro User, Hit/Miss-Zähler, TTL/LRU-Eviction
+und dass generate_embedding(s)_for_email(s) wortgleiche Texte nicht erneut
+ans Backend schicken.
+"""
+
+import sys
+import os
+import base64
+import hashlib
+import importlib
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import embedding_cache
+from src.services.embedding_cache import EmbeddingCache, content_hash, derive_cache_key
+
+semantic_search = importlib.import_module("src.semantic_search")
+
+MASTER_KEY = base64.b64encode(b"e" * 32).decode()
+OTHER_MASTER_KEY = base64.b64encode(b"o" * 32).decode()
+KEY = derive_cache_key(MASTER_KEY)
+BODY = "Unser Newsletter für diese Woche: neue Angebote, Termine und Neuigkeiten aus dem Team."
+
+
+class _Client:
+    """Embedding-Client der Texte zählt"""
+    model = "all-minilm:22m"
+
+    def __init__(self):
+        self.texts = []
+
+    def _get_embedding(self, text):
+        self.texts.append(text)
+        return [float(len(text)), 1.0, 2.0]
+
+    def _get_embeddings_batch(self, texts):
+        return [self._get_embedding(text) for text in texts]
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    """Frische Cache-Datei + Zähler pro Test"""
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
+    monkeypatch.setattr(embedding_cache, "EMBEDDING_CACHE_ENABLED", True)
+    EmbeddingCache.reset_stats()
+    yield EmbeddingCache
+    EmbeddingCache.reset_stats()
+
+
+class TestEmbeddingCache:
+    """Tests für EmbeddingCache"""
+
+    def test_normalized_hash(self):
+        assert content_hash(KEY, "m", "Hallo\n\n  Welt ") == content_hash(KEY, "m", "Hallo Welt")
+        assert content_hash(KEY, "m", "Hallo Welt") != content_hash(KEY, "m", "Hallo Welt!")
+
+    def test_key_is_user_specific_and_not_plain_sha256(self):
+        """Test: Ohne Master-Key lässt sich ein geratener Text nicht bestätigen"""
+        other = derive_cache_key(OTHER_MASTER_KEY)
+
+        assert content_hash(KEY, "m", "Hallo Welt") != content_hash(other, "m", "Hallo Welt")
+        assert content_hash(KEY, "m", "Hallo Welt") != hashlib.sha256(b"Hallo Welt").hexdigest()
+
+    def test_hits_misses_and_model_key(self, cache):
+        cache.put(KEY, "model-a", "Text", b"\x01\x02")
+
+        assert cache.get(KEY, "model-a", "Text") == b"\x01\x02"
+        assert cache.get(KEY, "model-b", "Text") is None
+        assert cache.get(KEY, "model-a", "Anderer Text") is None
+        assert cache.get(derive_cache_key(OTHER_MASTER_KEY), "model-a", "Text") is None
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 3)
+        assert stats["entries"] == 1 and stats["stored_hits"] == 1
+
+    def test_ttl_and_lru_eviction(self, cache, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(embedding_cache.time, "time", lambda: now[0])
+        monkeypatch.setattr(embedding_cache, "EMBEDDING_CACHE_TTL_SECONDS", 100)
+        for i in range(5):
+            now[0] += 1
+            cache.put(KEY, "m", f"text {i}", b"x")
+        cache.get(KEY, "m", "text 0")  # zuletzt genutzt
+
+        assert cache.prune(max_entries=3) == 3  # auf 90% von 3 → 2 behalten
+        assert cache.get(KEY, "m", "text 0") == b"x"
+        assert cache.get(KEY, "m", "text 4") == b"x"
+        assert cache.get(KEY, "m", "text 1") is None
+
+        now[0] += 200  # abgelaufen: zählt als Miss, wird von prune entfernt
+        assert cache.get(KEY, "m", "text 0") is None
+        assert cache.prune() == 2
+        assert cache.get_stats()["evictions"] == 5
+
+    def test_disabled(self, cache, monkeypatch):
+        monkeypatch.setattr(embedding_cache, "EMBEDDING_CACHE_ENABLED", False)
+        cache.put(KEY, "m", "Text", b"x")
+
+        assert cache.get(KEY, "m", "Text") is None
+
+
+class TestSemanticSearchIntegration:
+    """Cache in generate_embedding_for_email / generate_embeddings_for_emails"""
+
+    def test_single_uses_cache(self, cache):
+        client = _Client()
+
+        first = semantic_search.generate_embedding_for_email("Newsletter", BODY, client, master_key=MASTER_KEY)
+        second = semantic_search.generate_embedding_for_email(
+            "Newsletter", BODY + "\n\n", client, master_key=MASTER_KEY
+        )
+
+        assert len(client.texts) == 1
+        assert first[0] == second[0] and second[1] == "all-minilm:22m"
+        assert cache.get_stats()["hit_rate"] == 0.5
+
+    def test_no_cache_without_master_key_or_across_users(self, cache):
+        client = _Client()
+
+        semantic_search.generate_embedding_for_email("Newsletter", BODY, client)
+        semantic_search.generate_embedding_for_email("Newsletter", BODY, client)
+        semantic_search.generate_embedding_for_email("Newsletter", BODY, client, master_key=MASTER_KEY)
+        semantic_search.generate_embedding_for_email("Newsletter", BODY, client, master_key=OTHER_MASTER_KEY)
+
+        assert len(client.texts) == 4
+        assert cache.get_stats()["entries"] == 2
+
+    def test_batch_deduplicates_and_uses_cache(self, cache):
+        client = _Client()
+        semantic_search.generate_embedding_for_email("Newsletter", BODY, client, master_key=MASTER_KEY)
+        emails = [("Newsletter", BODY), ("Rechnung", BODY), ("Rechnung", BODY), ("Hi", "kurz")]
+
+        results = semantic_search.generate_embeddings_for_emails(emails, client, master_key=MASTER_KEY)
+
+        assert len(client.texts) == 2  # 1× vorab, 1× "Rechnung" (Duplikat im Batch)
+        assert results[1][0] == results[2][0]
+        assert results[3][0] is None
+        assert np.frombuffer(results[0][0], dtype=np.float32).shape == (3,)
@@ -0,0 +1,260 @@
+"""
+Test EmbeddingIndex (vektorisierte Semantic Search)
+
+Prüft Top-K und inkrementelle Updates gegen die Brute-Force-Referenz
+(Cosine Similarity pro Email) sowie die Ordner-/Account-Filter der
+Semantic Search in SQL (SQLite).
+"""
+
+import sys
+import os
+import importlib
+import weakref
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import JSON, create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.embedding_index import EmbeddingIndex
+from src.semantic_search import SemanticSearchService
+
+models = importlib.import_module("src.02_models")
+
+
+def _random_rows(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    return [
+        (i + 1, vectors[i].tobytes())
+        for i in range(n)
+    ], vectors
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    # raw_emails.processing_warnings ist JSONB (PostgreSQL) → für SQLite kurz als JSON anlegen
+    warnings_column = models.RawEmail.__table__.c.processing_warnings
+    jsonb, warnings_column.type = warnings_column.type, JSON()
+    try:
+        models.Base.metadata.create_all(engine, tables=[models.RawEmail.__table__])
+    finally:
+        warnings_column.type = jsonb
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _brute_force(vectors, query, threshold=-1.0):
+    q = query / np.linalg.norm(query)
+    scores = []
+    for i, v in enumerate(vectors):
+        sim = float(np.dot(v, q) / np.linalg.norm(v))
+        if sim >= threshold:
+            scores.append((i + 1, sim))
+    scores.sort(key=lambda x: x[1], reverse=True)
+    return scores
+
+
+class TestEmbeddingIndex:
+    """Tests für EmbeddingIndex"""
+
+    def test_topk_matches_brute_force(self):
+        rows, vectors = _random_rows(200)
+        index = EmbeddingIndex(user_id=1, model="test")
+        index.upsert(rows)
+
+        query = np.random.default_rng(1).normal(size=16).astype(np.float32)
+        hits = index.query(query, k=10, threshold=-1.0)
+        expected = _brute_force(vectors, query)[:10]
+
+        assert [h[0] for h in hits] == [e[0] for e in expected]
+        assert np.allclose([h[1] for h in hits], [e[1] for e in expected], atol=1e-5)
+
+    def test_threshold(self):
+        rows, vectors = _random_rows(100)
+        index = EmbeddingIndex(user_id=1, model="test")
+        index.upsert(rows)
+
+        hits = index.query(vectors[10], k=100, threshold=0.2)
+
+        assert hits
+        assert all(score >= 0.2 for _, score in hits)
+        assert [h[0] for h in hits] == [e[0] for e in _brute_force(vectors, vectors[10], 0.2)]
+
+    def test_exclude_ids(self):
+        rows, vectors = _random_rows(20)
+        index = EmbeddingIndex(user_id=1, model="test")
+        index.upsert(rows)
+
+        hits = index.query(vectors[4], k=3, exclude_ids=[5])
+
+        assert 5 not in [h[0] for h in hits]
+
+    def test_upsert_overwrites_and_remove(self):
+        rows, vectors = _random_rows(10)
+        index = EmbeddingIndex(user_id=1, model="test")
+        index.upsert(rows)
+
+        index.upsert([(3, vectors[7].tobytes())])
+        assert index.size == 10
+        assert index.query(vectors[7], k=2)[0][1] > 0.999
+        assert {h[0] for h in index.query(vectors[7], k=2)} == {3, 8}
+
+        assert index.remove([3, 8, 999]) == 2
+        assert index.size == 8
+        assert not index.contains(3)
+        assert 8 not in [h[0] for h in index.query(vectors[7], k=10)]
+
+    def test_duplicate_ids_in_batch_last_wins(self):
+        rows, vectors = _random_rows(3)
+        index = EmbeddingIndex(user_id=1, model="test")
+
+        index.upsert(rows + [(rows[1][0], vectors[2].tobytes())])
+
+        assert index.size == 3
+        assert len(set(index.ids.tolist())) == 3
+        assert {h[0] for h in index.query(vectors[2], k=2, threshold=0.999)} == {rows[1][0], rows[2][0]}
+
+    def test_wrong_dimension_is_skipped(self):
+        rows, _ = _random_rows(5)
+        index = EmbeddingIndex(user_id=1, model="test")
+        index.upsert(rows)
+
+        added = index.upsert([(99, np.ones(8, dtype=np.float32).tobytes())])
+
+        assert added == 0
+        assert index.size == 5
+        assert index.query(np.ones(8, dtype=np.float32), k=3) == []
+
+
+class TestRankedHits:
+    """Tests für SemanticSearchService._ranked_hits (Filter in SQL statt im Index)"""
+
+    def _setup(self, db, n=200):
+        rows, vectors = _random_rows(n)
+        for email_id, _ in rows:
+            db.add(models.RawEmail(
+                id=email_id, user_id=1, mail_account_id=1 if email_id <= n // 2 else 2,
+                encrypted_sender="x", received_at=datetime(2026, 1, 1),
+                imap_uid=email_id, imap_folder="INBOX", imap_uidvalidity=1,
+            ))
+        db.commit()
+        index = EmbeddingIndex(user_id=1, model="test")
+        index.upsert(rows)
+        return SemanticSearchService(db), index, vectors
+
+    def test_moved_mail_found_under_new_folder(self, db):
+        service, index, vectors = self._setup(db)
+        query = vectors[0]
+        # Schwächster Treffer wird verschoben - der Index erfährt davon nichts
+        weakest = index.query(query, k=200, threshold=-1.0)[-1][0]
+        db.get(models.RawEmail, weakest).imap_folder = "Archiv"
+        db.commit()
+
+        hits = service._ranked_hits(index, query, 1, limit=5, threshold=-1.0, folder="Archiv")
+
+        assert [email_id for email_id, _ in hits] == [weakest]
+        assert service._ranked_hits(index, query, 1, limit=5, threshold=-1.0, folder="Gibt's nicht") == []
+
+    def test_account_filter_and_exclude(self, db):
+        service, index, vectors = self._setup(db)
+
+        hits = service._ranked_hits(
+            index, vectors[0], 1, limit=10, threshold=-1.0, account_id=2, exclude_ids=[150]
+        )
+
+        assert len(hits) == 10
+        assert all(100 < email_id <= 200 and email_id != 150 for email_id, _ in hits)
+        expected = [e for e in _brute_force(vectors, vectors[0]) if e[0] > 100 and e[0] != 150][:10]
+        assert [h[0] for h in hits] == [e[0] for e in expected]
+
+    def test_selective_filter_on_ivf_matches_brute_force(self, db):
+        from src.services.ann_index import IVFIndex
+
+        rng = np.random.default_rng(3)
+        centers = rng.normal(size=(20, 16)) * 4
+        labels = rng.integers(0, 20, size=1000)
+        vectors = (centers[labels] + rng.normal(size=(1000, 16))).astype(np.float32)
+        for i in range(1000):
+            db.add(models.RawEmail(
+                id=i + 1, user_id=1, mail_account_id=1, encrypted_sender="x",
+                received_at=datetime(2026, 1, 1), imap_uid=i + 1, imap_uidvalidity=1,
+                # Selektiver Filter: nur ein Cluster liegt im Ordner "Archiv"
+                imap_folder="Archiv" if labels[i] == 7 else "INBOX",
+            ))
+        db.commit()
+        flat = EmbeddingIndex(user_id=1, model="test")
+        flat.upsert([(i + 1, vectors[i].tobytes()) for i in range(1000)])
+        ivf = IVFIndex.from_embedding_index(flat)
+        ivf.nprobe = 1
+        query = centers[0].astype(np.float32)  # weit weg von Cluster 7
+
+        hits = SemanticSearchService(db)._ranked_hits(ivf, query, 1, limit=5, threshold=-1.0, folder="Archiv")
+
+        expected = [e[0] for e in _brute_force(vectors, query) if labels[e[0] - 1] == 7][:5]
+        assert [h[0] for h in hits] == expected
+
+
+class TestEmbeddingIndexCacheLocking:
+    """Ein laufender Rebuild blockiert nur den eigenen (user, model)-Key"""
+
+    def test_build_of_one_user_does_not_block_other_users(self, monkeypatch):
+        import threading
+        from src.services.embedding_index import EmbeddingIndexCache
+
+        started, release = threading.Event(), threading.Event()
+
+        def slow_build(cls, db, user_id, model):
+            if user_id == 1:
+                started.set()
+                release.wait(5)
+            return EmbeddingIndex(user_id=user_id, model=model)
+
+        monkeypatch.setattr(EmbeddingIndexCache, "_build", classmethod(slow_build))
+        monkeypatch.setattr(EmbeddingIndexCache, "ANN_MIN_VECTORS", 0)
+        monkeypatch.setattr(EmbeddingIndexCache, "_indexes", {})
+        monkeypatch.setattr(EmbeddingIndexCache, "_key_locks", weakref.WeakValueDictionary())
+
+        worker = threading.Thread(target=EmbeddingIndexCache.get_index, args=(None, 1, "test"))
+        worker.start()
+        try:
+            assert started.wait(5)
+            # Während User 1 noch baut, kommt User 2 sofort durch
+            assert EmbeddingIndexCache.get_index(None, 2, "test").user_id == 2
+        finally:
+            release.set()
+            worker.join(5)
+        assert (1, "test") in EmbeddingIndexCache._indexes
+
+    def test_cache_is_bounded_by_bytes(self, monkeypatch):
+        from cachetools import TTLCache
+        from src.services.embedding_index import EmbeddingIndexCache
+
+        def build(cls, db, user_id, model):
+            index = EmbeddingIndex(user_id=user_id, model=model)
+            rows, _ = _random_rows(10, seed=user_id)
+            index.upsert(rows)
+            return index
+
+        one_index = build(None, None, 0, "test").nbytes
+        monkeypatch.setattr(EmbeddingIndexCache, "_build", classmethod(build))
+        monkeypatch.setattr(EmbeddingIndexCache, "ANN_MIN_VECTORS", 0)
+        monkeypatch.setattr(
+            EmbeddingIndexCache, "_indexes",
+            TTLCache(maxsize=2 * one_index, ttl=60, getsizeof=lambda index: index.nbytes),
+        )
+        monkeypatch.setattr(EmbeddingIndexCache, "_key_locks", weakref.WeakValueDictionary())
+
+        for user_id in (1, 2, 3):
+            EmbeddingIndexCache.get_index(None, user_id, "test")
+
+        # Ältester Index verdrängt, Budget eingehalten
+        assert set(EmbeddingIndexCache._indexes) == {(2, "test"), (3, "test")}
+        assert EmbeddingIndexCache.get_stats()["bytes"] <= 2 * one_index
+        # Key-Locks werden nach Gebrauch freigegeben statt pro User zu wachsen
+        assert len(EmbeddingIndexCache._key_locks) == 0
@@ -0,0 +1,215 @@
+"""
+Test Folder-Audit-Cache (folder_audit_cache)
+
+Prüft Config-Fingerprint, verschlüsseltes Speichern/Laden pro UID,
+Verwerfen bei UIDVALIDITY-Wechsel, Bereinigung verschwundener UIDs und
+gegen einen Fake-IMAP-Server, dass erneute Audits nur neue UIDs holen.
+"""
+
+import sys
+import os
+import base64
+import importlib
+from datetime import datetime, timedelta, UTC
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+models = importlib.import_module("src.02_models")
+audit_cache = importlib.import_module("src.services.folder_audit_cache")
+folder_audit = importlib.import_module("src.services.folder_audit_service")
+trusted_senders = importlib.import_module("src.services.trusted_senders")
+
+MASTER_KEY = base64.b64encode(b"k" * 32).decode()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine, tables=[
+        models.FolderAuditCacheEntry.__table__,
+        models.TrustedSender.__table__,
+        models.AuditTrustedDomain.__table__,
+        models.AuditImportantKeyword.__table__,
+        models.AuditSafePattern.__table__,
+        models.AuditVIPSender.__table__,
+        models.AuditAutoDeleteRule.__table__,
+    ])
+    session = sessionmaker(bind=engine)()
+    folder_audit.AuditConfigCache.clear_cache()
+    trusted_senders.TrustedSenderManager.invalidate()
+    yield session
+    session.close()
+    folder_audit.AuditConfigCache.clear_cache()
+    trusted_senders.TrustedSenderManager.invalidate()
+
+
+def _cache(db, uidvalidity=1, folder="Trash"):
+    return audit_cache.FolderAuditCache(db, 1, 1, folder, uidvalidity, MASTER_KEY)
+
+
+class TestFingerprint:
+    """Tests für config_fingerprint"""
+
+    def test_order_independent(self):
+        a = audit_cache.config_fingerprint(
+            {"trusted_domains": {"a.de", "b.de"}}, [("x@a.de", "exact", None), ("b.de", "domain", 1)]
+        )
+        b = audit_cache.config_fingerprint(
+            {"trusted_domains": {"b.de", "a.de"}}, [("b.de", "domain", 1), ("x@a.de", "exact", None)]
+        )
+        assert a == b
+
+    def test_changes_with_config_and_trusted_senders(self):
+        base = audit_cache.config_fingerprint({"trusted_domains": {"a.de"}})
+        assert base != audit_cache.config_fingerprint({"trusted_domains": {"a.de", "c.de"}})
+        assert base != audit_cache.config_fingerprint(
+            {"trusted_domains": {"a.de"}}, [("x@a.de", "exact", None)]
+        )
+
+
+class TestFolderAuditCache:
+    """Tests für FolderAuditCache load/store/prune"""
+
+    def test_store_and_load_roundtrip(self, db):
+        cache = _cache(db)
+        cache.store([(5, {"subject": "Hallo"}, {"category": "safe"})], "fp")
+
+        row = db.query(models.FolderAuditCacheEntry).one()
+        assert "Hallo" not in row.encrypted_data
+
+        cached = _cache(db).load()
+        assert set(cached) == {5}
+        assert cached[5].features == {"subject": "Hallo"}
+        assert cached[5].result == {"category": "safe"}
+        assert cached[5].is_fresh("fp")
+        assert not cached[5].is_fresh("other")
+        assert not cached[5].is_fresh(
+            "fp", datetime.now(UTC) + timedelta(hours=audit_cache.AUDIT_CACHE_MAX_AGE_HOURS + 1)
+        )
+
+    def test_store_replaces_existing_uid(self, db):
+        cache = _cache(db)
+        cache.store([(5, {}, {"category": "safe"})], "fp1")
+        cache.store([(5, {}, {"category": "scam"})], "fp2")
+
+        cached = cache.load()
+        assert cached[5].result == {"category": "scam"}
+        assert cached[5].fingerprint == "fp2"
+
+    def test_uidvalidity_change_discards_entries(self, db):
+        _cache(db).store([(5, {}, {}), (6, {}, {})], "fp")
+
+        assert _cache(db, uidvalidity=2).load() == {}
+        assert db.query(models.FolderAuditCacheEntry).count() == 0
+
+    def test_prune_removes_vanished_uids(self, db):
+        _cache(db).store([(5, {}, {}), (6, {}, {})], "fp")
+        _cache(db, folder="INBOX").store([(5, {}, {})], "fp")
+
+        assert _cache(db).prune({6}) == 1
+        assert set(_cache(db).load()) == {6}
+        assert set(_cache(db, folder="INBOX").load()) == {5}
+
+    def test_store_leaves_commit_to_caller(self, db):
+        """Test: store()/prune() schreiben nur per Savepoint, der Caller committed"""
+        db.add(models.TrustedSender(user_id=1, sender_pattern="a@example.com", pattern_type="exact"))
+        _cache(db).store([(5, {}, {})], "fp")
+        db.rollback()
+
+        assert db.query(models.FolderAuditCacheEntry).count() == 0
+        assert db.query(models.TrustedSender).count() == 0
+
+        _cache(db).store([(5, {}, {}), (6, {}, {})], "fp")
+        _cache(db).prune({6})
+        db.commit()
+        assert set(_cache(db).load()) == {6}
+
+
+class FakeIMAP:
+    """Ein Ordner "Trash" mit Newsletter-Mails"""
+
+    def __init__(self):
+        self.uidvalidity = 1
+        self.mails = {}
+        self.calls = []
+
+    def add(self, uid, sender="news@shop.de", flags=()):
+        self.mails[uid] = (sender, tuple(flags))
+
+    def select_folder(self, folder, readonly=False):
+        return {b"UIDVALIDITY": self.uidvalidity, b"EXISTS": len(self.mails)}
+
+    def search(self, criteria):
+        return sorted(self.mails)
+
+    def fetch(self, uids, data):
+        self.calls.append((tuple(uids), "ENVELOPE" in data))
+        result = {}
+        for uid in uids:
+            sender, flags = self.mails[uid]
+            mailbox, host = sender.split("@")
+            entry = {b"FLAGS": flags}
+            if "ENVELOPE" in data:
+                entry[b"ENVELOPE"] = SimpleNamespace(
+                    subject=f"Angebot {uid}".encode(),
+                    from_=[SimpleNamespace(mailbox=mailbox.encode(), host=host.encode(), name=b"Shop")],
+                    date=datetime.now(UTC) - timedelta(days=3),
+                )
+                entry[b"RFC822.SIZE"] = 1000
+                entry[b"BODY[HEADER.FIELDS (LIST-UNSUBSCRIBE)]"] = b"List-Unsubscribe: <mailto:u@shop.de>\r\n"
+            result[uid] = entry
+        return result
+
+    def header_fetches(self):
+        return [uids for uids, with_envelope in self.calls if with_envelope]
+
+
+def _audit(db, imap):
+    fetcher = SimpleNamespace(connection=imap, username="me@example.org")
+    return folder_audit.FolderAuditService.fetch_and_analyze_trash(
+        fetcher, db_session=db, user_id=1, account_id=1, folder="Trash", master_key=MASTER_KEY
+    )
+
+
+class TestIncrementalAudit:
+    """Tests für fetch_and_analyze_trash mit master_key"""
+
+    def test_repeat_audit_fetches_only_new_uids(self, db):
+        imap = FakeIMAP()
+        imap.add(1)
+        imap.add(2)
+
+        first = _audit(db, imap)
+        assert imap.header_fetches() == [(1, 2)]
+
+        imap.calls.clear()
+        imap.add(3)
+        del imap.mails[1]
+        second = _audit(db, imap)
+
+        assert imap.header_fetches() == [(3,)]
+        assert [e.uid for e in second.emails] == [2, 3]
+        assert second.emails[0].to_dict() == first.emails[1].to_dict()
+        assert {uid for (uid,) in db.query(models.FolderAuditCacheEntry.uid)} == {2, 3}
+
+    def test_config_change_rescores_without_fetch(self, db):
+        imap = FakeIMAP()
+        imap.add(1)
+        _audit(db, imap)
+        fingerprint = db.query(models.FolderAuditCacheEntry.config_fingerprint).scalar()
+
+        db.add(models.TrustedSender(
+            user_id=1, sender_pattern="news@shop.de", pattern_type="exact"
+        ))
+        db.commit()
+        imap.calls.clear()
+        result = _audit(db, imap)
+
+        assert imap.header_fetches() == []
+        assert result.total == 1
+        assert db.query(models.FolderAuditCacheEntry.config_fingerprint).scalar() != fingerprint
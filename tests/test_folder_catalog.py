@@ -0,0 +1,132 @@
+"""
+Test Ordner-Katalog (email_folders statt Live-IMAP)
+
+Prüft das Parsen der LIST-Antwort, Upsert/Löschen in email_folders, den
+Memory-Cache und den Fallback auf mail_server_state.
+"""
+
+import sys
+import os
+import importlib
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+models = importlib.import_module("src.02_models")
+folder_catalog = importlib.import_module("src.services.folder_catalog")
+
+Catalog = folder_catalog.FolderCatalogService
+
+MAILBOXES = [
+    ((b"\\HasNoChildren",), b"/", "INBOX"),
+    ((b"\\HasNoChildren", b"\\Sent"), b"/", "Gesendet"),
+    ((b"\\Noselect", b"\\HasChildren"), b"/", "[Gmail]"),
+    ((b"\\HasNoChildren", b"\\Trash"), b"/", "Papierkorb"),
+]
+
+
+@pytest.fixture
+def db():
+    Catalog.invalidate()
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(
+        engine, tables=[models.EmailFolder.__table__, models.MailServerState.__table__]
+    )
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    Catalog.invalidate()
+
+
+class TestParseFolderList:
+    """Tests für parse_folder_list"""
+
+    def test_skips_noselect_and_detects_special_use(self):
+        parsed = folder_catalog.parse_folder_list(MAILBOXES)
+
+        assert [f["name"] for f in parsed] == ["Gesendet", "INBOX", "Papierkorb"]
+        types = {f["name"]: f["special_folder_type"] for f in parsed}
+        assert types == {"Gesendet": "sent", "INBOX": "inbox", "Papierkorb": "trash"}
+
+
+class TestFolderCatalogService:
+    """Tests für FolderCatalogService.store / get_folder_names"""
+
+    def test_store_upserts_and_removes(self, db):
+        Catalog.store(db, 1, 10, MAILBOXES)
+        Catalog.store(db, 1, 10, MAILBOXES[:2] + [((), b"/", "Archiv")])
+
+        rows = db.query(models.EmailFolder).filter_by(mail_account_id=10).all()
+        assert sorted(r.name for r in rows) == ["Archiv", "Gesendet", "INBOX"]
+        assert next(r for r in rows if r.name == "Gesendet").is_special_folder is True
+
+        Catalog.invalidate()
+        assert Catalog.get_folder_names(db, 1, 10) == ["Archiv", "Gesendet", "INBOX"]
+
+    def test_store_leaves_commit_to_caller(self, db):
+        """Test: store() schreibt nur per Savepoint, Caller-Arbeit bleibt erhalten"""
+        db.add(models.MailServerState(
+            user_id=1, mail_account_id=10, folder="INBOX", uid=1,
+            uidvalidity=1, content_hash="h1", is_deleted=False,
+        ))
+        Catalog.store(db, 1, 10, MAILBOXES)
+        db.rollback()
+        assert db.query(models.EmailFolder).count() == 0
+        assert db.query(models.MailServerState).count() == 0
+
+        def fail(session, flush_context, instances):
+            if any(isinstance(obj, models.EmailFolder) for obj in session.new):
+                raise RuntimeError("kaputt")
+
+        db.add(models.MailServerState(
+            user_id=1, mail_account_id=10, folder="INBOX", uid=2,
+            uidvalidity=1, content_hash="h2", is_deleted=False,
+        ))
+        db.flush()
+        event.listen(db, "before_flush", fail)
+        try:
+            assert Catalog.store(db, 1, 10, MAILBOXES) == ["Gesendet", "INBOX", "Papierkorb"]
+        finally:
+            event.remove(db, "before_flush", fail)
+        db.commit()
+        assert db.query(models.MailServerState).count() == 1
+        assert db.query(models.EmailFolder).count() == 0
+
+    def test_memory_cache_avoids_db(self, db):
+        Catalog.store(db, 1, 10, MAILBOXES)
+        db.query(models.EmailFolder).delete()
+        db.commit()
+
+        assert Catalog.get_folder_names(db, 1, 10) == ["Gesendet", "INBOX", "Papierkorb"]
+        Catalog.invalidate(account_id=10)
+        assert Catalog.get_folder_names(db, 1, 10) == []
+
+    def test_fallback_to_server_state(self, db):
+        for uid, folder in enumerate(["INBOX", "Archiv", "INBOX"], 1):
+            db.add(models.MailServerState(
+                user_id=1, mail_account_id=10, folder=folder, uid=uid,
+                uidvalidity=1, content_hash=f"h{uid}", is_deleted=False,
+            ))
+        db.commit()
+
+        assert Catalog.get_folder_names(db, 1, 10) == ["Archiv", "INBOX"]
+
+    def test_get_or_refresh_only_hits_server_when_needed(self, db, monkeypatch):
+        calls = []
+
+        def fake_refresh(session, account, master_key):
+            calls.append(account.id)
+            return Catalog.store(session, account.user_id, account.id, MAILBOXES)
+
+        monkeypatch.setattr(Catalog, "refresh_from_server", staticmethod(fake_refresh))
+        account = SimpleNamespace(id=10, user_id=1, auth_type="imap")
+
+        assert Catalog.get_or_refresh(db, account, "key") == ["Gesendet", "INBOX", "Papierkorb"]
+        assert Catalog.get_or_refresh(db, account, "key") == ["Gesendet", "INBOX", "Papierkorb"]
+        assert Catalog.get_or_refresh(db, account, "key", refresh=True)
+        assert calls == [10, 10]
+        assert Catalog.get_or_refresh(db, SimpleNamespace(id=11, user_id=1, auth_type="imap"), None) == []
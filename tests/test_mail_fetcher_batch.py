@@ -0,0 +1,190 @@
+"""
+Test Pipelined Batch-FETCH im MailFetcher
+
+Prüft dass _fetch_emails_batched():
+- pro Chunk genau EIN FETCH-Kommando sendet
+- das gleiche Dict-Format liefert wie der Einzel-FETCH
+- Chunks nach Byte-Budget (RFC822.SIZE) begrenzt, große Mails einzeln holt
+- bei Chunk-Fehlern auf Einzel-FETCH zurückfällt (nach Reconnect, falls
+  die Verbindung tot ist)
+"""
+
+import sys
+import os
+import importlib
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+mail_fetcher = importlib.import_module('src.06_mail_fetcher')
+MailFetcher = mail_fetcher.MailFetcher
+
+
+def _rfc822(uid: int) -> bytes:
+    return (
+        f"From: Sender {uid} <sender{uid}@example.com>\r\n"
+        f"To: me@example.com\r\n"
+        f"Subject: Mail {uid}\r\n"
+        f"Message-ID: <msg{uid}@example.com>\r\n"
+        f"Content-Type: text/plain; charset=utf-8\r\n"
+        f"\r\n"
+        f"Body {uid}\r\n"
+    ).encode()
+
+
+class FakeConnection:
+    """Minimaler IMAPClient-Ersatz: speichert alle fetch()-Aufrufe"""
+
+    def __init__(self, uids, fail_batches=False, sizes=None, uidvalidity=42):
+        self.uids = set(uids)
+        self.fail_batches = fail_batches
+        self.sizes = sizes or {}
+        self.uidvalidity = uidvalidity
+        self.dead = False
+        self.calls = []
+
+    def noop(self):
+        if self.dead:
+            raise OSError("socket closed")
+
+    def select_folder(self, folder, readonly=False):
+        return {b'UIDVALIDITY': self.uidvalidity}
+
+    def fetch(self, uids, items):
+        self.calls.append((list(uids), list(items)))
+        if self.dead:
+            raise OSError("socket closed")
+        if self.fail_batches and len(uids) > 1:
+            raise RuntimeError("BAD command too long")
+        result = {}
+        for uid in uids:
+            if uid not in self.uids:
+                continue
+            data = {}
+            if 'RFC822.SIZE' in items:
+                data[b'RFC822.SIZE'] = self.sizes.get(uid, 123)
+            if 'FLAGS' in items:
+                data[b'FLAGS'] = (b'\\Seen',)
+                data[b'ENVELOPE'] = None
+                data[b'BODYSTRUCTURE'] = None
+                data[b'INTERNALDATE'] = datetime(2026, 1, 1, 12, 0)
+            if 'RFC822' in items:
+                data[b'RFC822'] = _rfc822(uid)
+            result[uid] = data
+        return result
+
+
+def _make_fetcher(conn):
+    fetcher = MailFetcher("imap.example.com", "me@example.com", "secret")
+    fetcher.connection = conn
+    fetcher._current_folder_uidvalidity = 42
+    return fetcher
+
+
+class TestBatchFetch:
+    """Tests für Pipelined Batch-FETCH"""
+
+    def test_one_fetch_per_chunk(self):
+        conn = FakeConnection(range(1, 251))
+        fetcher = _make_fetcher(conn)
+
+        emails = fetcher._fetch_emails_batched(list(range(250, 0, -1)), "INBOX", batch_size=100)
+
+        assert len(emails) == 250
+        # 1× RFC822.SIZE für die Chunk-Planung, dann ein FETCH pro Chunk
+        assert conn.calls[0] == (list(range(250, 0, -1)), ['RFC822.SIZE'])
+        fetches = conn.calls[1:]
+        assert [len(uids) for uids, _ in fetches] == [100, 100, 50]
+        assert all('RFC822' in items for _, items in fetches)
+        assert [s["uids"] for s in fetcher.last_fetch_stats] == [100, 100, 50]
+
+    def test_same_shape_as_single_fetch(self):
+        conn = FakeConnection([7, 8])
+        fetcher = _make_fetcher(conn)
+
+        batched = fetcher._fetch_emails_batched([8, 7], "INBOX", batch_size=10)
+        single = [fetcher._fetch_email_by_id(uid, "INBOX") for uid in (8, 7)]
+
+        assert [e["uid"] for e in batched] == ["8", "7"]
+        for b, s in zip(batched, single):
+            assert b.keys() == s.keys()
+            assert b["subject"] == s["subject"]
+            assert b["body"] == s["body"]
+            assert b["message_id"] == s["message_id"]
+            assert b["imap_uidvalidity"] == 42
+
+    def test_missing_uid_is_skipped(self):
+        conn = FakeConnection([1, 3])
+        fetcher = _make_fetcher(conn)
+
+        emails = fetcher._fetch_emails_batched([3, 2, 1], "INBOX", batch_size=10)
+
+        assert [e["uid"] for e in emails] == ["3", "1"]
+
+    def test_failed_chunk_falls_back_to_single_fetch(self):
+        conn = FakeConnection([1, 2, 3], fail_batches=True)
+        fetcher = _make_fetcher(conn)
+
+        emails = fetcher._fetch_emails_batched([3, 2, 1], "INBOX", batch_size=10)
+
+        assert [e["uid"] for e in emails] == ["3", "2", "1"]
+        # RFC822.SIZE + 1 fehlgeschlagener Batch (beide > 1 UID) + 2 FETCHes pro UID
+        assert len(conn.calls) == 2 + 3 * 2
+
+    def test_byte_budget_splits_chunks_and_isolates_large_mails(self, monkeypatch):
+        monkeypatch.setattr(MailFetcher, "FETCH_BATCH_BYTES", 1000)
+        sizes = {6: 400, 5: 400, 4: 400, 3: 5000, 2: 100, 1: 100}
+        conn = FakeConnection(range(1, 7), sizes=sizes)
+        fetcher = _make_fetcher(conn)
+
+        emails = fetcher._fetch_emails_batched([6, 5, 4, 3, 2, 1], "INBOX", batch_size=100)
+
+        assert [e["uid"] for e in emails] == ["6", "5", "4", "3", "2", "1"]
+        assert [uids for uids, _ in conn.calls[1:]] == [[6, 5], [4], [3], [2, 1]]
+
+    def test_dead_connection_reconnects_before_single_fetch(self, monkeypatch):
+        conn = FakeConnection([1, 2, 3])
+        fresh = FakeConnection([1, 2, 3])
+        fetcher = _make_fetcher(conn)
+        monkeypatch.setattr(fetcher, "connect", lambda: setattr(fetcher, "connection", fresh))
+        monkeypatch.setattr(fetcher, "_plan_fetch_chunks", lambda c, ids, size: [ids])
+        conn.dead = True
+
+        emails = fetcher._fetch_emails_batched([3, 2, 1], "INBOX", batch_size=10)
+
+        assert [e["uid"] for e in emails] == ["3", "2", "1"]
+        assert len(conn.calls) == 1
+        assert len(fresh.calls) == 3 * 2
+
+    def test_reconnect_with_changed_uidvalidity_aborts_folder(self, monkeypatch):
+        conn = FakeConnection([1, 2])
+        fetcher = _make_fetcher(conn)
+        monkeypatch.setattr(
+            fetcher, "connect", lambda: setattr(fetcher, "connection", FakeConnection([1, 2], uidvalidity=99))
+        )
+        monkeypatch.setattr(fetcher, "_plan_fetch_chunks", lambda c, ids, size: [ids])
+        conn.dead = True
+
+        assert fetcher._fetch_emails_batched([2, 1], "INBOX", batch_size=10) == []
+
+    def test_failed_reconnect_keeps_fetched_chunks(self, monkeypatch):
+        conn = FakeConnection([1, 2, 3, 4])
+        fetcher = _make_fetcher(conn)
+
+        def fail_connect():
+            raise OSError("connection refused")
+
+        monkeypatch.setattr(fetcher, "connect", fail_connect)
+        monkeypatch.setattr(fetcher, "_plan_fetch_chunks", lambda c, ids, size: [ids[:2], ids[2:]])
+        original_fetch = conn.fetch
+
+        def fetch_then_die(uids, items):
+            result = original_fetch(uids, items)
+            conn.dead = True
+            return result
+
+        conn.fetch = fetch_then_die
+
+        emails = fetcher._fetch_emails_batched([4, 3, 2, 1], "INBOX", batch_size=2)
+
+        assert [e["uid"] for e in emails] == ["4", "3"]
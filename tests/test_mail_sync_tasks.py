@@ -5,7 +5,16 @@ Tests für src/tasks/mail_sync_tasks.py
 
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from src.tasks.mail_sync_tasks import sync_user_emails, sync_all_accounts
+from src.tasks.mail_sync_tasks import (
+    sync_user_emails,
+    sync_all_accounts,
+    sync_account_step,
+    sync_all_accounts_done,
+    _fan_out_lanes,
+    _dispatch_processing_pipeline,
+    process_emails_nlp,
+    finish_sync_pipeline,
+)
 
 
 class TestSyncUserEmailsTask:
@@ -149,93 +158,190 @@ class TestSyncUserEmailsTask:
 
 
 class TestSyncAllAccountsTask:
-    """Tests für sync_all_accounts Celery Task"""
+    """Tests für sync_all_accounts (Chord-Fan-out) und seine Sub-Tasks"""
     
+    def test_lanes_respect_parallel_cap(self):
+        """Test: Accounts reihum auf max. N Lanes verteilt"""
+        assert _fan_out_lanes([1, 2, 3, 4, 5], 2) == [[1, 3, 5], [2, 4]]
+        assert _fan_out_lanes([1, 2], 3) == [[1], [2]]
+        assert _fan_out_lanes([], 3) == []
+    
+    @patch('src.tasks.mail_sync_tasks.SYNC_ALL_MAX_PARALLEL', 2)
     @patch('src.tasks.mail_sync_tasks.get_session')
     @patch('src.tasks.mail_sync_tasks.get_user')
-    @patch('src.tasks.mail_sync_tasks.sync_user_emails')
-    def test_sync_all_success(self, mock_sync_task, mock_get_user, mock_get_session):
-        """Test: Alle Accounts erfolgreich synced"""
-        mock_session = Mock()
-        mock_get_session.return_value = mock_session
-        
-        # Mock user with 2 accounts
-        mock_account1 = Mock(id=1, email="acc1@example.com")
-        mock_account2 = Mock(id=2, email="acc2@example.com")
-        mock_user = Mock(id=1, mail_accounts=[mock_account1, mock_account2])
-        mock_get_user.return_value = mock_user
+    def test_sync_all_dispatches_chord(self, mock_get_user, mock_get_session):
+        """Test: Ein Chord mit einer Chain pro Lane, kein blockierendes .get()"""
+        mock_get_session.return_value = Mock()
+        mock_get_user.return_value = Mock(id=1, mail_accounts=[Mock(id=i) for i in (1, 2, 3)])
         
-        # Mock sync results
-        mock_result1 = Mock()
-        mock_result1.get.return_value = {
-            'status': 'success',
-            'email_count': 10
-        }
-        mock_result2 = Mock()
-        mock_result2.get.return_value = {
-            'status': 'success',
-            'email_count': 15
-        }
-        
-        mock_sync_task.apply_async.side_effect = [mock_result1, mock_result2]
-        
-        # Execute
-        result = sync_all_accounts(user_id=1, master_key="test_key")
-        
-        # Assertions
-        assert result['status'] == 'success'
-        assert result['user_id'] == 1
-        assert result['accounts_synced'] == 2
-        assert result['total_accounts'] == 2
-        assert result['total_emails'] == 25
+        with patch('celery.chord') as mock_chord:
+            mock_chord.return_value.return_value = Mock(id="chord-1")
+            result = sync_all_accounts.run(user_id=1, service_token_id=7)
         
-        # Verify both accounts were synced
-        assert mock_sync_task.apply_async.call_count == 2
+        header = mock_chord.call_args.args[0]
+        lanes = [[sig.args[-2] for sig in lane.tasks] for lane in header.tasks]
+        assert lanes == [[1, 3], [2]]
+        assert header.tasks[0].tasks[0].args == ([], 1, 1, 7)
+        assert header.tasks[0].tasks[1].args == (1, 3, 7)
+        assert result['status'] == 'dispatched'
+        assert result['parallel'] == 2
+        assert result['chord_id'] == "chord-1"
     
     @patch('src.tasks.mail_sync_tasks.get_session')
     @patch('src.tasks.mail_sync_tasks.get_user')
     def test_sync_all_user_not_found(self, mock_get_user, mock_get_session):
         """Test: User nicht gefunden"""
-        mock_session = Mock()
-        mock_get_session.return_value = mock_session
+        mock_get_session.return_value = Mock()
         mock_get_user.return_value = None
         
-        result = sync_all_accounts(user_id=999, master_key="test_key")
+        result = sync_all_accounts.run(user_id=999, service_token_id=7)
         
         assert result['status'] == 'error'
-        assert result['message'] == 'User not found'
+        assert result['message'] == 'User nicht gefunden'
     
-    @patch('src.tasks.mail_sync_tasks.get_session')
-    @patch('src.tasks.mail_sync_tasks.get_user')
-    @patch('src.tasks.mail_sync_tasks.sync_user_emails')
-    def test_sync_all_partial_failure(self, mock_sync_task, mock_get_user, mock_get_session):
-        """Test: Ein Account schlägt fehl, andere erfolgreich"""
-        mock_session = Mock()
-        mock_get_session.return_value = mock_session
+    @patch('src.tasks.mail_sync_tasks._sync_account_locked')
+    def test_step_collects_errors_instead_of_breaking_chain(self, mock_sync):
+        """Test: Fehler/Lock-Konflikt landen im Ergebnis, die Lane läuft weiter"""
+        from celery.exceptions import Reject
         
-        # Mock user with 2 accounts
-        mock_account1 = Mock(id=1, email="acc1@example.com")
-        mock_account2 = Mock(id=2, email="acc2@example.com")
-        mock_user = Mock(id=1, mail_accounts=[mock_account1, mock_account2])
-        mock_get_user.return_value = mock_user
+        mock_sync.side_effect = [
+            {'status': 'success'},
+            Exception("IMAP connection failed"),
+            Reject("Account sync already in progress", requeue=False),
+        ]
+        
+        results = sync_account_step.run([], 1, 1, 7)
+        results = sync_account_step.run(results, 1, 2, 7)
+        results = sync_account_step.run(results, 1, 3, 7)
+        
+        assert [(r['account_id'], r['status']) for r in results] == [
+            (1, 'success'), (2, 'error'), (3, 'skipped')
+        ]
+    
+    def test_done_aggregates_lanes(self):
+        """Test: Chord-Callback fasst alle Lanes zusammen"""
+        result = sync_all_accounts_done.run(
+            [[{'account_id': 1, 'status': 'success'}, {'account_id': 3, 'status': 'error'}],
+             [{'account_id': 2, 'status': 'success'}]],
+            1,
+        )
+        
+        assert result['accounts_synced'] == 2
+        assert result['accounts_failed'] == 1
+        assert result['total_accounts'] == 3
+
+
+class TestProcessingPipeline:
+    """Tests für die Sync-Pipeline nlp → llm → Auto-Rules"""
+    
+    def test_routes_split_queues(self):
+        """Test: IMAP-, NLP- und LLM-Stufen laufen in eigenen Queues"""
+        from src.celery_app import celery_app
+        
+        routes = celery_app.conf.task_routes
+        assert routes["tasks.sync_user_emails"]["queue"] == "imap"
+        assert routes["tasks.finish_sync_pipeline"]["queue"] == "imap"
+        assert routes["tasks.process_emails_nlp"]["queue"] == "nlp"
+        assert routes["tasks.classify_emails_llm"]["queue"] == "llm"
+    
+    @patch('src.tasks.mail_sync_tasks.PIPELINE_BATCH_SIZE', 2)
+    @patch('src.tasks.mail_sync_tasks.celery_app')
+    def test_dispatch_batches_into_chord(self, mock_celery_app):
+        """Test: Eine Chain nlp → llm pro Batch, Callback unter der pipeline_id"""
+        redis_client = mock_celery_app.backend.client
+        redis_client.set.return_value = True
+        with patch('celery.chord') as mock_chord:
+            pipeline_id, queued = _dispatch_processing_pipeline(1, 2, 7, [10, 11, 12])
+        
+        assert queued == 3
+        assert redis_client.set.call_args.args == ("sync_pipeline:user_1:account_2", pipeline_id)
+        assert redis_client.set.call_args.kwargs["nx"] is True
+
+        header = mock_chord.call_args.args[0]
+        batches = [chain.tasks[0].args for chain in header.tasks]
+        assert batches == [
+            ([10, 11], 1, 2, 7, pipeline_id, 0, 3),
+            ([12], 1, 2, 7, pipeline_id, 2, 3),
+        ]
+        assert [chain.tasks[1].task for chain in header.tasks] == ["tasks.classify_emails_llm"] * 2
+        callback = mock_chord.return_value.call_args.args[0]
+        assert callback.task == "tasks.finish_sync_pipeline"
+        assert callback.options["task_id"] == pipeline_id
+    
+    @patch('src.tasks.mail_sync_tasks.celery_app')
+    def test_dispatch_without_ids_runs_finish_directly(self, mock_celery_app):
+        """Test: Keine neuen Mails → nur Auto-Rules-Callback"""
+        mock_celery_app.backend.client.set.return_value = True
+        with patch.object(finish_sync_pipeline, 'apply_async') as mock_apply:
+            pipeline_id, queued = _dispatch_processing_pipeline(1, 2, 7, [])
+        
+        assert queued == 0
+        mock_apply.assert_called_once_with(args=[[], 1, 2, 7], task_id=pipeline_id)
+    
+    @patch('src.tasks.mail_sync_tasks.celery_app')
+    def test_dispatch_skipped_while_previous_pipeline_runs(self, mock_celery_app):
+        """Test: Laufende Pipeline des Accounts → kein zweiter Chord über dieselben IDs"""
+        redis_client = mock_celery_app.backend.client
+        redis_client.set.return_value = False
+        redis_client.get.return_value = b"pipeline-alt"
+        with patch('celery.chord') as mock_chord, \
+                patch.object(finish_sync_pipeline, 'apply_async') as mock_apply:
+            result = _dispatch_processing_pipeline(1, 2, 7, [10, 11])
         
-        # First succeeds, second fails
-        mock_result1 = Mock()
-        mock_result1.get.return_value = {'status': 'success', 'email_count': 10}
+        assert result == ("pipeline-alt", 0)
+        mock_chord.assert_not_called()
+        mock_apply.assert_not_called()
+    
+    @patch('src.tasks.mail_sync_tasks.celery_app')
+    def test_release_lease_only_for_own_pipeline(self, mock_celery_app):
+        """Test: Callback gibt nur die eigene Lease frei"""
+        from src.tasks.mail_sync_tasks import _release_pipeline_lease
+        
+        redis_client = mock_celery_app.backend.client
+        redis_client.get.return_value = b"pipeline-neu"
+        _release_pipeline_lease(1, 2, "pipeline-alt")
+        redis_client.delete.assert_not_called()
+        
+        _release_pipeline_lease(1, 2, "pipeline-neu")
+        redis_client.delete.assert_called_once_with("sync_pipeline:user_1:account_2")
+    
+    @patch('src.tasks.mail_sync_tasks.PIPELINE_LEASE_RENEW_SECONDS', 0)
+    @patch('src.tasks.mail_sync_tasks.celery_app')
+    def test_progress_callback_renews_own_lease(self, mock_celery_app):
+        """Test: Lange Batches verlängern die Lease pro Email (nicht nur beim Stufen-Start)"""
+        from src.tasks.mail_sync_tasks import (
+            PIPELINE_LEASE_SECONDS, _pipeline_progress, _renew_pipeline_lease,
+        )
         
-        mock_result2 = Mock()
-        mock_result2.get.side_effect = Exception("IMAP connection failed")
+        redis_client = mock_celery_app.backend.client
+        redis_client.get.return_value = b"pipeline-neu"
+        progress = _pipeline_progress(
+            None, 0, 10, renew_lease=lambda: _renew_pipeline_lease(1, 2, "pipeline-neu")
+        )
+        progress(1, 10, "Mail 1")
+        progress(2, 10, "Mail 2")
+        
+        assert redis_client.expire.call_count == 2
+        redis_client.expire.assert_called_with("sync_pipeline:user_1:account_2", PIPELINE_LEASE_SECONDS)
+    
+    @patch('src.tasks.mail_sync_tasks._run_pipeline_stage')
+    def test_nlp_stage_passes_ids_on_error(self, mock_stage):
+        """Test: Fehler in der NLP-Stufe brechen die Chain nicht ab"""
+        mock_stage.side_effect = Exception("spaCy kaputt")
         
-        mock_sync_task.apply_async.side_effect = [mock_result1, mock_result2]
+        assert process_emails_nlp.run([10, 11], 1, 2, 7) == [10, 11]
+        assert mock_stage.call_args.kwargs["skip_classification"] is True
+    
+    @patch('src.tasks.mail_sync_tasks._get_dek_from_service_token', return_value=None)
+    @patch('src.tasks.mail_sync_tasks.get_session')
+    def test_finish_sums_batches(self, mock_get_session, mock_dek):
+        """Test: Callback summiert die LLM-Batches"""
+        mock_get_session.return_value = Mock()
         
-        # Execute
-        result = sync_all_accounts(user_id=1, master_key="test_key")
+        with patch.object(finish_sync_pipeline, 'update_state'):
+            result = finish_sync_pipeline.run([{'processed': 2}, {'processed': 1}, None], 1, 2, 7)
         
-        # Assertions: Sollte nicht komplett fehlschlagen
-        assert result['status'] == 'success'
-        assert result['accounts_synced'] == 1  # Nur 1 erfolgreich
-        assert result['total_accounts'] == 2
-        assert result['total_emails'] == 10
+        assert result == {'status': 'success', 'processed': 3, 'rules_triggered': 0}
 
 
 class TestTaskRetryMechanism:
@@ -0,0 +1,184 @@
+"""
+Test inkrementeller State-Sync (mail_sync_v2 Schritt 1)
+
+Prüft gegen einen Fake-IMAP-Server: Voll-Sync beim ersten Lauf, keine
+IMAP-Scans bei unverändertem Ordner, UID-Diff für neue/gelöschte Mails,
+CHANGEDSINCE mit CONDSTORE, Flag-Vergleich ohne CONDSTORE und Voll-Sync
+nach UIDVALIDITY-Wechsel.
+"""
+
+import sys
+import os
+import importlib
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+models = importlib.import_module("src.02_models")
+mail_sync_v2 = importlib.import_module("src.services.mail_sync_v2")
+
+
+class FakeIMAP:
+    """Ein Ordner "INBOX" mit uid → (flags, modseq)"""
+
+    def __init__(self, condstore=True):
+        self.condstore = condstore
+        self.uidvalidity = 1
+        self.modseq = 1
+        self.mails = {}
+        self.calls = []
+
+    def add(self, uid, flags=()):
+        self.modseq += 1
+        self.mails[uid] = (tuple(flags), self.modseq)
+
+    def set_flags(self, uid, flags):
+        self.modseq += 1
+        self.mails[uid] = (tuple(flags), self.modseq)
+
+    def expunge(self, uid):
+        del self.mails[uid]
+
+    def has_capability(self, name):
+        return self.condstore and name == "CONDSTORE"
+
+    def select_folder(self, folder, readonly=False):
+        info = {
+            b"UIDVALIDITY": self.uidvalidity,
+            b"UIDNEXT": max(self.mails, default=0) + 1,
+            b"EXISTS": len(self.mails),
+        }
+        if self.condstore:
+            info[b"HIGHESTMODSEQ"] = self.modseq
+        return info
+
+    def search(self, criteria):
+        self.calls.append(("search",))
+        return sorted(self.mails)
+
+    def fetch(self, messages, data, modifiers=None):
+        self.calls.append(("fetch", tuple(data), tuple(modifiers or ())))
+        if messages == "1:*":
+            uids = sorted(self.mails)
+        else:
+            uids = [uid for uid in messages if uid in self.mails]
+        since = int(modifiers[0].split()[1]) if modifiers else None
+        result = {}
+        for uid in uids:
+            flags, modseq = self.mails[uid]
+            if since is not None and modseq <= since:
+                continue
+            entry = {b"FLAGS": flags}
+            if "ENVELOPE" in data:
+                entry[b"ENVELOPE"] = SimpleNamespace(
+                    message_id=f"<{uid}@test>".encode(), from_=None, subject=f"Mail {uid}".encode(), date=None
+                )
+            result[uid] = entry
+        return result
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(
+        engine, tables=[models.MailServerState.__table__, models.MailFolderSyncState.__table__]
+    )
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _sync(db, imap):
+    imap.calls.clear()
+    service = mail_sync_v2.MailSyncServiceV2(imap, db, user_id=1, account_id=1)
+    stats = service.sync_state_with_server(["INBOX"])
+    assert stats.success, stats.errors
+    return stats
+
+
+def _state(db):
+    return {
+        row.uid: row.flags
+        for row in db.query(models.MailServerState).filter_by(folder="INBOX")
+    }
+
+
+def _envelope_fetches(imap):
+    return [call for call in imap.calls if call[0] == "fetch" and "ENVELOPE" in call[1]]
+
+
+@pytest.fixture
+def imap():
+    server = FakeIMAP()
+    for uid in (1, 2, 3):
+        server.add(uid)
+    return server
+
+
+class TestIncrementalStateSync:
+    """Tests für MailSyncServiceV2._sync_folder_state"""
+
+    def test_first_sync_is_full(self, db, imap):
+        stats = _sync(db, imap)
+
+        assert stats.state_inserted == 3
+        assert _state(db) == {1: "", 2: "", 3: ""}
+        marker = db.query(models.MailFolderSyncState).one()
+        assert (marker.uidvalidity, marker.uidnext, marker.highestmodseq) == (1, 4, imap.modseq)
+        assert marker.last_full_sync_at is not None
+
+    def test_unchanged_folder_needs_no_scan(self, db, imap):
+        _sync(db, imap)
+        stats = _sync(db, imap)
+
+        assert imap.calls == []
+        assert stats.folders_unchanged == 1
+        assert stats.mails_on_server == 3
+
+    def test_new_deleted_and_changed_flags(self, db, imap):
+        _sync(db, imap)
+        imap.add(4, [b"\\Seen"])
+        imap.expunge(2)
+        imap.set_flags(3, [b"\\Seen", b"\\Flagged"])
+
+        stats = _sync(db, imap)
+
+        assert _state(db) == {1: "", 3: "\\Seen \\Flagged", 4: "\\Seen"}
+        assert (stats.state_inserted, stats.state_updated, stats.state_deleted) == (1, 1, 1)
+        envelope_fetches = _envelope_fetches(imap)
+        assert len(envelope_fetches) == 1
+        assert ("fetch", ("FLAGS",), ("CHANGEDSINCE 4",)) in imap.calls
+
+    def test_without_condstore_compares_all_flags(self, db):
+        imap = FakeIMAP(condstore=False)
+        for uid in (1, 2):
+            imap.add(uid)
+        _sync(db, imap)
+        imap.set_flags(2, [b"\\Answered"])
+
+        stats = _sync(db, imap)
+
+        assert _state(db) == {1: "", 2: "\\Answered"}
+        assert stats.state_updated == 1
+        assert _envelope_fetches(imap) == []
+
+    def test_uidvalidity_change_forces_full_sync(self, db, imap):
+        _sync(db, imap)
+        imap.uidvalidity = 2
+
+        stats = _sync(db, imap)
+
+        assert (stats.state_deleted, stats.state_inserted) == (3, 3)
+        assert {row.uidvalidity for row in db.query(models.MailServerState)} == {2}
+
+    def test_incremental_disabled(self, db, imap, monkeypatch):
+        _sync(db, imap)
+        monkeypatch.setattr(mail_sync_v2, "MAIL_SYNC_INCREMENTAL", False)
+
+        stats = _sync(db, imap)
+
+        assert (stats.state_deleted, stats.state_inserted) == (3, 3)
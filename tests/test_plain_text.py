@@ -0,0 +1,109 @@
+"""
+Test persistierter Plain Text (HTML→Text einmal pro Email)
+
+Prüft den gemeinsamen Konverter, lazy Backfill über PlainTextService.ensure,
+Neuberechnung bei anderer Konverter-Version und dass die Vorbereitungs-Stufe
+in process_pending_raw_emails gespeicherten Plain Text ohne Konvertierung nutzt.
+"""
+
+import sys
+import os
+import base64
+import importlib
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import plain_text
+from src.services.plain_text import PlainTextService, PLAIN_TEXT_VERSION
+
+processing = importlib.import_module("src.12_processing")
+encryption = importlib.import_module("src.08_encryption")
+
+MASTER_KEY = base64.b64encode(b"p" * 32).decode()
+HTML = "<html><body><p>Hallo <b>Welt</b></p><p>Zweiter &amp; Absatz</p></body></html>"
+
+
+def _raw_email(body, **kwargs):
+    fields = dict(
+        id=1,
+        encrypted_subject=encryption.EmailDataManager.encrypt_email_subject("Betreff", MASTER_KEY),
+        encrypted_body=encryption.EmailDataManager.encrypt_email_body(body, MASTER_KEY),
+        encrypted_sender=encryption.EmailDataManager.encrypt_email_sender("a@example.com", MASTER_KEY),
+        encrypted_plain_body=None,
+        plain_body_version=None,
+        detected_language="de",
+        embedding_generated_at="2026-01-01",
+        processing_status=0,
+    )
+    fields.update(kwargs)
+    return SimpleNamespace(**fields)
+
+
+def _count_conversions(monkeypatch):
+    calls = []
+    original = plain_text.html_to_plain_text
+
+    def counting(html):
+        calls.append(html)
+        return original(html)
+
+    monkeypatch.setattr(plain_text, "html_to_plain_text", counting)
+    return calls
+
+
+def test_converter_detects_and_converts_html():
+    assert plain_text.is_html(HTML)
+    assert not plain_text.is_html("Nur Text mit a < b")
+    assert plain_text.to_plain_text("Nur Text") == "Nur Text"
+    assert plain_text.to_plain_text(None) is None
+
+    text = plain_text.to_plain_text(HTML)
+    assert "<" not in text
+    assert "Hallo Welt" in text
+    assert "Zweiter & Absatz" in text
+
+
+def test_ensure_converts_once_and_stores_encrypted(monkeypatch):
+    """Test: Lazy Backfill - erste Anfrage konvertiert + speichert, zweite liest nur"""
+    calls = _count_conversions(monkeypatch)
+    raw = _raw_email(HTML)
+
+    first = PlainTextService.ensure(raw, MASTER_KEY)
+    second = PlainTextService.ensure(raw, MASTER_KEY)
+
+    assert first == second
+    assert len(calls) == 1
+    assert raw.plain_body_version == PLAIN_TEXT_VERSION
+    assert "Hallo" not in raw.encrypted_plain_body  # verschlüsselt gespeichert
+
+
+def test_outdated_version_is_regenerated(monkeypatch):
+    """Test: Anderer Konverter-Stand → gespeicherter Text gilt als veraltet"""
+    calls = _count_conversions(monkeypatch)
+    stale = encryption.EmailDataManager.encrypt_email_body("alter Text", MASTER_KEY)
+    raw = _raw_email(HTML, encrypted_plain_body=stale, plain_body_version=PLAIN_TEXT_VERSION - 1)
+
+    assert PlainTextService.load(raw, MASTER_KEY) is None
+    assert "Hallo Welt" in PlainTextService.ensure(raw, MASTER_KEY)
+    assert len(calls) == 1
+    assert raw.plain_body_version == PLAIN_TEXT_VERSION
+
+
+def test_prepare_stage_reuses_stored_plain_text(monkeypatch):
+    """Test: Gespeicherter Plain Text wird entschlüsselt statt neu konvertiert"""
+    calls = _count_conversions(monkeypatch)
+    stored = encryption.EmailDataManager.encrypt_email_body("gespeichert", MASTER_KEY)
+    cached = _raw_email(HTML, encrypted_plain_body=stored, plain_body_version=PLAIN_TEXT_VERSION)
+    fresh = _raw_email(HTML, id=2)
+
+    prepared_cached = processing._prepare_email(processing._email_payload(cached), MASTER_KEY)
+    prepared_fresh = processing._prepare_email(processing._email_payload(fresh), MASTER_KEY)
+
+    assert prepared_cached.plain_body == "gespeichert"
+    assert prepared_cached.encrypted_plain_body is None  # nichts neu zu speichern
+    assert "Hallo Welt" in prepared_fresh.plain_body
+    assert encryption.EmailDataManager.decrypt_email_body(
+        prepared_fresh.encrypted_plain_body, MASTER_KEY
+    ) == prepared_fresh.plain_body
+    assert len(calls) == 1
@@ -0,0 +1,144 @@
+"""
+Test Staged Pipeline in process_pending_raw_emails
+
+Prüft dass die Vorbereitungs-Stufe (Entschlüsselung, HTML→Text, Embedding)
+mit Worker-Threads die gleichen Ergebnisse in gleicher Reihenfolge liefert
+wie der sequentielle Modus, Embeddings pro Batch gesammelt werden und
+Fehler nicht nach außen wirft.
+"""
+
+import sys
+import os
+import time
+import base64
+import importlib
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+processing = importlib.import_module("src.12_processing")
+encryption = importlib.import_module("src.08_encryption")
+semantic_search = importlib.import_module("src.semantic_search")
+
+MASTER_KEY = base64.b64encode(b"k" * 32).decode()
+
+
+def _raw_email(i, html=False, embedded=False):
+    body = f"<html><body><p>Inhalt {i}</p></body></html>" if html else f"Inhalt {i}"
+    return SimpleNamespace(
+        id=i,
+        encrypted_subject=encryption.EmailDataManager.encrypt_email_subject(f"Betreff {i}", MASTER_KEY),
+        encrypted_body=encryption.EmailDataManager.encrypt_email_body(body, MASTER_KEY),
+        encrypted_sender=encryption.EmailDataManager.encrypt_email_sender(f"s{i}@example.com", MASTER_KEY),
+        detected_language="de",
+        embedding_generated_at="2026-01-01" if embedded else None,
+        processing_status=0,
+        encrypted_plain_body=None,
+        plain_body_version=None,
+    )
+
+
+def _fake_embedding(monkeypatch, delay=0.0):
+    """Fake für Einzel- und Batch-Embedding; calls enthält die Batch-Größen"""
+    calls = []
+
+    def fake(subject, body, ai_client, model_name=None, **kwargs):
+        calls.append(1)
+        time.sleep(delay)
+        return subject.encode(), model_name, None
+
+    def fake_batch(emails, ai_client, model_name=None, **kwargs):
+        calls.append(len(emails))
+        time.sleep(delay)
+        return [(subject.encode(), model_name, None) for subject, _ in emails]
+
+    monkeypatch.setattr(semantic_search, "generate_embedding_for_email", fake)
+    monkeypatch.setattr(semantic_search, "generate_embeddings_for_emails", fake_batch)
+    return calls
+
+
+class TestPreparePipeline:
+    """Tests für _iter_prepared_emails / _prepare_email"""
+
+    def test_concurrent_matches_sequential(self, monkeypatch):
+        _fake_embedding(monkeypatch, delay=0.01)
+        emails = [_raw_email(i, html=i % 2 == 0, embedded=i % 3 == 0) for i in range(1, 13)]
+
+        sequential = list(processing._iter_prepared_emails(emails, 0, MASTER_KEY, None, "m"))
+        concurrent = list(processing._iter_prepared_emails(emails, 4, MASTER_KEY, None, "m", batch_size=3))
+
+        assert [p.raw_email_id for p in concurrent] == [e.id for e in emails]
+        for a, b in zip(sequential, concurrent):
+            assert (a.subject, a.plain_body, a.sender, a.embedding) == (b.subject, b.plain_body, b.sender, b.embedding)
+            assert a.embedding_attempted == b.embedding_attempted
+        assert "<html" not in concurrent[1].plain_body
+        assert concurrent[2].embedding_attempted is False  # id 3 hat bereits Embedding
+        assert concurrent[0].embedding[0] == b"Betreff 1"
+
+    def test_embeddings_are_batched(self, monkeypatch):
+        calls = _fake_embedding(monkeypatch)
+        emails = [_raw_email(i, embedded=i == 2) for i in range(1, 10)]
+
+        prepared = list(processing._iter_prepared_emails(emails, 0, MASTER_KEY, None, "m", batch_size=4))
+
+        # Batches [1-4] (ohne id 2), [5-8], [9] → 3 Requests statt 8
+        assert calls == [3, 4, 1]
+        assert [p.embedding_attempted for p in prepared] == [i != 2 for i in range(1, 10)]
+        assert "embedding_batch" in prepared[0].timings
+
+    def test_stage_overlaps_io(self, monkeypatch):
+        _fake_embedding(monkeypatch, delay=0.05)
+        emails = [_raw_email(i) for i in range(1, 9)]
+
+        started = time.perf_counter()
+        list(processing._iter_prepared_emails(emails, 4, MASTER_KEY, None, "m", batch_size=1))
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 8 * 0.05
+
+    def test_errors_are_captured(self, monkeypatch):
+        def failing(*args, **kwargs):
+            raise RuntimeError("Ollama down")
+
+        monkeypatch.setattr(semantic_search, "generate_embedding_for_email", failing)
+        monkeypatch.setattr(semantic_search, "generate_embeddings_for_emails", failing)
+        broken = _raw_email(1)
+        broken.encrypted_subject = "kein-ciphertext"
+        emails = [broken, _raw_email(2), _raw_email(3)]
+
+        prepared = list(processing._iter_prepared_emails(emails, 2, MASTER_KEY, None, "m", batch_size=3))
+
+        assert prepared[0].decrypt_error is not None
+        assert prepared[0].embedding_attempted is False
+        assert isinstance(prepared[1].embedding_error, RuntimeError)
+        assert isinstance(prepared[2].embedding_error, RuntimeError)
+
+    def test_plain_text_error_fails_only_that_email(self, monkeypatch):
+        _fake_embedding(monkeypatch)
+        emails = [_raw_email(i) for i in range(1, 4)]
+        encrypt = encryption.EmailDataManager.encrypt_email_body
+
+        def flaky_encrypt(text, master_key):
+            if "Inhalt 2" in text:
+                raise ValueError("Plain-Text-Backfill kaputt")
+            return encrypt(text, master_key)
+
+        monkeypatch.setattr(encryption.EmailDataManager, "encrypt_email_body", staticmethod(flaky_encrypt))
+
+        prepared = list(processing._iter_prepared_emails(emails, 2, MASTER_KEY, None, "m", batch_size=3))
+
+        assert [p.raw_email_id for p in prepared] == [1, 2, 3]
+        assert isinstance(prepared[1].plain_text_error, ValueError)
+        assert prepared[1].embedding_attempted is False
+        assert prepared[0].plain_text_error is None and prepared[2].embedding is not None
+
+    def test_stats_summary(self):
+        stats = processing.PipelineStats()
+        stats.merge({"decrypt": 0.5, "embedding": 1.0})
+        stats.add("embedding", 1.0)
+
+        summary = stats.summary()
+
+        assert summary["embedding"] == {"count": 2, "seconds": 2.0, "per_second": 1.0}
+        assert summary["decrypt"]["count"] == 1
+        assert "wall" in summary
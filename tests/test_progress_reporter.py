@@ -0,0 +1,98 @@
+"""
+Test gedrosselte Progress-Updates (ProgressReporter)
+
+Prüft Zeit-/Anzahl-Drossel, force/Abschluss, flush des letzten Snapshots,
+Durchsatz/ETA in der meta und Updates unter fremder Task-ID (pipeline_id).
+"""
+
+import sys
+import os
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.tasks.progress_reporter import ProgressReporter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _reporter(**kwargs):
+    task = Mock()
+    task.request.id = "task-1"
+    clock = FakeClock()
+    return ProgressReporter(task, clock=clock, **kwargs), task, clock
+
+
+def test_updates_are_coalesced_by_time():
+    """Test: 100 Updates in 1s → max. 2/s Writes, erster sofort"""
+    reporter, task, clock = _reporter(min_interval=0.5)
+
+    for idx in range(1, 101):
+        clock.now = idx * 0.01
+        reporter.update(current=idx, total=1000, current_email_index=idx)
+
+    assert task.update_state.call_count == 2
+    last_meta = task.update_state.call_args.kwargs["meta"]
+    assert last_meta["current_email_index"] == 51
+
+
+def test_min_items_gate():
+    """Test: Zähler muss um min_items weiterlaufen, auch wenn Zeit abgelaufen"""
+    reporter, task, clock = _reporter(min_interval=0.0, min_items=10)
+
+    for idx in range(1, 26):
+        clock.now = float(idx)
+        reporter.update(current=idx, total=100)
+
+    written = [c.kwargs["meta"] for c in task.update_state.call_args_list]
+    assert len(written) == 3  # 1, 11, 21
+
+
+def test_force_finished_and_flush():
+    """Test: force und current >= total gehen sofort raus, flush sendet Rest"""
+    reporter, task, clock = _reporter(min_interval=10.0)
+
+    assert reporter.update(phase="fetch_mails", message="Lade...", force=True)
+    assert reporter.update(phase="sync_raw", message="Sync...", force=True)
+    assert not reporter.update(current=1, total=3, current_email_index=1)
+    assert reporter.flush()
+    assert task.update_state.call_args.kwargs["meta"]["current_email_index"] == 1
+    assert not reporter.flush()  # nichts mehr offen
+    assert reporter.update(current=3, total=3, current_email_index=3)
+    assert reporter.writes == 4
+
+
+def test_eta_and_throughput():
+    """Test: items_per_sec/eta_seconds aus dem Messfenster, keine ETA bei Phasen-Meldung"""
+    reporter, task, clock = _reporter(min_interval=0.0)
+
+    reporter.update(current=0, total=100)
+    clock.now = 10.0
+    reporter.update(current=20, total=100)
+    meta = task.update_state.call_args.kwargs["meta"]
+    assert meta["items_per_sec"] == 2.0
+    assert meta["eta_seconds"] == 40
+    assert meta["elapsed_seconds"] == 10
+
+    clock.now = 11.0
+    reporter.update(phase="sync_raw", message="Synchronisiere Mails...")
+    assert "eta_seconds" not in task.update_state.call_args.kwargs["meta"]
+
+
+def test_foreign_task_id_and_no_worker():
+    """Test: Updates unter pipeline_id; ohne Task-ID kein Backend-Write"""
+    reporter, task, clock = _reporter(task_id="pipeline-9")
+    reporter.update(current=1, total=2)
+    assert task.update_state.call_args.kwargs["task_id"] == "pipeline-9"
+
+    task = Mock()
+    task.request.id = None
+    reporter = ProgressReporter(task)
+    reporter.update(current=1, total=2, force=True)
+    task.update_state.assert_not_called()
@@ -0,0 +1,215 @@
+"""
+Test Blind-Index Suche (email_search_tokens)
+
+Prüft Normalisierung, Präfix-/Wort-Tokens, Key-Trennung zwischen Usern,
+die AND-Semantik der SQL-Abfrage und den Entschlüsselungs-Fallback für noch
+nicht indexierte Emails (SQLite).
+"""
+
+import sys
+import os
+import base64
+import importlib
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import JSON, create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+models = importlib.import_module("src.02_models")
+search_index = importlib.import_module("src.services.search_index")
+encryption = importlib.import_module("src.08_encryption")
+
+KEY_A = base64.b64encode(b"a" * 32).decode()
+KEY_B = base64.b64encode(b"b" * 32).decode()
+
+
+class TestTokens:
+    """Tests für normalize_words / text_tokens / query_tokens"""
+
+    def test_normalize_words(self):
+        assert search_index.normalize_words("Max.Mustermann@Firma.DE") == ["max", "mustermann", "firma", "de"]
+        assert search_index.normalize_words("STRASSE Straße") == ["strasse", "strasse"]
+        assert search_index.normalize_words(None) == []
+
+    def test_prefix_and_word_tokens(self):
+        key = search_index.derive_search_key(KEY_A)
+        tokens = search_index.text_tokens(key, "Rechnung März", "billing@shop.de")
+
+        for query in ("rech", "Rechnung", "märz", "billing", "shop", "de"):
+            assert set(search_index.query_tokens(key, query)) <= tokens, query
+        assert not set(search_index.query_tokens(key, "chnung")) <= tokens
+
+    def test_long_words_match_only_whole(self, monkeypatch):
+        monkeypatch.setattr(search_index, "SEARCH_INDEX_MAX_PREFIX", 5)
+        key = search_index.derive_search_key(KEY_A)
+        tokens = search_index.text_tokens(key, "Bestellbestätigung")
+
+        assert set(search_index.query_tokens(key, "bestellbestätigung")) <= tokens
+        assert set(search_index.query_tokens(key, "beste")) <= tokens
+        assert not set(search_index.query_tokens(key, "bestellb")) <= tokens
+
+    def test_keys_are_user_specific(self):
+        key_a = search_index.derive_search_key(KEY_A)
+        key_b = search_index.derive_search_key(KEY_B)
+
+        assert search_index.query_tokens(key_a, "rechnung") != search_index.query_tokens(key_b, "rechnung")
+        assert key_a != base64.b64decode(KEY_A)  # nicht der Verschlüsselungs-Key selbst
+
+    def test_text_matches_same_semantics_as_tokens(self):
+        key = search_index.derive_search_key(KEY_A)
+        subject, sender = "Rechnung März", "billing@shop.de"
+        tokens = search_index.text_tokens(key, subject, sender)
+
+        for query in ("rech", "rech shop", "MÄRZ de", "chnung", "rechnung mai", "x"):
+            expected = set(search_index.query_tokens(key, query)) <= tokens
+            assert search_index.text_matches(query, subject, sender) == expected, query
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine, tables=[models.EmailSearchToken.__table__])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _index(db, email_id, subject, sender, master_key=KEY_A, user_id=1):
+    raw_email = SimpleNamespace(id=email_id, user_id=user_id, search_indexed_at=None)
+    search_index.SearchIndexService.index_email(db, raw_email, subject, sender, master_key)
+    return raw_email
+
+
+def _search(db, query, master_key=KEY_A, user_id=1):
+    ids = search_index.SearchIndexService.matching_email_ids(
+        db, user_id, query, master_key, include_unindexed=False
+    )
+    return sorted(row[0] for row in db.execute(ids))
+
+
+class TestMatchingEmailIds:
+    """Tests für SearchIndexService.index_email / matching_email_ids"""
+
+    def test_all_words_must_match(self, db):
+        raw_email = _index(db, 1, "Rechnung März", "billing@shop.de")
+        _index(db, 2, "Rechnung April", "info@verein.org")
+        _index(db, 3, "Newsletter", "news@shop.de")
+
+        assert raw_email.search_indexed_at is not None
+        assert _search(db, "rechnung") == [1, 2]
+        assert _search(db, "rech shop") == [1]
+        assert _search(db, "SHOP") == [1, 3]
+        assert _search(db, "rechnung mai") == []
+        assert search_index.SearchIndexService.matching_email_ids(db, 1, " ... ", KEY_A) is None
+
+    def test_other_user_key_finds_nothing(self, db):
+        _index(db, 1, "Rechnung", "a@b.de")
+        _index(db, 2, "Rechnung", "a@b.de", master_key=KEY_B, user_id=2)
+
+        assert _search(db, "rechnung") == [1]
+        assert _search(db, "rechnung", master_key=KEY_B) == []
+        assert _search(db, "rechnung", master_key=KEY_B, user_id=2) == [2]
+
+    def test_reindex_replaces_tokens(self, db):
+        _index(db, 1, "Alt", "x@y.de")
+        _index(db, 1, "Neu", "x@y.de")
+
+        assert _search(db, "alt") == []
+        assert _search(db, "neu") == [1]
+
+    def test_index_new_emails_bulk(self, db):
+        key = search_index.derive_search_key(KEY_A)
+        written = search_index.SearchIndexService.index_new_emails(db, [
+            (1, 1, "Rechnung März", "billing@shop.de"),
+            (2, 1, "Newsletter", "news@shop.de"),
+            (3, 1, None, None),
+        ], key)
+
+        assert written == db.query(models.EmailSearchToken).count()
+        assert _search(db, "rech shop") == [1]
+        assert _search(db, "shop") == [1, 2]
+
+
+@pytest.fixture
+def mail_db():
+    engine = create_engine("sqlite://")
+    # raw_emails.processing_warnings ist JSONB (PostgreSQL) → für SQLite kurz als JSON anlegen
+    warnings_column = models.RawEmail.__table__.c.processing_warnings
+    jsonb, warnings_column.type = warnings_column.type, JSON()
+    try:
+        models.Base.metadata.create_all(engine, tables=[
+            models.RawEmail.__table__,
+            models.EmailSearchToken.__table__,
+        ])
+    finally:
+        warnings_column.type = jsonb
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _stored_email(db, uid, subject, sender):
+    encryptor = encryption.BatchEncryptor(KEY_A)
+    raw_email = models.RawEmail(
+        user_id=1, mail_account_id=1, imap_uid=uid, imap_folder="INBOX", imap_uidvalidity=1,
+        encrypted_subject=encryptor.encrypt(subject), encrypted_sender=encryptor.encrypt(sender),
+        received_at=datetime(2026, 1, uid),
+    )
+    db.add(raw_email)
+    db.flush()
+    return raw_email
+
+
+class TestUnindexedEmails:
+    """Bestand ohne Tokens: Fallback bei der Suche, Backfill im Task"""
+
+    def test_search_includes_unindexed_without_writing(self, mail_db):
+        indexed = _stored_email(mail_db, 1, "Rechnung März", "billing@shop.de")
+        search_index.SearchIndexService.index_email(mail_db, indexed, "Rechnung März", "billing@shop.de", KEY_A)
+        old = _stored_email(mail_db, 2, "Alte Rechnung", "info@verein.org")
+        _stored_email(mail_db, 3, "Newsletter", "news@shop.de")
+        mail_db.commit()
+
+        assert search_index.SearchIndexService.has_unindexed(mail_db, 1)
+        assert _search(mail_db, "rechnung") == [1]  # nur Index
+        ids = search_index.SearchIndexService.matching_email_ids(mail_db, 1, "rechnung", KEY_A)
+        assert sorted(row[0] for row in mail_db.execute(ids)) == [1, old.id]
+        assert old.search_indexed_at is None  # Suche schreibt nichts
+        assert not mail_db.new and not mail_db.dirty
+
+    def test_backfill_completes_index(self, mail_db):
+        for uid in range(1, 6):
+            _stored_email(mail_db, uid, f"Rechnung {uid}", "billing@shop.de")
+        mail_db.commit()
+        batches = []
+
+        indexed = search_index.SearchIndexService.backfill(
+            mail_db, 1, KEY_A, batch_size=2, on_batch=batches.append
+        )
+
+        assert indexed == 5
+        assert batches == [2, 4, 5]
+        assert not search_index.SearchIndexService.has_unindexed(mail_db, 1)
+        assert len(_search(mail_db, "rech shop")) == 5
+
+    def test_fetched_mail_is_indexed_at_insert(self, mail_db):
+        mail_sync_v2 = importlib.import_module("src.services.mail_sync_v2")
+        encryptor = encryption.BatchEncryptor(KEY_A)
+        service = mail_sync_v2.MailSyncServiceV2(None, mail_db, user_id=1, account_id=1)
+
+        raw_id = service.insert_fetched_mail(
+            "INBOX", 7, 1, "<m7@shop.de>", "hash7",
+            encrypted_sender=encryptor.encrypt("billing@shop.de"),
+            encrypted_subject=encryptor.encrypt("Rechnung Juni"),
+            received_at=datetime(2026, 6, 1),
+            subject="Rechnung Juni", sender="billing@shop.de",
+            search_key=search_index.derive_search_key(KEY_A),
+        )
+        mail_db.commit()
+
+        assert _search(mail_db, "rech shop") == [raw_id]
+        assert not search_index.SearchIndexService.has_unindexed(mail_db, 1)
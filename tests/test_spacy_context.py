@@ -0,0 +1,183 @@
+"""
+Test geteilter spaCy-Kontext (ein Parse pro Text und Email)
+
+Prüft den Doc-Cache im doc_scope, gebündeltes Parsen per nlp.pipe, die
+(vorgefüllten) Email-Scopes der Verarbeitungsschleife und dass sich die
+NLP-Detektoren der HybridPipeline ein Doc teilen. spaCy selbst wird durch
+ein Fake-Modell ersetzt (kein Modell-Download nötig).
+"""
+
+import sys
+import os
+import importlib
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import spacy_context
+from src.services.spacy_detectors import NegationDetector, QuestionDetector
+from src.services.hybrid_pipeline import HybridPipeline
+
+processing = importlib.import_module("src.12_processing")
+
+
+class FakeNlp:
+    """Zählt Einzel-Parses und pipe()-Aufrufe, Doc = Liste von Tokens"""
+
+    def __init__(self):
+        self.calls = []
+        self.pipe_calls = []
+
+    def _doc(self, text):
+        return [SimpleNamespace(text=word, lemma_=word, dep_="") for word in text.split()]
+
+    def __call__(self, text):
+        self.calls.append(text)
+        return self._doc(text)
+
+    def pipe(self, texts, n_process=1, batch_size=32):
+        texts = list(texts)
+        self.pipe_calls.append((texts, n_process, batch_size))
+        return (self._doc(text) for text in texts)
+
+
+def test_parse_without_scope_parses_every_time():
+    nlp = FakeNlp()
+
+    spacy_context.parse("Hallo Welt", nlp)
+    spacy_context.parse("Hallo Welt", nlp)
+
+    assert len(nlp.calls) == 2
+
+
+def test_scope_reuses_doc_and_nested_scope_shares():
+    nlp = FakeNlp()
+
+    with spacy_context.doc_scope() as scope:
+        first = spacy_context.parse("Hallo Welt", nlp)
+        with spacy_context.doc_scope() as inner:
+            second = spacy_context.parse("Hallo Welt", nlp)
+        spacy_context.parse("Anderer Text", nlp)
+
+    assert inner is scope
+    assert first is second
+    assert nlp.calls == ["Hallo Welt", "Anderer Text"]
+    assert (scope.parsed, scope.reused) == (2, 1)
+
+    spacy_context.parse("Hallo Welt", nlp)  # Scope geschlossen → neu parsen
+    assert len(nlp.calls) == 3
+
+
+def test_parse_many_pipes_missing_texts_once():
+    """Test: nlp.pipe nur für noch nicht geparste, deduplizierte Texte"""
+    nlp = FakeNlp()
+
+    with spacy_context.doc_scope():
+        spacy_context.parse("a b", nlp)
+        docs = spacy_context.parse_many(["a b", "c d", "c d", "e"], nlp, n_process=2, batch_size=8)
+        again = spacy_context.parse("e", nlp)
+
+    assert nlp.pipe_calls == [(["c d", "e"], 2, 8)]
+    assert [len(doc) for doc in docs] == [2, 2, 2, 1]
+    assert docs[1] is docs[2]
+    assert again is docs[3]
+    assert nlp.calls == ["a b"]
+
+
+def test_email_scope_starts_with_preparsed_docs():
+    nlp = FakeNlp()
+    docs = spacy_context.parse_many(["Mail eins", "Mail zwei"], nlp)
+
+    token = spacy_context.enter_email_scope({"Mail zwei": docs[1]}, nlp)
+    try:
+        assert spacy_context.parse("Mail zwei", nlp) is docs[1]
+    finally:
+        spacy_context.exit_scope(token)
+
+    assert nlp.calls == []
+    assert len(nlp.pipe_calls) == 1
+
+
+def test_email_scope_is_fresh_per_email_and_restores_outer():
+    nlp = FakeNlp()
+
+    with spacy_context.doc_scope() as outer:
+        for _ in range(2):
+            token = spacy_context.enter_email_scope()
+            try:
+                spacy_context.parse("Mail eins", nlp)
+                spacy_context.parse("Mail eins", nlp)
+            finally:
+                spacy_context.exit_scope(token)
+        spacy_context.parse("Außen", nlp)
+
+    assert nlp.calls == ["Mail eins", "Mail eins", "Außen"]
+    assert outer.docs.keys() == {(id(nlp), "Außen")}
+
+
+def test_email_scope_closed_on_error():
+    nlp = FakeNlp()
+
+    try:
+        token = spacy_context.enter_email_scope()
+        try:
+            spacy_context.parse("Mail", nlp)
+            raise RuntimeError("kaputt")
+        finally:
+            spacy_context.exit_scope(token)
+    except RuntimeError:
+        pass
+
+    spacy_context.parse("Mail", nlp)  # kein Scope mehr aktiv → neu parsen
+    assert len(nlp.calls) == 2
+
+
+def test_detectors_share_one_parse():
+    """Test: Frage- und Negations-Detektor parsen denselben Text nur einmal"""
+    nlp = FakeNlp()
+    text = "Können Sie das nicht bis morgen prüfen ?"
+
+    with spacy_context.doc_scope():
+        questions = QuestionDetector(nlp).analyze(text)
+        negations = NegationDetector(nlp).analyze(text)
+
+    assert len(nlp.calls) == 1
+    assert questions["question_count"] == 1
+    assert negations["negation_count"] == 1
+
+
+def test_processing_preparses_booster_emails_per_batch(monkeypatch):
+    """Test: process_pending_raw_emails parst die Booster-Texte eines Batches per nlp.pipe"""
+    nlp = FakeNlp()
+    monkeypatch.setattr(spacy_context, "get_nlp", lambda: nlp)
+    monkeypatch.setattr(spacy_context, "SPACY_PIPE_BATCH_SIZE", 2)
+    modes = {1: "spacy_booster", 2: "llm_original"}
+    session = SimpleNamespace(get=lambda model, account_id: SimpleNamespace(effective_ai_mode=modes[account_id]))
+
+    def email(email_id, account_id, classified=None, decrypt_error=None):
+        raw_email = SimpleNamespace(id=email_id, mail_account_id=account_id, ai_classification_completed_at=classified)
+        prepared = processing.PreparedEmail(raw_email_id=email_id)
+        prepared.subject, prepared.plain_body = f"Betreff {email_id}", "Bitte bis morgen prüfen"
+        prepared.decrypt_error = decrypt_error
+        return raw_email, prepared
+
+    pairs = [email(1, 1), email(2, 2), email(3, 1), email(4, 1, classified="2026-01-01"), email(5, 1, decrypt_error="x")]
+    result = list(processing._with_preparsed_docs(session, pairs, enabled=True))
+
+    assert [raw_email.id for raw_email, _, _ in result] == [1, 2, 3, 4, 5]
+    assert [bool(docs) for _, _, docs in result] == [True, False, True, False, False]
+    assert [calls[0] for calls in nlp.pipe_calls] == [
+        [HybridPipeline.detector_text("Betreff 1", "Bitte bis morgen prüfen")],
+        [HybridPipeline.detector_text("Betreff 3", "Bitte bis morgen prüfen")],
+    ]
+
+    # Detektoren im Email-Scope treffen den vorab geparsten Doc
+    _, prepared, docs = result[0]
+    token = spacy_context.enter_email_scope(docs)
+    try:
+        QuestionDetector(nlp).analyze(HybridPipeline._analysis_text(prepared.subject, prepared.plain_body))
+    finally:
+        spacy_context.exit_scope(token)
+    assert nlp.calls == []
+
+    assert all(docs == {} for _, _, docs in processing._with_preparsed_docs(session, pairs, enabled=False))
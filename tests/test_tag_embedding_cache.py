@@ -0,0 +1,239 @@
+"""
+Test TagEmbeddingCache (begrenzter, model-aware LRU/TTL Cache)
+
+Prüft Budget-Eviction, TTL, Hit/Miss-Zähler, Invalidierung und den
+optionalen prozessübergreifenden Shared-Cache.
+"""
+
+import sys
+import os
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services import tag_manager
+from src.services.tag_manager import TagEmbeddingCache, _CountingTTLCache
+
+
+class _FakeClient:
+    """Embedding-Client der nur Aufrufe zählt"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def _get_embedding(self, text):
+        self.calls += 1
+        return [float(len(text)), 1.0, 0.0, 0.0]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def _tag(tag_id, user_id=1, learned=None, description=None):
+    return SimpleNamespace(
+        id=tag_id, user_id=user_id, name=f"Tag{tag_id}", description=description,
+        learned_embedding=learned.tobytes() if learned is not None else None,
+        embedding_updated_at=None, negative_updated_at=None,
+    )
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Frische Caches + Fake-Client/Model pro Test"""
+    client = _FakeClient()
+    monkeypatch.setattr(TagEmbeddingCache, "_cache", _CountingTTLCache(
+        maxsize=4 * 4 * 3, ttl=60, getsizeof=lambda emb: emb.nbytes))
+    monkeypatch.setattr(TagEmbeddingCache, "_current_model", _CountingTTLCache(maxsize=10, ttl=60))
+    monkeypatch.setattr(TagEmbeddingCache, "_matrix_cache", _CountingTTLCache(maxsize=1024, ttl=60))
+    monkeypatch.setattr(TagEmbeddingCache, "_stats", dict.fromkeys(TagEmbeddingCache._stats, 0))
+
+    def fake_client(cls, user_id, db=None):
+        cls._current_model[user_id] = "model-a"
+        return client
+
+    monkeypatch.setattr(TagEmbeddingCache, "_get_ai_client_for_user", classmethod(fake_client))
+    return client
+
+
+class TestCountingTTLCache:
+    """Tests für _CountingTTLCache"""
+
+    def test_budget_eviction_is_lru(self):
+        cache = _CountingTTLCache(maxsize=32, ttl=60, getsizeof=lambda emb: emb.nbytes)
+        for i in range(3):
+            cache[i] = np.zeros(4, dtype=np.float32)  # 16 Bytes
+            cache.get(0)  # 0 bleibt "recently used"
+
+        assert set(cache.keys()) == {0, 2}
+        assert cache.evictions == 1
+
+    def test_ttl_expiry_counts_as_eviction(self):
+        now = [0.0]
+        cache = _CountingTTLCache(maxsize=10, ttl=5, timer=lambda: now[0])
+        cache["a"] = 1
+        now[0] = 10.0
+
+        assert cache.get("a") is None
+        cache.expire()
+        assert cache.evictions == 1
+
+
+class TestTagEmbeddingCache:
+    """Tests für TagEmbeddingCache"""
+
+    def test_hits_and_misses(self, cache):
+        tag = _tag(1, description="Rechnungen")
+
+        first = TagEmbeddingCache.get_tag_embedding(tag, db=None)
+        second = TagEmbeddingCache.get_tag_embedding(tag, db=None)
+
+        assert cache.calls == 1
+        assert np.allclose(first, second)
+        stats = TagEmbeddingCache.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["embeddings_bytes"] == first.nbytes
+
+    def test_budget_evicts_old_tags(self, cache):
+        for tag_id in range(1, 6):
+            TagEmbeddingCache.get_tag_embedding(_tag(tag_id, description="x"), db=None)
+
+        assert len(TagEmbeddingCache._cache) == 3
+        assert TagEmbeddingCache.get_stats()["embeddings_evictions"] == 2
+
+    def test_model_is_part_of_key(self, cache):
+        tag = _tag(1, learned=np.ones(4, dtype=np.float32))
+        TagEmbeddingCache.get_tag_embedding(tag, db=None)
+
+        assert (1, 1, "model-a", None, None) in TagEmbeddingCache._cache
+        assert (1, 1, "model-b", None, None) not in TagEmbeddingCache._cache
+
+    def test_learned_embedding_update_is_part_of_key(self, cache):
+        """Test: In anderem Prozess neu gelerntes Embedding → kein veralteter Cache-Treffer"""
+        tag = _tag(1, learned=np.array([1, 0, 0, 0], dtype=np.float32))
+        TagEmbeddingCache.get_tag_embedding(tag, db=None)
+
+        tag.learned_embedding = np.array([0, 1, 0, 0], dtype=np.float32).tobytes()
+        tag.embedding_updated_at = datetime(2026, 2, 1)
+
+        assert np.allclose(TagEmbeddingCache.get_tag_embedding(tag, db=None), [0, 1, 0, 0])
+
+    def test_invalidate_tag_and_user(self, cache):
+        for tag_id in (1, 2):
+            TagEmbeddingCache.get_tag_embedding(_tag(tag_id, description="x"), db=None)
+        TagEmbeddingCache.get_tag_embedding(_tag(3, user_id=2, description="x"), db=None)
+
+        TagEmbeddingCache.invalidate_tag_cache(1, 1)
+        assert {k[:2] for k in TagEmbeddingCache._cache.keys()} == {(1, 2), (2, 3)}
+
+        TagEmbeddingCache.invalidate_user_cache(1)
+        assert {k[:2] for k in TagEmbeddingCache._cache.keys()} == {(2, 3)}
+
+    def test_shared_cache_across_processes(self, cache, monkeypatch):
+        redis = _FakeRedis()
+        monkeypatch.setattr(tag_manager, "TAG_SHARED_CACHE_ENABLED", True)
+        monkeypatch.setattr(TagEmbeddingCache, "_shared_client", redis)
+        tag = _tag(7, description="Newsletter")
+
+        TagEmbeddingCache.get_tag_embedding(tag, db=None)
+        TagEmbeddingCache.clear_all()  # "anderer Prozess": leerer lokaler Cache
+        TagEmbeddingCache.get_tag_embedding(tag, db=None)
+
+        assert cache.calls == 1
+        assert TagEmbeddingCache.get_stats()["shared_hits"] == 1
+
+        # Geänderte Beschreibung → neuer Key, kein veraltetes Embedding
+        TagEmbeddingCache.clear_all()
+        TagEmbeddingCache.get_tag_embedding(_tag(7, description="Werbung"), db=None)
+        assert cache.calls == 2
+
+
+class TestTagFingerprint:
+    """Fingerprint der Tag-Matrix (SQLite)"""
+
+    @pytest.fixture
+    def db(self):
+        import importlib
+        from sqlalchemy import JSON, create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        models = importlib.import_module("src.02_models")
+        engine = create_engine("sqlite://")
+        # raw_emails.processing_warnings ist JSONB (PostgreSQL) → für SQLite kurz als JSON anlegen
+        warnings_column = models.RawEmail.__table__.c.processing_warnings
+        jsonb, warnings_column.type = warnings_column.type, JSON()
+        try:
+            models.Base.metadata.create_all(engine, tables=[
+                models.User.__table__,
+                models.EmailTag.__table__,
+                models.RawEmail.__table__,
+            ])
+        finally:
+            warnings_column.type = jsonb
+        session = sessionmaker(bind=engine)()
+        session.add(models.User(id=1, username="u", email="u@example.com", password_hash="x",
+                                preferred_embedding_model="model-a"))
+        session.add(models.EmailTag(id=1, user_id=1, name="Rechnung"))
+        session.add(models.RawEmail(
+            id=1, user_id=1, mail_account_id=1, encrypted_sender="x", received_at=datetime(2026, 1, 1),
+            imap_uid=1, imap_folder="INBOX", imap_uidvalidity=1,
+            email_embedding=b"\0" * 16, embedding_model="model-a",
+        ))
+        session.commit()
+        yield session, models
+        session.close()
+
+    def test_model_switch_changes_fingerprint(self, db):
+        """Test: Model-Wechsel (Settings oder neue Email-Embeddings) → Matrix wird neu gebaut"""
+        session, models = db
+        base = TagEmbeddingCache._tag_fingerprint(1, session)
+        assert TagEmbeddingCache._tag_fingerprint(1, session) == base
+
+        session.query(models.User).update({"preferred_embedding_model": "model-b"})
+        after_settings = TagEmbeddingCache._tag_fingerprint(1, session)
+        assert after_settings != base
+
+        session.query(models.RawEmail).update({"embedding_model": "model-b"})
+        assert TagEmbeddingCache._tag_fingerprint(1, session) != after_settings
+
+    def test_name_or_description_change_changes_fingerprint(self, db):
+        """Test: EmailTag hat kein updated_at - Umbenennen/Beschreibung ändert trotzdem den Fingerprint"""
+        session, models = db
+        base = TagEmbeddingCache._tag_fingerprint(1, session)
+
+        session.query(models.EmailTag).update({"name": "Rechnungen"})
+        renamed = TagEmbeddingCache._tag_fingerprint(1, session)
+        assert renamed != base
+
+        session.query(models.EmailTag).update({"description": "Rechnungen und Mahnungen"})
+        assert TagEmbeddingCache._tag_fingerprint(1, session) != renamed
+
+    def test_retrained_tag_updates_matrix(self, db, cache):
+        """Test: Neu gelerntes Embedding (updated_at) landet in der neu gebauten Matrix"""
+        session, models = db
+        session.query(models.EmailTag).update({
+            "learned_embedding": np.array([1, 0, 0, 0], dtype=np.float32).tobytes(),
+            "embedding_updated_at": datetime(2026, 1, 1),
+        })
+        session.commit()
+        assert np.allclose(TagEmbeddingCache.get_tag_matrix(1, session).positive, [[1, 0, 0, 0]])
+
+        # "Anderer Prozess" trainiert den Tag neu
+        session.query(models.EmailTag).update({
+            "learned_embedding": np.array([0, 1, 0, 0], dtype=np.float32).tobytes(),
+            "embedding_updated_at": datetime(2026, 2, 1),
+        })
+        session.commit()
+
+        assert np.allclose(TagEmbeddingCache.get_tag_matrix(1, session).positive, [[0, 1, 0, 0]])
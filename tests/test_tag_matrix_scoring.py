@@ -0,0 +1,158 @@
+"""
+Test TagMatrix (vektorisiertes Tag-Scoring, Phase F.2/F.3)
+
+Prüft dass die Matrix-Bewertung identisch zur bisherigen Einzel-Schleife
+ist (compute_similarity + get_negative_similarity + calculate_negative_penalty).
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.tag_manager import (
+    TagMatrix,
+    TagEmbeddingCache,
+    calculate_negative_penalty,
+    calculate_negative_penalties,
+    get_negative_similarity,
+)
+
+
+def _tags(n=12, dim=16, seed=0):
+    """Tags mit gemischten Quellen und teilweise Negative-Feedback"""
+    rng = np.random.default_rng(seed)
+    tags, embeddings = [], []
+    for i in range(n):
+        emb = rng.normal(size=dim).astype(np.float32)
+        negative = rng.normal(size=dim).astype(np.float32) if i % 3 == 0 else None
+        tags.append(SimpleNamespace(
+            id=i + 1,
+            name=f"Tag{i}",
+            learned_embedding=emb.tobytes() if i % 2 == 0 else None,
+            description="Beschreibung" if i % 4 == 1 else None,
+            negative_embedding=negative.tobytes() if negative is not None else None,
+            negative_count=i % 7,
+        ))
+        embeddings.append(emb)
+    return tags, embeddings
+
+
+def _loop_reference(email, tags, embeddings):
+    """Bisheriger Algorithmus aus suggest_tags_by_email_embedding"""
+    scores = []
+    for tag, tag_emb in zip(tags, embeddings):
+        similarity = TagEmbeddingCache.compute_similarity(email, tag_emb)
+        negative_sim = get_negative_similarity(email, tag)
+        if negative_sim > 0.0:
+            penalty = calculate_negative_penalty(similarity, negative_sim, tag.negative_count or 0, 0.20)
+            similarity = max(0.0, similarity - penalty)
+        scores.append(similarity)
+    return np.array(scores)
+
+
+class TestTagMatrix:
+    """Tests für TagMatrix"""
+
+    def test_scores_match_loop(self):
+        tags, embeddings = _tags()
+        # Emails nahe an Tags (inkl. Negative-Feedback-Tags) für echte Penalties
+        rng = np.random.default_rng(1)
+        emails = np.stack([embeddings[i] + 0.5 * rng.normal(size=16) for i in range(12)]).astype(np.float32)
+        emails *= 3.0  # nicht normalisiert wie aus der DB
+
+        matrix = TagMatrix.build(tags, embeddings)
+        similarities, penalties = matrix.score(emails)
+
+        assert similarities.shape == (12, 12)
+        assert (penalties > 0).any()
+        for i, email in enumerate(emails):
+            assert np.allclose(similarities[i], _loop_reference(email, tags, embeddings), atol=1e-5)
+
+    def test_thresholds_and_sources(self):
+        tags, embeddings = _tags(n=4)
+        matrix = TagMatrix.build(tags, embeddings)
+
+        assert matrix.sources == ["learned", "description", "learned", "name"]
+        assert np.allclose(matrix.suggest_thresholds, [0.75, 0.50, 0.75, 0.35])
+        assert np.allclose(matrix.auto_thresholds, [0.80, 0.60, 0.80, 0.65])
+
+    def test_missing_and_mismatched_embeddings_are_skipped(self):
+        tags, embeddings = _tags(n=5)
+        embeddings[1] = None
+        embeddings[2] = np.ones(8, dtype=np.float32)
+
+        matrix = TagMatrix.build(tags, embeddings)
+
+        assert matrix.size == 3
+        assert matrix.total_tags == 5
+        assert list(matrix.tag_ids) == [1, 4, 5]
+        assert matrix.dim == 16
+
+    def test_vectorized_penalty_matches_scalar(self):
+        rng = np.random.default_rng(3)
+        pos = rng.uniform(-0.2, 1.0, size=(20, 6))
+        neg = rng.uniform(-0.2, 1.0, size=(20, 6))
+        counts = np.array([0, 1, 2, 3, 5, 10])
+
+        vectorized = calculate_negative_penalties(pos, neg, counts)
+
+        for i in range(20):
+            for j in range(6):
+                expected = calculate_negative_penalty(pos[i, j], neg[i, j], counts[j]) if neg[i, j] > 0 else 0.0
+                assert abs(vectorized[i, j] - expected) < 1e-9
+
+
+class _FakeDB:
+    """Minimaler Session-Ersatz: db.get(Model, id) → Tag-Objekt"""
+
+    def __init__(self, tags):
+        self._tags = {tag.id: tag for tag in tags}
+
+    def get(self, model, tag_id):
+        return self._tags.get(tag_id)
+
+
+class TestSuggestTagsByEmailEmbedding:
+    """Tests für TagManager.suggest_tags_by_email_embedding"""
+
+    def _setup(self, monkeypatch, n=6):
+        from src.services.tag_manager import TagManager
+
+        tags, embeddings = _tags(n=n)
+        matrix = TagMatrix.build(tags, embeddings)
+        monkeypatch.setattr(TagEmbeddingCache, "get_tag_matrix", classmethod(lambda cls, user_id, db: matrix))
+        return TagManager, tags, embeddings
+
+    def test_returns_matching_tag_first(self, monkeypatch):
+        TagManager, tags, embeddings = self._setup(monkeypatch)
+
+        results = TagManager.suggest_tags_by_email_embedding(
+            _FakeDB(tags), user_id=1, email_embedding_bytes=embeddings[3].tobytes(), top_k=3
+        )
+
+        assert results
+        assert results[0][0].id == 4
+        assert results[0][1] > 0.99
+        assert [s for _, s in results] == sorted((s for _, s in results), reverse=True)
+
+    def test_exclude_tag_ids(self, monkeypatch):
+        TagManager, tags, embeddings = self._setup(monkeypatch)
+
+        results = TagManager.suggest_tags_by_email_embedding(
+            _FakeDB(tags), user_id=1, email_embedding_bytes=embeddings[3].tobytes(), exclude_tag_ids=[4]
+        )
+
+        assert all(tag.id != 4 for tag, _ in results)
+
+    def test_dimension_mismatch_returns_empty(self, monkeypatch):
+        TagManager, tags, _ = self._setup(monkeypatch)
+
+        results = TagManager.suggest_tags_by_email_embedding(
+            _FakeDB(tags), user_id=1, email_embedding_bytes=np.ones(8, dtype=np.float32).tobytes()
+        )
+
+        assert results == []
@@ -0,0 +1,164 @@
+"""
+Test persistenter Message-ID → Thread-Index (message_thread_index)
+
+Prüft Parsing der Message-ID-Header, inkrementelle Zuordnung über
+Batch-Grenzen hinweg, Zusammenlegen von Threads bei nachträglich
+auftauchenden Eltern, parallel angelegte Knoten und den Rebuild aus
+verschlüsselten Headern (SQLite).
+"""
+
+import sys
+import os
+import base64
+import importlib
+from datetime import datetime
+
+import pytest
+from sqlalchemy import JSON, create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+models = importlib.import_module("src.02_models")
+encryption = importlib.import_module("src.08_encryption")
+thread_index = importlib.import_module("src.services.thread_index")
+
+Service = thread_index.ThreadIndexService
+MASTER_KEY = base64.b64encode(b"m" * 32).decode()
+KEY = thread_index.derive_thread_key(MASTER_KEY)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    # raw_emails.processing_warnings ist JSONB (PostgreSQL) → für SQLite kurz als JSON anlegen
+    warnings_column = models.RawEmail.__table__.c.processing_warnings
+    jsonb, warnings_column.type = warnings_column.type, JSON()
+    try:
+        models.Base.metadata.create_all(engine, tables=[
+            models.MessageThreadNode.__table__,
+            models.RawEmail.__table__,
+            models.ThreadSummary.__table__,
+        ])
+    finally:
+        warnings_column.type = jsonb
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _raw_email(db, uid, message_id, thread_id, in_reply_to=None, references=None):
+    encryptor = encryption.BatchEncryptor(MASTER_KEY)
+    raw = models.RawEmail(
+        user_id=1, mail_account_id=1,
+        encrypted_sender=encryptor.encrypt("a@b.de"),
+        received_at=datetime(2026, 1, uid),
+        imap_uid=uid, imap_folder="INBOX", imap_uidvalidity=1,
+        message_id=message_id, thread_id=thread_id,
+        encrypted_in_reply_to=encryptor.encrypt_optional(in_reply_to),
+        encrypted_references=encryptor.encrypt_optional(references),
+    )
+    db.add(raw)
+    return raw
+
+
+class TestParsing:
+    """Tests für parse_message_ids / message_links"""
+
+    def test_references_with_and_without_brackets(self):
+        assert thread_index.parse_message_ids("<a@x> <b@y>\r\n <c@z>") == ["a@x", "b@y", "c@z"]
+        assert thread_index.parse_message_ids("a@x b@y") == ["a@x", "b@y"]
+        assert thread_index.parse_message_ids("garbage") == []
+        assert thread_index.parse_message_ids(None) == []
+
+    def test_links_deduplicated_own_id_first(self):
+        assert thread_index.message_links("c@x", "b@x", "<a@x> <b@x>") == ["c@x", "b@x", "a@x"]
+
+
+class TestAssign:
+    """Tests für ThreadIndexService.assign"""
+
+    def test_reply_in_later_batch_joins_thread(self, db):
+        [root] = Service.assign(db, 1, KEY, [("a@x", None, None, "batch-1")])
+        db.commit()
+
+        [reply] = Service.assign(db, 1, KEY, [("b@x", "a@x", "<a@x>", "batch-2")])
+        assert reply == root
+        assert root != "batch-1"
+
+    def test_replies_to_missing_parent_share_thread(self, db):
+        [first] = Service.assign(db, 1, KEY, [("b@x", "a@x", None, None)])
+        [second] = Service.assign(db, 1, KEY, [("c@x", "a@x", None, None)])
+        assert first == second
+
+    def test_missing_link_merges_threads(self, db):
+        thread_a, thread_b, _ = Service.assign(db, 1, KEY, [
+            ("a@x", None, None, None),
+            ("c@x", "b@x", None, None),
+            ("d@x", "c@x", "<b@x> <c@x>", None),
+        ])
+        assert thread_a != thread_b
+        _raw_email(db, 1, "a@x", thread_a)
+        _raw_email(db, 2, "c@x", thread_b)
+        db.commit()
+
+        [merged] = Service.assign(db, 1, KEY, [("b@x", "a@x", None, None)])
+        db.commit()
+
+        # Größerer Thread (b, c, d) behält seine ID
+        assert merged == thread_b
+        assert {t for (t,) in db.query(models.RawEmail.thread_id)} == {thread_b}
+        assert {t for (t,) in db.query(models.MessageThreadNode.thread_id)} == {thread_b}
+
+    def test_node_inserted_concurrently_is_merged(self, db, monkeypatch):
+        """Test: Knoten, den ein paralleler Worker zuerst schreibt (ON CONFLICT), wird zusammengelegt"""
+        [other_worker] = Service.assign(db, 1, KEY, [("a@x", None, None, None)])
+        _raw_email(db, 1, "a@x", other_worker)
+        db.commit()
+
+        # Lesen vor dem Commit des anderen Workers: a@x ist noch unbekannt
+        load_nodes = Service._load_nodes
+        calls = []
+
+        def stale_then_real(session, user_id, keys):
+            calls.append(keys)
+            return {} if len(calls) == 1 else load_nodes(session, user_id, keys)
+
+        monkeypatch.setattr(Service, "_load_nodes", staticmethod(stale_then_real))
+        [reply] = Service.assign(db, 1, KEY, [("b@x", "a@x", None, None)])
+        db.commit()
+
+        assert calls[1] == [thread_index.message_key(KEY, "a@x")]
+        assert {t for (t,) in db.query(models.MessageThreadNode.thread_id)} == {reply}
+        assert {t for (t,) in db.query(models.RawEmail.thread_id)} == {reply}
+        assert db.query(models.MessageThreadNode).count() == 2
+
+    def test_without_message_ids_keeps_fallback_and_users_are_separate(self, db):
+        assert Service.assign(db, 1, KEY, [(None, None, None, "batch-1")]) == ["batch-1"]
+
+        [own] = Service.assign(db, 1, KEY, [("a@x", None, None, None)])
+        [other] = Service.assign(db, 2, KEY, [("b@x", "a@x", None, None)])
+        assert own != other
+
+
+class TestRebuild:
+    """Tests für ThreadIndexService.rebuild_user / ensure_built"""
+
+    def test_rethreads_from_encrypted_headers(self, db):
+        _raw_email(db, 1, "a@x", "t-old")
+        _raw_email(db, 2, "b@x", "t-other", in_reply_to="a@x")
+        _raw_email(db, 3, "c@x", "t-third", references="<a@x> <b@x>")
+        _raw_email(db, 4, "z@x", "t-old")
+        db.commit()
+
+        assert Service.ensure_built(db, 1, MASTER_KEY) is True
+        assert Service.ensure_built(db, 1, MASTER_KEY) is False
+
+        threads = dict(db.query(models.RawEmail.message_id, models.RawEmail.thread_id))
+        assert threads["a@x"] == threads["b@x"] == threads["c@x"] == "t-old"
+        assert threads["z@x"] not in ("t-old", None)
+        assert db.query(models.MessageThreadNode).count() == 4
+        assert db.query(models.ThreadSummary).count() == 2
+
+        [reply] = Service.assign(db, 1, KEY, [("d@x", "c@x", None, None)])
+        assert reply == "t-old"
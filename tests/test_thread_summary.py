@@ -0,0 +1,164 @@
+"""
+Test materialisierte Thread-Übersicht (thread_summary)
+
+Prüft die Aggregation (Root/Neueste, Ungelesene), das Vormerken
+geänderter Threads für den nächsten Commit und die Nachführung über die
+Session-Events mit einer echten Session (SQLite).
+"""
+
+import sys
+import os
+import importlib
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import JSON, create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+models = importlib.import_module("src.02_models")
+thread_summary = importlib.import_module("src.services.thread_summary")
+
+Service = thread_summary.ThreadSummaryService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    # raw_emails.processing_warnings ist JSONB (PostgreSQL) → für SQLite kurz als JSON anlegen
+    warnings_column = models.RawEmail.__table__.c.processing_warnings
+    jsonb, warnings_column.type = warnings_column.type, JSON()
+    try:
+        models.Base.metadata.create_all(engine, tables=[
+            models.RawEmail.__table__,
+            models.ThreadSummary.__table__,
+            # Beziehungen, die db.delete(RawEmail) mitlädt
+            models.EmailAttachment.__table__,
+            models.ProcessedEmail.__table__,
+            models.MailServerState.__table__,
+        ])
+    finally:
+        warnings_column.type = jsonb
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _raw_email(db, uid, thread_id, is_seen=False):
+    raw = models.RawEmail(
+        user_id=1, mail_account_id=1,
+        encrypted_sender=f"sender-{uid}", encrypted_subject=f"subject-{uid}",
+        received_at=datetime(2026, 1, uid),
+        imap_uid=uid, imap_folder="INBOX", imap_uidvalidity=1,
+        imap_is_seen=is_seen, thread_id=thread_id,
+    )
+    db.add(raw)
+    return raw
+
+
+def _summary(db, thread_id):
+    return db.query(models.ThreadSummary).filter_by(user_id=1, thread_id=thread_id).one_or_none()
+
+
+def _row(thread_id, day, uid, is_seen, account_id=1):
+    # (thread_id, account_id, received_at, uid, is_seen, sender, subject)
+    return (thread_id, account_id, datetime(2026, 1, day), uid, is_seen, f"sender-{uid}", f"subject-{uid}")
+
+
+class TestCompute:
+    """Tests für ThreadSummaryService._compute"""
+
+    def test_root_and_latest(self):
+        summaries = Service._compute([
+            _row("t1", 1, 10, True),
+            _row("t1", 3, 12, False),
+            _row("t1", 5, 11, None),
+            _row("t2", 2, 20, False),
+        ])
+
+        t1 = summaries["t1"]
+        assert t1["email_count"] == 3
+        assert t1["oldest_date"] == datetime(2026, 1, 1)
+        assert t1["root_subject"] == "subject-10"
+        assert t1["latest_date"] == datetime(2026, 1, 5)
+        assert t1["latest_uid"] == 11
+        assert t1["latest_sender"] == "sender-11"
+
+        t2 = summaries["t2"]
+        assert t2["email_count"] == 1
+        assert t2["root_subject"] == "subject-20"
+        assert t2["latest_uid"] == 20
+
+    def test_unread_counts_only_explicit_false(self):
+        summaries = Service._compute([
+            _row("t1", 1, 1, False),
+            _row("t1", 2, 2, None),
+            _row("t1", 3, 3, True),
+            _row("t1", 4, 4, False),
+        ])
+
+        assert summaries["t1"]["unread_count"] == 2
+
+    def test_empty(self):
+        assert Service._compute([]) == {}
+
+
+class TestMarkDirty:
+    """Tests für ThreadSummaryService.mark_dirty"""
+
+    def test_collects_keys_in_session_info(self):
+        session = SimpleNamespace(info={})
+
+        Service.mark_dirty(session, 1, ["a", None, "b"])
+        Service.mark_dirty(session, 2, ["a"])
+        Service.mark_dirty(session, 1, [])
+
+        assert session.info[models.THREAD_SUMMARY_DIRTY_KEY] == {(1, "a"), (1, "b"), (2, "a")}
+
+
+class TestSessionEvents:
+    """Tests für die Nachführung per before_flush/before_commit (echte Session)"""
+
+    def test_insert_flag_change_and_delete(self, db):
+        first = _raw_email(db, 1, "t1")
+        second = _raw_email(db, 2, "t1")
+        db.commit()
+
+        summary = _summary(db, "t1")
+        assert (summary.email_count, summary.unread_count, summary.latest_uid) == (2, 2, 2)
+        assert summary.root_subject == "subject-1"
+
+        first.imap_is_seen = True
+        db.commit()
+        db.refresh(summary)
+        assert summary.unread_count == 1
+
+        db.delete(second)
+        db.commit()
+        db.refresh(summary)
+        assert (summary.email_count, summary.latest_uid, summary.latest_sender) == (1, 1, "sender-1")
+
+        db.delete(first)
+        db.commit()
+        assert _summary(db, "t1") is None
+
+    def test_failed_refresh_invalidates_user(self, db, monkeypatch):
+        _raw_email(db, 1, "t1")
+        db.commit()
+        assert _summary(db, "t1").email_count == 1
+
+        def broken(session, keys):
+            raise RuntimeError("kaputt")
+
+        monkeypatch.setattr(Service, "refresh_threads", staticmethod(broken))
+        _raw_email(db, 2, "t1")
+        db.commit()
+        monkeypatch.undo()
+
+        # Commit der Emails ging durch, die veraltete Summary wurde verworfen
+        assert db.query(models.RawEmail).count() == 2
+        assert _summary(db, "t1") is None
+        assert Service.ensure_built(db, 1) is True
+        assert _summary(db, "t1").email_count == 2
@@ -0,0 +1,151 @@
+"""
+Test Übersetzungs-Cache und gebündelte Opus-MT-Inferenz
+
+Prüft Segmentierung, Batching nach Token-Budget, Memory-/DB-Cache-Treffer
+ohne generate() und die verschlüsselte translation_cache-Tabelle samt
+Pruning (SQLite).
+Opus-MT wird durch einen Fake-Tokenizer/-Modell ersetzt (kein transformers nötig).
+"""
+
+import sys
+import os
+import base64
+import importlib
+from collections import OrderedDict
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+models = importlib.import_module("src.02_models")
+translation_cache = importlib.import_module("src.services.translation_cache")
+translator_service = importlib.import_module("src.services.translator_service")
+
+MASTER_KEY = base64.b64encode(b"t" * 32).decode()
+MODEL = translator_service.opus_model_name("it", "de")
+
+
+class FakeTokenizer:
+    """Ein Token pro Wort; "Tensoren" sind einfach die Texte"""
+
+    def __call__(self, texts, return_tensors=None, padding=False, max_length=None):
+        if return_tensors:
+            return {"input_ids": list(texts)}
+        return {"input_ids": [text.split() for text in texts]}
+
+    def batch_decode(self, output, skip_special_tokens=True):
+        return [f"DE[{text}]" for text in output]
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def generate(self, input_ids, max_length=512):
+        self.calls.append(list(input_ids))
+        return input_ids
+
+
+@pytest.fixture
+def translator():
+    service = translator_service.TranslatorService()
+    previous = getattr(service, "_opus_models", None)
+    model = FakeModel()
+    service._opus_models = OrderedDict({MODEL: (FakeTokenizer(), model)})
+    service.fake_model = model
+    translation_cache.SegmentMemoryCache.clear()
+    yield service
+    translation_cache.SegmentMemoryCache.clear()
+    service._opus_models = previous if previous is not None else OrderedDict()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine, tables=[models.TranslationCacheEntry.__table__])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+class TestSplitSegments:
+    """Tests für split_segments"""
+
+    def test_paragraphs_and_trailing_spaces(self):
+        text = "Ciao   \nRiga due\n\n   \n\nSaluti  "
+        assert translator_service.split_segments(text) == ["Ciao\nRiga due", "Saluti"]
+
+    def test_long_paragraph_split_at_sentences(self, monkeypatch):
+        monkeypatch.setattr(translator_service, "MAX_CHARS_PER_SEGMENT", 20)
+        segments = translator_service.split_segments("Uno due tre. Quattro cinque. " + "x" * 45)
+
+        assert segments[0] == "Uno due tre."
+        assert all(len(segment) <= 20 for segment in segments)
+        assert "".join(segments).replace(" ", "") == "Unoduetre.Quattrocinque." + "x" * 45
+
+
+class TestBatchedTranslation:
+    """Tests für translate_batch_sync / _run_opus_translation"""
+
+    def test_batch_dedupes_and_respects_token_budget(self, translator, monkeypatch):
+        monkeypatch.setattr(translator_service, "OPUS_MT_BATCH_TOKENS", 6)
+        footer = "Cordiali saluti"
+        results = translator.translate_batch_sync(
+            [f"Uno due tre\n\n{footer}", f"Quattro\n\n{footer}", ""], "de", "it"
+        )
+
+        assert [r.translated_text for r in results] == [
+            f"DE[Uno due tre]\n\nDE[{footer}]",
+            f"DE[Quattro]\n\nDE[{footer}]",
+            "",
+        ]
+        assert results[0].model_used == "opus-mt-it-de"
+        # 3 eindeutige Segmente (1, 2, 3 Tokens) bei Budget 6 → 2 Aufrufe, kurze zuerst
+        assert translator.fake_model.calls == [["Quattro", footer], ["Uno due tre"]]
+
+    def test_memory_cache_skips_generate(self, translator):
+        translator._run_opus_translation(MODEL, "Buongiorno", "it")
+        translator.fake_model.calls.clear()
+
+        assert translator._run_opus_translation(MODEL, "Buongiorno  ", "it") == "DE[Buongiorno]"
+        assert translator.fake_model.calls == []
+
+    def test_persistent_cache_roundtrip(self, translator, db):
+        cache = translation_cache.PersistentTranslationCache(db, 1, MASTER_KEY)
+        translator._run_opus_translation(MODEL, "Buongiorno\n\nA presto", "it", cache)
+        db.commit()
+
+        row = db.query(models.TranslationCacheEntry).first()
+        assert "Buongiorno" not in row.encrypted_translation
+        assert db.query(models.TranslationCacheEntry).count() == 2
+
+        translation_cache.SegmentMemoryCache.clear()
+        translator.fake_model.calls.clear()
+        assert translator._run_opus_translation(MODEL, "A presto", "it", cache) == "DE[A presto]"
+        assert translator.fake_model.calls == []
+
+        other_user = translation_cache.PersistentTranslationCache(db, 2, base64.b64encode(b"u" * 32).decode())
+        assert other_user.get_many(MODEL, "it", ["A presto"]) == {}
+
+    def test_persistent_cache_prunes_oldest_and_expired(self, db, monkeypatch):
+        monkeypatch.setattr(translation_cache, "TRANSLATION_CACHE_MAX_ENTRIES", 3)
+        cache = translation_cache.PersistentTranslationCache(db, 1, MASTER_KEY)
+        other_user = translation_cache.PersistentTranslationCache(db, 2, base64.b64encode(b"u" * 32).decode())
+        other_user.put_many(MODEL, "it", {"Vecchio": "Alt"})
+        for i in range(5):
+            cache.put_many(MODEL, "it", {f"Segmento {i}": f"Segment {i}"})
+        db.commit()
+
+        assert set(cache.get_many(MODEL, "it", [f"Segmento {i}" for i in range(5)])) == {
+            "Segmento 2", "Segmento 3", "Segmento 4",
+        }
+        assert other_user.get_many(MODEL, "it", ["Vecchio"]) == {"Vecchio": "Alt"}
+
+        monkeypatch.setattr(translation_cache, "TRANSLATION_CACHE_TTL", timedelta(0))
+        cache.put_many(MODEL, "it", {"Nuovo": "Neu"})
+        db.commit()
+        assert [row.model_name for row in db.query(models.TranslationCacheEntry).filter_by(user_id=1)] == [MODEL]
+        assert cache.get_many(MODEL, "it", ["Nuovo", "Segmento 4"]) == {"Nuovo": "Neu"}
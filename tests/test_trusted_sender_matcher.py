@@ -0,0 +1,123 @@
+"""
+Test kompilierter Trusted-Sender-Matcher
+
+Prüft exact/@domain/Domain-Trie-Matching inkl. Suffix-Spoofing, die
+Reihenfolge account-spezifisch vor global, Batch-Matching und die
+Invalidierung des Caches nach Änderungen (SQLite, nur trusted_senders).
+"""
+
+import sys
+import os
+import importlib
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+models = importlib.import_module("src.02_models")
+trusted_senders = importlib.import_module("src.services.trusted_senders")
+
+Manager = trusted_senders.TrustedSenderManager
+
+
+def _entry(id, pattern, pattern_type, account_id=None):
+    return {
+        'id': id, 'label': None, 'use_urgency_booster': True,
+        'pattern': pattern, 'pattern_type': pattern_type, 'account_id': account_id,
+    }
+
+
+class TestCompiledSenderMatcher:
+    """Tests für CompiledSenderMatcher.match"""
+
+    def test_pattern_types(self):
+        matcher = trusted_senders.CompiledSenderMatcher([
+            _entry(1, "boss@firma.de", "exact"),
+            _entry(2, "@shop.de", "email_domain"),
+            _entry(3, "example.com", "domain"),
+        ])
+
+        assert matcher.match('"Chef" <BOSS@Firma.de>')['id'] == 1
+        assert matcher.match("admin@firma.de") is None
+        assert matcher.match("info@shop.de")['id'] == 2
+        assert matcher.match("info@mail.shop.de") is None
+        assert matcher.match("a@example.com")['id'] == 3
+        assert matcher.match("a@mail.secure.example.com")['id'] == 3
+        assert matcher.match("a@test-example.com") is None
+        assert matcher.match("a@example.com.evil.com") is None
+        assert matcher.match("example.com") is None
+        assert matcher.match("") is None
+
+    def test_most_specific_domain_wins(self):
+        matcher = trusted_senders.CompiledSenderMatcher([
+            _entry(1, "example.com", "domain"),
+            _entry(2, "mail.example.com", "domain"),
+        ])
+
+        assert matcher.match("a@x.mail.example.com")['id'] == 2
+        assert matcher.match("a@www.example.com")['id'] == 1
+
+    def test_account_before_global(self):
+        matcher = trusted_senders.CompiledSenderMatcher([
+            _entry(1, "example.com", "domain"),
+            _entry(2, "@example.com", "email_domain", account_id=7),
+        ])
+
+        assert matcher.match("a@example.com", account_id=7)['id'] == 2
+        assert matcher.match("a@example.com", account_id=8)['id'] == 1
+        assert matcher.match("a@example.com")['id'] == 1
+        assert matcher.match("a@mail.example.com", account_id=7)['id'] == 1
+
+    def test_account_patterns_ignored_without_account(self):
+        matcher = trusted_senders.CompiledSenderMatcher([
+            _entry(1, "boss@firma.de", "exact", account_id=7),
+        ])
+
+        assert matcher.match("boss@firma.de") is None
+        assert matcher.match("boss@firma.de", account_id=7)['account_id'] == 7
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine, tables=[models.TrustedSender.__table__])
+    session = sessionmaker(bind=engine)()
+    Manager.invalidate()
+    yield session
+    session.close()
+    Manager.invalidate()
+
+
+def _count_queries(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+class TestTrustedSenderManager:
+    """Tests für is_trusted_sender / match_senders mit Cache"""
+
+    def test_single_query_for_many_lookups(self, db):
+        Manager.add_trusted_sender(db, 1, "example.com", "domain")
+        statements = _count_queries(db)
+
+        for _ in range(20):
+            assert Manager.is_trusted_sender(db, 1, "a@example.com")['pattern'] == "example.com"
+        matches = Manager.match_senders(db, 1, ["a@example.com", "b@other.org"])
+
+        assert matches["b@other.org"] is None
+        assert matches["a@example.com"]['pattern_type'] == "domain"
+        assert len(statements) == 1
+
+    def test_add_and_delete_invalidate(self, db):
+        assert Manager.is_trusted_sender(db, 1, "boss@firma.de") is None
+
+        result = Manager.add_trusted_sender(db, 1, "boss@firma.de", "exact")
+        assert Manager.is_trusted_sender(db, 1, "boss@firma.de")['id'] == result['id']
+
+        db.query(models.TrustedSender).delete()
+        db.commit()
+        Manager.invalidate(1)
+        assert Manager.is_trusted_sender(db, 1, "boss@firma.de") is None